@@ -402,13 +402,7 @@ def main():
     print_timestamp("Inicio del análisis")
     
     # Crear la SparkSession con configuración desde YAML
-    spark_config = config.get_spark_config()
-    spark = SparkSession.builder \
-        .appName(spark_config.get('app_name', 'Bluesky Data Analysis')) \
-        .config("spark.driver.memory", spark_config.get('driver_memory', '8g')) \
-        .config("spark.executor.memory", spark_config.get('executor_memory', '8g')) \
-        .config("spark.sql.debug.maxToStringFields", spark_config.get('max_to_string_fields', 1000)) \
-        .getOrCreate()
+    spark = spark_utils.crear_sesion_spark(config.get_spark_config())
 
     # Instanciar las clases
     carga_datos = CargaDatos(spark)
@@ -12,6 +12,29 @@ def set_exportador(exportador):
     global _exportador
     _exportador = exportador
 
+def crear_sesion_spark(spark_config, app_name=None, extra_config=None):
+    """
+    Crea (o reutiliza) la SparkSession con la configuración del YAML
+    
+    Args:
+        spark_config: Sección `spark` de configuracion/config.yaml
+        app_name: Nombre de la aplicación (por defecto el del YAML)
+        extra_config: Dict opcional con claves de configuración adicionales
+    
+    Returns:
+        SparkSession
+    """
+    from pyspark.sql import SparkSession
+    
+    builder = SparkSession.builder \
+        .appName(app_name or spark_config.get('app_name', 'Bluesky Data Analysis')) \
+        .config("spark.driver.memory", spark_config.get('driver_memory', '8g')) \
+        .config("spark.executor.memory", spark_config.get('executor_memory', '8g')) \
+        .config("spark.sql.debug.maxToStringFields", spark_config.get('max_to_string_fields', 1000))
+    for clave, valor in (extra_config or {}).items():
+        builder = builder.config(clave, valor)
+    return builder.getOrCreate()
+
 def show_and_capture(df, titulo="", n=20, truncate=True):
     """
     Muestra una tabla de Spark en consola Y la captura para el MD
@@ -120,6 +120,10 @@ class Config:
         """Retorna el delay cuando hay rate limit"""
         return self.get('posts', 'delay_rate_limit', default=60)
     
+    def get_horas_entre_descargas(self):
+        """Retorna las horas tras las que se vuelve a descargar un usuario ya procesado"""
+        return self.get('posts', 'horas_entre_descargas', default=24)
+    
     # Spark
     def get_spark_config(self):
         """Retorna toda la configuración de Spark como diccionario"""
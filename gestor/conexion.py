@@ -1,5 +1,6 @@
+import asyncio
 import os
-from atproto import Client
+from atproto import AsyncClient, Client
 
 class ConexionBluesky:
     """
@@ -28,3 +29,38 @@ class ConexionBluesky:
         if not self.logged_in or self.client is None:
             self.conectar()
         return self.client
+
+
+class ConexionBlueskyAsync:
+    """
+    Versión asíncrona de ConexionBluesky con el AsyncClient de atproto.
+    Pensada para vivir en un único bucle de eventos (un worker de web/asgi.py):
+    el inicio de sesión se hace una vez y lo comparten todas las peticiones.
+    """
+    def __init__(self, handle=None, app_password=None):
+        self.handle = handle or os.environ.get('BSKY_HANDLE')
+        self.app_password = app_password or os.environ.get('BSKY_APP_PASSWORD')
+        self.client = None
+        self.logged_in = False
+        self._lock = None
+
+    async def conectar(self):
+        if not self.handle or not self.app_password:
+            raise ValueError("Configura BSKY_HANDLE y BSKY_APP_PASSWORD.")
+        self.client = AsyncClient()
+        try:
+            await self.client.login(self.handle, self.app_password)
+            self.logged_in = True
+            print(f"Inicio de sesión exitoso como {self.client.me.handle}")
+        except Exception as e:
+            self.logged_in = False
+            raise RuntimeError(f"Error al iniciar sesión: {e}")
+
+    async def get_client(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Las peticiones que llegan durante el inicio de sesión esperan al mismo
+        async with self._lock:
+            if not self.logged_in or self.client is None:
+                await self.conectar()
+        return self.client
@@ -0,0 +1,168 @@
+"""
+Descarga concurrente del perfil y los posts de un usuario.
+
+`get_profile` y `get_author_feed` son independientes, así que se lanzan a la
+vez en un pool de hilos compartido y la latencia es la de la llamada más
+lenta, no la suma de las dos. Cada llamada tiene su propio tiempo máximo:
+- Si el perfil no llega o falla, no hay predicción posible y se lanza
+  PerfilNoDisponible.
+- Si los posts no llegan a tiempo o fallan, se devuelve solo el perfil
+  (`posts_completos=False`) para hacer una predicción degradada.
+
+Las llamadas que agotan su tiempo no se pueden interrumpir: terminan en
+segundo plano y su resultado se descarta.
+
+`descargar_usuario_async` hace lo mismo con el AsyncClient de atproto dentro
+de un bucle de eventos (modo asíncrono de la web, web/asgi.py). Ahí no hacen
+falta hilos y las llamadas que agotan su tiempo sí se cancelan.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+class PerfilNoDisponible(Exception):
+    """No se pudo obtener el perfil (error de la API o tiempo agotado)."""
+
+    def __init__(self, mensaje, agotado=False):
+        super().__init__(mensaje)
+        self.agotado = agotado
+
+
+def _pool():
+    """Pool compartido por todas las descargas del proceso."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix='descarga-bsky')
+        return _POOL
+
+
+def posts_desde_feed(feed_response):
+    """Convierte la respuesta de get_author_feed al formato de posts del proyecto"""
+    posts = []
+    for feed_item in feed_response.feed:
+        post = feed_item.post
+        posts.append({
+            'text': post.record.text,
+            'createdAt': post.record.created_at,
+            'likeCount': post.like_count,
+            'replyCount': post.reply_count,
+            'repostCount': post.repost_count
+        })
+    return posts
+
+
+def _cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def descargar_usuario(client, actor, num_posts=25, timeout_perfil=10.0, timeout_posts=5.0):
+    """
+    Perfil y últimos posts de un usuario, pedidos en paralelo
+
+    Args:
+        client: Cliente autenticado de atproto
+        actor: Handle o DID
+        num_posts: Posts a pedir a get_author_feed
+        timeout_perfil: Segundos máximos de espera del perfil
+        timeout_posts: Segundos máximos de espera de los posts (desde el inicio)
+
+    Returns:
+        Dict con profile, posts, posts_completos, error_posts, posts_agotado
+        (los posts no llegaron a tiempo) y tiempos (segundos de cada llamada;
+        None si no terminó a tiempo)
+
+    Raises:
+        PerfilNoDisponible: Si el perfil falla o no llega a tiempo
+    """
+    inicio = time.perf_counter()
+    pool = _pool()
+    futuro_perfil = pool.submit(_cronometrar, lambda: client.get_profile(actor=actor).model_dump(mode='json'))
+    futuro_posts = pool.submit(_cronometrar, lambda: posts_desde_feed(
+        client.get_author_feed(actor=actor, limit=num_posts)
+    ))
+
+    try:
+        profile, tiempo_perfil = futuro_perfil.result(timeout=timeout_perfil)
+    except FutureTimeoutError:
+        raise PerfilNoDisponible(f"el perfil no respondió en {timeout_perfil:g} s", agotado=True) from None
+    except Exception as e:
+        raise PerfilNoDisponible(str(e)) from e
+
+    # El tiempo de los posts cuenta desde que se lanzaron, no desde que llegó el perfil
+    restante = max(0.0, timeout_posts - (time.perf_counter() - inicio))
+    posts, tiempo_posts, error_posts, posts_agotado = [], None, None, False
+    try:
+        posts, tiempo_posts = futuro_posts.result(timeout=restante)
+    except FutureTimeoutError:
+        error_posts = f"los posts no respondieron en {timeout_posts:g} s"
+        posts_agotado = True
+    except Exception as e:
+        error_posts = str(e)
+
+    return _resultado(profile, posts, error_posts, posts_agotado, tiempo_perfil, tiempo_posts, inicio)
+
+
+def _resultado(profile, posts, error_posts, posts_agotado, tiempo_perfil, tiempo_posts, inicio):
+    return {
+        'profile': profile,
+        'posts': posts,
+        'posts_completos': error_posts is None,
+        'error_posts': error_posts,
+        'posts_agotado': posts_agotado,
+        'tiempos': {'perfil': tiempo_perfil, 'posts': tiempo_posts, 'total': time.perf_counter() - inicio},
+    }
+
+
+async def _cronometrar_async(corrutina):
+    inicio = time.perf_counter()
+    resultado = await corrutina
+    return resultado, time.perf_counter() - inicio
+
+
+async def descargar_usuario_async(client, actor, num_posts=25, timeout_perfil=10.0, timeout_posts=5.0):
+    """
+    Versión asíncrona de descargar_usuario (mismos argumentos y resultado)
+
+    Args:
+        client: AsyncClient autenticado de atproto
+    """
+    inicio = time.perf_counter()
+
+    async def pedir_perfil():
+        respuesta = await client.get_profile(actor=actor)
+        return respuesta.model_dump(mode='json')
+
+    async def pedir_posts():
+        return posts_desde_feed(await client.get_author_feed(actor=actor, limit=num_posts))
+
+    tarea_perfil = asyncio.ensure_future(_cronometrar_async(pedir_perfil()))
+    tarea_posts = asyncio.ensure_future(_cronometrar_async(pedir_posts()))
+
+    try:
+        profile, tiempo_perfil = await asyncio.wait_for(tarea_perfil, timeout_perfil)
+    except asyncio.TimeoutError:
+        tarea_posts.cancel()
+        raise PerfilNoDisponible(f"el perfil no respondió en {timeout_perfil:g} s", agotado=True) from None
+    except Exception as e:
+        tarea_posts.cancel()
+        raise PerfilNoDisponible(str(e)) from e
+
+    restante = max(0.0, timeout_posts - (time.perf_counter() - inicio))
+    posts, tiempo_posts, error_posts, posts_agotado = [], None, None, False
+    try:
+        posts, tiempo_posts = await asyncio.wait_for(tarea_posts, restante)
+    except asyncio.TimeoutError:
+        error_posts = f"los posts no respondieron en {timeout_posts:g} s"
+        posts_agotado = True
+    except Exception as e:
+        error_posts = str(e)
+
+    return _resultado(profile, posts, error_posts, posts_agotado, tiempo_perfil, tiempo_posts, inicio)
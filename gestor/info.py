@@ -126,8 +126,9 @@ class datosUsuario:
             all_profiles = existing_profiles + new_profiles
             print(f"Guardando {len(new_profiles)} perfiles nuevos (total acumulado: {len(all_profiles)}) en {output_filename}...")
             
-            # Guardar con permisos restrictivos (solo propietario puede leer/escribir)
-            with handler.abrir_escritura(output_filename, permisos=0o600) as f:
+            # Guardar con permisos restrictivos (solo propietario puede leer/escribir),
+            # de forma atómica porque la web lo indexa (web/local_store.py)
+            with handler.abrir_escritura_atomica(output_filename, permisos=0o600) as f:
                 json.dump(all_profiles, f, indent=4, ensure_ascii=False)
             print(f"¡Datos guardados correctamente!")
             
@@ -2,6 +2,7 @@ import os
 import sys
 import json
 import time
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Agregar ruta del proyecto para imports
@@ -10,6 +11,32 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from gestor.conexion import ConexionBluesky
 from configuracion.load_config import config
 from seguridad.secure_file_handler import SecureFileHandler
+from prediccion.utils.estadisticas_incrementales import actualizar_entrada
+
+
+def cargar_indice_duplicados():
+    """
+    Índice de duplicados entre cuentas de prediccion/ si `duplicados.habilitado`
+    está activo en prediccion/config.yaml
+
+    Los posts se añaden al índice según se descargan, así el modelo servido por
+    la web (que lo carga junto al modelo) conoce las cuentas nuevas.
+
+    Returns:
+        Tupla (IndiceDuplicados, ruta), o (None, None) si está desactivado
+    """
+    import yaml
+    from prediccion.utils.duplicados import IndiceDuplicados
+
+    base_dir = Path(__file__).parent.parent / 'prediccion'
+    with open(base_dir / 'config.yaml', 'r', encoding='utf-8') as f:
+        config_prediccion = yaml.safe_load(f)
+    cfg = config_prediccion.get('duplicados') or {}
+    if not cfg.get('habilitado'):
+        return None, None
+    ruta = base_dir / cfg.get('indice', 'datos/indice_duplicados.pkl')
+    return IndiceDuplicados.cargar_o_crear(config_prediccion, ruta), ruta
+
 
 class BlueskyPostsFetcher:
     """
@@ -23,7 +50,8 @@ class BlueskyPostsFetcher:
     """
     
     
-    def __init__(self, handle=None, app_password=None, input_file=None, output_file=None, posts_per_user_limit=None):
+    def __init__(self, handle=None, app_password=None, input_file=None, output_file=None, posts_per_user_limit=None,
+                 horas_entre_descargas=None):
         self.handle = handle or os.environ.get('BSKY_HANDLE')
         self.app_password = app_password or os.environ.get('BSKY_APP_PASSWORD')
         self.conexion = ConexionBluesky(self.handle, self.app_password)
@@ -44,10 +72,15 @@ class BlueskyPostsFetcher:
         self.input_file = input_file
         self.output_file = output_file
         self.posts_per_user_limit = posts_per_user_limit if posts_per_user_limit is not None else config.get_posts_por_usuario_limite()
+        if not isinstance(self.posts_per_user_limit, int) or self.posts_per_user_limit < 1:
+            raise ValueError(f"posts_por_usuario_limite debe ser un entero positivo, no {self.posts_per_user_limit!r}")
+        self.horas_entre_descargas = horas_entre_descargas if horas_entre_descargas is not None else config.get_horas_entre_descargas()
         self.client = None
         self.processed_data = {}
         self.processed_dids = set()
         self.profiles_to_scan = []
+        self.indice_duplicados = None
+        self.ruta_indice_duplicados = None
 
 
 
@@ -96,13 +129,40 @@ class BlueskyPostsFetcher:
 
 
 
+    def pendiente(self, did, ahora=None):
+        """
+        Indica si hay que descargar los posts de un usuario: nunca procesado, o
+        descargado hace más de `horas_entre_descargas` (o sin fecha de descarga).
+        """
+        if did not in self.processed_dids:
+            return True
+        if not self.horas_entre_descargas:
+            return False
+        descargado_en = self.processed_data.get(did, {}).get('descargado_en')
+        if not descargado_en:
+            return True
+        ahora = ahora or datetime.now(timezone.utc)
+        try:
+            fecha = datetime.fromisoformat(descargado_en)
+        except ValueError:
+            return True
+        if fecha.tzinfo is None:
+            fecha = fecha.replace(tzinfo=timezone.utc)
+        return (ahora - fecha).total_seconds() > self.horas_entre_descargas * 3600
+
+
+
     def process_profiles(self):
         """
         Procesa los perfiles cargados, obteniendo sus posts y guardando el progreso.
+
+        Los usuarios ya procesados se vuelven a descargar pasadas `horas_entre_descargas`
+        horas; solo sus posts nuevos se añaden y actualizan las estadísticas.
         """
         
-        # Solo procesar los perfiles cuyo DID no esté en processed_dids
-        perfiles_pendientes = [p for p in self.profiles_to_scan if p.get('did') not in self.processed_dids]
+        # Perfiles nuevos y ya procesados cuya descarga ha caducado
+        ahora = datetime.now(timezone.utc)
+        perfiles_pendientes = [p for p in self.profiles_to_scan if self.pendiente(p.get('did'), ahora)]
         total_profiles = len(perfiles_pendientes)
         try:
             for i, profile in enumerate(perfiles_pendientes):
@@ -130,10 +190,16 @@ class BlueskyPostsFetcher:
                             }
                             user_posts.append(post_data)
                     print(f"Se obtuvieron {len(user_posts)} posts.")
-                    self.processed_data[did] = {
-                        "profile": profile,
-                        "posts": user_posts
-                    }
+                    # Los posts nuevos se añaden a los existentes y actualizan las estadísticas
+                    # del usuario; se conservan los últimos posts_per_user_limit, la misma
+                    # ventana que puntúa la web (ver estadisticas_incrementales)
+                    entrada = self.processed_data.get(did) or {"posts": []}
+                    entrada["profile"] = profile
+                    # Marca de frescura para la ruta local de la web (ver web/local_store.py)
+                    entrada["descargado_en"] = datetime.now(timezone.utc).isoformat()
+                    self.processed_data[did] = actualizar_entrada(entrada, user_posts, self.posts_per_user_limit)
+                    if self.indice_duplicados is not None:
+                        self.indice_duplicados.agregar_posts(did, user_posts)
                     self.save_progress()
                 except Exception as e:
                     error_message = str(e)
@@ -150,15 +216,20 @@ class BlueskyPostsFetcher:
                 time.sleep(config.get_delay_entre_requests())
         except KeyboardInterrupt:
             print("\nProceso interrumpido por el usuario. El progreso ha sido guardado.")
+        finally:
+            self.save_indice_duplicados()
 
 
 
     def save_progress(self):
         """
         Guarda el progreso actual en el archivo JSON de salida de forma segura.
+        
+        Se escribe de forma atómica (temporal + os.replace): la web puede estar
+        leyendo el archivo por posiciones (web/local_store.py) mientras se descarga.
         """        
         try:
-            with self.file_handler.abrir_escritura(self.output_file, permisos=0o600) as f:
+            with self.file_handler.abrir_escritura_atomica(self.output_file, permisos=0o600) as f:
                 json.dump(self.processed_data, f, indent=2, ensure_ascii=False)
             print("Progreso guardado.")
         except ValueError as e:
@@ -167,6 +238,17 @@ class BlueskyPostsFetcher:
 
 
 
+    def save_indice_duplicados(self):
+        """
+        Guarda el índice de duplicados (una vez por ejecución: firmarlo tras cada perfil sería caro).
+        """
+        if self.indice_duplicados is None:
+            return
+        self.indice_duplicados.guardar(self.ruta_indice_duplicados)
+        print(f"Índice de duplicados guardado ({len(self.indice_duplicados)} posts).")
+
+
+
     def run(self):
         """
         Ejecuta el proceso completo de extracción de posts.
@@ -175,6 +257,7 @@ class BlueskyPostsFetcher:
         self.login()
         self.load_progress()
         self.load_profiles()
+        self.indice_duplicados, self.ruta_indice_duplicados = cargar_indice_duplicados()
         self.process_profiles()
         print("\n--- ¡Procesamiento completado! ---")
         print(f"Todos los datos están en {self.output_file}")
\ No newline at end of file
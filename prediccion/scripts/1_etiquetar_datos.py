@@ -6,14 +6,16 @@ import os
 import sys
 import json
 import yaml
-import pandas as pd
 from pathlib import Path
 
 # Añadir directorio raíz al path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from prediccion.utils.feature_extraction import FeatureExtractor
+from prediccion.utils.feature_extraction import FeatureExtractor, features_de_config
 from prediccion.utils.heuristics import HeuristicLabeler
+from prediccion.utils.json_streaming import iterar_array, iterar_objeto, IndicePostsUsuarios
+from prediccion.utils.duplicados import IndiceDuplicados
+from prediccion.utils.datasets import EscritorPorBloques
 
 def cargar_config():
     """Carga la configuración desde config.yaml"""
@@ -22,115 +24,196 @@ def cargar_config():
         return yaml.safe_load(f)
 
 def cargar_datos(config):
-    """Carga profiles y posts desde los archivos JSON"""
+    """
+    Prepara la lectura incremental de profiles y posts
+
+    Los profiles se recorren como un generador y los posts se indexan por DID
+    (solo posiciones en disco), de modo que ninguno de los dos archivos se
+    carga completo en memoria.
+    """
     base_dir = Path(__file__).parent.parent
     
-    # Cargar profiles
+    # Profiles: generador sobre el array JSON
     profiles_path = base_dir / config['rutas']['profiles_input']
-    print(f"📖 Cargando profiles desde: {profiles_path}")
-    with open(profiles_path, 'r', encoding='utf-8') as f:
-        profiles = json.load(f)
-    print (f"✓ {len(profiles)} perfiles cargados")
+    print(f"📖 Leyendo profiles de forma incremental desde: {profiles_path}")
+    profiles = iterar_array(profiles_path)
     
-    # Cargar posts
+    # Posts: índice DID -> posición en el archivo
     posts_path = base_dir / config['rutas']['posts_input']
-    print(f"📖 Cargando posts desde: {posts_path}")
-    with open(posts_path, 'r', encoding='utf-8') as f:
-        posts_data = json.load(f)
-    print(f"✓ {len(posts_data)} usuarios con posts cargados")
+    print(f"📖 Indexando posts desde: {posts_path}")
+    posts_data = IndicePostsUsuarios(posts_path)
+    print(f"✓ {len(posts_data)} usuarios con posts indexados")
     
     return profiles, posts_data
 
-def etiquetar_perfiles(profiles, posts_data, config):
+def preparar_indice_duplicados(config):
+    """
+    Carga el índice de duplicados entre cuentas y le añade los posts nuevos
+
+    Returns:
+        IndiceDuplicados, o None si `duplicados.habilitado` es False
+    """
+    cfg = config.get('duplicados') or {}
+    if not cfg.get('habilitado'):
+        return None
+    
+    base_dir = Path(__file__).parent.parent
+    indice_path = base_dir / cfg.get('indice', 'datos/indice_duplicados.pkl')
+    if indice_path.exists():
+        print(f"📖 Cargando índice de duplicados desde: {indice_path}")
+    indice = IndiceDuplicados.cargar_o_crear(config, indice_path)
+    
+    # Solo se calculan firmas de los posts que no estaban indexados
+    posts_path = base_dir / config['rutas']['posts_input']
+    nuevos = 0
+    for did, entrada in iterar_objeto(posts_path):
+        nuevos += indice.agregar_posts(did, entrada.get('posts', []))
+    print(f"✓ Índice de duplicados: {len(indice)} posts ({nuevos} nuevos), "
+          f"{len(indice.clusters())} clusters entre cuentas")
+    
+    indice.guardar(indice_path)
+    return indice
+
+def etiquetar_perfiles(profiles, posts_data, config, etiquetados, indice_duplicados=None):
     """
     Etiqueta perfiles usando heurísticas
     
-    Returns:
-        DataFrame con features y labels
+    Las features se extraen perfil a perfil y las reglas se evalúan de forma
+    vectorizada sobre bloques de `etiquetado.tamano_bloque` perfiles.
+    
+    Args:
+        profiles: Iterable de perfiles
+        posts_data: Mapeo DID -> {'profile', 'posts'}
+        config: Configuración cargada
+        etiquetados: Dict de contadores que se actualiza durante el recorrido
+            ('total' cuenta todos los perfiles leídos, 'errores' los que no se pudieron puntuar)
+        indice_duplicados: IndiceDuplicados para las features entre cuentas (opcional)
+    
+    Yields:
+        Dict con features, metadata y label de cada perfil etiquetado
+        (los inciertos se cuentan pero no se emiten)
     """
     print("\n🏷️  Iniciando etiquetado heurístico...")
     
-    extractor = FeatureExtractor()
+    # Solo se calculan las features de config.yaml más las que usan las reglas;
+    # al dataset se escriben únicamente las de config.yaml
+    columnas = features_de_config(config)
     labeler = HeuristicLabeler(config['heuristicas'])
-    
-    data = []
-    etiquetados = {'bots': 0, 'humanos': 0, 'inciertos': 0}
-    
+    extractor = FeatureExtractor.desde_config(
+        config,
+        adicionales=labeler.features_requeridas,
+        indice_duplicados=indice_duplicados,
+    )
+    tamano_bloque = config.get('etiquetado', {}).get('tamano_bloque', 5000)
+    
+    bloque = []
     for i, profile in enumerate(profiles):
         if (i + 1) % 1000 == 0:
-            print(f"  Procesados: {i+1}/{len(profiles)}")
+            print(f"  Procesados: {i+1}")
+        etiquetados['total'] += 1
         
         did = profile.get('did')
         if not did:
+            etiquetados['errores'] += 1
             continue
         
         # Obtener posts del usuario (si existen)
         user_posts = None
-        if did in posts_data:
-            user_posts = posts_data[did].get('posts', [])
+        entrada = posts_data.get(did)
+        if entrada is not None:
+            user_posts = entrada.get('posts', [])
         
         # Extraer features
         try:
             features = extractor.extract_profile_features(profile, user_posts)
         except Exception as e:
             print(f"  ⚠️ Error extrayendo features de {did}: {e}")
+            etiquetados['errores'] += 1
             continue
         
-        # Etiquetar con heurísticas
-        label = labeler.label_profile(features)
-        
-        # Contar
+        bloque.append((did, profile.get('handle', ''), features))
+        if len(bloque) >= tamano_bloque:
+            yield from _etiquetar_bloque(bloque, labeler, columnas, etiquetados)
+            bloque = []
+    
+    if bloque:
+        yield from _etiquetar_bloque(bloque, labeler, columnas, etiquetados)
+
+def _etiquetar_bloque(bloque, labeler, columnas, etiquetados):
+    """Aplica las heurísticas a un bloque de (did, handle, features) de una vez"""
+    labels = labeler.label_batch([features for _, _, features in bloque])
+    
+    for (did, handle, features), label in zip(bloque, labels.tolist()):
+        # Contar y descartar inciertos (label == -1)
         if label == 1:
             etiquetados['bots'] += 1
         elif label == 0:
             etiquetados['humanos'] += 1
         else:
             etiquetados['inciertos'] += 1
+            continue
         
-        # Guardar datos (incluso inciertos, los filtraremos después)
-        row = features.copy()
+        row = {col: features[col] for col in columnas}
         row['did'] = did
-        row['handle'] = profile.get('handle', '')
+        row['handle'] = handle
         row['label'] = label
-        data.append(row)
+        yield row
+
+def guardar_dataset(filas, config):
+    """Escribe el dataset etiquetado en disco por bloques"""
+    base_dir = Path(__file__).parent.parent
+    output_path = base_dir / config['rutas']['dataset_etiquetado']
+    tamano_bloque = config.get('etiquetado', {}).get('tamano_bloque', 5000)
+    
+    # Mismo orden de columnas que las filas de _etiquetar_bloque (y cabecera con 0 filas)
+    columnas = features_de_config(config) + ['did', 'handle', 'label']
+    with EscritorPorBloques(output_path, tamano_bloque, columnas=columnas) as escritor:
+        for fila in filas:
+            escritor.agregar(fila)
     
-    print(f"\n📊 Etiquetado completado:")
+    return output_path, escritor.filas_escritas
+
+def guardar_resumen(etiquetados, filas_escritas, config):
+    """
+    Guarda los contadores del etiquetado en JSON
+    
+    check_results.py y scripts/explorar_umbrales.py leen de aquí el número
+    real de perfiles de entrada.
+    """
+    base_dir = Path(__file__).parent.parent
+    resumen_path = base_dir / config['rutas']['resumen_etiquetado']
+    resumen_path.parent.mkdir(parents=True, exist_ok=True)
+    resumen = {
+        'total_perfiles': etiquetados['total'],
+        'bots': etiquetados['bots'],
+        'humanos': etiquetados['humanos'],
+        'inciertos': etiquetados['inciertos'],
+        'errores': etiquetados['errores'],
+        'filas_dataset': filas_escritas,
+        'min_score_bot': config['heuristicas'].get('min_score_bot', 0.5),
+        'min_score_humano': config['heuristicas'].get('min_score_humano', 0.8),
+    }
+    with open(resumen_path, 'w', encoding='utf-8') as f:
+        json.dump(resumen, f, indent=2)
+    return resumen_path
+
+def mostrar_resumen(etiquetados, filas_escritas, output_path):
+    """Muestra la distribución de labels a partir de los contadores"""
+    print(f"\n📊 Etiquetado completado ({etiquetados['total']} perfiles leídos):")
     print(f"  • Bots: {etiquetados['bots']}")
     print(f"  • Humanos: {etiquetados['humanos']}")
     print(f"  • Inciertos: {etiquetados['inciertos']}")
+    if etiquetados['errores']:
+        print(f"  • Sin DID o con error: {etiquetados['errores']}")
     
-    # Verificar que hay datos
-    if not data:
+    if filas_escritas == 0:
         print("\n❌ ERROR: No se pudieron extraer features de ningún perfil")
         print("   Verifica que los archivos JSON tengan el formato correcto")
-        return pd.DataFrame()  # DataFrame vacío
+        return
     
-    df = pd.DataFrame(data)
-    
-    # Filtrar inciertos (label == -1)
-    df_etiquetado = df[df['label'] != -1].copy()
-    print(f"\n✓ Dataset final: {len(df_etiquetado)} perfiles etiquetados")
-    print(f"  (Descartados {len(df) - len(df_etiquetado)} inciertos)")
-    
-    return df_etiquetado
-
-def guardar_dataset(df, config):
-    """Guarda el dataset etiquetado"""
-    base_dir = Path(__file__).parent.parent
-    output_path = base_dir / config['rutas']['dataset_etiquetado']
-    
-    # Crear directorio si no existe
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    df.to_csv(output_path, index=False)
+    print(f"\n✓ Dataset final: {filas_escritas} perfiles etiquetados")
+    print(f"  (Descartados {etiquetados['inciertos']} inciertos)")
     print(f"\n💾 Dataset guardado en: {output_path}")
-    print(f"📊 Tamaño: {len(df)} filas x {len(df.columns)} columnas")
-    
-    # Mostrar distribución de labels
-    print(f"\n📈 Distribución de labels:")
-    print(df['label'].value_counts())
-    
-    return output_path
 
 def main():
     print("=" * 80)
@@ -140,14 +223,21 @@ def main():
     # Cargar configuración
     config = cargar_config()
     
-    # Cargar datos
+    # Preparar lectura incremental de datos
     profiles, posts_data = cargar_datos(config)
     
-    # Etiquetar perfiles
-    df_etiquetado = etiquetar_perfiles(profiles, posts_data, config)
+    # Índice de posts duplicados entre cuentas (opcional)
+    indice_duplicados = preparar_indice_duplicados(config)
+    
+    # Etiquetar y guardar por bloques (el dataset nunca está completo en memoria)
+    etiquetados = {'total': 0, 'bots': 0, 'humanos': 0, 'inciertos': 0, 'errores': 0}
+    with posts_data:
+        filas = etiquetar_perfiles(profiles, posts_data, config, etiquetados, indice_duplicados)
+        output_path, filas_escritas = guardar_dataset(filas, config)
     
-    # Guardar dataset
-    output_path = guardar_dataset(df_etiquetado, config)
+    mostrar_resumen(etiquetados, filas_escritas, output_path)
+    resumen_path = guardar_resumen(etiquetados, filas_escritas, config)
+    print(f"📝 Resumen guardado en: {resumen_path}")
     
     print("\n" + "=" * 80)
     print("✅ ETIQUETADO COMPLETADO")
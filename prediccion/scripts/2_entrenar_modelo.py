@@ -1,14 +1,22 @@
 """
 PASO 2: Entrenar modelo XGBoost
 Lee dataset etiquetado y entrena el modelo de detección de bots
+
+Uso:
+    python scripts/2_entrenar_modelo.py            # Entrenamiento normal
+    python scripts/2_entrenar_modelo.py buscar     # Búsqueda de hiperparámetros
+    python scripts/2_entrenar_modelo.py incremental [--desde datos/nuevos.parquet]
+    python scripts/2_entrenar_modelo.py compilar   # Recompilar el modelo actual para servir
 """
+import argparse
 import os
 import sys
+import time
 import yaml
+import numpy as np
 import pandas as pd
 import pickle
 from pathlib import Path
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
 import xgboost as xgb
@@ -17,6 +25,14 @@ import xgboost as xgb
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from seguridad.secure_model_handler import SecureModelHandler
+from prediccion.utils.datasets import columnas_dataset, es_parquet, leer_dataset
+from prediccion.utils.entrenamiento_streaming import entrenar_streaming, leer_bloques, mascara_test
+from prediccion.utils.cascada import ModeloCascada
+from prediccion.utils.arboles_compilados import compilar_modelo
+from prediccion.utils.incremental import (
+    RegistroVersiones, huellas_dids, verificar_compatibilidad, desplazamiento_features, entrenar_incremental
+)
+from prediccion.utils.busqueda import buscar_hiperparametros, guardar_mejores_parametros, parametros_xgboost
 
 def cargar_config():
     """Carga la configuración desde config.yaml"""
@@ -24,14 +40,23 @@ def cargar_config():
     with open(config_path, 'r', encoding='utf-8') as f:
         return yaml.safe_load(f)
 
-def cargar_dataset(config):
-    """Carga el dataset etiquetado"""
+def cargar_dataset(config, columnas=None):
+    """
+    Carga el dataset etiquetado con tipos compactos
+    
+    Por defecto solo lee las columnas de features, el label y el DID (que no
+    se usa para entrenar, solo para la división train/test); en Parquet el
+    resto de columnas ni se descomprime.
+    """
     base_dir = Path(__file__).parent.parent
     dataset_path = base_dir / config['rutas']['dataset_etiquetado']
     
+    if columnas is None:
+        columnas = [c for c in columnas_dataset(dataset_path) if c != 'handle']
+    
     print(f"📖 Cargando dataset desde: {dataset_path}")
-    df = pd.read_csv(dataset_path)
-    print(f"✓ Dataset cargado: {len(df)} muestras")
+    df = leer_dataset(dataset_path, columnas=columnas)
+    print(f"✓ Dataset cargado: {len(df)} muestras ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB en memoria)")
     
     return df
 
@@ -54,16 +79,15 @@ def preparar_datos(df, config):
     print(f"    - Humanos (0): {(y == 0).sum()}")
     print(f"    - Bots (1): {(y == 1).sum()}")
     
-    # Dividir en entrenamiento/prueba
+    # Dividir en entrenamiento/prueba por hash del DID, como los modos streaming,
+    # spark e incremental: así la parte de prueba de la cascada (entrenar_cascada)
+    # son filas que XGBoost no ha visto
     test_size = config['modelo']['train_test_split']['test_size']
     random_state = config['modelo']['train_test_split']['random_state']
+    prueba = mascara_test(df['did'].to_numpy(), test_size, random_state)
     
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y,
-        test_size=test_size,
-        random_state=random_state,
-        stratify=y  # Mantener proporción de clases
-    )
+    X_train, X_test = X[~prueba], X[prueba]
+    y_train, y_test = y[~prueba], y[prueba]
     
     print(f"\n✓ División completada:")
     print(f"  • Entrenamiento: {len(X_train)} muestras")
@@ -80,17 +104,15 @@ def entrenar_modelo(X_train, y_train, config):
     """Entrena el modelo XGBoost"""
     print("\n🤖 Entrenando modelo XGBoost...")
     
-    # Parámetros desde config
-    params = config['modelo']['xgboost']
+    # Parámetros desde config (o de la última búsqueda de hiperparámetros)
+    params = parametros_xgboost(config, Path(__file__).parent.parent)
     
     model = xgb.XGBClassifier(**params)
     
-    # Entrenar
-    model.fit(
-        X_train, y_train,
-        eval_set=[(X_train, y_train)],
-        verbose=False
-    )
+    # Entrenar. Sin eval_set: evaluar sobre el propio entrenamiento no da señal
+    # de validación; el número de árboles con early stopping lo fija la búsqueda
+    # (modelo.busqueda) sobre folds de validación
+    model.fit(X_train, y_train, verbose=False)
     
     print("✓ Modelo entrenado exitosamente")
     
@@ -101,9 +123,14 @@ def evaluar_modelo(model, X_test, y_test, feature_cols):
     print("\n📊 Evaluando modelo...")
     
     # Predicciones
-    y_pred = model.predict(X_test)
     y_pred_proba = model.predict_proba(X_test)[:, 1]
     
+    return reportar_metricas(model, y_test, y_pred_proba, feature_cols)
+
+def reportar_metricas(model, y_test, y_pred_proba, feature_cols):
+    """Muestra las métricas de prueba y devuelve la importancia de features"""
+    y_pred = (y_pred_proba > 0.5).astype(int)
+    
     # Métricas
     print("\n" + "=" * 60)
     print("REPORTE DE CLASIFICACIÓN")
@@ -168,14 +195,394 @@ def guardar_modelo(model, scaler, feature_cols, feature_importance, config):
     
     print("\n🔒 Checksums de integridad generados y guardados.")
 
-def main():
+def leer_muestra(ruta, columnas, muestras_max):
+    """Primeras `muestras_max` filas del dataset (leídas por bloques)"""
+    bloques, filas = [], 0
+    for df in leer_bloques(ruta, columnas, min(muestras_max, 100000)):
+        bloques.append(df.iloc[:muestras_max - filas])
+        filas += len(bloques[-1])
+        if filas >= muestras_max:
+            break
+    return pd.concat(bloques, ignore_index=True)
+
+def entrenar_cascada(model, scaler, feature_cols, config):
+    """
+    Destila el modelo rápido de la cascada y lo guarda junto al modelo
+    
+    Usa hasta `muestras_max` filas del dataset: el modelo rápido imita las
+    probabilidades de XGBoost (no necesita etiquetas) y la parte de prueba
+    (por hash del DID) mide el acuerdo con el modelo completo.
+    """
+    cfg = config['modelo'].get('cascada') or {}
+    if not cfg.get('habilitada', True):
+        return None
+    
+    print("\n⚡ Entrenando cascada (modelo rápido + XGBoost)...")
+    base_dir = Path(__file__).parent.parent
+    dataset_path = base_dir / config['rutas']['dataset_etiquetado']
+    df = leer_muestra(dataset_path, ['did', 'label'] + feature_cols, cfg.get('muestras_max', 200000))
+    
+    split = config['modelo']['train_test_split']
+    prueba = mascara_test(df['did'].to_numpy(), split['test_size'], split['random_state'])
+    X = scaler.transform(df[feature_cols])
+    y = df['label'].to_numpy()
+    
+    cascada = ModeloCascada(
+        threshold=config['modelo']['threshold_bot'],
+        objetivo_acuerdo=cfg.get('objetivo_acuerdo', 0.995),
+        alpha=cfg.get('alpha', 1.0),
+        margen_min=cfg.get('margen_min', 1.0),
+    )
+    cascada.ajustar(X[~prueba], model.predict_proba(X[~prueba])[:, 1])
+    
+    cascada.metricas = cascada.evaluar(X[prueba], model, y[prueba])
+    
+    # Latencia de un perfil cada vez (el caso de la web y de 3_predecir.py)
+    filas_latencia = [X[prueba][i:i + 1] for i in range(min(200, int(prueba.sum())))]
+    for nombre, predecir in (('completo', lambda x: model.predict_proba(x)),
+                             ('cascada', lambda x: cascada.resolver(x, model))):
+        inicio = time.perf_counter()
+        for x in filas_latencia:
+            predecir(x)
+        cascada.metricas[f'latencia_{nombre}_us'] = 1e6 * (time.perf_counter() - inicio) / max(len(filas_latencia), 1)
+    cascada.contadores = {'rapida': 0, 'completa': 0}
+    
+    m = cascada.metricas
+    print(f"  • Margen de la banda incierta (logit): {cascada.margen:.3f}")
+    print(f"  • Resueltas por el camino rápido: {m['fraccion_rapida']:.1%} de {m['filas']} filas de prueba")
+    print(f"  • Acuerdo con el modelo completo: {m['acuerdo']:.2%} (camino rápido: {m['acuerdo_rapida']:.2%})")
+    print(f"  • Exactitud vs labels: cascada {m['exactitud_cascada']:.2%}, completo {m['exactitud_completo']:.2%}")
+    print(f"  • Latencia por perfil: cascada {m['latencia_cascada_us']:.0f} µs, completo {m['latencia_completo_us']:.0f} µs")
+    
+    handler = SecureModelHandler(base_dir / 'modelos')
+    cascada.checksum_modelo = handler.calcular_checksum(base_dir / 'modelos' / 'bot_detector.pkl')
+    cascada_path = handler.guardar_modelo(cascada, 'cascada.pkl', permisos=0o600)
+    print(f"  ✓ Cascada: {cascada_path}")
+    return cascada
+
+def compilar(model, scaler, feature_cols, config):
+    """
+    Exporta el modelo a arrays de NumPy para servir sin xgboost
+    
+    El scaler queda plegado en los umbrales de los árboles. Antes de guardar se
+    compara bit a bit con predict_proba sobre una muestra del dataset (más
+    filas justo en los umbrales); si alguna fila difiere, no se guarda.
+    """
+    cfg = config['modelo'].get('compilado') or {}
+    if not cfg.get('habilitado', True):
+        return None
+    
+    print("\n🧱 Compilando modelo para servir (NumPy, sin xgboost)...")
+    base_dir = Path(__file__).parent.parent
+    dataset_path = base_dir / config['rutas']['dataset_etiquetado']
+    df = leer_muestra(dataset_path, feature_cols, cfg.get('muestras_verificacion', 50000))
+    
+    try:
+        arrays, verificacion = compilar_modelo(model, scaler, feature_cols, df[feature_cols].to_numpy(np.float64))
+    except ValueError as e:
+        print(f"  ⚠️ No se puede compilar: {e}")
+        return None
+    print(f"  • Verificado contra predict_proba: {verificacion['filas']} filas, "
+          f"{verificacion['distintas']} distintas")
+    if verificacion['distintas']:
+        print(f"  ❌ El modelo compilado no coincide bit a bit (diferencia máxima "
+              f"{verificacion['max_diff']:.3g}); no se guarda")
+        return None
+    
+    handler = SecureModelHandler(base_dir / 'modelos')
+    arrays['checksum_modelo'] = np.array(handler.calcular_checksum(base_dir / 'modelos' / 'bot_detector.pkl'))
+    ruta = handler.guardar_arrays(arrays, cfg.get('archivo', 'bot_detector_compilado.npz'), permisos=0o600)
+    print(f"  ✓ Modelo compilado: {ruta} ({len(arrays['raices'])} árboles, {len(arrays['valor'])} nodos)")
+    return ruta
+
+def registro_versiones(config):
+    """Registro de versiones del modelo (sección modelo.incremental)"""
+    cfg = config['modelo'].get('incremental') or {}
+    base_dir = Path(__file__).parent.parent
+    return RegistroVersiones(base_dir / cfg.get('versiones_dir', 'modelos/versiones'), cfg.get('max_versiones', 5))
+
+def huellas_dataset(ruta, tamano_bloque=100000):
+    """Huellas de todos los DIDs del dataset (solo se lee la columna did)"""
+    partes = [huellas_dids(df['did'].to_numpy()) for df in leer_bloques(ruta, ['did'], tamano_bloque)]
+    return np.concatenate(partes) if partes else np.empty(0, dtype=np.uint64)
+
+def registrar_version(model, scaler, feature_cols, config):
+    """Registra el modelo recién entrenado desde cero como nueva versión"""
+    base_dir = Path(__file__).parent.parent
+    dataset_path = base_dir / config['rutas']['dataset_etiquetado']
+    huellas = huellas_dataset(dataset_path)
+    entrada = registro_versiones(config).registrar(
+        model, scaler, feature_cols, huellas,
+        tipo='completo', dataset=config['rutas']['dataset_etiquetado'], filas=int(huellas.size),
+    )
+    print(f"  ✓ Versión v{entrada['version']:04d} registrada ({entrada['arboles']} árboles)")
+
+def entrenar_por_bloques(config):
+    """
+    Modo `streaming`: entrena sin cargar el dataset en memoria
+    
+    El pico de memoria lo acotan `tamano_bloque` (lectura) y el QuantileDMatrix
+    de XGBoost (o las páginas en disco con `external_memory: true`).
+    """
+    base_dir = Path(__file__).parent.parent
+    dataset_path = base_dir / config['rutas']['dataset_etiquetado']
+    cfg = config['modelo'].get('entrenamiento') or {}
+    split = config['modelo']['train_test_split']
+    
+    print(f"📖 Entrenando por bloques desde: {dataset_path}")
+    print(f"  • Bloques de {cfg.get('tamano_bloque', 100000)} filas, max_bin={cfg.get('max_bin', 256)}"
+          f"{', external memory' if cfg.get('external_memory') else ''}")
+    print("\n🤖 Entrenando modelo XGBoost (hist + QuantileDMatrix)...")
+    resultado = entrenar_streaming(
+        dataset_path,
+        parametros_xgboost(config, base_dir),
+        test_size=split['test_size'],
+        semilla=split['random_state'],
+        tamano_bloque=cfg.get('tamano_bloque', 100000),
+        max_bin=cfg.get('max_bin', 256),
+        external_memory=cfg.get('external_memory', False),
+        cache_dir=base_dir / cfg.get('cache_dir', 'datos/cache_xgb'),
+    )
+    
+    return resumir_resultado(resultado)
+
+def resumir_resultado(resultado):
+    """Muestra conteos y métricas de entrenar_streaming / entrenar_spark"""
+    conteos = resultado['conteos']
+    print(f"✓ Modelo entrenado exitosamente")
+    print(f"  • Features: {len(resultado['feature_cols'])}")
+    for lado, nombre in (('train', 'Entrenamiento'), ('test', 'Prueba')):
+        print(f"  • {nombre}: {sum(conteos[lado].values())} muestras "
+              f"(Humanos: {conteos[lado][0]}, Bots: {conteos[lado][1]})")
+    
+    print("\n📊 Evaluando modelo...")
+    feature_importance = reportar_metricas(
+        resultado['model'], resultado['y_test'], resultado['y_pred_proba'], resultado['feature_cols']
+    )
+    return resultado['model'], resultado['scaler'], resultado['feature_cols'], feature_importance
+
+def entrenar_en_spark(config):
+    """
+    Modo `spark`: entrena con xgboost.spark.SparkXGBClassifier repartido en ejecutores
+    
+    Lee rutas.dataset_etiquetado (Parquet, también el directorio que escribe
+    extraer_features_spark.py) con Spark; el modelo y el scaler resultantes son
+    los mismos objetos de sklearn/xgboost que en los otros modos.
+    """
+    from prediccion.utils.spark_features import crear_sesion
+    from prediccion.utils.spark_entrenamiento import entrenar_spark
+    
+    base_dir = Path(__file__).parent.parent
+    dataset_path = base_dir / config['rutas']['dataset_etiquetado']
+    cfg = config['modelo'].get('entrenamiento') or {}
+    split = config['modelo']['train_test_split']
+    
+    spark = crear_sesion("Bluesky Bot Detector Training")
+    try:
+        print(f"📖 Leyendo con Spark: {dataset_path}")
+        if es_parquet(dataset_path):
+            df = spark.read.parquet(str(dataset_path))
+        else:
+            df = spark.read.csv(str(dataset_path), header=True, inferSchema=True)
+        
+        print(f"\n🤖 Entrenando modelo XGBoost en Spark ({cfg.get('spark_workers', 2)} workers)...")
+        resultado = entrenar_spark(
+            df.drop('handle'),
+            parametros_xgboost(config, base_dir),
+            test_size=split['test_size'],
+            semilla=split['random_state'],
+            num_workers=cfg.get('spark_workers', 2),
+        )
+    finally:
+        spark.stop()
+    
+    return resumir_resultado(resultado)
+
+def buscar(config):
+    """
+    Subcomando `buscar`: validación cruzada en paralelo con successive halving
+    
+    Solo usa la parte de entrenamiento (el conjunto de prueba queda intacto) y
+    guarda los mejores parámetros en `modelo.busqueda.resultado`, que el
+    entrenamiento normal aplica sobre los de `modelo.xgboost`.
+    """
     print("=" * 80)
-    print("PASO 2: ENTRENAMIENTO DEL MODELO")
+    print("BÚSQUEDA DE HIPERPARÁMETROS")
+    print("=" * 80)
+    
+    base_dir = Path(__file__).parent.parent
+    cfg = config['modelo']['busqueda']
+    
+    df = cargar_dataset(config)
+    X_train, _, y_train, _, _, _ = preparar_datos(df, config)
+    del df
+    
+    print(f"\n🔎 Successive halving: {cfg.get('candidatos', 16)} candidatos, "
+          f"{cfg.get('folds', 3)} folds, eta={cfg.get('eta', 3)}")
+    resultado = buscar_hiperparametros(X_train, y_train, cfg, params_base=config['modelo']['xgboost'])
+    
+    ruta = guardar_mejores_parametros(resultado, base_dir / cfg.get('resultado', 'modelos/mejores_parametros.json'))
+    print(f"\n🏆 Mejores parámetros (AUC validación {resultado['auc']:.4f}):")
+    for nombre, valor in resultado['params'].items():
+        print(f"  • {nombre}: {valor}")
+    print(f"\n💾 Guardados en: {ruta}")
+    print("➡️  Siguiente paso: python scripts/2_entrenar_modelo.py (los aplica automáticamente)")
+
+def cargar_filas_nuevas(ruta, feature_cols, huellas_vistas=None, tamano_bloque=100000):
+    """
+    Lee por bloques las filas cuyo DID no está en `huellas_vistas`
+    
+    Solo las filas nuevas llegan a memoria, así que el coste depende del delta
+    y no del tamaño del dataset acumulado.
+    """
+    nuevas = []
+    for df in leer_bloques(ruta, ['did', 'label'] + feature_cols, tamano_bloque):
+        if huellas_vistas is not None and huellas_vistas.size:
+            df = df[~np.isin(huellas_dids(df['did'].to_numpy()), huellas_vistas)]
+        if len(df):
+            nuevas.append(df)
+    return pd.concat(nuevas, ignore_index=True) if nuevas else pd.DataFrame(columns=['did', 'label'] + feature_cols)
+
+def incremental(config, desde=None, arboles=None):
+    """
+    Subcomando `incremental`: añade árboles al modelo actual con las filas nuevas
+    
+    Sin `desde`, el delta son las filas de rutas.dataset_etiquetado cuyo DID no
+    estaba en la última versión registrada. Con `desde`, todas las filas de ese
+    dataset. El modelo resultante se registra como versión y pasa a ser el activo.
+    """
+    print("=" * 80)
+    print("ENTRENAMIENTO INCREMENTAL")
+    print("=" * 80)
+    
+    base_dir = Path(__file__).parent.parent
+    cfg = config['modelo'].get('incremental') or {}
+    registro = registro_versiones(config)
+    base = registro.ultima()
+    
+    if base is not None:
+        print(f"📦 Modelo base: versión v{base['version']:04d} ({base['arboles']} árboles, {base['fecha']})")
+        model, scaler, feature_cols = registro.cargar(base['version'])
+        huellas_vistas = registro.huellas(base['version'])
+    elif desde:
+        # Modelo entrenado antes de que existiera el registro de versiones
+        print("📦 Modelo base: modelos/ (sin versión registrada)")
+        handler = SecureModelHandler(base_dir / 'modelos')
+        model = handler.cargar_modelo('bot_detector.pkl')
+        scaler = handler.cargar_modelo('feature_scaler.pkl')
+        feature_cols = handler.cargar_modelo('feature_columns.pkl')
+        huellas_vistas = np.empty(0, dtype=np.uint64)
+    else:
+        print("❌ No hay versiones registradas: ejecuta primero un entrenamiento completo "
+              "(python scripts/2_entrenar_modelo.py) o indica --desde")
+        sys.exit(1)
+    
+    dataset_path = base_dir / (desde or config['rutas']['dataset_etiquetado'])
+    columnas = [c for c in columnas_dataset(dataset_path) if c not in ('did', 'handle', 'label')]
+    try:
+        verificar_compatibilidad(scaler, feature_cols, columnas)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    print(f"📖 Buscando filas nuevas en: {dataset_path}")
+    tamano_bloque = (config['modelo'].get('entrenamiento') or {}).get('tamano_bloque', 100000)
+    df = cargar_filas_nuevas(dataset_path, feature_cols, None if desde else huellas_vistas, tamano_bloque)
+    print(f"✓ {len(df)} filas nuevas (Humanos: {(df['label'] == 0).sum()}, Bots: {(df['label'] == 1).sum()})")
+    
+    if len(df) < cfg.get('min_filas_nuevas', 50):
+        print(f"ℹ️  Menos de {cfg.get('min_filas_nuevas', 50)} filas nuevas: el modelo actual no cambia")
+        return
+    
+    umbral = cfg.get('umbral_desplazamiento', 3.0)
+    desplazadas = {k: v for k, v in desplazamiento_features(scaler, df[feature_cols], feature_cols).items()
+                   if abs(v) > umbral}
+    if desplazadas:
+        print(f"⚠️  Features con media escalada fuera de ±{umbral} (el scaler se mantiene fijo; "
+              f"considera un entrenamiento completo):")
+        for nombre, media in desplazadas.items():
+            print(f"    - {nombre}: {media:+.2f}")
+    
+    arboles = arboles or cfg.get('arboles_nuevos', 50)
+    split = config['modelo']['train_test_split']
+    print(f"\n🤖 Añadiendo {arboles} árboles...")
+    resultado = entrenar_incremental(
+        model, scaler, feature_cols, df, parametros_xgboost(config, base_dir),
+        arboles_nuevos=arboles, test_size=split['test_size'], semilla=split['random_state'],
+    )
+    print(f"✓ Entrenado con {resultado['filas_train']} filas; {resultado['filas_test']} reservadas para prueba")
+    if resultado['auc_nuevo'] is not None:
+        print(f"🎯 AUC-ROC en filas nuevas: {resultado['auc_anterior']:.4f} (anterior) → "
+              f"{resultado['auc_nuevo']:.4f} (nuevo)")
+    
+    nuevo = resultado['model']
+    feature_importance = pd.DataFrame({
+        'feature': feature_cols,
+        'importance': nuevo.feature_importances_
+    }).sort_values('importance', ascending=False)
+    guardar_modelo(nuevo, scaler, feature_cols, feature_importance, config)
+    entrenar_cascada(nuevo, scaler, feature_cols, config)
+    compilar(nuevo, scaler, feature_cols, config)
+    
+    entrada = registro.registrar(
+        nuevo, scaler, feature_cols, np.concatenate([huellas_vistas, huellas_dids(df['did'].to_numpy())]),
+        tipo='incremental', base=base['version'] if base else None, dataset=str(desde or config['rutas']['dataset_etiquetado']),
+        filas=len(df), auc_anterior=resultado['auc_anterior'], auc_nuevo=resultado['auc_nuevo'],
+    )
+    print(f"  ✓ Versión v{entrada['version']:04d} registrada ({entrada['arboles']} árboles)")
+    
+    print("\n" + "=" * 80)
+    print("✅ ENTRENAMIENTO INCREMENTAL COMPLETADO")
     print("=" * 80)
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrenamiento del modelo de detección de bots")
+    subcomandos = parser.add_subparsers(dest='comando')
+    subcomandos.add_parser('entrenar', help="Entrenar el modelo (por defecto)")
+    subcomandos.add_parser('buscar', help="Buscar hiperparámetros con validación cruzada")
+    parser_incremental = subcomandos.add_parser('incremental', help="Añadir árboles al modelo actual con las filas nuevas")
+    parser_incremental.add_argument('--desde', help="Dataset con solo las filas nuevas (por defecto, el delta del dataset etiquetado)")
+    parser_incremental.add_argument('--arboles', type=int, help="Árboles a añadir (por defecto modelo.incremental.arboles_nuevos)")
+    subcomandos.add_parser('compilar', help="Compilar el modelo actual a arrays de NumPy para servir")
+    args = parser.parse_args()
     
     # Cargar configuración
     config = cargar_config()
     
+    if args.comando == 'buscar':
+        buscar(config)
+        return
+    if args.comando == 'incremental':
+        incremental(config, desde=args.desde, arboles=args.arboles)
+        return
+    if args.comando == 'compilar':
+        handler = SecureModelHandler(Path(__file__).parent.parent / 'modelos')
+        compilar(
+            handler.cargar_modelo('bot_detector.pkl'),
+            handler.cargar_modelo('feature_scaler.pkl'),
+            handler.cargar_modelo('feature_columns.pkl'),
+            config,
+        )
+        return
+    
+    print("=" * 80)
+    print("PASO 2: ENTRENAMIENTO DEL MODELO")
+    print("=" * 80)
+    
+    modo = (config['modelo'].get('entrenamiento') or {}).get('modo', 'memoria')
+    if modo in ('streaming', 'spark'):
+        entrenar = entrenar_por_bloques if modo == 'streaming' else entrenar_en_spark
+        model, scaler, feature_cols, feature_importance = entrenar(config)
+        guardar_modelo(model, scaler, feature_cols, feature_importance, config)
+        entrenar_cascada(model, scaler, feature_cols, config)
+        compilar(model, scaler, feature_cols, config)
+        registrar_version(model, scaler, feature_cols, config)
+        print("\n" + "=" * 80)
+        print("✅ ENTRENAMIENTO COMPLETADO")
+        print("=" * 80)
+        print("\n➡️  Siguiente paso: python scripts/3_predecir.py")
+        return
+    
     # Cargar dataset
     df = cargar_dataset(config)
     
@@ -190,6 +597,9 @@ def main():
     
     # Guardar modelo
     guardar_modelo(model, scaler, feature_cols, feature_importance, config)
+    entrenar_cascada(model, scaler, feature_cols, config)
+    compilar(model, scaler, feature_cols, config)
+    registrar_version(model, scaler, feature_cols, config)
     
     print("\n" + "=" * 80)
     print("✅ ENTRENAMIENTO COMPLETADO")
@@ -12,9 +12,12 @@ from pathlib import Path
 # Añadir directorio raíz al path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from prediccion.utils.feature_extraction import FeatureExtractor
+from prediccion.utils.feature_extraction import FeatureExtractor, FEATURES_DUPLICADOS
+from prediccion.utils.duplicados import IndiceDuplicados
 from gestor.conexion import ConexionBluesky
+from gestor.descarga import descargar_usuario, PerfilNoDisponible
 from seguridad.secure_model_handler import SecureModelHandler
+from prediccion.utils.cascada import cargar_cascada
 
 def cargar_config():
     """Carga la configuración desde config.yaml"""
@@ -68,53 +71,71 @@ def obtener_datos_usuario(handle=None, did=None, config=None):
     identifier = did if did else handle
     print(f"  • Identificador: {identifier}")
     
+    # Perfil y posts se piden a la vez; si los posts tardan, se predice solo con el perfil
+    cfg = config['prediccion']
     try:
-        profile_response = client.get_profile(actor=identifier)
-        profile = profile_response.model_dump(mode='json')
-        print(f"  ✓ Perfil obtenido: @{profile.get('handle')}")
-    except Exception as e:
+        datos = descargar_usuario(
+            client, identifier,
+            num_posts=cfg['num_posts_analizar'],
+            timeout_perfil=cfg.get('timeout_perfil', 10),
+            timeout_posts=cfg.get('timeout_posts', 5),
+        )
+    except PerfilNoDisponible as e:
         print(f"  ✗ Error obteniendo perfil: {e}")
         return None, None
+    profile, posts = datos['profile'], datos['posts']
+    print(f"  ✓ Perfil obtenido: @{profile.get('handle')}")
     
-    # Obtener posts
-    num_posts = config['prediccion']['num_posts_analizar']
-    try:
-        posts_response = client.get_author_feed(
-            actor=identifier,
-            limit=num_posts
-        )
-        
-        posts = []
-        for feed_item in posts_response.feed:
-            post = feed_item.post
-            posts.append({
-                'text': post.record.text,
-                'createdAt': post.record.created_at,
-                'likeCount': post.like_count,
-                'replyCount': post.reply_count,
-                'repostCount': post.repost_count
-            })
-        
+    if datos['posts_completos']:
         print(f"  ✓ Posts obtenidos: {len(posts)}")
-    except Exception as e:
-        print(f"  ⚠️  Error obteniendo posts: {e}")
-        posts = []
+    else:
+        print(f"  ⚠️  Error obteniendo posts: {datos['error_posts']}")
+        print("     Predicción degradada: solo con los datos del perfil")
+    print(f"  • Tiempo de descarga: {datos['tiempos']['total']:.2f} s")
     
     return profile, posts
 
-def extraer_features(profile, posts):
-    """Extrae características del perfil y posts"""
+def cargar_indice_duplicados(config, feature_cols):
+    """Carga el índice de duplicados si el modelo usa features entre cuentas"""
+    if not any(f in FEATURES_DUPLICADOS for f in feature_cols):
+        return None
+    
+    base_dir = Path(__file__).parent.parent
+    indice_path = base_dir / (config.get('duplicados') or {}).get('indice', 'datos/indice_duplicados.pkl')
+    if not indice_path.exists():
+        print(f"  ⚠️  El modelo usa features de duplicados pero no existe {indice_path}")
+        return None
+    return IndiceDuplicados.cargar(indice_path)
+
+def extraer_features(profile, posts, feature_cols=None, indice_duplicados=None):
+    """Extrae características del perfil y posts (solo las que usa el modelo)"""
     print("\n🔬 Extrayendo características...")
     
-    extractor = FeatureExtractor()
+    # Los posts recién descargados se comparan contra todo el almacén
+    # (el índice no se guarda: la predicción no modifica los datos)
+    if indice_duplicados is not None:
+        indice_duplicados.agregar_posts(profile.get('did'), posts)
+    
+    extractor = FeatureExtractor(feature_cols, indice_duplicados=indice_duplicados)
     features = extractor.extract_profile_features(profile, posts)
     
     print(f"  ✓ {len(features)} features extraídos")
     
     return features
 
-def predecir(features, model, scaler, feature_cols, config):
-    """Predice si el usuario es bot"""
+def cargar_cascada_modelo(config):
+    """Carga la cascada (modelo rápido) si está habilitada y corresponde al modelo actual"""
+    if not (config['modelo'].get('cascada') or {}).get('habilitada', True):
+        return None
+    cascada = cargar_cascada(SecureModelHandler(Path(__file__).parent.parent / 'modelos'))
+    if cascada is None:
+        print("  ℹ️  Sin cascada válida para este modelo: se usa solo XGBoost")
+    else:
+        print(f"    ✓ Cascada cargada ({cascada.metricas.get('fraccion_rapida', 0):.0%} por el camino rápido en prueba)")
+    return cascada
+
+def predecir(features, model, scaler, feature_cols, config, cascada=None):
+    """Predice si el usuario es bot (con la cascada, XGBoost solo en la banda incierta)"""
     print("\n🤖 Ejecutando predicción...")
     
     # Preparar features en el orden correcto
@@ -123,20 +144,23 @@ def predecir(features, model, scaler, feature_cols, config):
     # Escalar
     X_scaled = scaler.transform(X)
     
-    # Predecir
-    prob = model.predict_proba(X_scaled)[0]
-    prob_humano = prob[0]
-    prob_bot = prob[1]
-    
     # Clasificación basada en threshold
     threshold = config['modelo']['threshold_bot']
-    es_bot = prob_bot > threshold
+    
+    if cascada is not None:
+        probs, decisiones, rapida = cascada.resolver(X_scaled, model)
+        prob_bot, es_bot, via = probs[0], bool(decisiones[0]), 'rápida' if rapida[0] else 'completa'
+    else:
+        prob_bot = model.predict_proba(X_scaled)[0][1]
+        es_bot = prob_bot > threshold
+        via = 'completa'
     
     return {
-        'prob_humano': prob_humano,
+        'prob_humano': 1 - prob_bot,
         'prob_bot': prob_bot,
         'es_bot': es_bot,
-        'threshold': threshold
+        'threshold': threshold,
+        'via': via
     }
 
 def mostrar_resultado(profile, resultado, features, model, feature_cols, config):
@@ -165,6 +189,7 @@ def mostrar_resultado(profile, resultado, features, model, feature_cols, config)
     print(f"  • Humano: {resultado['prob_humano']:.1%}")
     print(f"  • Bot:    {resultado['prob_bot']:.1%}")
     print(f"  • Threshold usado: {resultado['threshold']}")
+    print(f"  • Modelo: {'camino rápido (lineal)' if resultado['via'] == 'rápida' else 'XGBoost'}")
     
     # Top factores si está configurado
     if config['prediccion']['mostrar_top_factores'] > 0:
@@ -221,6 +246,7 @@ def main():
     
     # Cargar modelo
     model, scaler, feature_cols = cargar_modelo(config)
+    cascada = cargar_cascada_modelo(config)
     
     # Obtener datos del usuario
     profile, posts = obtener_datos_usuario(handle=handle, did=did, config=config)
@@ -230,10 +256,11 @@ def main():
         return
     
     # Extraer features
-    features = extraer_features(profile, posts)
+    indice_duplicados = cargar_indice_duplicados(config, feature_cols)
+    features = extraer_features(profile, posts, feature_cols, indice_duplicados)
     
     # Predecir
-    resultado = predecir(features, model, scaler, feature_cols, config)
+    resultado = predecir(features, model, scaler, feature_cols, config, cascada)
     
     # Mostrar resultado
     mostrar_resultado(profile, resultado, features, model, feature_cols, config)
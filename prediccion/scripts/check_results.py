@@ -1,12 +1,29 @@
-import pandas as pd
+import json
+import sys
+import yaml
 from pathlib import Path
 
-# Cargar dataset (path absoluto)
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from prediccion.utils.datasets import leer_dataset
+
+# Cargar dataset (path absoluto, solo hace falta el label)
 script_dir = Path(__file__).parent.parent
-df = pd.read_csv(script_dir / 'datos' / 'dataset_etiquetado.csv')
+with open(script_dir / 'config.yaml', 'r', encoding='utf-8') as f:
+    config = yaml.safe_load(f)
+df = leer_dataset(script_dir / config['rutas']['dataset_etiquetado'], columnas=['label'])
+
+# Total real de perfiles de entrada (lo guarda 1_etiquetar_datos.py)
+resumen_path = script_dir / config['rutas']['resumen_etiquetado']
+if resumen_path.exists():
+    with open(resumen_path, 'r', encoding='utf-8') as f:
+        total_original = json.load(f)['total_perfiles']
+else:
+    print(f"⚠️ No se encontró {resumen_path}; re-ejecuta 1_etiquetar_datos.py")
+    print("   Se usa el tamaño del dataset como total (inciertos = 0)")
+    total_original = len(df)
 
 # Calcular estadísticas
-total_original = 14900
 total_etiquetado = len(df)
 bots = (df['label'] == 1).sum()
 humanos = (df['label'] == 0).sum()
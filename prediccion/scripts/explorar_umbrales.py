@@ -0,0 +1,206 @@
+"""
+Explorador de umbrales del etiquetado heurístico
+Calcula una sola vez el score neto de todos los perfiles (se guarda en caché) y
+muestra la distribución bots/humanos/inciertos para un grid de pares
+(min_score_bot, min_score_humano) sin volver a ejecutar 1_etiquetar_datos.py
+
+Uso:
+    python scripts/explorar_umbrales.py
+    python scripts/explorar_umbrales.py --bot 0 3 0.25 --humano 0 3 0.25 --max-inciertos 5
+    python scripts/explorar_umbrales.py --csv datos/barrido_umbrales.csv
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+import yaml
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Añadir directorio raíz al path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from prediccion.utils.feature_extraction import FeatureExtractor, FEATURES_DUPLICADOS
+from prediccion.utils.heuristics import HeuristicLabeler
+from prediccion.utils.json_streaming import iterar_array, IndicePostsUsuarios
+from prediccion.utils.duplicados import IndiceDuplicados
+from prediccion.utils.umbrales import barrer_umbrales, histograma_scores
+
+def cargar_config():
+    """Carga la configuración desde config.yaml"""
+    config_path = Path(__file__).parent.parent / 'config.yaml'
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def firma_entrada(config, profiles_path, posts_path):
+    """
+    Identifica los datos y reglas con los que se calcularon los scores
+
+    Cambia si cambian los archivos de entrada o las reglas/pesos, pero no con
+    los umbrales (que son justo lo que se explora).
+    """
+    reglas = {k: v for k, v in config['heuristicas'].items() if k not in ('min_score_bot', 'min_score_humano')}
+    partes = [json.dumps(reglas, sort_keys=True)]
+    for ruta in (profiles_path, posts_path):
+        stat = ruta.stat()
+        partes.append(f"{ruta.resolve()}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256('|'.join(partes).encode('utf-8')).hexdigest()
+
+def calcular_scores(config, profiles_path, posts_path):
+    """
+    Score neto de cada perfil (una pasada sobre los datos, como el etiquetado)
+
+    Returns:
+        Tupla (scores, total_perfiles): los perfiles sin DID o con error no
+        tienen score pero cuentan en el total
+    """
+    labeler = HeuristicLabeler(config['heuristicas'])
+    indice_duplicados = None
+    indice_path = Path(__file__).parent.parent / (config.get('duplicados') or {}).get('indice', 'datos/indice_duplicados.pkl')
+    if set(FEATURES_DUPLICADOS) & set(labeler.features_requeridas) and indice_path.exists():
+        indice_duplicados = IndiceDuplicados.cargar(indice_path)
+    # Solo las features que usan las reglas
+    extractor = FeatureExtractor(labeler.features_requeridas, indice_duplicados=indice_duplicados)
+    tamano_bloque = config.get('etiquetado', {}).get('tamano_bloque', 5000)
+
+    scores = []
+    bloque = []
+    total = 0
+    with IndicePostsUsuarios(posts_path) as posts_data:
+        for profile in iterar_array(profiles_path):
+            total += 1
+            if total % 1000 == 0:
+                print(f"  Procesados: {total}")
+            did = profile.get('did')
+            if not did:
+                continue
+            entrada = posts_data.get(did)
+            posts = entrada.get('posts', []) if entrada is not None else None
+            try:
+                bloque.append(extractor.extract_profile_features(profile, posts))
+            except Exception as e:
+                print(f"  ⚠️ Error extrayendo features de {did}: {e}")
+                continue
+            if len(bloque) >= tamano_bloque:
+                scores.append(labeler.motor.evaluar(bloque).scores if labeler.motor
+                              else np.array([labeler.score(f) for f in bloque]))
+                bloque = []
+    if bloque:
+        scores.append(labeler.motor.evaluar(bloque).scores if labeler.motor
+                      else np.array([labeler.score(f) for f in bloque]))
+
+    return (np.concatenate(scores) if scores else np.empty(0)), total
+
+def cargar_o_calcular_scores(config, recalcular=False):
+    """Devuelve (scores, total) desde la caché si sigue siendo válida"""
+    base_dir = Path(__file__).parent.parent
+    profiles_path = base_dir / config['rutas']['profiles_input']
+    posts_path = base_dir / config['rutas']['posts_input']
+    cache_path = base_dir / config['rutas']['cache_scores']
+    firma = firma_entrada(config, profiles_path, posts_path)
+
+    if cache_path.exists() and not recalcular:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if str(cache['firma']) == firma:
+                print(f"📖 Scores en caché: {cache_path}")
+                return cache['scores'], int(cache['total'])
+        print("ℹ️  La caché de scores no corresponde a los datos/reglas actuales, se recalcula")
+
+    print(f"🧮 Calculando scores de {profiles_path}...")
+    inicio = time.perf_counter()
+    scores, total = calcular_scores(config, profiles_path, posts_path)
+    print(f"✓ {scores.size} perfiles puntuados de {total} en {time.perf_counter() - inicio:.1f}s")
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        np.savez(f, scores=scores, total=total, firma=firma)
+    print(f"💾 Caché guardada en: {cache_path}")
+    return scores, total
+
+def mostrar_histograma(scores, min_bot, min_humano, ancho=50):
+    """Histograma de scores marcando las zonas bot / incierto / humano"""
+    valores, conteos = histograma_scores(scores)
+    if valores.size == 0:
+        return
+    maximo = conteos.max()
+    print("\n📊 Distribución de scores (🤖 bot | · incierto | 👤 humano):")
+    for valor, conteo in zip(valores, conteos):
+        zona = '🤖' if valor <= -min_bot else ('👤' if valor >= min_humano else ' ·')
+        barra = '█' * max(1, round(ancho * conteo / maximo))
+        print(f"  {zona} {valor:+6.1f} | {barra} {conteo}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido de umbrales del etiquetado heurístico")
+    parser.add_argument('--bot', nargs=3, type=float, default=[0.0, 5.0, 0.25],
+                        metavar=('INICIO', 'FIN', 'PASO'), help="Rango de min_score_bot")
+    parser.add_argument('--humano', nargs=3, type=float, default=[0.0, 5.0, 0.25],
+                        metavar=('INICIO', 'FIN', 'PASO'), help="Rango de min_score_humano")
+    parser.add_argument('--max-inciertos', type=float, default=5.0,
+                        help="Porcentaje máximo de inciertos para las recomendaciones")
+    parser.add_argument('--top', type=int, default=10, help="Número de pares a mostrar")
+    parser.add_argument('--csv', help="Guardar el grid completo en este CSV")
+    parser.add_argument('--recalcular', action='store_true', help="Ignorar la caché de scores")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("EXPLORADOR DE UMBRALES HEURÍSTICOS")
+    print("=" * 80)
+
+    config = cargar_config()
+    scores, total = cargar_o_calcular_scores(config, recalcular=args.recalcular)
+
+    umbrales_bot = np.arange(args.bot[0], args.bot[1] + args.bot[2] / 2, args.bot[2])
+    umbrales_humano = np.arange(args.humano[0], args.humano[1] + args.humano[2] / 2, args.humano[2])
+
+    inicio = time.perf_counter()
+    grid = barrer_umbrales(scores, umbrales_bot, umbrales_humano, total=total)
+    ms = (time.perf_counter() - inicio) * 1000
+    print(f"\n⚡ {grid['bots'].size} pares de umbrales evaluados en {ms:.2f} ms")
+
+    # Umbrales actuales de config.yaml
+    actual_bot = config['heuristicas'].get('min_score_bot', 0.5)
+    actual_humano = config['heuristicas'].get('min_score_humano', 0.8)
+    actual = barrer_umbrales(scores, [actual_bot], [actual_humano], total=total)
+    print(f"\n⚙️  Umbrales actuales (bot ≤ -{actual_bot}, humano ≥ {actual_humano}) sobre {total:,} perfiles:")
+    print(f"  • Bots:      {int(actual['bots'][0, 0]):,} ({actual['pct_bots'][0, 0]:.1f}%)")
+    print(f"  • Humanos:   {int(actual['humanos'][0, 0]):,} ({actual['pct_humanos'][0, 0]:.1f}%)")
+    print(f"  • Inciertos: {int(actual['inciertos'][0, 0]):,} ({actual['pct_inciertos'][0, 0]:.1f}%)")
+
+    mostrar_histograma(scores, actual_bot, actual_humano)
+
+    i, j = np.meshgrid(np.arange(umbrales_bot.size), np.arange(umbrales_humano.size), indexing='ij')
+    df = pd.DataFrame({
+        'min_score_bot': umbrales_bot[i.ravel()],
+        'min_score_humano': umbrales_humano[j.ravel()],
+        'bots': grid['bots'].ravel(),
+        'humanos': grid['humanos'].ravel(),
+        'inciertos': grid['inciertos'].ravel(),
+        'pct_bots': grid['pct_bots'].ravel(),
+        'pct_humanos': grid['pct_humanos'].ravel(),
+        'pct_inciertos': grid['pct_inciertos'].ravel(),
+    })
+
+    # Entre los pares que cumplen el objetivo de inciertos, los más estrictos
+    # (umbrales más altos = etiquetas más seguras)
+    candidatos = df[df['pct_inciertos'] <= args.max_inciertos].copy()
+    print(f"\n🎯 Pares con inciertos ≤ {args.max_inciertos}% (más estrictos primero):")
+    if candidatos.empty:
+        print("  Ninguno: amplía el rango o sube --max-inciertos")
+    else:
+        candidatos['margen'] = candidatos['min_score_bot'] + candidatos['min_score_humano']
+        candidatos = candidatos.sort_values(['margen', 'pct_inciertos'], ascending=[False, True])
+        print(candidatos.head(args.top).drop(columns='margen').to_string(index=False, float_format='%.2f'))
+
+    if args.csv:
+        csv_path = Path(__file__).parent.parent / args.csv
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(csv_path, index=False)
+        print(f"\n💾 Grid completo guardado en: {csv_path}")
+
+    print("\n➡️  Para aplicar un par: edita heuristicas.min_score_bot / min_score_humano en config.yaml")
+    print("   y ejecuta: python scripts/1_etiquetar_datos.py")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Extracción de features con PySpark (alternativa a 1_etiquetar_datos.py para crawls grandes)
+Calcula las mismas features que FeatureExtractor, las etiqueta con heurísticas y
+guarda una tabla Parquet que 2_entrenar_modelo.py puede usar directamente
+"""
+import sys
+import yaml
+from pathlib import Path
+
+# Añadir directorio raíz al path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from analisis.carga_datos import CargaDatos
+from prediccion.utils.feature_extraction import features_de_config
+from prediccion.utils.spark_features import SparkFeatureExtractor, crear_sesion
+
+def cargar_config():
+    """Carga la configuración desde config.yaml"""
+    config_path = Path(__file__).parent.parent / 'config.yaml'
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def main():
+    print("=" * 80)
+    print("EXTRACCIÓN DE FEATURES CON SPARK")
+    print("=" * 80)
+    
+    config = cargar_config()
+    base_dir = Path(__file__).parent.parent
+    
+    spark = crear_sesion("Bluesky Feature Extraction")
+    carga = CargaDatos(spark)
+    
+    profiles_path = base_dir / config['rutas']['profiles_input']
+    posts_path = base_dir / config['rutas']['posts_input_jsonl']
+    df_profiles = carga.cargar_profiles_to_scan(str(profiles_path))
+    df_posts = carga.cargar_posts_usuarios(str(posts_path))
+    if df_profiles is None:
+        print("\n❌ ERROR: No se pudieron cargar los perfiles")
+        spark.stop()
+        return
+    
+    # Mismas features que el etiquetado en Python
+    extractor = SparkFeatureExtractor(spark, features_de_config(config))
+    df_features = extractor.extraer(df_profiles, df_posts)
+    df_etiquetado = extractor.etiquetar(df_features, config['heuristicas'])
+    
+    output_path = base_dir / config['rutas']['dataset_spark']
+    print(f"\n💾 Escribiendo features etiquetadas en: {output_path}")
+    df_etiquetado.write.mode('overwrite').parquet(str(output_path))
+    
+    distribucion = {row['label']: row['count'] for row in df_etiquetado.groupBy('label').count().collect()}
+    print(f"\n📈 Distribución de labels:")
+    print(f"  • Bots (1): {distribucion.get(1, 0)}")
+    print(f"  • Humanos (0): {distribucion.get(0, 0)}")
+    
+    spark.stop()
+    
+    print("\n" + "=" * 80)
+    print("✅ EXTRACCIÓN COMPLETADA")
+    print("=" * 80)
+    print(f"\n➡️  Para entrenar con esta tabla, apunta rutas.dataset_etiquetado a '{config['rutas']['dataset_spark']}'")
+    print("   y ejecuta: python scripts/2_entrenar_modelo.py")
+
+if __name__ == "__main__":
+    main()
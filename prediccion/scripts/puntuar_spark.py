@@ -0,0 +1,110 @@
+"""
+Puntuación por lotes con Spark: probabilidad de bot de todos los usuarios del almacén
+Calcula las features con SparkFeatureExtractor (o lee una tabla ya calculada),
+aplica el modelo de modelos/ (cargado con SecureModelHandler) en los ejecutores
+y guarda una tabla Parquet con did, handle, prob_bot y es_bot
+
+Uso:
+    python scripts/puntuar_spark.py
+    python scripts/puntuar_spark.py --tabla datos/dataset_etiquetado_spark.parquet
+"""
+import argparse
+import sys
+import yaml
+from pathlib import Path
+from pyspark.sql import functions as F
+
+# Añadir directorio raíz al path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from seguridad.secure_model_handler import SecureModelHandler
+from analisis.carga_datos import CargaDatos
+from prediccion.utils.spark_features import SparkFeatureExtractor, crear_sesion
+from prediccion.utils.spark_entrenamiento import puntuar_spark
+
+def cargar_config():
+    """Carga la configuración desde config.yaml"""
+    config_path = Path(__file__).parent.parent / 'config.yaml'
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+def cargar_modelo():
+    """Modelo, scaler y columnas de modelos/ con verificación de integridad"""
+    model_handler = SecureModelHandler(Path(__file__).parent.parent / 'modelos')
+    model = model_handler.cargar_modelo('bot_detector.pkl', verificar_integridad=True)
+    scaler = model_handler.cargar_modelo('feature_scaler.pkl', verificar_integridad=True)
+    feature_cols = model_handler.cargar_modelo('feature_columns.pkl', verificar_integridad=True)
+    return model, scaler, feature_cols
+
+def features_almacen(spark, config, feature_cols):
+    """Features del modelo para todos los perfiles del almacén"""
+    base_dir = Path(__file__).parent.parent
+    carga = CargaDatos(spark)
+    df_profiles = carga.cargar_profiles_to_scan(str(base_dir / config['rutas']['profiles_input']))
+    df_posts = carga.cargar_posts_usuarios(str(base_dir / config['rutas']['posts_input_jsonl']))
+    if df_profiles is None:
+        return None
+    return SparkFeatureExtractor(spark, feature_cols).extraer(df_profiles, df_posts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Puntuación por lotes con Spark")
+    parser.add_argument('--tabla', help="Tabla Parquet de features a puntuar (por defecto se calculan del almacén)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("PUNTUACIÓN POR LOTES CON SPARK")
+    print("=" * 80)
+
+    config = cargar_config()
+    base_dir = Path(__file__).parent.parent
+
+    print("📦 Cargando modelo entrenado...")
+    try:
+        model, scaler, feature_cols = cargar_modelo()
+    except (ValueError, FileNotFoundError) as e:
+        print(f"\n❌ {e}")
+        print("   Entrena el modelo primero: python scripts/2_entrenar_modelo.py")
+        return
+    print(f"✓ Modelo verificado ({len(feature_cols)} features)")
+
+    spark = crear_sesion("Bluesky Bot Scoring")
+    try:
+        if args.tabla:
+            print(f"📖 Leyendo features de: {base_dir / args.tabla}")
+            df_features = spark.read.parquet(str(base_dir / args.tabla))
+        else:
+            print("📖 Calculando features de todos los perfiles del almacén...")
+            try:
+                df_features = features_almacen(spark, config, feature_cols)
+            except ValueError as e:
+                print(f"\n❌ {e}")
+                return
+            if df_features is None:
+                print("\n❌ ERROR: No se pudieron cargar los perfiles")
+                return
+
+        threshold = config['modelo']['threshold_bot']
+        predicciones = puntuar_spark(df_features, model, scaler, feature_cols, threshold)
+
+        output_path = base_dir / config['rutas']['predicciones_spark']
+        print(f"\n💾 Escribiendo predicciones en: {output_path}")
+        predicciones.write.mode('overwrite').parquet(str(output_path))
+
+        # Resumen sobre la tabla escrita (no se vuelve a puntuar)
+        resultado = spark.read.parquet(str(output_path))
+        fila = resultado.agg(F.count(F.lit(1)).alias('total'), F.sum('es_bot').alias('bots')).collect()[0]
+        total, bots = fila['total'], fila['bots'] or 0
+        print(f"\n📈 Usuarios puntuados: {total:,}")
+        print(f"  • Bots (prob > {threshold}): {bots:,} ({100 * bots / max(total, 1):.1f}%)")
+        print("\n🔝 Mayor probabilidad de bot:")
+        for row in resultado.orderBy(F.desc('prob_bot')).limit(10).collect():
+            print(f"  {row['prob_bot']:6.1%}  @{row['handle']}")
+    finally:
+        spark.stop()
+
+    print("\n" + "=" * 80)
+    print("✅ PUNTUACIÓN COMPLETADA")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Módulo para compilar el modelo XGBoost a arrays planos de NumPy
+
+La exportación convierte el booster entrenado y su StandardScaler en un único
+conjunto de arrays (un nodo por posición: feature, umbral, hijos, dirección por
+defecto y valor de hoja). El predictor recorre todos los árboles a la vez con
+operaciones vectorizadas, sin importar xgboost, sklearn ni pandas, y devuelve
+exactamente los mismos bits que `model.predict_proba(scaler.transform(X))`:
+
+  - El scaler se pliega en los umbrales. XGBoost compara
+    float32((x - media) / escala) < umbral; esa condición es monótona en x, así
+    que para cada nodo se busca (por bisección sobre los float64) el menor x
+    crudo que la hace falsa. El predictor compara x < T directamente.
+  - El margen se acumula árbol a árbol en float32 desde el margen base, en el
+    mismo orden que XGBoost.
+  - La sigmoide usa la misma expresión que XGBoost, con `expf` de la libm del
+    sistema en los valores donde exp en float64 no basta para decidir el
+    redondeo a float32.
+
+`compilar_modelo` comprueba el resultado contra `predict_proba` y el script de
+entrenamiento no guarda el artefacto si alguna fila difiere.
+"""
+import ctypes
+import ctypes.util
+import json
+import numpy as np
+
+FORMATO = 1
+
+# Filas por bloque al recorrer los árboles (memoria: filas x árboles enteros)
+_FILAS_BLOQUE = 4096
+
+_SIGNO = np.int64(-2**63)
+_MAGNITUD = np.int64(2**63 - 1)
+
+
+def _cargar_expf():
+    """expf de la libm del sistema (la que usa XGBoost), o None si no se encuentra"""
+    nombre = ctypes.util.find_library('m') or ctypes.util.find_library('c')
+    if nombre is None:
+        return None
+    try:
+        expf = ctypes.CDLL(nombre).expf
+    except (OSError, AttributeError):
+        return None
+    expf.restype = ctypes.c_float
+    expf.argtypes = [ctypes.c_float]
+    return expf
+
+
+_EXPF = _cargar_expf()
+
+
+def expf(z):
+    """
+    exp en float32 con el mismo redondeo que `expf` de la libm
+
+    Se calcula exp en float64 y se redondea; solo los valores que caen casi en
+    el punto medio entre dos float32 se recalculan con la libm (ahí los dos
+    redondeos pueden diferir).
+    """
+    z = np.asarray(z, dtype=np.float32)
+    e = np.exp(z.astype(np.float64))
+    r = e.astype(np.float32)
+    if _EXPF is None or r.size == 0:
+        return r
+    vecino = np.nextafter(r, np.where(e > r, np.float32(np.inf), np.float32(-np.inf)))
+    r64, v64 = r.astype(np.float64), vecino.astype(np.float64)
+    dudosos = np.abs(e - (r64 + v64) / 2) <= 0.01 * np.abs(v64 - r64)
+    if dudosos.any():
+        r[dudosos] = [_EXPF(float(v)) for v in z[dudosos]]
+    return r
+
+
+def _claves(x):
+    """Enteros con el mismo orden que los float64 (±0 comparten clave)"""
+    bits = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, -(bits & _MAGNITUD), bits)
+
+
+def _desde_claves(claves):
+    claves = np.asarray(claves, dtype=np.int64)
+    return np.where(claves < 0, (-claves) | _SIGNO, claves).view(np.float64)
+
+
+def plegar_umbrales(umbrales, media, escala):
+    """
+    Umbrales en la escala original de las features
+
+    Para cada nodo devuelve el menor float64 T tal que
+    float32((T - media) / escala) >= umbral, de modo que
+    x < T  <=>  float32((x - media) / escala) < umbral  para cualquier x.
+
+    Args:
+        umbrales: Umbrales float32 de XGBoost (uno por nodo)
+        media: Media del scaler de la feature de cada nodo
+        escala: Escala del scaler de la feature de cada nodo
+    """
+    umbrales = np.asarray(umbrales, dtype=np.float32)
+    media = np.asarray(media, dtype=np.float64)
+    escala = np.asarray(escala, dtype=np.float64)
+
+    def condicion(x):
+        with np.errstate(over='ignore', invalid='ignore'):
+            return ((x - media) / escala).astype(np.float32) < umbrales
+
+    # Invariante: condicion(bajo) es cierta y condicion(alto) es falsa
+    bajo = np.broadcast_to(_claves(-np.inf), umbrales.shape).copy()
+    alto = np.broadcast_to(_claves(np.inf), umbrales.shape).copy()
+    while True:
+        pendientes = bajo + 1 < alto
+        if not pendientes.any():
+            return _desde_claves(alto)
+        medio = (bajo >> 1) + (alto >> 1) + (bajo & alto & 1)
+        cierta = condicion(_desde_claves(medio))
+        bajo = np.where(pendientes & cierta, medio, bajo)
+        alto = np.where(pendientes & ~cierta, medio, alto)
+
+
+def _numero_arboles(model, total):
+    """Árboles que usa predict_proba (respeta best_iteration si hubo early stopping)"""
+    rondas = model.get_booster().num_boosted_rounds()
+    try:
+        usadas = model.best_iteration + 1
+    except AttributeError:
+        usadas = rondas
+    return total * min(usadas, rondas) // max(rondas, 1)
+
+
+def exportar(model, scaler, feature_cols):
+    """
+    Convierte un XGBClassifier binario y su scaler en arrays planos
+
+    Args:
+        model: XGBClassifier entrenado (objective binary:logistic, booster gbtree)
+        scaler: StandardScaler con el que se entrenó
+        feature_cols: Columnas de features en el orden del modelo
+
+    Returns:
+        Dict de arrays (se guarda con SecureModelHandler.guardar_arrays)
+
+    Raises:
+        ValueError: Si el modelo usa algo que el predictor no reproduce
+    """
+    learner = json.loads(model.get_booster().save_raw('json'))['learner']
+    objetivo = learner['objective']['name']
+    if objetivo != 'binary:logistic':
+        raise ValueError(f"Solo se compilan modelos binary:logistic (el modelo usa {objetivo})")
+    booster = learner['gradient_booster']
+    if booster['name'] != 'gbtree':
+        raise ValueError(f"Solo se compilan modelos gbtree (el modelo usa {booster['name']})")
+
+    arboles = booster['model']['trees']
+    arboles = arboles[:_numero_arboles(model, len(arboles))]
+    # Con with_mean/with_std desactivados sklearn deja mean_/scale_ a None
+    media = np.broadcast_to(np.asarray(
+        scaler.mean_ if scaler.mean_ is not None else 0.0, dtype=np.float64), (len(feature_cols),))
+    escala = np.broadcast_to(np.asarray(
+        scaler.scale_ if scaler.scale_ is not None else 1.0, dtype=np.float64), (len(feature_cols),))
+
+    feature, umbral, izquierda, derecha, defecto, valor, raices = [], [], [], [], [], [], []
+    profundidad = 0
+    inicio = 0
+    for arbol in arboles:
+        if any(arbol.get('split_type', [])):
+            raise ValueError("Los splits categóricos no se pueden compilar")
+        izq = np.asarray(arbol['left_children'], dtype=np.int64)
+        der = np.asarray(arbol['right_children'], dtype=np.int64)
+        hoja = izq == -1
+        nodos = np.arange(izq.size)
+        # Las hojas apuntan a sí mismas: recorrer de más no cambia el resultado
+        izquierda.append(np.where(hoja, nodos, izq) + inicio)
+        derecha.append(np.where(hoja, nodos, der) + inicio)
+        feature.append(np.where(hoja, 0, arbol['split_indices']))
+        umbral.append(np.asarray(arbol['split_conditions'], dtype=np.float32))
+        defecto.append(np.asarray(arbol['default_left'], dtype=bool))
+        valor.append(np.where(hoja, umbral[-1], 0).astype(np.float32))
+        raices.append(inicio)
+
+        niveles = np.zeros(izq.size, dtype=np.int64)
+        for n in nodos:
+            if not hoja[n]:
+                niveles[izq[n]] = niveles[der[n]] = niveles[n] + 1
+        profundidad = max(profundidad, int(niveles.max()))
+        inicio += izq.size
+
+    feature = np.concatenate(feature).astype(np.int32)
+    internos = np.concatenate(izquierda) != np.arange(inicio)
+    umbral_crudo = np.full(inicio, np.inf)
+    umbral_crudo[internos] = plegar_umbrales(
+        np.concatenate(umbral)[internos], media[feature[internos]], escala[feature[internos]]
+    )
+
+    # Margen base tal como lo calcula XGBoost a partir de base_score
+    base_score = np.float32(float(learner['learner_model_param']['base_score']))
+    base_margen = np.float32(-np.log(np.float64(np.float32(1.0) / base_score - np.float32(1.0))))
+
+    return {
+        'formato': np.int32(FORMATO),
+        'feature_cols': np.asarray(feature_cols, dtype=str),
+        'media': np.ascontiguousarray(media),
+        'escala': np.ascontiguousarray(escala),
+        'feature': feature,
+        'umbral': umbral_crudo,
+        'izquierda': np.concatenate(izquierda).astype(np.int32),
+        'derecha': np.concatenate(derecha).astype(np.int32),
+        'defecto_izq': np.concatenate(defecto),
+        'valor': np.concatenate(valor),
+        'raices': np.asarray(raices, dtype=np.int32),
+        'profundidad': np.int32(profundidad),
+        'base_margen': base_margen,
+    }
+
+
+class PredictorCompilado:
+    """Predicción con los arrays de `exportar` (solo NumPy)"""
+
+    def __init__(self, arrays):
+        """
+        Args:
+            arrays: Dict devuelto por exportar (o cargado con cargar_arrays)
+        """
+        if int(arrays['formato']) != FORMATO:
+            raise ValueError(f"Formato de modelo compilado no soportado: {int(arrays['formato'])}")
+        self.arrays = arrays
+        self.feature_cols = [str(c) for c in arrays['feature_cols']]
+        self.media = arrays['media']
+        self.escala = arrays['escala']
+        self.checksum_modelo = str(arrays['checksum_modelo']) if 'checksum_modelo' in arrays else None
+        self._feature = arrays['feature']
+        self._umbral = arrays['umbral']
+        self._izquierda = arrays['izquierda']
+        self._derecha = arrays['derecha']
+        self._defecto = arrays['defecto_izq']
+        self._valor = arrays['valor']
+        self._raices = arrays['raices']
+        self._profundidad = int(arrays['profundidad'])
+        self._base = np.float32(arrays['base_margen'])
+
+    @property
+    def n_arboles(self):
+        return int(self._raices.size)
+
+    def vector(self, features):
+        """Fila (1, n_features) en float64 a partir de un dict de features"""
+        return np.array([[features[c] for c in self.feature_cols]], dtype=np.float64)
+
+    def escalar(self, X):
+        """Mismo resultado que scaler.transform(X) (float64)"""
+        return (np.asarray(X, dtype=np.float64) - self.media) / self.escala
+
+    def _hojas(self, X):
+        """Nodo hoja alcanzado en cada árbol, (filas, árboles)"""
+        # Índices sobre X aplanado: fila * n_features + feature del nodo
+        desplazamiento = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        plano = np.ascontiguousarray(X).ravel()
+        nodo = np.broadcast_to(self._raices, (X.shape[0], self._raices.size)).copy()
+        for _ in range(self._profundidad):
+            x = plano.take(desplazamiento + self._feature.take(nodo))
+            izquierda = np.where(np.isnan(x), self._defecto.take(nodo), x < self._umbral.take(nodo))
+            nodo = np.where(izquierda, self._izquierda.take(nodo), self._derecha.take(nodo))
+        return nodo
+
+    def margen(self, X):
+        """Margen (logit) float32 de cada fila, X en la escala original"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_cols):
+            raise ValueError(f"Se esperaban {len(self.feature_cols)} features por fila")
+        margen = np.full(X.shape[0], self._base, dtype=np.float32)
+        for inicio in range(0, X.shape[0], _FILAS_BLOQUE):
+            hojas = self._valor.take(self._hojas(X[inicio:inicio + _FILAS_BLOQUE]))
+            bloque = margen[inicio:inicio + _FILAS_BLOQUE]
+            for j in range(hojas.shape[1]):
+                bloque += hojas[:, j]
+        return margen
+
+    def predict_proba(self, X):
+        """
+        Probabilidades (filas, 2) en float32, como XGBClassifier.predict_proba
+
+        Args:
+            X: Features sin escalar, columnas en el orden de feature_cols
+        """
+        z = np.minimum(-self.margen(X), np.float32(88.7))
+        p = np.float32(1.0) / (expf(z) + np.float32(1.0))
+        return np.column_stack([np.float32(1.0) - p, p])
+
+
+def comparar(predictor, model, scaler, X):
+    """
+    Compara bit a bit el predictor compilado con predict_proba
+
+    Returns:
+        Dict con filas, distintas y max_diff
+    """
+    import pandas as pd
+
+    X = np.asarray(X, dtype=np.float64)
+    referencia = model.predict_proba(
+        scaler.transform(pd.DataFrame(X, columns=predictor.feature_cols))
+    ).astype(np.float32)
+    compilado = predictor.predict_proba(X)
+    distintas = (referencia.view(np.uint32) != compilado.view(np.uint32)).any(axis=1)
+    return {
+        'filas': int(X.shape[0]),
+        'distintas': int(distintas.sum()),
+        'max_diff': float(np.abs(referencia - compilado).max()) if X.shape[0] else 0.0,
+    }
+
+
+def filas_frontera(predictor, X, max_filas=20000, semilla=42):
+    """
+    Filas de prueba con features justo en los umbrales plegados
+
+    Cada fila copia una fila de X y pone la feature de un nodo en T y en el
+    float64 anterior (donde cambia la rama), además de filas con esa feature a NaN.
+    """
+    rng = np.random.default_rng(semilla)
+    X = np.asarray(X, dtype=np.float64)
+    internos = np.flatnonzero(predictor._izquierda != np.arange(predictor._izquierda.size))
+    if internos.size == 0 or X.shape[0] == 0:
+        return X[:0]
+    nodos = rng.choice(internos, size=min(internos.size, max_filas // 3), replace=False)
+    base = X[rng.integers(0, X.shape[0], size=nodos.size)]
+    features = predictor._feature[nodos]
+    T = predictor._umbral[nodos]
+    filas = []
+    for valores in (T, np.nextafter(T, -np.inf), np.full(T.shape, np.nan)):
+        bloque = base.copy()
+        bloque[np.arange(nodos.size), features] = valores
+        filas.append(bloque)
+    return np.vstack(filas)
+
+
+def compilar_modelo(model, scaler, feature_cols, X_verificacion):
+    """
+    Exporta el modelo y comprueba que predice exactamente lo mismo
+
+    Args:
+        model: XGBClassifier entrenado
+        scaler: StandardScaler del modelo
+        feature_cols: Columnas de features en el orden del modelo
+        X_verificacion: Muestra de filas sin escalar (se le añaden filas en
+            los umbrales de los nodos)
+
+    Returns:
+        Tupla (arrays, verificacion); verificacion es el dict de `comparar`
+    """
+    arrays = exportar(model, scaler, feature_cols)
+    predictor = PredictorCompilado(arrays)
+    X = np.asarray(X_verificacion, dtype=np.float64)
+    X = np.vstack([X, filas_frontera(predictor, X)])
+    return arrays, comparar(predictor, model, scaler, X)
+
+
+def cargar_compilado(handler, nombre_archivo='bot_detector_compilado.npz', modelo_archivo='bot_detector.pkl'):
+    """
+    Carga el predictor compilado si existe y corresponde al modelo actual
+
+    Returns:
+        PredictorCompilado, o None si no hay uno válido
+    """
+    if not (handler.modelos_dir / nombre_archivo).exists():
+        return None
+    predictor = PredictorCompilado(handler.cargar_arrays(nombre_archivo, verificar_integridad=True))
+    if predictor.checksum_modelo != handler.calcular_checksum(handler.modelos_dir / modelo_archivo):
+        return None
+    return predictor
@@ -0,0 +1,182 @@
+"""
+Módulo para buscar hiperparámetros de XGBoost en paralelo
+
+Validación cruzada estratificada repartida en un pool de procesos con
+successive halving: se prueban muchas combinaciones con pocas rondas de
+boosting y solo la mejor fracción (1/eta) pasa a la siguiente ronda con eta
+veces más presupuesto. Cada entrenamiento usa early stopping sobre su fold de
+validación.
+
+La matriz de features se escribe una vez en un np.memmap; los procesos la
+abren en solo lectura y comparten las páginas del sistema operativo en lugar
+de recibir cada uno una copia serializada.
+"""
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+# Estado de cada proceso del pool (se rellena en _iniciar_proceso)
+_X = None
+_y = None
+_FOLDS = None
+
+
+def _iniciar_proceso(ruta_X, ruta_y, forma, folds, semilla):
+    """Abre los memmap en solo lectura y calcula los folds una vez por proceso"""
+    global _X, _y, _FOLDS
+    _X = np.memmap(ruta_X, dtype=np.float32, mode='r', shape=forma)
+    _y = np.memmap(ruta_y, dtype=np.int8, mode='r', shape=(forma[0],))
+    _FOLDS = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=semilla).split(np.zeros(forma[0]), _y))
+
+
+def _evaluar_fold(tarea):
+    """Entrena una combinación en un fold y devuelve (candidato, auc, mejor_iteración)"""
+    candidato, fold, params, rondas, early_stopping, hilos = tarea
+    entrenamiento, validacion = _FOLDS[fold]
+    model = xgb.XGBClassifier(
+        **params,
+        n_estimators=rondas,
+        early_stopping_rounds=early_stopping,
+        eval_metric='logloss',
+        tree_method='hist',
+        n_jobs=hilos,
+    )
+    X_val, y_val = _X[validacion], _y[validacion]
+    model.fit(_X[entrenamiento], _y[entrenamiento], eval_set=[(X_val, y_val)], verbose=False)
+    proba = model.predict_proba(X_val)[:, 1]
+    auc = roc_auc_score(y_val, proba) if len(np.unique(y_val)) > 1 else 0.5
+    return candidato, auc, model.best_iteration
+
+
+def muestrear_candidatos(espacio, n, semilla=42):
+    """Combinaciones aleatorias (sin repetir si el espacio lo permite) del espacio de búsqueda"""
+    rng = np.random.default_rng(semilla)
+    nombres = sorted(espacio)
+    total = math.prod(len(espacio[k]) for k in nombres)
+    candidatos, vistos = [], set()
+    while len(candidatos) < min(n, total):
+        combinacion = tuple(espacio[k][rng.integers(len(espacio[k]))] for k in nombres)
+        if combinacion in vistos:
+            continue
+        vistos.add(combinacion)
+        candidatos.append(dict(zip(nombres, combinacion)))
+    return candidatos
+
+
+def buscar_hiperparametros(X, y, cfg, params_base=None, log=print):
+    """
+    Successive halving con validación cruzada estratificada en paralelo
+
+    Args:
+        X: Matriz de features de entrenamiento (ya escalada)
+        y: Labels (0/1)
+        cfg: Sección modelo.busqueda de config.yaml
+        params_base: Parámetros fijos (ej: random_state) que se combinan con cada candidato
+        log: Función para mostrar el progreso
+
+    Returns:
+        Dict con 'params' (mejores parámetros, incluido n_estimators),
+        'auc' (AUC medio de validación) e 'historial' (resultados por ronda)
+    """
+    # n_estimators lo decide el presupuesto de cada ronda (con early stopping)
+    params_base = {k: v for k, v in (params_base or {}).items() if k != 'n_estimators' and k not in cfg['espacio']}
+    folds = cfg.get('folds', 3)
+    eta = cfg.get('eta', 3)
+    rondas = cfg.get('rondas_min', 50)
+    rondas_max = cfg.get('rondas_max', 450)
+    early_stopping = cfg.get('early_stopping_rounds', 20)
+    semilla = cfg.get('semilla', 42)
+    procesos = cfg.get('procesos') or os.cpu_count() or 1
+    hilos = cfg.get('hilos_por_modelo', 1)
+
+    candidatos = muestrear_candidatos(cfg['espacio'], cfg.get('candidatos', 16), semilla)
+    vivos = list(range(len(candidatos)))
+    historial = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Una sola copia de los datos en disco/page cache para todos los procesos
+        ruta_X, ruta_y = os.path.join(tmp, 'X.dat'), os.path.join(tmp, 'y.dat')
+        X_mm = np.memmap(ruta_X, dtype=np.float32, mode='w+', shape=X.shape)
+        X_mm[:] = np.asarray(X)
+        X_mm.flush()
+        y_mm = np.memmap(ruta_y, dtype=np.int8, mode='w+', shape=(X.shape[0],))
+        y_mm[:] = np.asarray(y)
+        y_mm.flush()
+        del X_mm, y_mm
+
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=_iniciar_proceso,
+            initargs=(ruta_X, ruta_y, X.shape, folds, semilla),
+        ) as pool:
+            while True:
+                log(f"  • Ronda: {len(vivos)} candidatos x {folds} folds, hasta {rondas} árboles")
+                tareas = [
+                    (c, f, {**params_base, **candidatos[c]}, rondas, early_stopping, hilos)
+                    for c in vivos for f in range(folds)
+                ]
+                aucs = {c: [] for c in vivos}
+                iteraciones = {c: [] for c in vivos}
+                for c, auc, mejor in pool.map(_evaluar_fold, tareas):
+                    aucs[c].append(auc)
+                    iteraciones[c].append(mejor)
+
+                # Mayor AUC primero; a igualdad, el que necesita menos árboles
+                resultados = sorted(
+                    ((float(np.mean(aucs[c])), c, int(round(np.mean(iteraciones[c]))) + 1) for c in vivos),
+                    key=lambda r: (-r[0], r[2], r[1]),
+                )
+                historial.append({
+                    'rondas': rondas,
+                    'resultados': [
+                        {'params': candidatos[c], 'auc': auc, 'n_estimators': n} for auc, c, n in resultados
+                    ],
+                })
+                mejor_auc, mejor, mejor_n = resultados[0]
+                log(f"    Mejor AUC: {mejor_auc:.4f} con {candidatos[mejor]} ({mejor_n} árboles)")
+
+                if len(vivos) == 1 or rondas >= rondas_max:
+                    break
+                vivos = [c for _, c, _ in resultados[:max(1, math.ceil(len(vivos) / eta))]]
+                rondas = min(rondas * eta, rondas_max)
+
+    return {
+        'params': {**candidatos[mejor], 'n_estimators': mejor_n},
+        'auc': mejor_auc,
+        'historial': historial,
+    }
+
+
+def guardar_mejores_parametros(resultado, ruta):
+    """Guarda el resultado de la búsqueda en JSON (lo lee el entrenamiento normal)"""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2)
+    return ruta
+
+
+def parametros_xgboost(config, base_dir):
+    """
+    Parámetros de XGBoost para el entrenamiento normal
+
+    Los de modelo.xgboost, sobrescritos por los de la última búsqueda si
+    existe el archivo `modelo.busqueda.resultado` y `usar_resultado` está activo.
+    """
+    params = dict(config['modelo']['xgboost'])
+    cfg = config['modelo'].get('busqueda') or {}
+    if not cfg.get('usar_resultado', True):
+        return params
+    ruta = Path(base_dir) / cfg.get('resultado', 'modelos/mejores_parametros.json')
+    if ruta.exists():
+        with open(ruta, 'r', encoding='utf-8') as f:
+            params.update(json.load(f)['params'])
+    return params
@@ -0,0 +1,191 @@
+"""
+Módulo de inferencia en cascada: modelo lineal rápido con XGBoost de respaldo
+
+El modelo rápido es una regresión lineal (Ridge) destilada del modelo completo:
+aprende el logit de la probabilidad de XGBoost a partir de las mismas features
+escaladas. Solo necesita un producto escalar, así que no hace falta entrenar
+con etiquetas ni recorrer árboles.
+
+Cuando el logit predicho está lejos del umbral de decisión (más de `margen`),
+la respuesta del modelo rápido se da por buena; en la banda incierta se
+consulta a XGBoost. El margen se calibra para que, entre los casos que resuelve
+el camino rápido, la decisión coincida con la del modelo completo al menos en
+`objetivo_acuerdo` de los casos, y nunca es menor que `margen_min` (si los datos
+de calibración son fáciles, la banda no desaparece).
+"""
+import numpy as np
+
+# Los logits de XGBoost se recortan para que la regresión no persiga probabilidades 0/1 exactas
+_LOGIT_MAX = 12.0
+
+
+def _logit(p):
+    p = np.clip(np.asarray(p, dtype=np.float64), 1e-12, 1 - 1e-12)
+    return np.clip(np.log(p / (1 - p)), -_LOGIT_MAX, _LOGIT_MAX)
+
+
+def _sigmoide(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def calibrar_margen(distancias, acuerdos, objetivo_acuerdo):
+    """
+    Menor margen con el que el camino rápido acierta al menos `objetivo_acuerdo`
+
+    Se ordenan los casos de más lejano a más cercano al umbral y se busca el
+    prefijo más largo cuyo acuerdo acumulado con el modelo completo cumple el
+    objetivo. Los casos con distancia mayor que el margen devuelto forman ese
+    prefijo.
+
+    Args:
+        distancias: |logit rápido - logit del umbral| de cada caso
+        acuerdos: True si la decisión rápida coincide con la del modelo completo
+        objetivo_acuerdo: Fracción mínima de acuerdo (ej: 0.995)
+
+    Returns:
+        Margen (inf si ningún prefijo cumple el objetivo: todo va a XGBoost)
+    """
+    orden = np.argsort(-np.asarray(distancias), kind='stable')
+    d = np.asarray(distancias, dtype=np.float64)[orden]
+    if d.size == 0:
+        return float('inf')
+    acumulado = np.cumsum(np.asarray(acuerdos)[orden]) / np.arange(1, d.size + 1)
+    # Solo se puede cortar entre distancias distintas (los empates van juntos)
+    fronteras = np.r_[d[1:] < d[:-1], True]
+    validos = np.flatnonzero((acumulado >= objetivo_acuerdo) & fronteras)
+    if validos.size == 0:
+        return float('inf')
+    k = validos[-1]
+    return float(d[k + 1]) if k + 1 < d.size else -1.0
+
+
+class ModeloCascada:
+    """Modelo rápido destilado y banda incierta que se delega a XGBoost"""
+
+    def __init__(self, threshold=0.5, objetivo_acuerdo=0.995, alpha=1.0, margen_min=1.0):
+        """
+        Args:
+            threshold: Umbral de probabilidad de bot (modelo.threshold_bot)
+            objetivo_acuerdo: Acuerdo mínimo con el modelo completo en el camino rápido
+            alpha: Regularización de la regresión Ridge
+            margen_min: Semiancho mínimo de la banda incierta (en logit)
+        """
+        self.threshold = threshold
+        self.objetivo_acuerdo = objetivo_acuerdo
+        self.alpha = alpha
+        self.margen_min = margen_min
+        self.coef_ = None
+        self.intercept_ = 0.0
+        self.margen = float('inf')
+        self.checksum_modelo = None
+        self.metricas = {}
+        self.contadores = {'rapida': 0, 'completa': 0}
+
+    @property
+    def _logit_umbral(self):
+        return float(_logit(self.threshold))
+
+    def logit_rapido(self, X_scaled):
+        """Logit predicho por el modelo lineal (X ya escalado)"""
+        return np.asarray(X_scaled, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def ajustar(self, X_scaled, prob_completo):
+        """
+        Destila el modelo rápido y calibra la banda incierta
+
+        Args:
+            X_scaled: Features escaladas (entrenamiento)
+            prob_completo: Probabilidad de bot del modelo completo para esas filas
+        """
+        # Import diferido: cargar y usar la cascada no necesita sklearn
+        from sklearn.linear_model import Ridge
+
+        objetivo = _logit(prob_completo)
+        ridge = Ridge(alpha=self.alpha).fit(X_scaled, objetivo)
+        self.coef_ = ridge.coef_.astype(np.float64)
+        self.intercept_ = float(ridge.intercept_)
+
+        z = self.logit_rapido(X_scaled)
+        acuerdos = (z > self._logit_umbral) == (np.asarray(prob_completo) > self.threshold)
+        margen = calibrar_margen(np.abs(z - self._logit_umbral), acuerdos, self.objetivo_acuerdo)
+        self.margen = max(margen, self.margen_min)
+        return self
+
+    def resolver(self, X_scaled, modelo_completo, X_modelo=None):
+        """
+        Probabilidad y decisión de cada fila pasando por la cascada
+
+        Args:
+            X_scaled: Features escaladas
+            modelo_completo: XGBClassifier (o PredictorCompilado) al que se
+                delega la banda incierta
+            X_modelo: Filas que recibe modelo_completo si no son X_scaled (el
+                predictor compilado trabaja con las features sin escalar)
+
+        Returns:
+            Tupla (prob_bot, es_bot, rapida), arrays de la longitud de X_scaled;
+            `rapida` indica qué filas resolvió el modelo lineal
+        """
+        X_scaled = np.asarray(X_scaled)
+        z = self.logit_rapido(X_scaled)
+        rapida = np.abs(z - self._logit_umbral) > self.margen
+        prob = _sigmoide(z)
+        if not rapida.all():
+            X_modelo = X_scaled if X_modelo is None else np.asarray(X_modelo)
+            prob[~rapida] = modelo_completo.predict_proba(X_modelo[~rapida])[:, 1]
+        self.contadores['rapida'] += int(rapida.sum())
+        self.contadores['completa'] += int((~rapida).sum())
+        return prob, prob > self.threshold, rapida
+
+    def fraccion_rapida(self):
+        """Fracción de predicciones resueltas por el camino rápido desde que se cargó"""
+        total = self.contadores['rapida'] + self.contadores['completa']
+        return self.contadores['rapida'] / total if total else 0.0
+
+    def evaluar(self, X_scaled, modelo_completo, y=None):
+        """
+        Métricas de la cascada frente al modelo completo (no cuenta en `contadores`)
+
+        Returns:
+            Dict con fraccion_rapida, acuerdo (decisiones iguales al modelo
+            completo), acuerdo_rapida (solo en el camino rápido) y, si se pasa
+            `y`, exactitud de la cascada y del modelo completo
+        """
+        contadores = dict(self.contadores)
+        prob, es_bot, rapida = self.resolver(X_scaled, modelo_completo)
+        self.contadores = contadores
+
+        completo = modelo_completo.predict_proba(np.asarray(X_scaled))[:, 1] > self.threshold
+        metricas = {
+            'filas': int(len(prob)),
+            'fraccion_rapida': float(rapida.mean()) if len(prob) else 0.0,
+            'acuerdo': float((es_bot == completo).mean()) if len(prob) else 1.0,
+            'acuerdo_rapida': float((es_bot[rapida] == completo[rapida]).mean()) if rapida.any() else 1.0,
+        }
+        if y is not None:
+            y = np.asarray(y)
+            metricas['exactitud_cascada'] = float((es_bot == y).mean())
+            metricas['exactitud_completo'] = float((completo == y).mean())
+        return metricas
+
+
+def cargar_cascada(handler, nombre_archivo='cascada.pkl', modelo_archivo='bot_detector.pkl'):
+    """
+    Carga la cascada si existe y corresponde al modelo actual
+
+    La cascada guarda el checksum del bot_detector.pkl del que se destiló; si el
+    modelo se reentrenó después (por ejemplo en modo incremental sin cascada),
+    se ignora y todas las predicciones van al modelo completo.
+
+    Args:
+        handler: SecureModelHandler de la carpeta de modelos
+
+    Returns:
+        ModeloCascada, o None si no hay cascada válida
+    """
+    if not (handler.modelos_dir / nombre_archivo).exists():
+        return None
+    cascada = handler.cargar_modelo(nombre_archivo, verificar_integridad=True)
+    if cascada.checksum_modelo != handler.calcular_checksum(handler.modelos_dir / modelo_archivo):
+        return None
+    return cascada
@@ -0,0 +1,189 @@
+"""
+Módulo para escribir y leer datasets de features por bloques, con memoria acotada
+
+El formato lo decide la extensión de la ruta:
+  - .parquet: columnas tipadas y compactas (features float32, label int8,
+    handle con codificación de diccionario). Se puede leer solo un
+    subconjunto de columnas sin recorrer el resto del archivo.
+  - .csv: texto plano, se mantiene por compatibilidad.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Columnas de metadata que no son features
+COLUMNAS_NO_FEATURES = ['did', 'handle', 'label']
+
+
+def es_parquet(ruta):
+    """True si la ruta es un archivo (o un directorio de Spark) Parquet"""
+    return Path(ruta).suffix == '.parquet'
+
+
+def esquema_arrow(columnas):
+    """
+    Esquema pyarrow del dataset: did string, handle diccionario, label int8 y
+    el resto (features) float32
+    """
+    import pyarrow as pa
+    campos = []
+    for col in columnas:
+        if col == 'did':
+            tipo = pa.string()
+        elif col == 'handle':
+            tipo = pa.dictionary(pa.int32(), pa.string())
+        elif col == 'label':
+            tipo = pa.int8()
+        else:
+            tipo = pa.float32()
+        campos.append(pa.field(col, tipo))
+    return pa.schema(campos)
+
+
+def tipar_dataset(df):
+    """
+    Convierte un DataFrame a los tipos compactos del dataset (en el sitio)
+
+    Útil para CSV y para Parquet escritos por Spark (features en float64).
+    """
+    for col in df.columns:
+        if col == 'did':
+            continue
+        if col == 'handle':
+            df[col] = df[col].astype('category')
+        elif col == 'label':
+            df[col] = df[col].astype(np.int8)
+        elif df[col].dtype != np.float32:
+            df[col] = df[col].astype(np.float32)
+    return df
+
+
+def columnas_dataset(ruta):
+    """Nombres de columnas del dataset sin leer sus filas"""
+    ruta = Path(ruta)
+    if es_parquet(ruta):
+        if ruta.is_dir():
+            import pyarrow.dataset as ds
+            return list(ds.dataset(ruta, format='parquet').schema.names)
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(ruta).names)
+    return list(pd.read_csv(ruta, nrows=0).columns)
+
+
+def leer_dataset(ruta, columnas=None):
+    """
+    Lee el dataset completo (o solo `columnas`) con los tipos compactos
+
+    Args:
+        ruta: Archivo .parquet (o directorio de Spark) o .csv
+        columnas: Columnas a leer; por defecto todas
+
+    Returns:
+        DataFrame con features float32, label int8 y handle categórico
+    """
+    ruta = Path(ruta)
+    if es_parquet(ruta):
+        df = pd.read_parquet(ruta, columns=columnas)
+    else:
+        # En CSV se indican los tipos al parsear para no pasar por float64/int64
+        tipos = {c: np.float32 for c in (columnas or columnas_dataset(ruta)) if c not in COLUMNAS_NO_FEATURES}
+        tipos.update({'did': str, 'handle': 'category', 'label': np.int8})
+        df = pd.read_csv(ruta, usecols=columnas, dtype=tipos)
+    return tipar_dataset(df)
+
+
+class EscritorPorBloques:
+    """
+    Acumula filas (dicts) y las escribe a disco en bloques de tamaño fijo
+
+    Escribe en un archivo temporal junto a `ruta` que solo reemplaza al
+    dataset anterior al cerrar sin errores: si el etiquetado falla o se
+    interrumpe, el dataset anterior sigue intacto y no queda uno truncado.
+    """
+
+    def __init__(self, ruta, tamano_bloque=5000, columnas=None):
+        """
+        Args:
+            ruta: Archivo de salida (.parquet o .csv; se sobrescribe si existe)
+            tamano_bloque: Número de filas que se mantienen en memoria antes de escribir
+                (en Parquet, cada bloque es un row group)
+            columnas: Orden de columnas del archivo; por defecto el de la primera
+                fila. Con 0 filas se escribe un archivo vacío con estas columnas.
+        """
+        self.ruta = Path(ruta)
+        self.tamano_bloque = tamano_bloque
+        self.columnas = list(columnas) if columnas is not None else None
+        self.filas_escritas = 0
+        self._bloque = []
+        self._writer = None
+
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._temporal = self.ruta.with_name(f".{self.ruta.name}.{os.getpid()}.tmp")
+        if self._temporal.exists():
+            self._temporal.unlink()
+
+    def agregar(self, fila):
+        """Añade una fila y vuelca el bloque a disco si está lleno"""
+        self._bloque.append(fila)
+        if len(self._bloque) >= self.tamano_bloque:
+            self._volcar()
+
+    def _volcar(self):
+        if not self._bloque:
+            return
+        # El primer bloque fija el orden de columnas para todo el archivo
+        if self.columnas is None:
+            self.columnas = list(self._bloque[0].keys())
+        df = pd.DataFrame(self._bloque, columns=self.columnas)
+        if es_parquet(self.ruta):
+            self._escribir_parquet(df)
+        else:
+            df.to_csv(self._temporal, mode='a', header=self.filas_escritas == 0, index=False)
+        self.filas_escritas += len(df)
+        self._bloque = []
+
+    def _escribir_parquet(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._temporal, esquema_arrow(self.columnas))
+        tabla = pa.Table.from_pandas(tipar_dataset(df), schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(tabla)
+
+    def cerrar(self):
+        """Escribe el último bloque pendiente y reemplaza el dataset anterior"""
+        self._volcar()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.filas_escritas == 0:
+            # Sin filas: archivo vacío con las columnas, para que el paso
+            # siguiente vea un dataset sin filas en lugar de uno anterior
+            columnas = self.columnas or []
+            if es_parquet(self.ruta):
+                import pyarrow.parquet as pq
+                pq.write_table(esquema_arrow(columnas).empty_table(), self._temporal)
+            else:
+                pd.DataFrame(columns=columnas).to_csv(self._temporal, index=False)
+        os.replace(self._temporal, self.ruta)
+
+    def descartar(self):
+        """Cierra y borra el archivo temporal sin tocar el dataset anterior"""
+        self._bloque = []
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._temporal.exists():
+            self._temporal.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.descartar()
+        return False
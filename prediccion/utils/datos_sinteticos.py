@@ -0,0 +1,173 @@
+"""
+Módulo para generar perfiles y posts sintéticos con el formato del almacén
+
+Produce perfiles (como profiles_to_scan.json) y listas de posts (como las de
+posts_usuarios.json) con una mezcla de cuentas "humanas" y "bot" para medir el
+rendimiento del extractor y del etiquetado a cualquier escala. Todo se genera
+de forma perezosa y reproducible a partir de una semilla, así que recorrer un
+millón de usuarios no requiere tenerlos en memoria.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Vocabulario base de los posts (se mezcla con palabras numeradas para dar variedad)
+_PALABRAS = (
+    "hoy mañana ayer gracias buenos días noche café trabajo casa ciudad música libro "
+    "película partido equipo gol lluvia sol playa montaña viaje tren avión foto amigos "
+    "familia comida cena fiesta concierto serie capítulo final nuevo nueva proyecto código "
+    "datos red social bluesky post hilo opinión noticia política ciencia arte diseño juego "
+    "perro gato jardín invierno verano otoño primavera semana mes año feliz triste cansado"
+).split()
+_VOCABULARIO = np.array(_PALABRAS + [f"palabra{i}" for i in range(2000)])
+
+_PLANTILLAS_SPAM = [
+    "Gana dinero desde casa con este método {url}",
+    "Oferta limitada solo hoy entra ya {url}",
+    "Sigue a esta cuenta y consigue seguidores gratis {url}",
+    "Mira este vídeo increíble {url}",
+]
+
+_FECHA_REFERENCIA = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _iso(fecha):
+    """Fecha con el formato de Bluesky (2024-01-01T00:00:00.000Z)"""
+    return fecha.strftime('%Y-%m-%dT%H:%M:%S.') + f"{fecha.microsecond // 1000:03d}Z"
+
+
+def generar_perfil(rng, indice, es_bot):
+    """
+    Genera un perfil con los campos que usa FeatureExtractor
+
+    Args:
+        rng: numpy Generator
+        indice: Número de usuario (para DID y handle únicos)
+        es_bot: Si True, genera un perfil con rasgos de bot
+    """
+    if es_bot:
+        edad_dias = int(rng.integers(1, 120))
+        followers = int(rng.integers(0, 30))
+        following = int(rng.integers(200, 5000))
+        posts_count = int(rng.integers(300, 20000))
+        handle = f"user{int(rng.integers(10_000, 99_999_999))}.bsky.social"
+        bio = "" if rng.random() < 0.7 else "Promo"
+        avatar = None if rng.random() < 0.8 else f"https://cdn.bsky.app/img/avatar/{indice}.jpg"
+    else:
+        edad_dias = int(rng.integers(30, 2000))
+        followers = int(rng.lognormal(4.5, 1.5))
+        following = int(rng.lognormal(4.5, 1.0))
+        posts_count = int(rng.integers(10, 5000))
+        handle = f"persona{indice}.bsky.social"
+        bio = " ".join(rng.choice(_VOCABULARIO, size=int(rng.integers(0, 30))))
+        avatar = f"https://cdn.bsky.app/img/avatar/{indice}.jpg" if rng.random() < 0.9 else None
+
+    return {
+        'did': f"did:plc:sintetico{indice:08d}",
+        'handle': handle,
+        'display_name': handle.split('.')[0].capitalize(),
+        'description': bio,
+        'avatar': avatar,
+        'followers_count': followers,
+        'follows_count': following,
+        'posts_count': posts_count,
+        'created_at': _iso(_FECHA_REFERENCIA - timedelta(days=edad_dias)),
+    }
+
+
+def generar_posts(rng, perfil, num_posts, es_bot):
+    """
+    Genera los posts de un usuario (del más reciente al más antiguo, como la API)
+
+    Los bots publican plantillas con URL a intervalos casi regulares y a
+    cualquier hora; los humanos textos variados con intervalos irregulares.
+    """
+    did = perfil['did']
+    if es_bot:
+        intervalos = rng.normal(10, 0.5, size=num_posts).clip(1)  # minutos
+        plantillas = rng.integers(0, len(_PLANTILLAS_SPAM), size=num_posts)
+        textos = [
+            _PLANTILLAS_SPAM[p].format(url=f"https://spam.example/{int(rng.integers(0, 100))}")
+            for p in plantillas
+        ]
+        likes = rng.poisson(0.2, size=num_posts)
+        replies = rng.poisson(0.05, size=num_posts)
+    else:
+        intervalos = rng.exponential(600, size=num_posts)
+        longitudes = rng.integers(1, 40, size=num_posts)
+        palabras = rng.choice(_VOCABULARIO, size=int(longitudes.sum()))
+        cortes = np.cumsum(longitudes)[:-1]
+        textos = [" ".join(trozo) for trozo in np.split(palabras, cortes)]
+        likes = rng.poisson(6, size=num_posts)
+        replies = rng.poisson(1, size=num_posts)
+
+    fecha = _FECHA_REFERENCIA
+    posts = []
+    for i in range(num_posts):
+        fecha -= timedelta(minutes=float(intervalos[i]))
+        posts.append({
+            'uri': f"at://{did}/app.bsky.feed.post/{i}",
+            'cid': f"bafy{did[-8:]}{i}",
+            'text': textos[i],
+            'createdAt': _iso(fecha),
+            'likeCount': int(likes[i]),
+            'replyCount': int(replies[i]),
+            'repostCount': 0,
+        })
+    return posts
+
+
+def generar_usuarios(num_usuarios, posts_min=25, posts_max=1000, proporcion_bots=0.3, semilla=42):
+    """
+    Genera usuarios sintéticos de forma perezosa
+
+    Args:
+        num_usuarios: Número de usuarios (1k - 1M)
+        posts_min: Mínimo de posts por usuario
+        posts_max: Máximo de posts por usuario
+        proporcion_bots: Fracción de usuarios con rasgos de bot
+        semilla: Semilla para que la secuencia sea reproducible
+
+    Yields:
+        Tupla (profile, posts)
+    """
+    rng = np.random.default_rng(semilla)
+    for indice in range(num_usuarios):
+        es_bot = bool(rng.random() < proporcion_bots)
+        perfil = generar_perfil(rng, indice, es_bot)
+        num_posts = int(rng.integers(posts_min, posts_max + 1))
+        yield perfil, generar_posts(rng, perfil, num_posts, es_bot)
+
+
+def escribir_almacen(directorio, num_usuarios, **kwargs):
+    """
+    Escribe profiles_to_scan.json y posts_usuarios.json sintéticos sin tenerlos en memoria
+
+    Args:
+        directorio: Carpeta de salida
+        num_usuarios: Número de usuarios
+        **kwargs: Parámetros de `generar_usuarios`
+
+    Returns:
+        Tupla (ruta_profiles, ruta_posts)
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta_profiles = directorio / 'profiles_to_scan.json'
+    ruta_posts = directorio / 'posts_usuarios.json'
+
+    with open(ruta_profiles, 'w', encoding='utf-8') as f_profiles, \
+         open(ruta_posts, 'w', encoding='utf-8') as f_posts:
+        f_profiles.write('[')
+        f_posts.write('{')
+        for i, (perfil, posts) in enumerate(generar_usuarios(num_usuarios, **kwargs)):
+            separador = ',\n' if i else '\n'
+            f_profiles.write(separador + json.dumps(perfil, ensure_ascii=False))
+            entrada = {'profile': perfil, 'posts': posts}
+            f_posts.write(separador + json.dumps(perfil['did']) + ': ' + json.dumps(entrada, ensure_ascii=False))
+        f_profiles.write('\n]')
+        f_posts.write('\n}')
+
+    return ruta_profiles, ruta_posts
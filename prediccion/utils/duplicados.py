@@ -0,0 +1,268 @@
+"""
+Módulo para detectar posts casi idénticos publicados desde cuentas distintas
+
+Las redes de bots coordinadas suelen publicar el mismo texto desde muchas
+cuentas. `post_similarity_avg` solo compara posts de un mismo usuario; este
+índice MinHash-LSH agrupa textos casi iguales de todo el almacén en tiempo
+casi lineal y se actualiza de forma incremental al añadir posts nuevos.
+"""
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from prediccion.utils.feature_extraction import FEATURES_DUPLICADOS
+from seguridad.secure_model_handler import SecureModelHandler
+
+_PRIMO = np.uint64(4294967311)  # Primo > 2^32 para el hashing universal
+_MASCARA_32 = np.uint64(0xFFFFFFFF)
+
+
+def _normalizar(texto):
+    """Minúsculas y solo palabras (ignora puntuación y espacios repetidos)"""
+    return re.findall(r'\w+', (texto or '').lower())
+
+
+def _shingles(texto, tamano):
+    """Hashes de los n-gramas de palabras del texto (vacío si no hay palabras)"""
+    palabras = _normalizar(texto)
+    if not palabras:
+        return np.empty(0, dtype=np.uint64)
+    if len(palabras) <= tamano:
+        grams = {' '.join(palabras)}
+    else:
+        grams = {' '.join(palabras[i:i + tamano]) for i in range(len(palabras) - tamano + 1)}
+    # crc32 es determinista entre procesos (hash() de Python no lo es)
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class IndiceDuplicados:
+    """
+    Índice MinHash-LSH incremental sobre los posts de todas las cuentas.
+
+    Cada post se resume en una firma MinHash; la firma se divide en bandas y
+    dos posts son candidatos si coinciden en alguna banda. Los candidatos cuya
+    similitud estimada supera `umbral` se unen en el mismo cluster (union-find).
+    """
+
+    def __init__(self, num_permutaciones=64, bandas=16, umbral=0.8, tamano_shingle=3, semilla=42):
+        """
+        Args:
+            num_permutaciones: Longitud de la firma MinHash
+            bandas: Número de bandas LSH (debe dividir a num_permutaciones)
+            umbral: Jaccard estimado mínimo para considerar dos posts duplicados
+            tamano_shingle: Palabras por n-grama
+            semilla: Semilla de las funciones hash (fija para que el índice sea reproducible)
+        """
+        if num_permutaciones % bandas != 0:
+            raise ValueError("num_permutaciones debe ser múltiplo de bandas")
+        self.num_permutaciones = num_permutaciones
+        self.bandas = bandas
+        self.filas_por_banda = num_permutaciones // bandas
+        self.umbral = umbral
+        self.tamano_shingle = tamano_shingle
+
+        rng = np.random.default_rng(semilla)
+        # a < 2^31 y x < 2^32 garantizan que a*x + b no desborda uint64
+        self._a = rng.integers(1, 1 << 31, size=(num_permutaciones, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=(num_permutaciones, 1), dtype=np.uint64)
+
+        self.firmas = []       # id de post -> firma (uint32)
+        self.did_de_post = []  # id de post -> DID
+        self.padre = []        # union-find
+        self.dids_cluster = {}  # raíz -> set de DIDs del cluster
+        self.posts_por_did = {}
+        self.claves_vistas = set()
+        self.cubetas = {}      # (banda, bytes de la banda) -> ids representantes
+
+    def __len__(self):
+        return len(self.firmas)
+
+    # ── UNION-FIND ──
+
+    def _raiz(self, i):
+        padre = self.padre
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    def _unir(self, i, j):
+        ri, rj = self._raiz(i), self._raiz(j)
+        if ri == rj:
+            return ri
+        # Unión por tamaño del set de DIDs (se fusiona el menor en el mayor)
+        if len(self.dids_cluster[ri]) < len(self.dids_cluster[rj]):
+            ri, rj = rj, ri
+        self.padre[rj] = ri
+        self.dids_cluster[ri] |= self.dids_cluster.pop(rj)
+        return ri
+
+    def _raiz_lectura(self, i):
+        """Como _raiz pero sin compresión de caminos: las consultas no escriben en el índice"""
+        padre = self.padre
+        while padre[i] != i:
+            i = padre[i]
+        return i
+
+    # ── INSERCIÓN ──
+
+    def firma(self, texto):
+        """Firma MinHash de un texto, o None si no tiene palabras"""
+        shingles = _shingles(texto, self.tamano_shingle)
+        if shingles.size == 0:
+            return None
+        hashes = (self._a * shingles[None, :] + self._b) % _PRIMO
+        return (hashes.min(axis=1) & _MASCARA_32).astype(np.uint32)
+
+    def agregar_posts(self, did, posts):
+        """
+        Añade los posts de un usuario al índice (los ya indexados se ignoran)
+
+        Args:
+            did: DID del autor
+            posts: Lista de posts con 'text' (y opcionalmente 'uri'/'cid')
+
+        Returns:
+            int: Número de posts nuevos indexados
+        """
+        nuevos = 0
+        for post in posts or []:
+            clave = post.get('uri') or post.get('cid') or (did, post.get('createdAt'), post.get('text'))
+            if clave in self.claves_vistas:
+                continue
+            self.claves_vistas.add(clave)
+            firma = self.firma(post.get('text', ''))
+            if firma is None:
+                continue
+            self._insertar(did, firma)
+            nuevos += 1
+        return nuevos
+
+    def _insertar(self, did, firma):
+        pid = len(self.firmas)
+        self.firmas.append(firma)
+        self.did_de_post.append(did)
+        self.padre.append(pid)
+        self.dids_cluster[pid] = {did}
+        self.posts_por_did.setdefault(did, []).append(pid)
+
+        r = self.filas_por_banda
+        for banda in range(self.bandas):
+            clave = (banda, firma[banda * r:(banda + 1) * r].tobytes())
+            cubeta = self.cubetas.get(clave)
+            if cubeta is None:
+                self.cubetas[clave] = [pid]
+                continue
+            unido = False
+            for candidato in cubeta:
+                if self._raiz(candidato) == self._raiz(pid):
+                    unido = True
+                    continue
+                similitud = np.count_nonzero(self.firmas[candidato] == firma) / self.num_permutaciones
+                if similitud >= self.umbral:
+                    self._unir(candidato, pid)
+                    unido = True
+            # Solo se guarda un representante por cluster en cada cubeta, así
+            # miles de copias del mismo texto no hacen crecer la cubeta
+            if not unido:
+                cubeta.append(pid)
+
+    # ── CONSULTAS ──
+
+    def features_usuario(self, did):
+        """
+        Features de duplicados entre cuentas para un usuario
+
+        Returns:
+            Dict con:
+              - cross_dup_ratio: fracción de sus posts en clusters con >= 2 cuentas
+              - cross_dup_cluster_size: máximo nº de cuentas distintas en esos clusters
+        """
+        posts = self.posts_por_did.get(did)
+        if not posts:
+            return dict.fromkeys(FEATURES_DUPLICADOS, 0)
+        en_cluster = 0
+        maximo = 0
+        for pid in posts:
+            cuentas = len(self.dids_cluster[self._raiz_lectura(pid)])
+            if cuentas >= 2:
+                en_cluster += 1
+                maximo = max(maximo, cuentas)
+        return {'cross_dup_ratio': en_cluster / len(posts), 'cross_dup_cluster_size': maximo}
+
+    def features_candidato(self, did, posts):
+        """
+        Features de duplicados de un usuario sin modificar el índice
+
+        Para servir predicciones: el resultado no depende de qué otras cuentas
+        se consultaron antes y el índice (compartido entre hilos, o entre
+        workers tras un fork) no crece ni se escribe. Si el DID ya está
+        indexado se usan sus features guardadas; si no, cada post se compara
+        con los clusters a los que se uniría al insertarlo.
+
+        Args:
+            did: DID del usuario
+            posts: Lista de posts con 'text'
+
+        Returns:
+            Dict con cross_dup_ratio y cross_dup_cluster_size (ver features_usuario)
+        """
+        if did in self.posts_por_did:
+            return self.features_usuario(did)
+        r = self.filas_por_banda
+        con_firma = en_cluster = maximo = 0
+        for post in posts or []:
+            firma = self.firma(post.get('text', ''))
+            if firma is None:
+                continue
+            con_firma += 1
+            raices = set()
+            for banda in range(self.bandas):
+                for candidato in self.cubetas.get((banda, firma[banda * r:(banda + 1) * r].tobytes()), ()):
+                    similitud = np.count_nonzero(self.firmas[candidato] == firma) / self.num_permutaciones
+                    if similitud >= self.umbral:
+                        raices.add(self._raiz_lectura(candidato))
+            cuentas = len({did}.union(*(self.dids_cluster[raiz] for raiz in raices)))
+            if cuentas >= 2:
+                en_cluster += 1
+                maximo = max(maximo, cuentas)
+        if not con_firma:
+            return dict.fromkeys(FEATURES_DUPLICADOS, 0)
+        return {'cross_dup_ratio': en_cluster / con_firma, 'cross_dup_cluster_size': maximo}
+
+    def clusters(self, min_cuentas=2):
+        """Devuelve los clusters con al menos `min_cuentas` DIDs distintos (raíz -> set de DIDs)"""
+        return {raiz: dids for raiz, dids in self.dids_cluster.items() if len(dids) >= min_cuentas}
+
+    # ── PERSISTENCIA ──
+
+    def guardar(self, ruta):
+        """Guarda el índice con checksum de integridad"""
+        ruta = Path(ruta)
+        return SecureModelHandler(ruta.parent).guardar_modelo(self, ruta.name, permisos=0o600)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Carga un índice guardado verificando su checksum"""
+        ruta = Path(ruta)
+        return SecureModelHandler(ruta.parent).cargar_modelo(ruta.name, verificar_integridad=True)
+
+    @classmethod
+    def cargar_o_crear(cls, config, ruta):
+        """Carga el índice de `ruta` si existe; si no, crea uno vacío con los parámetros de config.yaml"""
+        if Path(ruta).exists():
+            return cls.cargar(ruta)
+        return cls.desde_config(config)
+
+    @classmethod
+    def desde_config(cls, config):
+        """Crea un índice vacío con los parámetros de la sección `duplicados`"""
+        cfg = config.get('duplicados') or {}
+        return cls(
+            num_permutaciones=cfg.get('num_permutaciones', 64),
+            bandas=cfg.get('bandas', 16),
+            umbral=cfg.get('umbral_jaccard', 0.8),
+            tamano_shingle=cfg.get('tamano_shingle', 3),
+        )
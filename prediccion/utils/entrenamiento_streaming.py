@@ -0,0 +1,214 @@
+"""
+Módulo para entrenar XGBoost sin cargar el dataset etiquetado en memoria
+
+El dataset (CSV o Parquet) se recorre por bloques:
+  1. Primera pasada: StandardScaler.partial_fit con las filas de entrenamiento.
+  2. XGBoost consume los bloques ya escalados a través de un `xgb.DataIter` y
+     construye un QuantileDMatrix (histogramas cuantizados, ~1 byte por valor)
+     o, con `external_memory`, un DMatrix paginado en disco.
+
+La división entrenamiento/prueba se decide con un hash del DID, de modo que
+cada fila cae siempre en el mismo lado en todas las pasadas sin guardar índices.
+"""
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+from prediccion.utils.datasets import COLUMNAS_NO_FEATURES, columnas_dataset, es_parquet, tipar_dataset
+
+
+def leer_bloques(ruta, columnas=None, tamano_bloque=100_000):
+    """
+    Recorre un dataset CSV o Parquet en DataFrames de `tamano_bloque` filas
+
+    Args:
+        ruta: Archivo .csv o .parquet
+        columnas: Columnas a leer (por defecto todas)
+        tamano_bloque: Filas por bloque
+    """
+    ruta = Path(ruta)
+    if es_parquet(ruta):
+        import pyarrow.parquet as pq
+        # Spark escribe un directorio de part-files; pyarrow lo lee como dataset
+        if ruta.is_dir():
+            import pyarrow.dataset as ds
+            for lote in ds.dataset(ruta, format='parquet').to_batches(columns=columnas, batch_size=tamano_bloque):
+                yield lote.to_pandas()
+            return
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque, columns=columnas):
+            yield lote.to_pandas()
+    else:
+        for df in pd.read_csv(ruta, usecols=columnas, chunksize=tamano_bloque, dtype={'did': str}):
+            yield tipar_dataset(df)
+
+
+def mascara_test(dids, test_size, semilla=42):
+    """
+    True para las filas que van al conjunto de prueba
+
+    Hash crc32 de "semilla:did" normalizado a [0, 1): determinista entre
+    pasadas y procesos. La proporción de prueba es ~test_size (no estratificada).
+    """
+    prefijo = f"{semilla}:"
+    return np.fromiter(
+        (zlib.crc32((prefijo + str(did)).encode('utf-8')) / 2**32 < test_size for did in dids),
+        dtype=bool, count=len(dids),
+    )
+
+
+class IteradorBloques(xgb.DataIter):
+    """Entrega a XGBoost los bloques escalados de un lado de la división"""
+
+    def __init__(self, ruta, feature_cols, scaler, test_size, semilla, prueba=False,
+                 tamano_bloque=100_000, cache_prefix=None):
+        """
+        Args:
+            ruta: Dataset CSV o Parquet
+            feature_cols: Columnas de features (orden del modelo)
+            scaler: StandardScaler ya ajustado
+            test_size: Fracción de prueba de mascara_test
+            semilla: Semilla de mascara_test
+            prueba: Si True entrega las filas de prueba; si no, las de entrenamiento
+            tamano_bloque: Filas leídas por bloque
+            cache_prefix: Prefijo de las páginas en disco (modo external memory)
+        """
+        self.ruta = ruta
+        self.feature_cols = feature_cols
+        self.scaler = scaler
+        self.test_size = test_size
+        self.semilla = semilla
+        self.prueba = prueba
+        self.tamano_bloque = tamano_bloque
+        self._bloques = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _siguiente_bloque(self):
+        for df in self._bloques:
+            mascara = mascara_test(df['did'], self.test_size, self.semilla)
+            if not self.prueba:
+                mascara = ~mascara
+            if mascara.any():
+                df = df[mascara]
+                X = self.scaler.transform(df[self.feature_cols].astype(np.float64))
+                return X.astype(np.float32), df['label'].to_numpy()
+        return None
+
+    def next(self, input_data):
+        if self._bloques is None:
+            self.reset()
+        bloque = self._siguiente_bloque()
+        if bloque is None:
+            return False
+        X, y = bloque
+        input_data(data=X, label=y)
+        return True
+
+    def reset(self):
+        self._bloques = leer_bloques(
+            self.ruta, columnas=['did', 'label'] + self.feature_cols, tamano_bloque=self.tamano_bloque
+        )
+
+
+def ajustar_scaler(ruta, feature_cols, test_size, semilla, tamano_bloque=100_000):
+    """
+    Primera pasada: ajusta el StandardScaler con las filas de entrenamiento
+
+    Returns:
+        Tupla (scaler, conteos) con conteos {'train': {0: n, 1: n}, 'test': {...}}
+    """
+    scaler = StandardScaler()
+    conteos = {'train': {0: 0, 1: 0}, 'test': {0: 0, 1: 0}}
+    for df in leer_bloques(ruta, columnas=['did', 'label'] + feature_cols, tamano_bloque=tamano_bloque):
+        prueba = mascara_test(df['did'], test_size, semilla)
+        for lado, mascara in (('train', ~prueba), ('test', prueba)):
+            etiquetas = df['label'].to_numpy()[mascara]
+            conteos[lado][0] += int((etiquetas == 0).sum())
+            conteos[lado][1] += int((etiquetas == 1).sum())
+        if (~prueba).any():
+            # Con DataFrame el scaler guarda feature_names_in_, igual que en el modo en memoria
+            scaler.partial_fit(df.loc[~prueba, feature_cols].astype(np.float64))
+    return scaler, conteos
+
+
+def parametros_booster(params_xgb, max_bin=256):
+    """
+    Traduce los parámetros de XGBClassifier (config.yaml) a xgb.train
+
+    Returns:
+        Tupla (params, num_boost_round)
+    """
+    params = dict(params_xgb)
+    num_boost_round = params.pop('n_estimators', 100)
+    if 'random_state' in params:
+        params['seed'] = params.pop('random_state')
+    params.setdefault('objective', 'binary:logistic')
+    params.setdefault('eval_metric', 'logloss')
+    params['tree_method'] = 'hist'
+    params['max_bin'] = max_bin
+    return params, num_boost_round
+
+
+def booster_a_clasificador(booster):
+    """Envuelve un Booster en XGBClassifier (lo que esperan 3_predecir.py y la web)"""
+    model = xgb.XGBClassifier()
+    model.load_model(booster.save_raw('json'))
+    return model
+
+
+def entrenar_streaming(ruta, params_xgb, test_size=0.2, semilla=42, tamano_bloque=100_000,
+                       max_bin=256, external_memory=False, cache_dir=None):
+    """
+    Entrena XGBoost recorriendo el dataset por bloques
+
+    Args:
+        ruta: Dataset etiquetado (CSV o Parquet)
+        params_xgb: Sección modelo.xgboost de config.yaml
+        test_size: Fracción de prueba (por hash del DID)
+        semilla: Semilla de la división
+        tamano_bloque: Filas por bloque (acota el pico de memoria de lectura)
+        max_bin: Bins de los histogramas de XGBoost
+        external_memory: Si True, las páginas del DMatrix se guardan en `cache_dir`
+        cache_dir: Carpeta de las páginas de external memory
+
+    Returns:
+        Dict con 'model' (XGBClassifier), 'scaler', 'feature_cols', 'conteos',
+        'y_test' e 'y_pred_proba' (predicciones del conjunto de prueba)
+    """
+    feature_cols = [c for c in columnas_dataset(ruta) if c not in COLUMNAS_NO_FEATURES]
+    scaler, conteos = ajustar_scaler(ruta, feature_cols, test_size, semilla, tamano_bloque)
+
+    comunes = dict(test_size=test_size, semilla=semilla, tamano_bloque=tamano_bloque)
+    if external_memory:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        it_train = IteradorBloques(ruta, feature_cols, scaler, cache_prefix=str(cache_dir / 'train'), **comunes)
+        dtrain = xgb.DMatrix(it_train)
+    else:
+        it_train = IteradorBloques(ruta, feature_cols, scaler, **comunes)
+        dtrain = xgb.QuantileDMatrix(it_train, max_bin=max_bin)
+
+    params, num_boost_round = parametros_booster(params_xgb, max_bin=max_bin)
+    booster = xgb.train(params, dtrain, num_boost_round=num_boost_round)
+    del dtrain
+
+    # Predicciones del conjunto de prueba bloque a bloque (solo se guardan etiquetas y probabilidades)
+    it_test = IteradorBloques(ruta, feature_cols, scaler, prueba=True, **comunes)
+    it_test.reset()
+    y_test, y_pred_proba = [], []
+    while (bloque := it_test._siguiente_bloque()) is not None:
+        X, y = bloque
+        y_test.append(y)
+        y_pred_proba.append(booster.predict(xgb.DMatrix(X)))
+
+    return {
+        'model': booster_a_clasificador(booster),
+        'scaler': scaler,
+        'feature_cols': feature_cols,
+        'conteos': conteos,
+        'y_test': np.concatenate(y_test) if y_test else np.empty(0, dtype=np.int64),
+        'y_pred_proba': np.concatenate(y_pred_proba) if y_pred_proba else np.empty(0),
+    }
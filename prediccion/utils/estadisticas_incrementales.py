@@ -0,0 +1,226 @@
+"""
+Módulo con acumuladores por usuario para actualizar features de posts en O(1)
+
+En lugar de recalcular `avg_post_length`, `std_post_length`, `post_interval_std`,
+`avg_engagement`... sobre la lista completa de posts cada vez que llega uno
+nuevo, se guarda un resumen compacto (contadores, medias y varianzas de Welford,
+último timestamp) junto a los posts del usuario en posts_usuarios.json.
+
+Con `limite` (posts.posts_por_usuario_limite), `posts` es una ventana con los
+últimos `limite` posts, la misma que puntúa la web al descargar el feed, y las
+estadísticas describen esa ventana: al salir posts de ella se recalculan desde
+la ventana (coste acotado por el límite, no por el historial).
+"""
+import math
+from datetime import timezone
+
+from prediccion.utils.feature_extraction import parsear_fecha
+
+# Features que se pueden obtener directamente del acumulador
+FEATURES_INCREMENTALES = [
+    'avg_post_length',
+    'std_post_length',
+    'post_interval_std',
+    'night_posts_ratio',
+    'repost_ratio',
+    'url_ratio',
+    'avg_engagement',
+]
+
+# Claves (uri/cid) de los últimos posts que se recuerdan para descartar los ya
+# vistos sin recorrer el historial. Es un mínimo: actualizar_entrada recuerda al
+# menos `limite` claves, los posts que devuelve cada descarga
+MAX_RECIENTES = 200
+
+
+def clave_post(post):
+    """Identificador de un post (uri o cid), o None si no tiene"""
+    return post.get('uri') or post.get('cid')
+
+
+def _epoch(fecha_str):
+    """(segundos desde epoch, hora) de una fecha de Bluesky (UTC si no trae zona), o None"""
+    ts = parsear_fecha(fecha_str)
+    if ts is None:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp(), ts.hour
+
+
+class EstadisticasUsuario:
+    """Acumulador de estadísticas de posts de un usuario (actualización O(1))"""
+
+    __slots__ = (
+        'n', 'media_longitud', 'm2_longitud', 'suma_engagement',
+        'cortos', 'con_url', 'nocturnos',
+        'ultimo_ts', 'n_intervalos', 'media_intervalo', 'm2_intervalo',
+        'desordenados', 'recientes',
+    )
+
+    def __init__(self):
+        self.n = 0
+        self.media_longitud = 0.0
+        self.m2_longitud = 0.0
+        self.suma_engagement = 0
+        self.cortos = 0       # Posts con < 10 caracteres (reposts)
+        self.con_url = 0
+        self.nocturnos = 0    # Posts entre 00:00 y 06:00
+        self.ultimo_ts = None  # Epoch (segundos) del post más reciente
+        self.n_intervalos = 0
+        self.media_intervalo = 0.0  # En minutos
+        self.m2_intervalo = 0.0
+        self.desordenados = 0  # Posts más antiguos que ultimo_ts (sin intervalo)
+        self.recientes = []    # Claves de los últimos MAX_RECIENTES posts (más antiguo primero)
+
+    def actualizar(self, post, max_recientes=MAX_RECIENTES):
+        """
+        Incorpora un post nuevo
+
+        Los posts deben llegar en orden cronológico para que los intervalos
+        sean exactos; un post anterior al último se cuenta en el resto de
+        estadísticas pero no genera intervalo (se registra en `desordenados`).
+
+        Args:
+            post: Post con 'text' y opcionalmente 'createdAt', 'uri'/'cid'...
+            max_recientes: Claves de posts que se recuerdan en `recientes`
+        """
+        clave = clave_post(post)
+        if clave is not None:
+            self.recientes.append(clave)
+            if len(self.recientes) > max_recientes:
+                del self.recientes[:len(self.recientes) - max_recientes]
+
+        texto = post.get('text', '') or ''
+        longitud = len(texto)
+
+        # Welford para la longitud
+        self.n += 1
+        delta = longitud - self.media_longitud
+        self.media_longitud += delta / self.n
+        self.m2_longitud += delta * (longitud - self.media_longitud)
+
+        self.suma_engagement += (post.get('likeCount', 0) or 0) + (post.get('replyCount', 0) or 0)
+        if longitud < 10:
+            self.cortos += 1
+        if 'http' in texto.lower():
+            self.con_url += 1
+
+        fecha = _epoch(post.get('createdAt')) if 'createdAt' in post else None
+        if fecha is None:
+            return
+        ts, hora = fecha
+        if hora < 6:
+            self.nocturnos += 1
+
+        if self.ultimo_ts is None:
+            self.ultimo_ts = ts
+        elif ts >= self.ultimo_ts:
+            # Welford para los intervalos entre posts consecutivos (minutos)
+            intervalo = (ts - self.ultimo_ts) / 60
+            self.ultimo_ts = ts
+            self.n_intervalos += 1
+            delta = intervalo - self.media_intervalo
+            self.media_intervalo += delta / self.n_intervalos
+            self.m2_intervalo += delta * (intervalo - self.media_intervalo)
+        else:
+            self.desordenados += 1
+
+    def features(self):
+        """Devuelve las features de FEATURES_INCREMENTALES (mismas definiciones que FeatureExtractor)"""
+        if self.n == 0:
+            return dict.fromkeys(FEATURES_INCREMENTALES, 0)
+        return {
+            'avg_post_length': self.media_longitud,
+            'std_post_length': math.sqrt(self.m2_longitud / self.n) if self.n > 1 else 0,
+            'post_interval_std': math.sqrt(self.m2_intervalo / self.n_intervalos) if self.n_intervalos else 0,
+            'night_posts_ratio': self.nocturnos / self.n,
+            'repost_ratio': self.cortos / self.n,
+            'url_ratio': self.con_url / self.n,
+            'avg_engagement': self.suma_engagement / self.n,
+        }
+
+    def a_dict(self):
+        """Representación serializable a JSON"""
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Reconstruye el acumulador desde `a_dict()`"""
+        estadisticas = cls()
+        for campo in cls.__slots__:
+            if campo in datos:
+                setattr(estadisticas, campo, datos[campo])
+        estadisticas.recientes = list(estadisticas.recientes)
+        return estadisticas
+
+    @classmethod
+    def desde_posts(cls, posts):
+        """Construye el acumulador a partir de un historial completo de posts"""
+        estadisticas = cls()
+        for post in ordenar_cronologicamente(posts):
+            estadisticas.actualizar(post)
+        return estadisticas
+
+
+def ordenar_cronologicamente(posts):
+    """Ordena posts del más antiguo al más reciente (los que no tienen fecha al principio)"""
+    def clave(post):
+        fecha = _epoch(post.get('createdAt'))
+        return fecha[0] if fecha else float('-inf')
+    return sorted(posts or [], key=clave)
+
+
+def actualizar_entrada(entrada, posts_nuevos, limite=None):
+    """
+    Añade posts nuevos a una entrada de posts_usuarios.json y actualiza sus estadísticas
+
+    Args:
+        entrada: Dict {'profile', 'posts', 'estadisticas'?} (se modifica in situ)
+        posts_nuevos: Posts descargados (los que están entre los últimos
+            max(MAX_RECIENTES, limite) vistos, por uri/cid, se ignoran)
+        limite: Posts que se conservan (los más recientes); None guarda todo el historial
+
+    Returns:
+        La misma entrada, con 'posts' y 'estadisticas' actualizados
+
+    Raises:
+        ValueError: Si limite no es un entero positivo
+    """
+    if limite is not None and (not isinstance(limite, int) or limite < 1):
+        raise ValueError(f"limite debe ser un entero positivo o None, no {limite!r}")
+    max_recientes = max(MAX_RECIENTES, limite or 0)
+    posts = entrada.setdefault('posts', [])
+    if 'estadisticas' in entrada:
+        estadisticas = EstadisticasUsuario.desde_dict(entrada['estadisticas'])
+        if 'recientes' not in entrada['estadisticas']:
+            # Acumuladores anteriores a `recientes`: se toman una vez del historial
+            claves = (clave_post(p) for p in ordenar_cronologicamente(posts))
+            estadisticas.recientes = [c for c in claves if c is not None][-max_recientes:]
+    else:
+        # Entradas antiguas sin acumulador: se construye una vez desde el historial
+        estadisticas = EstadisticasUsuario.desde_posts(posts)
+
+    # Solo se comparan las claves recientes (el feed devuelve los últimos posts),
+    # así el coste no crece con el historial
+    vistos = set(estadisticas.recientes)
+    for post in ordenar_cronologicamente(posts_nuevos):
+        clave = clave_post(post)
+        if clave is not None:
+            if clave in vistos:
+                continue
+            vistos.add(clave)
+        posts.append(post)
+        estadisticas.actualizar(post, max_recientes)
+
+    if limite is not None and len(posts) > limite:
+        # Ventana de los últimos `limite` posts: las estadísticas se recalculan
+        # sobre ella y `recientes` sigue recordando también los que salieron
+        ventana = ordenar_cronologicamente(posts)[-limite:]
+        recientes = estadisticas.recientes
+        estadisticas = EstadisticasUsuario.desde_posts(ventana)
+        estadisticas.recientes = recientes
+        entrada['posts'] = ventana
+
+    entrada['estadisticas'] = estadisticas.a_dict()
+    return entrada
@@ -1,207 +1,445 @@
 """
 Módulo para extraer características de perfiles y posts de Bluesky
+
+Las características se declaran en un registro: cada una indica qué entradas
+o intermedios necesita (`requiere`). El extractor resuelve el plan mínimo para
+las features pedidas, de modo que una feature costosa no penaliza a los modelos
+que no la usan, y los intermedios compartidos (timestamps parseados, textos,
+palabras...) se calculan una sola vez por perfil.
 """
 import numpy as np
 import re
-from datetime import datetime
-from collections import Counter
+from datetime import datetime, timezone
+
+# Entradas disponibles para cualquier definición del registro
+ENTRADAS = ('profile', 'posts', 'indice_duplicados')
+
+# Features por defecto, en el orden histórico del dataset
+FEATURES_PERFIL = [
+    'account_age_days',
+    'followers_count',
+    'following_count',
+    'posts_count',
+    'followers_ratio',
+    'has_avatar',
+    'bio_length',
+    'display_name_length',
+    'handle_has_many_numbers',
+    'posts_per_day',
+]
+FEATURES_COMPORTAMIENTO = [
+    'avg_post_length',
+    'std_post_length',
+    'post_interval_std',
+    'night_posts_ratio',
+    'repost_ratio',
+    'url_ratio',
+    'avg_engagement',
+    'vocabulary_diversity',
+    'post_similarity_avg',
+]
+FEATURES_BASE = FEATURES_PERFIL + FEATURES_COMPORTAMIENTO
+
+# Features entre cuentas (opcionales, requieren un IndiceDuplicados)
+FEATURES_DUPLICADOS = ['cross_dup_ratio', 'cross_dup_cluster_size']
+
+
+class _Definicion:
+    """Entrada del registro: feature o intermedio con sus dependencias"""
+
+    __slots__ = ('nombre', 'funcion', 'requiere', 'de_posts', 'defecto')
+
+    def __init__(self, nombre, funcion, requiere, de_posts, defecto):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.requiere = tuple(requiere)
+        self.de_posts = de_posts
+        self.defecto = defecto
+
+
+_REGISTRO = {}
+
+
+def registrar(nombre, requiere=(), de_posts=False, defecto=0):
+    """
+    Decorador para registrar una feature o intermedio
+
+    Args:
+        nombre: Nombre de la feature (columna del dataset) o del intermedio
+        requiere: Entradas ('profile', 'posts') o nombres registrados de los que
+            depende; sus valores se pasan a la función en el mismo orden
+        de_posts: Si True, vale `defecto` cuando el usuario no tiene posts
+        defecto: Valor usado cuando de_posts=True y no hay posts
+    """
+    def decorador(funcion):
+        _REGISTRO[nombre] = _Definicion(nombre, funcion, requiere, de_posts, defecto)
+        return funcion
+    return decorador
+
+
+def features_registradas():
+    """Devuelve los nombres de todas las definiciones registradas"""
+    return list(_REGISTRO)
+
+
+def resolver_plan(nombres, conocidos=()):
+    """
+    Calcula el orden de evaluación mínimo para obtener las features pedidas
+
+    Args:
+        nombres: Features pedidas
+        conocidos: Nombres cuyo valor ya se tiene (no se evalúan ni sus dependencias)
+
+    Returns:
+        list: Nombres a evaluar (dependencias antes que dependientes)
+
+    Raises:
+        ValueError: Si se pide algo no registrado o hay un ciclo
+    """
+    plan = []
+    visitados = set()
+
+    def visitar(nombre, pila):
+        if nombre in ENTRADAS or nombre in visitados or nombre in conocidos:
+            return
+        if nombre in pila:
+            raise ValueError(f"Dependencia circular en el registro de features: {nombre}")
+        definicion = _REGISTRO.get(nombre)
+        if definicion is None:
+            raise ValueError(f"Feature desconocida: '{nombre}'")
+        for dependencia in definicion.requiere:
+            visitar(dependencia, pila | {nombre})
+        visitados.add(nombre)
+        plan.append(nombre)
+
+    for nombre in nombres:
+        visitar(nombre, frozenset())
+    return plan
+
+
+# ── FUNCIONES AUXILIARES ──
+
+def parsear_fecha(date_str):
+    """Parsea una fecha de Bluesky a datetime"""
+    if not date_str:
+        return None
+    try:
+        # Formato ISO 8601
+        if 'T' in date_str:
+            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        else:
+            return datetime.strptime(date_str, '%Y-%m-%d')
+    except:
+        return None
+
+
+def tiene_muchos_numeros(handle):
+    """Detecta si el handle tiene muchos números (>= 5 dígitos consecutivos)"""
+    if not handle:
+        return 0
+    # Buscar secuencias de 5+ dígitos
+    if re.search(r'\d{5,}', handle):
+        return 1
+    return 0
+
+
+def similitud_media(texts):
+    """Calcula similitud promedio entre textos (Jaccard simplificado)"""
+    if len(texts) < 2:
+        return 0
+
+    similarities = []
+    for i in range(len(texts)):
+        for j in range(i+1, len(texts)):
+            words1 = set(texts[i].lower().split())
+            words2 = set(texts[j].lower().split())
+
+            if len(words1 | words2) > 0:
+                sim = len(words1 & words2) / len(words1 | words2)
+                similarities.append(sim)
+
+    return np.mean(similarities) if similarities else 0
+
+
+# ── CARACTERÍSTICAS DE PERFIL ──
+
+@registrar('fecha_creacion', requiere=('profile',), defecto=None)
+def _fecha_creacion(profile):
+    if 'created_at' in profile and profile['created_at']:
+        created = parsear_fecha(profile['created_at'])
+        # Si created no tiene timezone, asumirlo como UTC
+        if created and created.tzinfo is None:
+            created = created.replace(tzinfo=timezone.utc)
+        return created
+    return None
+
+
+@registrar('account_age_days', requiere=('fecha_creacion',))
+def _account_age_days(created):
+    # Edad de la cuenta (días desde creación)
+    if created:
+        return (datetime.now(timezone.utc) - created).days
+    return 0
+
+
+@registrar('followers_count', requiere=('profile',))
+def _followers_count(profile):
+    return profile.get('followers_count', 0) or 0
+
+
+@registrar('following_count', requiere=('profile',))
+def _following_count(profile):
+    return profile.get('follows_count', 0) or 0
+
+
+@registrar('posts_count', requiere=('profile',))
+def _posts_count(profile):
+    return profile.get('posts_count', 0) or 0
+
+
+@registrar('followers_ratio', requiere=('followers_count', 'following_count'))
+def _followers_ratio(followers, following):
+    if following > 0:
+        return followers / following
+    return followers
+
+
+@registrar('has_avatar', requiere=('profile',))
+def _has_avatar(profile):
+    return 1 if profile.get('avatar') else 0
+
+
+@registrar('bio_length', requiere=('profile',))
+def _bio_length(profile):
+    return len(profile.get('description', '') or '')
+
+
+@registrar('display_name_length', requiere=('profile',))
+def _display_name_length(profile):
+    return len(profile.get('display_name', '') or '')
+
+
+@registrar('handle_has_many_numbers', requiere=('profile',))
+def _handle_has_many_numbers(profile):
+    return tiene_muchos_numeros(profile.get('handle', ''))
+
+
+@registrar('posts_per_day', requiere=('posts_count', 'account_age_days'))
+def _posts_per_day(posts_count, account_age):
+    if account_age > 0:
+        return posts_count / account_age
+    return 0
+
+
+# ── INTERMEDIOS DE POSTS (compartidos entre features) ──
+
+@registrar('textos', requiere=('posts',), de_posts=True, defecto=[])
+def _textos(posts):
+    return [post.get('text', '') for post in posts]
+
+
+@registrar('longitudes', requiere=('textos',), de_posts=True, defecto=[])
+def _longitudes(textos):
+    return [len(texto) for texto in textos]
+
+
+@registrar('timestamps', requiere=('posts',), de_posts=True, defecto=[])
+def _timestamps(posts):
+    timestamps = []
+    for post in posts:
+        if 'createdAt' in post:
+            ts = parsear_fecha(post['createdAt'])
+            if ts:
+                timestamps.append(ts)
+    timestamps.sort()
+    return timestamps
+
+
+@registrar('palabras', requiere=('textos',), de_posts=True, defecto=[])
+def _palabras(textos):
+    all_words = []
+    for text in textos:
+        all_words.extend(re.findall(r'\b\w+\b', text.lower()))
+    return all_words
+
+
+# ── CARACTERÍSTICAS DE POSTS ──
+
+@registrar('avg_post_length', requiere=('longitudes',), de_posts=True)
+def _avg_post_length(post_lengths):
+    return np.mean(post_lengths) if post_lengths else 0
+
+
+@registrar('std_post_length', requiere=('longitudes',), de_posts=True)
+def _std_post_length(post_lengths):
+    return np.std(post_lengths) if len(post_lengths) > 1 else 0
+
+
+@registrar('post_interval_std', requiere=('timestamps',), de_posts=True)
+def _post_interval_std(timestamps):
+    # Intervalos entre posts consecutivos, en minutos
+    if len(timestamps) > 1:
+        intervals = [(timestamps[i+1] - timestamps[i]).total_seconds() / 60
+                     for i in range(len(timestamps)-1)]
+        return np.std(intervals) if intervals else 0
+    return 0
+
+
+@registrar('night_posts_ratio', requiere=('timestamps', 'posts'), de_posts=True)
+def _night_posts_ratio(timestamps, posts):
+    # Posts nocturnos (00:00 - 06:00)
+    night_posts = sum(1 for ts in timestamps if ts.hour >= 0 and ts.hour < 6)
+    return night_posts / len(posts)
+
+
+@registrar('repost_ratio', requiere=('longitudes',), de_posts=True)
+def _repost_ratio(post_lengths):
+    # Ratio de reposts (posts sin texto original o muy cortos)
+    reposts = sum(1 for longitud in post_lengths if longitud < 10)
+    return reposts / len(post_lengths)
+
+
+@registrar('url_ratio', requiere=('textos',), de_posts=True)
+def _url_ratio(textos):
+    url_posts = sum(1 for texto in textos if 'http' in texto.lower())
+    return url_posts / len(textos)
+
+
+@registrar('avg_engagement', requiere=('posts',), de_posts=True)
+def _avg_engagement(posts):
+    engagements = [
+        (post.get('likeCount', 0) or 0) + (post.get('replyCount', 0) or 0)
+        for post in posts
+    ]
+    return np.mean(engagements) if engagements else 0
+
+
+@registrar('vocabulary_diversity', requiere=('palabras',), de_posts=True)
+def _vocabulary_diversity(all_words):
+    if all_words:
+        return len(set(all_words)) / len(all_words)
+    return 0
+
+
+@registrar('post_similarity_avg', requiere=('textos',), de_posts=True)
+def _post_similarity_avg(textos):
+    # Similitud promedio entre posts (basado en palabras compartidas)
+    return similitud_media(textos)
+
+
+def features_de_config(config):
+    """Lista de features de la sección `features` de config.yaml (o las base)"""
+    features = config.get('features') or {}
+    nombres = list(features.get('perfil', [])) + list(features.get('comportamiento', []))
+    nombres = nombres or list(FEATURES_BASE)
+    if (config.get('duplicados') or {}).get('habilitado'):
+        nombres += [f for f in FEATURES_DUPLICADOS if f not in nombres]
+    return nombres
+
+
+# ── CARACTERÍSTICAS ENTRE CUENTAS ──
+
+@registrar('duplicados_usuario', requiere=('profile', 'indice_duplicados'), defecto=None)
+def _duplicados_usuario(profile, indice):
+    if indice is None:
+        return dict.fromkeys(FEATURES_DUPLICADOS, 0)
+    return indice.features_usuario(profile.get('did'))
+
+
+@registrar('cross_dup_ratio', requiere=('duplicados_usuario',))
+def _cross_dup_ratio(duplicados):
+    return duplicados['cross_dup_ratio']
+
+
+@registrar('cross_dup_cluster_size', requiere=('duplicados_usuario',))
+def _cross_dup_cluster_size(duplicados):
+    return duplicados['cross_dup_cluster_size']
+
 
 class FeatureExtractor:
     """Extrae características de un perfil y sus posts para detección de bots"""
-    
-    def __init__(self):
-        pass
-    
-    def extract_profile_features(self, profile_data, posts_data=None):
+
+    def __init__(self, feature_names=None, indice_duplicados=None):
+        """
+        Args:
+            feature_names: Features a calcular, en el orden de salida. Por
+                defecto las 19 features base. Típicamente `feature_columns.pkl`
+                del modelo cargado o la lista `features` de config.yaml.
+            indice_duplicados: IndiceDuplicados para las features entre cuentas
+                (opcional; sin él valen 0)
+
+        Raises:
+            ValueError: Si alguna feature no está registrada
+        """
+        self.feature_names = list(feature_names) if feature_names is not None else list(FEATURES_BASE)
+        self.plan = resolver_plan(self.feature_names)
+        self.indice_duplicados = indice_duplicados
+        self._planes = {}
+
+    @classmethod
+    def desde_config(cls, config, adicionales=(), indice_duplicados=None):
+        """
+        Crea un extractor con las features listadas en config.yaml
+
+        Args:
+            config: Configuración de prediccion/config.yaml
+            adicionales: Features extra necesarias (ej: las que usan las heurísticas)
+            indice_duplicados: IndiceDuplicados para las features entre cuentas
+        """
+        nombres = features_de_config(config)
+        nombres += [f for f in adicionales if f not in nombres]
+        return cls(nombres, indice_duplicados=indice_duplicados)
+
+    def _plan_para(self, conocidos):
+        """Plan reducido cuando parte de las features ya viene precalculada"""
+        clave = frozenset(conocidos)
+        plan = self._planes.get(clave)
+        if plan is None:
+            plan = resolver_plan(self.feature_names, conocidos=clave)
+            self._planes[clave] = plan
+        return plan
+
+    def extract_profile_features(self, profile_data, posts_data=None, precalculadas=None):
         """
         Extrae características de un perfil de Bluesky
-        
+
         Args:
             profile_data: Dict con datos del perfil
             posts_data: List de posts (opcional)
-            
+            precalculadas: Dict de features ya conocidas (ej: las de un
+                EstadisticasUsuario); no se recalculan ni sus dependencias
+
         Returns:
             Dict con características calculadas
         """
-        features = {}
-        
-        # ── CARACTERÍSTICAS DE PERFIL ──
-        
-        # Edad de la cuenta (días desde creación)
-        if 'created_at' in profile_data and profile_data['created_at']:
-            created = self._parse_date(profile_data['created_at'])
-            if created:
-                # Usar datetime con timezone UTC
-                from datetime import timezone
-                now_utc = datetime.now(timezone.utc)
-                # Si created no tiene timezone, asumirlo como UTC
-                if created.tzinfo is None:
-                    from datetime import timezone
-                    created = created.replace(tzinfo=timezone.utc)
-                features['account_age_days'] = (now_utc - created).days
+        valores = {
+            'profile': profile_data,
+            'posts': posts_data or [],
+            'indice_duplicados': self.indice_duplicados,
+        }
+        hay_posts = bool(posts_data)
+        plan = self.plan
+        if precalculadas:
+            valores.update(precalculadas)
+            plan = self._plan_para(precalculadas.keys())
+
+        for nombre in plan:
+            definicion = _REGISTRO[nombre]
+            if definicion.de_posts and not hay_posts:
+                valores[nombre] = definicion.defecto
             else:
-                features['account_age_days'] = 0
-        else:
-            features['account_age_days'] = 0
-        
-        # Contadores básicos
-        features['followers_count'] = profile_data.get('followers_count', 0) or 0
-        features['following_count'] = profile_data.get('follows_count', 0) or 0
-        features['posts_count'] = profile_data.get('posts_count', 0) or 0
-        
-        # Ratio de seguidores
-        if features['following_count'] > 0:
-            features['followers_ratio'] = features['followers_count'] / features['following_count']
-        else:
-            features['followers_ratio'] = features['followers_count']
-        
-        # Información del perfil
-        features['has_avatar'] = 1 if profile_data.get('avatar') else 0
-        features['bio_length'] = len(profile_data.get('description', '') or '')
-        features['display_name_length'] = len(profile_data.get('display_name', '') or '')
-        
-        # Análisis del handle
-        handle = profile_data.get('handle', '')
-        features['handle_has_many_numbers'] = self._has_many_numbers(handle)
-        
-        # Posts por día
-        if features['account_age_days'] > 0:
-            features['posts_per_day'] = features['posts_count'] / features['account_age_days']
-        else:
-            features['posts_per_day'] = 0
-        
-        # ── CARACTERÍSTICAS DE POSTS ──
-        if posts_data and len(posts_data) > 0:
-            post_features = self._extract_post_features(posts_data)
-            features.update(post_features)
-        else:
-            # Características por defecto si no hay posts
-            features.update({
-                'avg_post_length': 0,
-                'std_post_length': 0,
-                'post_interval_std': 0,
-                'night_posts_ratio': 0,
-                'repost_ratio': 0,
-                'url_ratio': 0,
-                'avg_engagement': 0,
-                'vocabulary_diversity': 0,
-                'post_similarity_avg': 0
-            })
-        
-        return features
-    
-    def _extract_post_features(self, posts):
-        """Extrae características de una lista de posts"""
-        features = {}
-        
-        if not posts or len(posts) == 0:
-            return {
-                'avg_post_length': 0,
-                'std_post_length': 0,
-                'post_interval_std': 0,
-                'night_posts_ratio': 0,
-                'repost_ratio': 0,
-                'url_ratio': 0,
-                'avg_engagement': 0,
-                'vocabulary_diversity': 0,
-                'post_similarity_avg': 0
-            }
-        
-        # Longitud de posts
-        post_lengths = [len(post.get('text', '')) for post in posts]
-        features['avg_post_length'] = np.mean(post_lengths) if post_lengths else 0
-        features['std_post_length'] = np.std(post_lengths) if len(post_lengths) > 1 else 0
-        
-        # Intervalos entre posts
-        timestamps = []
-        for post in posts:
-            if 'createdAt' in post:
-                ts = self._parse_date(post['createdAt'])
-                if ts:
-                    timestamps.append(ts)
-        
-        if len(timestamps) > 1:
-            timestamps.sort()
-            intervals = [(timestamps[i+1] - timestamps[i]).total_seconds() / 60  # en minutos
-                        for i in range(len(timestamps)-1)]
-            features['post_interval_std'] = np.std(intervals) if intervals else 0
-        else:
-            features['post_interval_std'] = 0
-        
-        # Posts nocturnos (00:00 - 06:00)
-        night_posts = sum(1 for ts in timestamps if ts.hour >= 0 and ts.hour < 6)
-        features['night_posts_ratio'] = night_posts / len(posts) if posts else 0
-        
-        # Ratio de reposts (posts sin texto original o muy cortos)
-        reposts = sum(1 for post in posts if len(post.get('text', '')) < 10)
-        features['repost_ratio'] = reposts / len(posts) if posts else 0
-        
-        # Ratio de posts con URLs
-        url_posts = sum(1 for post in posts if 'http' in post.get('text', '').lower())
-        features['url_ratio'] = url_posts / len(posts) if posts else 0
-        
-        # Engagement promedio
-        engagements = [
-            (post.get('likeCount', 0) or 0) + (post.get('replyCount', 0) or 0)
-            for post in posts
-        ]
-        features['avg_engagement'] = np.mean(engagements) if engagements else 0
-        
-        # Diversidad de vocabulario
-        all_words = []
-        for post in posts:
-            text = post.get('text', '').lower()
-            words = re.findall(r'\b\w+\b', text)
-            all_words.extend(words)
-        
-        if all_words:
-            unique_words = len(set(all_words))
-            total_words = len(all_words)
-            features['vocabulary_diversity'] = unique_words / total_words if total_words > 0 else 0
-        else:
-            features['vocabulary_diversity'] = 0
-        
-        # Similitud promedio entre posts (basado en palabras compartidas)
-        post_texts = [post.get('text', '') for post in posts]
-        features['post_similarity_avg'] = self._calculate_avg_similarity(post_texts)
-        
-        return features
-    
+                valores[nombre] = definicion.funcion(*(valores[r] for r in definicion.requiere))
+
+        return {nombre: valores[nombre] for nombre in self.feature_names}
+
     def _has_many_numbers(self, handle):
         """Detecta si el handle tiene muchos números (>= 5 dígitos consecutivos)"""
-        if not handle:
-            return 0
-        # Buscar secuencias de 5+ dígitos
-        if re.search(r'\d{5,}', handle):
-            return 1
-        return 0
-    
+        return tiene_muchos_numeros(handle)
+
     def _parse_date(self, date_str):
         """Parsea una fecha de Bluesky a datetime"""
-        if not date_str:
-            return None
-        try:
-            # Formato ISO 8601
-            if 'T' in date_str:
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            else:
-                return datetime.strptime(date_str, '%Y-%m-%d')
-        except:
-            return None
-    
+        return parsear_fecha(date_str)
+
     def _calculate_avg_similarity(self, texts):
         """Calcula similitud promedio entre textos (Jaccard simplificado)"""
-        if len(texts) < 2:
-            return 0
-        
-        similarities = []
-        for i in range(len(texts)):
-            for j in range(i+1, len(texts)):
-                words1 = set(texts[i].lower().split())
-                words2 = set(texts[j].lower().split())
-                
-                if len(words1 | words2) > 0:
-                    sim = len(words1 & words2) / len(words1 | words2)
-                    similarities.append(sim)
-        
-        return np.mean(similarities) if similarities else 0
+        return similitud_media(texts)
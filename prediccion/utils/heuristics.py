@@ -1,10 +1,22 @@
 """
 Módulo para aplicar reglas heurísticas de clasificación
 """
+import numpy as np
+
+from prediccion.utils.reglas import MotorReglas
+
 
 class HeuristicLabeler:
     """Aplica reglas heurísticas para etiquetar perfiles como bot o humano"""
     
+    # Features que consultan las reglas (el extractor debe calcularlas)
+    FEATURES_REQUERIDAS = [
+        'has_avatar', 'bio_length', 'handle_has_many_numbers', 'posts_per_day',
+        'account_age_days', 'posts_count', 'followers_ratio', 'following_count',
+        'followers_count', 'repost_ratio', 'night_posts_ratio', 'post_interval_std',
+        'vocabulary_diversity', 'post_similarity_avg', 'avg_engagement',
+    ]
+    
     def __init__(self, config):
         """
         Args:
@@ -13,6 +25,38 @@ class HeuristicLabeler:
         # Umbrales ULTRA-BAJOS para clasificar más del 95% de perfiles
         self.min_score_bot = config.get('min_score_bot', 0.5)
         self.min_score_humano = config.get('min_score_humano', 0.8)
+        
+        # Reglas ponderadas de config.yaml (reglas_bot / reglas_humano con `peso`);
+        # si no están definidas se usan las reglas históricas de _calculate_weighted_score
+        self.motor = MotorReglas.desde_config(config)
+        if self.motor is not None:
+            self.features_requeridas = self.motor.features
+        else:
+            self.features_requeridas = list(self.FEATURES_REQUERIDAS)
+    
+    def score(self, features):
+        """Score neto de un perfil (positivo = humano, negativo = bot)"""
+        if self.motor is not None:
+            return self.motor.puntuar(features)
+        return self._calculate_weighted_score(features)
+    
+    def label_batch(self, features):
+        """
+        Etiqueta muchos perfiles a la vez
+        
+        Args:
+            features: DataFrame, dict de columnas o lista de dicts de features
+            
+        Returns:
+            np.ndarray de int8 con 1 (bot), 0 (humano) o -1 (incierto)
+        """
+        if self.motor is not None:
+            return self.motor.evaluar(features).labels
+        if isinstance(features, dict):
+            features = [dict(zip(features, fila)) for fila in zip(*features.values())]
+        elif not isinstance(features, (list, tuple)):
+            features = features.to_dict('records')
+        return np.array([self.label_profile(f) for f in features], dtype=np.int8)
     
     def label_profile(self, features):
         """
@@ -25,7 +69,7 @@ class HeuristicLabeler:
             int: 1 (bot), 0 (humano), o -1 (incierto)
         """
         # Calcular score neto (positivo = humano, negativo = bot)
-        net_score = self._calculate_weighted_score(features)
+        net_score = self.score(features)
         
         # UMBRALES ULTRA-AGRESIVOS: clasificar más del 95% de perfiles
         if net_score <= -self.min_score_bot:
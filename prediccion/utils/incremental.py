@@ -0,0 +1,196 @@
+"""
+Módulo para continuar el entrenamiento del modelo con las etiquetas nuevas
+
+En lugar de reentrenar desde cero, se cargan el booster, el scaler y las
+columnas del modelo actual y se añaden árboles entrenados solo con las filas
+nuevas (`xgb_model=`). El scaler no se reajusta: los umbrales de los árboles
+existentes están expresados en el espacio escalado original.
+
+Cada modelo (completo o incremental) se registra como una versión en
+`modelo.incremental.versiones_dir`, con un manifest.json y las huellas de los
+DIDs ya vistos, que es lo que permite calcular el delta de la siguiente vez.
+"""
+import hashlib
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score
+
+from seguridad.secure_model_handler import SecureModelHandler
+from prediccion.utils.entrenamiento_streaming import mascara_test
+
+
+def huellas_dids(dids):
+    """Hash de 64 bits de cada DID (8 bytes por perfil en lugar del string)"""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(did).encode('utf-8'), digest_size=8).digest(), 'little')
+         for did in dids),
+        dtype=np.uint64, count=len(dids),
+    )
+
+
+def verificar_compatibilidad(scaler, feature_cols, columnas):
+    """
+    Comprueba que el dataset nuevo encaja con el modelo actual
+
+    Args:
+        scaler: StandardScaler del modelo actual
+        feature_cols: Columnas de features del modelo actual (en su orden)
+        columnas: Columnas de features del dataset nuevo
+
+    Raises:
+        ValueError: Si faltan o sobran features, o el scaler no corresponde
+    """
+    faltan = [c for c in feature_cols if c not in columnas]
+    sobran = [c for c in columnas if c not in feature_cols]
+    if faltan or sobran:
+        raise ValueError(
+            f"Las features del dataset no coinciden con las del modelo "
+            f"(faltan: {faltan or '-'}, sobran: {sobran or '-'}); hace falta un entrenamiento completo"
+        )
+    if getattr(scaler, 'n_features_in_', len(feature_cols)) != len(feature_cols):
+        raise ValueError(
+            f"El scaler espera {scaler.n_features_in_} features y el modelo usa {len(feature_cols)}"
+        )
+    nombres = getattr(scaler, 'feature_names_in_', None)
+    if nombres is not None and list(nombres) != list(feature_cols):
+        raise ValueError("El scaler se ajustó con otras columnas (u otro orden) que feature_columns")
+
+
+def desplazamiento_features(scaler, X, feature_cols):
+    """
+    Media de cada feature nueva en el espacio escalado del modelo
+
+    Con el scaler original, una media lejos de 0 (|z| > 3) indica que los
+    datos nuevos ya no se parecen a los del entrenamiento completo.
+    """
+    medias = np.asarray(scaler.transform(X)).mean(axis=0)
+    return dict(zip(feature_cols, medias.tolist()))
+
+
+def entrenar_incremental(model, scaler, feature_cols, df, params_xgb, arboles_nuevos=50,
+                         test_size=0.2, semilla=42):
+    """
+    Añade árboles al modelo actual entrenados con las filas de `df`
+
+    Las filas se dividen por hash del DID (mascara_test): la parte de prueba
+    sirve para comparar el modelo anterior con el nuevo sobre datos no vistos.
+
+    Args:
+        model: XGBClassifier actual
+        scaler: StandardScaler actual (no se modifica)
+        feature_cols: Columnas de features del modelo
+        df: Filas nuevas (features, 'label' y 'did')
+        params_xgb: Parámetros de XGBoost (solo afectan a los árboles nuevos)
+        arboles_nuevos: Rondas de boosting a añadir
+        test_size: Fracción de prueba del delta
+        semilla: Semilla de la división
+
+    Returns:
+        Dict con 'model' (XGBClassifier nuevo), 'filas_train', 'filas_test',
+        'auc_anterior' y 'auc_nuevo' (None si la parte de prueba tiene una sola clase)
+    """
+    prueba = mascara_test(df['did'].to_numpy(), test_size, semilla)
+    X = scaler.transform(df[feature_cols])
+    y = df['label'].to_numpy()
+
+    params = {k: v for k, v in params_xgb.items() if k != 'n_estimators'}
+    nuevo = xgb.XGBClassifier(**params, n_estimators=arboles_nuevos)
+    nuevo.fit(X[~prueba], y[~prueba], xgb_model=model.get_booster(), verbose=False)
+
+    auc_anterior = auc_nuevo = None
+    if len(np.unique(y[prueba])) > 1:
+        auc_anterior = float(roc_auc_score(y[prueba], model.predict_proba(X[prueba])[:, 1]))
+        auc_nuevo = float(roc_auc_score(y[prueba], nuevo.predict_proba(X[prueba])[:, 1]))
+
+    return {
+        'model': nuevo,
+        'filas_train': int((~prueba).sum()),
+        'filas_test': int(prueba.sum()),
+        'auc_anterior': auc_anterior,
+        'auc_nuevo': auc_nuevo,
+    }
+
+
+class RegistroVersiones:
+    """Versiones del modelo en disco: una carpeta por versión y un manifest.json"""
+
+    def __init__(self, directorio, max_versiones=5):
+        """
+        Args:
+            directorio: Carpeta de versiones (ej: modelos/versiones)
+            max_versiones: Versiones que se conservan (las más antiguas se borran)
+        """
+        self.directorio = Path(directorio)
+        self.max_versiones = max_versiones
+        self.manifest_path = self.directorio / 'manifest.json'
+
+    def versiones(self):
+        """Entradas del manifest, de la más antigua a la más reciente"""
+        if not self.manifest_path.exists():
+            return []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['versiones']
+
+    def ultima(self):
+        """Entrada de la versión más reciente (None si no hay ninguna)"""
+        versiones = self.versiones()
+        return versiones[-1] if versiones else None
+
+    def _carpeta(self, version):
+        return self.directorio / f"v{version:04d}"
+
+    def huellas(self, version):
+        """Huellas (ordenadas) de los DIDs vistos hasta esa versión"""
+        return np.load(self._carpeta(version) / 'dids.npy', allow_pickle=False)
+
+    def cargar(self, version):
+        """Devuelve (model, scaler, feature_cols) de una versión, verificando checksums"""
+        handler = SecureModelHandler(self._carpeta(version))
+        return (
+            handler.cargar_modelo('bot_detector.pkl'),
+            handler.cargar_modelo('feature_scaler.pkl'),
+            handler.cargar_modelo('feature_columns.pkl'),
+        )
+
+    def registrar(self, model, scaler, feature_cols, huellas, **info):
+        """
+        Guarda una versión nueva
+
+        Args:
+            model, scaler, feature_cols: Componentes del modelo
+            huellas: Huellas de todos los DIDs vistos hasta ahora (huellas_dids)
+            **info: Datos para el manifest (tipo, filas, métricas...)
+
+        Returns:
+            Entrada del manifest de la versión creada
+        """
+        versiones = self.versiones()
+        version = versiones[-1]['version'] + 1 if versiones else 1
+        carpeta = self._carpeta(version)
+        handler = SecureModelHandler(carpeta)
+        handler.guardar_modelo(model, 'bot_detector.pkl', permisos=0o600)
+        handler.guardar_modelo(scaler, 'feature_scaler.pkl', permisos=0o600)
+        handler.guardar_modelo(feature_cols, 'feature_columns.pkl', permisos=0o600)
+        np.save(carpeta / 'dids.npy', np.unique(np.asarray(huellas, dtype=np.uint64)))
+
+        entrada = {
+            'version': version,
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'arboles': int(model.get_booster().num_boosted_rounds()),
+            **info,
+        }
+        versiones.append(entrada)
+
+        # Conservar solo las últimas max_versiones carpetas
+        for vieja in versiones[:-self.max_versiones] if self.max_versiones else []:
+            shutil.rmtree(self._carpeta(vieja['version']), ignore_errors=True)
+        versiones = versiones[-self.max_versiones:] if self.max_versiones else versiones
+
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'versiones': versiones}, f, indent=2)
+        return entrada
@@ -0,0 +1,196 @@
+"""
+Módulo para leer de forma incremental los JSON grandes del almacén
+(profiles_to_scan.json y posts_usuarios.json) sin cargarlos enteros en memoria.
+"""
+import json
+
+TAMANO_BLOQUE_LECTURA = 1 << 16  # 64 KiB
+_ESPACIOS = ' \t\n\r'
+
+
+class _LectorJSON:
+    """Lector secuencial de un JSON de nivel superior con buffer acotado"""
+
+    def __init__(self, archivo, tamano_bloque=TAMANO_BLOQUE_LECTURA):
+        self.archivo = archivo
+        self.tamano_bloque = tamano_bloque
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.bytes_descartados = 0  # Bytes del archivo anteriores a buffer[0]
+        self.eof = False
+
+    def _leer_mas(self):
+        """Añade un bloque al buffer descartando lo ya consumido"""
+        if self.eof:
+            return False
+        if self.pos:
+            consumido = self.buffer[:self.pos]
+            self.bytes_descartados += len(consumido.encode('utf-8'))
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        bloque = self.archivo.read(self.tamano_bloque)
+        if not bloque:
+            self.eof = True
+            return False
+        self.buffer += bloque
+        return True
+
+    def offset_bytes(self):
+        """Posición en bytes dentro del archivo del cursor actual"""
+        return self.bytes_descartados + len(self.buffer[:self.pos].encode('utf-8'))
+
+    def siguiente_caracter(self):
+        """Devuelve (sin consumir) el siguiente carácter no blanco, o '' al final"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _ESPACIOS:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._leer_mas():
+                return ''
+
+    def esperar(self, caracter):
+        """Consume el carácter esperado o lanza ValueError"""
+        actual = self.siguiente_caracter()
+        if actual != caracter:
+            raise ValueError(
+                f"JSON inválido: se esperaba '{caracter}' y se encontró "
+                f"'{actual or 'EOF'}' en el byte {self.offset_bytes()}"
+            )
+        self.pos += 1
+
+    def leer_valor(self):
+        """Decodifica el siguiente valor JSON completo"""
+        self.siguiente_caracter()
+        while True:
+            try:
+                valor, fin = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._leer_mas():
+                    raise
+                continue
+            # Un valor que termina justo al final del buffer puede estar truncado
+            # (p. ej. un número), así que se vuelve a intentar con más datos
+            if fin == len(self.buffer) and not self.eof:
+                self._leer_mas()
+                continue
+            self.pos = fin
+            return valor
+
+
+def _abrir(ruta):
+    # newline='' evita traducir \r\n y mantiene los offsets en bytes exactos
+    return open(ruta, 'r', encoding='utf-8', newline='')
+
+
+def iterar_array(ruta, tamano_bloque=TAMANO_BLOQUE_LECTURA):
+    """
+    Itera los elementos de un archivo cuyo contenido es un array JSON
+
+    Args:
+        ruta: Ruta al archivo (ej: profiles_to_scan.json)
+        tamano_bloque: Caracteres leídos de disco en cada lectura
+
+    Yields:
+        Cada elemento del array, de uno en uno
+    """
+    with _abrir(ruta) as f:
+        lector = _LectorJSON(f, tamano_bloque)
+        lector.esperar('[')
+        if lector.siguiente_caracter() == ']':
+            return
+        while True:
+            yield lector.leer_valor()
+            if lector.siguiente_caracter() == ',':
+                lector.pos += 1
+                continue
+            lector.esperar(']')
+            return
+
+
+def iterar_objeto(ruta, tamano_bloque=TAMANO_BLOQUE_LECTURA, con_offsets=False):
+    """
+    Itera las entradas de un archivo cuyo contenido es un objeto JSON
+
+    Args:
+        ruta: Ruta al archivo (ej: posts_usuarios.json)
+        tamano_bloque: Caracteres leídos de disco en cada lectura
+        con_offsets: Si True, incluye (inicio, longitud) en bytes de cada valor
+
+    Yields:
+        (clave, valor) o (clave, valor, inicio, longitud) si con_offsets=True
+    """
+    with _abrir(ruta) as f:
+        lector = _LectorJSON(f, tamano_bloque)
+        lector.esperar('{')
+        if lector.siguiente_caracter() == '}':
+            return
+        while True:
+            clave = lector.leer_valor()
+            lector.esperar(':')
+            lector.siguiente_caracter()
+            inicio = lector.offset_bytes() if con_offsets else None
+            valor = lector.leer_valor()
+            if con_offsets:
+                yield clave, valor, inicio, lector.offset_bytes() - inicio
+            else:
+                yield clave, valor
+            if lector.siguiente_caracter() == ',':
+                lector.pos += 1
+                continue
+            lector.esperar('}')
+            return
+
+
+class IndicePostsUsuarios:
+    """
+    Acceso por DID a posts_usuarios.json sin mantenerlo en memoria.
+
+    Recorre el archivo una vez guardando solo la posición en bytes de cada
+    entrada; cada consulta lee únicamente la entrada pedida. Se comporta como
+    un dict de solo lectura (`did in indice`, `indice[did]`, `indice.get(did)`).
+    """
+
+    def __init__(self, ruta, tamano_bloque=TAMANO_BLOQUE_LECTURA):
+        """
+        Args:
+            ruta: Ruta a posts_usuarios.json
+            tamano_bloque: Caracteres leídos de disco en cada lectura
+        """
+        self.ruta = ruta
+        self.offsets = {}
+        for did, _, inicio, longitud in iterar_objeto(ruta, tamano_bloque, con_offsets=True):
+            self.offsets[did] = (inicio, longitud)
+        self._archivo = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, did):
+        return did in self.offsets
+
+    def __getitem__(self, did):
+        inicio, longitud = self.offsets[did]
+        if self._archivo is None:
+            self._archivo = open(self.ruta, 'rb')
+        self._archivo.seek(inicio)
+        return json.loads(self._archivo.read(longitud).decode('utf-8'))
+
+    def get(self, did, default=None):
+        if did not in self.offsets:
+            return default
+        return self[did]
+
+    def cerrar(self):
+        """Cierra el archivo abierto para las consultas"""
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
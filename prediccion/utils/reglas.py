@@ -0,0 +1,294 @@
+"""
+Módulo que compila las reglas heurísticas de config.yaml a expresiones NumPy
+
+Cada regla de `reglas_bot` / `reglas_humano` tiene una condición como
+"account_age_days < 30 AND posts_count > 300" y un `peso`. Las condiciones se
+analizan una sola vez (sin eval) y se evalúan sobre columnas completas de la
+matriz de features, de modo que puntuar un millón de perfiles son unas pocas
+operaciones vectorizadas por regla.
+
+Las reglas con el mismo `grupo` son excluyentes: dentro de un grupo solo
+puntúa la primera regla (en orden) que se cumple, igual que una cadena if/elif.
+"""
+import re
+from collections import namedtuple
+
+import numpy as np
+
+# Valor de una feature ausente (el resto valen 0), igual que en las reglas históricas
+VALORES_POR_DEFECTO = {
+    'post_interval_std': float('inf'),
+    'post_similarity_avg': 1.0,
+}
+
+_OPERADORES = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<numero>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)
+      | (?P<logico>AND|OR|NOT)\b
+      | (?P<nombre>[A-Za-z_]\w*)
+      | (?P<operador><=|>=|==|!=|<|>)
+      | (?P<parentesis>[()])
+    )""", re.VERBOSE)
+
+Regla = namedtuple('Regla', ['nombre', 'lado', 'grupo', 'peso', 'condicion', 'evaluar', 'features'])
+ResultadoReglas = namedtuple('ResultadoReglas', ['scores', 'labels', 'contribuciones', 'reglas'])
+
+
+def _tokenizar(texto):
+    tokens = []
+    posicion = 0
+    texto = texto.strip()
+    while posicion < len(texto):
+        m = _TOKEN.match(texto, posicion)
+        if not m or m.end() == posicion:
+            raise ValueError(f"Símbolo no reconocido en '{texto}' (posición {posicion})")
+        tokens.append((m.lastgroup, m.group(m.lastgroup)))
+        posicion = m.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Descenso recursivo sobre la gramática:
+
+        expr        := and_expr (OR and_expr)*
+        and_expr    := not_expr (AND not_expr)*
+        not_expr    := NOT not_expr | '(' expr ')' | comparacion
+        comparacion := operando (op operando)+      # se admite 0 < x < 5
+        operando    := numero | feature
+
+    Cada nodo se compila a una función columnas -> array (bool o float).
+    """
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.tokens = _tokenizar(texto)
+        self.i = 0
+        self.features = set()
+
+    def _actual(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None, None)
+
+    def _error(self, mensaje):
+        return ValueError(f"Condición inválida '{self.texto}': {mensaje}")
+
+    def compilar(self):
+        nodo = self._expr()
+        if self.i != len(self.tokens):
+            raise self._error(f"símbolo inesperado '{self._actual()[1]}'")
+        return nodo
+
+    def _expr(self):
+        nodo = self._and()
+        while self._actual() == ('logico', 'OR'):
+            self.i += 1
+            izquierda, derecha = nodo, self._and()
+            nodo = lambda c, a=izquierda, b=derecha: a(c) | b(c)
+        return nodo
+
+    def _and(self):
+        nodo = self._not()
+        while self._actual() == ('logico', 'AND'):
+            self.i += 1
+            izquierda, derecha = nodo, self._not()
+            nodo = lambda c, a=izquierda, b=derecha: a(c) & b(c)
+        return nodo
+
+    def _not(self):
+        tipo, valor = self._actual()
+        if (tipo, valor) == ('logico', 'NOT'):
+            self.i += 1
+            interno = self._not()
+            return lambda c, a=interno: ~a(c)
+        if (tipo, valor) == ('parentesis', '('):
+            self.i += 1
+            nodo = self._expr()
+            if self._actual() != ('parentesis', ')'):
+                raise self._error("falta ')'")
+            self.i += 1
+            return nodo
+        return self._comparacion()
+
+    def _operando(self):
+        tipo, valor = self._actual()
+        self.i += 1
+        if tipo == 'numero':
+            constante = float(valor)
+            return lambda c, v=constante: v
+        if tipo == 'nombre':
+            self.features.add(valor)
+            return lambda c, n=valor: c[n]
+        raise self._error(f"se esperaba una feature o un número y se encontró '{valor}'")
+
+    def _comparacion(self):
+        operandos = [self._operando()]
+        operadores = []
+        while self._actual()[0] == 'operador':
+            operadores.append(_OPERADORES[self._actual()[1]])
+            self.i += 1
+            operandos.append(self._operando())
+        if not operadores:
+            raise self._error("se esperaba una comparación")
+
+        def evaluar(c, operandos=operandos, operadores=operadores):
+            valores = [operando(c) for operando in operandos]
+            resultado = operadores[0](valores[0], valores[1])
+            for k in range(1, len(operadores)):
+                resultado = resultado & operadores[k](valores[k], valores[k + 1])
+            return resultado
+        return evaluar
+
+
+def compilar_condicion(texto):
+    """
+    Compila una condición de regla
+
+    Returns:
+        Tupla (función columnas -> array bool, set de features usadas)
+    """
+    parser = _Parser(texto)
+    funcion = parser.compilar()
+    return funcion, parser.features
+
+
+class MotorReglas:
+    """Evalúa las reglas ponderadas de config.yaml sobre toda la matriz de features"""
+
+    def __init__(self, reglas_bot, reglas_humano, min_score_bot=0.5, min_score_humano=0.8):
+        """
+        Args:
+            reglas_bot: Lista de dicts {nombre, condicion, peso, grupo?} (restan `peso`)
+            reglas_humano: Lista de dicts {nombre, condicion, peso, grupo?} (suman `peso`)
+            min_score_bot: Score <= -min_score_bot → bot
+            min_score_humano: Score >= min_score_humano → humano
+        """
+        self.min_score_bot = min_score_bot
+        self.min_score_humano = min_score_humano
+        self.reglas = []
+        for lado, signo, definiciones in (('bot', -1.0, reglas_bot), ('humano', 1.0, reglas_humano)):
+            for definicion in definiciones or []:
+                nombre = definicion.get('nombre', definicion.get('condicion'))
+                if 'peso' not in definicion:
+                    raise ValueError(f"La regla '{nombre}' no tiene peso")
+                evaluar, features = compilar_condicion(definicion['condicion'])
+                self.reglas.append(Regla(
+                    nombre=nombre,
+                    lado=lado,
+                    grupo=definicion.get('grupo'),
+                    peso=signo * float(definicion['peso']),
+                    condicion=definicion['condicion'],
+                    evaluar=evaluar,
+                    features=features,
+                ))
+        self.features = sorted(set().union(*(r.features for r in self.reglas)))
+        self.nombres_reglas = [r.nombre for r in self.reglas]
+
+    @classmethod
+    def desde_config(cls, config):
+        """
+        Crea el motor desde la sección `heuristicas`
+
+        Returns:
+            MotorReglas, o None si la sección no define reglas con peso
+        """
+        reglas_bot = config.get('reglas_bot') or []
+        reglas_humano = config.get('reglas_humano') or []
+        reglas = reglas_bot + reglas_humano
+        if not reglas or not all('peso' in r for r in reglas):
+            return None
+        return cls(
+            reglas_bot,
+            reglas_humano,
+            min_score_bot=config.get('min_score_bot', 0.5),
+            min_score_humano=config.get('min_score_humano', 0.8),
+        )
+
+    def _columnas(self, features):
+        """Extrae las columnas usadas como arrays float64 (con valores por defecto si faltan)"""
+        if isinstance(features, (list, tuple)):
+            n = len(features)
+            return n, {
+                nombre: np.fromiter(
+                    (f.get(nombre, VALORES_POR_DEFECTO.get(nombre, 0)) for f in features),
+                    dtype=np.float64, count=n,
+                )
+                for nombre in self.features
+            }
+
+        # DataFrame de pandas o dict de columnas
+        n = len(next(iter(features.values()))) if isinstance(features, dict) else len(features)
+        columnas = {}
+        for nombre in self.features:
+            if nombre in features:
+                columnas[nombre] = np.asarray(features[nombre], dtype=np.float64)
+            else:
+                columnas[nombre] = np.full(n, VALORES_POR_DEFECTO.get(nombre, 0), dtype=np.float64)
+        return n, columnas
+
+    def evaluar(self, features):
+        """
+        Puntúa y etiqueta todos los perfiles en una pasada
+
+        Args:
+            features: DataFrame, dict de columnas o lista de dicts de features
+
+        Returns:
+            ResultadoReglas con:
+              - scores: array (n,) con el score neto (positivo = humano)
+              - labels: array (n,) con 1 (bot), 0 (humano) o -1 (incierto)
+              - contribuciones: matriz (n, n_reglas) con el peso aportado por cada regla
+              - reglas: nombres de las columnas de `contribuciones`
+        """
+        n, columnas = self._columnas(features)
+        contribuciones = np.zeros((n, len(self.reglas)), dtype=np.float64)
+        ya_aplicada = {}  # (lado, grupo) -> máscara de perfiles en los que ya puntuó una regla
+
+        for j, regla in enumerate(self.reglas):
+            cumple = np.broadcast_to(regla.evaluar(columnas), (n,))
+            if regla.grupo is not None:
+                clave = (regla.lado, regla.grupo)
+                previa = ya_aplicada.get(clave)
+                if previa is not None:
+                    cumple = cumple & ~previa
+                    ya_aplicada[clave] = previa | cumple
+                else:
+                    ya_aplicada[clave] = cumple
+            contribuciones[cumple, j] = regla.peso
+
+        scores = contribuciones.sum(axis=1)
+        return ResultadoReglas(scores, self.etiquetar(scores), contribuciones, self.nombres_reglas)
+
+    def puntuar(self, features):
+        """Score neto de un solo perfil (dict de features) sin crear arrays"""
+        valores = {
+            nombre: float(features.get(nombre, VALORES_POR_DEFECTO.get(nombre, 0)))
+            for nombre in self.features
+        }
+        score = 0.0
+        aplicados = set()
+        for regla in self.reglas:
+            clave = (regla.lado, regla.grupo)
+            if regla.grupo is not None and clave in aplicados:
+                continue
+            if regla.evaluar(valores):
+                score += regla.peso
+                if regla.grupo is not None:
+                    aplicados.add(clave)
+        return score
+
+    def etiquetar(self, scores):
+        """Convierte scores en labels con los umbrales asimétricos"""
+        scores = np.asarray(scores, dtype=np.float64)
+        return np.where(
+            scores <= -self.min_score_bot, 1,
+            np.where(scores >= self.min_score_humano, 0, -1),
+        ).astype(np.int8)
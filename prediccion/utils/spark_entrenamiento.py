@@ -0,0 +1,171 @@
+"""
+Módulo para entrenar y puntuar el modelo de XGBoost en Spark
+
+El entrenamiento usa `xgboost.spark.SparkXGBClassifier`, repartido entre
+`num_workers` tareas de Spark. Para que el resultado sea intercambiable con el
+entrenamiento en pandas:
+  - El StandardScaler de sklearn se construye con la media y desviación de las
+    filas de entrenamiento calculadas por Spark (una sola agregación).
+  - La división entrenamiento/prueba usa el mismo hash crc32 del DID que
+    mascara_test, así que cada fila cae en el mismo lado que en modo streaming.
+  - El booster entrenado se envuelve en un XGBClassifier normal, que se guarda
+    con SecureModelHandler como cualquier otro modelo.
+"""
+import numpy as np
+from pyspark.ml.feature import VectorAssembler
+from pyspark.ml.functions import vector_to_array
+from pyspark.sql import functions as F
+from pyspark.sql.types import DoubleType, IntegerType, StructField, StructType
+from sklearn.preprocessing import StandardScaler
+
+from prediccion.utils.datasets import COLUMNAS_NO_FEATURES
+from prediccion.utils.entrenamiento_streaming import booster_a_clasificador
+
+# Parámetros de XGBClassifier que SparkXGBClassifier gestiona por su cuenta
+_PARAMETROS_IGNORADOS = ['n_jobs', 'nthread', 'tree_method']
+
+
+def columna_prueba(did, test_size, semilla=42):
+    """Expresión de Spark equivalente a mascara_test (True = conjunto de prueba)"""
+    huella = F.crc32(F.concat(F.lit(f"{semilla}:"), F.col(did).cast('string')).cast('binary'))
+    return huella / float(2**32) < test_size
+
+
+def ajustar_scaler_spark(df, feature_cols):
+    """
+    StandardScaler de sklearn ajustado con estadísticas calculadas en Spark
+
+    Equivale a StandardScaler().fit(df[feature_cols]) con un DataFrame de pandas
+    (desviación poblacional; las features constantes quedan con escala 1).
+    """
+    agregados = [F.count(F.lit(1)).alias('_n')]
+    for i, col in enumerate(feature_cols):
+        valor = F.col(col).cast('double')
+        agregados += [F.avg(valor).alias(f'_m{i}'), F.var_pop(valor).alias(f'_v{i}')]
+    fila = df.agg(*agregados).collect()[0]
+
+    media = np.array([fila[f'_m{i}'] for i in range(len(feature_cols))], dtype=np.float64)
+    varianza = np.array([fila[f'_v{i}'] for i in range(len(feature_cols))], dtype=np.float64)
+    escala = np.sqrt(varianza)
+    escala[escala < 10 * np.finfo(np.float64).eps] = 1.0
+
+    scaler = StandardScaler()
+    scaler.mean_ = media
+    scaler.var_ = varianza
+    scaler.scale_ = escala
+    scaler.n_samples_seen_ = int(fila['_n'])
+    scaler.n_features_in_ = len(feature_cols)
+    scaler.feature_names_in_ = np.array(feature_cols, dtype=object)
+    return scaler
+
+
+def ensamblar(df, feature_cols, scaler, salida='features'):
+    """Añade la columna vectorial `salida` con las features ya escaladas"""
+    escaladas = [
+        ((F.col(c).cast('double') - float(m)) / float(s)).alias(f'_esc_{c}')
+        for c, m, s in zip(feature_cols, scaler.mean_, scaler.scale_)
+    ]
+    df = df.select('*', *escaladas)
+    ensamblador = VectorAssembler(
+        inputCols=[f'_esc_{c}' for c in feature_cols], outputCol=salida, handleInvalid='keep'
+    )
+    return ensamblador.transform(df).drop(*[f'_esc_{c}' for c in feature_cols])
+
+
+def parametros_spark(params_xgb):
+    """Traduce los parámetros de modelo.xgboost a SparkXGBClassifier"""
+    return {k: v for k, v in params_xgb.items() if k not in _PARAMETROS_IGNORADOS}
+
+
+def entrenar_spark(df, params_xgb, test_size=0.2, semilla=42, num_workers=2):
+    """
+    Entrena XGBoost repartido en Spark
+
+    Args:
+        df: DataFrame de Spark con did, label y las features (ej: el Parquet de
+            extraer_features_spark.py o de 1_etiquetar_datos.py)
+        params_xgb: Sección modelo.xgboost de config.yaml
+        test_size: Fracción de prueba (por hash del DID)
+        semilla: Semilla de la división
+        num_workers: Tareas de Spark que entrenan en paralelo (como máximo, los
+            slots del clúster)
+
+    Returns:
+        Dict con 'model' (XGBClassifier), 'scaler', 'feature_cols', 'conteos',
+        'y_test' e 'y_pred_proba' (mismo formato que entrenar_streaming)
+    """
+    from xgboost.spark import SparkXGBClassifier
+
+    feature_cols = [c for c in df.columns if c not in COLUMNAS_NO_FEATURES]
+    df = df.withColumn('label', F.col('label').cast('int')) \
+        .withColumn('_prueba', columna_prueba('did', test_size, semilla))
+    train = df.filter(~F.col('_prueba'))
+    test = df.filter(F.col('_prueba'))
+
+    conteos = {'train': {0: 0, 1: 0}, 'test': {0: 0, 1: 0}}
+    for fila in df.groupBy('_prueba', 'label').count().collect():
+        conteos['test' if fila['_prueba'] else 'train'][int(fila['label'])] = fila['count']
+
+    scaler = ajustar_scaler_spark(train, feature_cols)
+    # Las tareas de XGBoost se lanzan en modo barrier: todas deben caber a la vez
+    num_workers = max(1, min(num_workers, df.sparkSession.sparkContext.defaultParallelism))
+    clasificador = SparkXGBClassifier(
+        features_col='features', label_col='label', num_workers=num_workers,
+        **parametros_spark(params_xgb),
+    )
+    modelo_spark = clasificador.fit(ensamblar(train, feature_cols, scaler))
+
+    # Solo etiqueta y probabilidad del conjunto de prueba llegan al driver
+    predicciones = modelo_spark.transform(ensamblar(test, feature_cols, scaler)).select(
+        F.col('label'), vector_to_array('probability')[1].alias('proba')
+    ).toPandas()
+
+    return {
+        'model': booster_a_clasificador(modelo_spark.get_booster()),
+        'scaler': scaler,
+        'feature_cols': feature_cols,
+        'conteos': conteos,
+        'y_test': predicciones['label'].to_numpy(),
+        'y_pred_proba': predicciones['proba'].to_numpy(),
+    }
+
+
+def puntuar_spark(df, model, scaler, feature_cols, threshold=0.5):
+    """
+    Probabilidad de bot para todas las filas de `df` (sin recoger nada al driver)
+
+    El modelo, el scaler y las columnas viajan a los ejecutores en la clausura
+    de mapInPandas; cada lote de Arrow se puntúa con el mismo código que
+    3_predecir.py.
+
+    Args:
+        df: DataFrame de Spark con did, handle y las features del modelo
+        model: XGBClassifier (cargado con SecureModelHandler)
+        scaler: StandardScaler del modelo
+        feature_cols: Columnas de features en el orden del modelo
+        threshold: Probabilidad a partir de la cual se marca es_bot
+
+    Returns:
+        DataFrame con did, handle, prob_bot y es_bot
+    """
+    faltan = [c for c in ['did', 'handle'] + list(feature_cols) if c not in df.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas del modelo en la tabla: {faltan}")
+
+    esquema = StructType([
+        df.schema['did'],
+        df.schema['handle'],
+        StructField('prob_bot', DoubleType()),
+        StructField('es_bot', IntegerType()),
+    ])
+
+    def puntuar_lotes(lotes):
+        for pdf in lotes:
+            X = scaler.transform(pdf[feature_cols].astype(np.float64))
+            proba = model.predict_proba(X)[:, 1]
+            yield pdf[['did', 'handle']].assign(
+                prob_bot=proba.astype(np.float64),
+                es_bot=(proba > threshold).astype(np.int32),
+            )
+
+    return df.select('did', 'handle', *feature_cols).mapInPandas(puntuar_lotes, esquema)
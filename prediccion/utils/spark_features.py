@@ -0,0 +1,207 @@
+"""
+Módulo para calcular en Spark las mismas características que FeatureExtractor
+
+Las features de perfil se expresan con columnas nativas de Spark y las de
+posts con agregaciones group-by sobre la tabla JSONL de posts (un post por
+fila con `usuario_did`). Solo `vocabulary_diversity` y `post_similarity_avg`
+se calculan con pandas UDFs (Arrow) reutilizando el código de FeatureExtractor.
+"""
+import os
+import sys
+
+import pandas as pd
+from pyspark.sql import functions as F
+from pyspark.sql.types import IntegerType, StructField, StructType
+from pyspark.sql.window import Window
+
+from prediccion.utils.feature_extraction import (
+    FeatureExtractor, FEATURES_BASE, FEATURES_PERFIL, FEATURES_COMPORTAMIENTO
+)
+from prediccion.utils.heuristics import HeuristicLabeler
+from analisis.spark_utils import crear_sesion_spark
+
+# Features de posts que necesitan código Python (se calculan con pandas UDF)
+FEATURES_TEXTO = ['vocabulary_diversity', 'post_similarity_avg']
+
+_MICROS_POR_DIA = 86400 * 1_000_000
+_MICROS_POR_MINUTO = 60 * 1_000_000
+
+
+def crear_sesion(app_name):
+    """SparkSession de los scripts de predicción, con la configuración del análisis descriptivo"""
+    from configuracion.load_config import config as config_proyecto
+    java_home = config_proyecto.get_java_home()
+    if java_home and os.path.isdir(java_home):
+        os.environ['JAVA_HOME'] = java_home
+    os.environ['PYSPARK_DRIVER_PYTHON'] = sys.executable
+    os.environ['PYSPARK_PYTHON'] = sys.executable
+
+    return crear_sesion_spark(
+        config_proyecto.get_spark_config(),
+        app_name=app_name,
+        extra_config={"spark.sql.execution.arrow.pyspark.enabled": "true"},
+    )
+
+
+def _columna(df, nombre):
+    """Columna del DataFrame o NULL si no existe (los JSON no siempre traen todos los campos)"""
+    return F.col(nombre) if nombre in df.columns else F.lit(None)
+
+
+def _parsear_fecha(columna):
+    """Equivalente a parsear_fecha: ISO 8601 con 'T' o 'YYYY-MM-DD'; NULL si no es válida"""
+    valida = columna.contains('T') | columna.rlike(r'^\d{4}-\d{2}-\d{2}$')
+    return F.when(valida, F.try_to_timestamp(columna))
+
+
+def _texto_udf(nombres):
+    """pandas UDF que calcula las features de texto pedidas a partir de la lista de textos"""
+    esquema = ', '.join(f'{nombre} double' for nombre in nombres)
+
+    @F.pandas_udf(esquema)
+    def features_texto(textos: pd.Series) -> pd.DataFrame:
+        extractor = FeatureExtractor(nombres)
+        filas = [
+            extractor.extract_profile_features({}, [{'text': t} for t in lista])
+            for lista in textos
+        ]
+        return pd.DataFrame(filas, columns=nombres).astype('float64')
+
+    return features_texto
+
+
+class SparkFeatureExtractor:
+    """Calcula en Spark las features de FeatureExtractor para todos los usuarios"""
+
+    def __init__(self, spark, feature_names=None):
+        """
+        Args:
+            spark: SparkSession (la misma que crea analisis/spark_utils.py)
+            feature_names: Features a calcular (por defecto las 19 base)
+        """
+        self.spark = spark
+        self.feature_names = list(feature_names) if feature_names is not None else list(FEATURES_BASE)
+        desconocidas = set(self.feature_names) - set(FEATURES_BASE)
+        if desconocidas:
+            raise ValueError(f"Features no disponibles en Spark: {sorted(desconocidas)}")
+        # Las fechas sin zona horaria se interpretan como UTC, igual que en Python
+        self.spark.conf.set("spark.sql.session.timeZone", "UTC")
+
+    def features_perfil(self, df_profiles):
+        """Features de perfil con expresiones de columna (una fila por DID)"""
+        followers = F.coalesce(_columna(df_profiles, 'followers_count'), F.lit(0)).cast('long')
+        following = F.coalesce(_columna(df_profiles, 'follows_count'), F.lit(0)).cast('long')
+        posts_count = F.coalesce(_columna(df_profiles, 'posts_count'), F.lit(0)).cast('long')
+        avatar = _columna(df_profiles, 'avatar')
+
+        creado = _parsear_fecha(_columna(df_profiles, 'created_at').cast('string'))
+        edad = F.coalesce(
+            F.floor((F.unix_micros(F.current_timestamp()) - F.unix_micros(creado)) / _MICROS_POR_DIA),
+            F.lit(0),
+        ).cast('long')
+
+        df = df_profiles.filter(F.col('did').isNotNull()).select(
+            F.col('did'),
+            F.coalesce(_columna(df_profiles, 'handle'), F.lit('')).alias('handle'),
+            edad.alias('account_age_days'),
+            followers.alias('followers_count'),
+            following.alias('following_count'),
+            posts_count.alias('posts_count'),
+            F.when(following > 0, followers / following).otherwise(followers.cast('double')).alias('followers_ratio'),
+            F.when(avatar.isNotNull() & (avatar != ''), 1).otherwise(0).alias('has_avatar'),
+            F.length(F.coalesce(_columna(df_profiles, 'description'), F.lit(''))).alias('bio_length'),
+            F.length(F.coalesce(_columna(df_profiles, 'display_name'), F.lit(''))).alias('display_name_length'),
+            # (?U) hace que \d acepte dígitos Unicode como el re de Python
+            F.coalesce(_columna(df_profiles, 'handle'), F.lit('')).rlike(r'(?U)\d{5,}').cast('int')
+                .alias('handle_has_many_numbers'),
+        )
+        return df.withColumn(
+            'posts_per_day',
+            F.when(F.col('account_age_days') > 0, F.col('posts_count') / F.col('account_age_days')).otherwise(0.0),
+        )
+
+    def features_posts(self, df_posts):
+        """Features de comportamiento agregadas por usuario_did"""
+        texto = F.coalesce(_columna(df_posts, 'text'), F.lit(''))
+        fecha_str = _columna(df_posts, 'createdAt').cast('string')
+        ts = _parsear_fecha(fecha_str)
+        # La hora es la del propio timestamp (como datetime.hour), no la convertida a UTC
+        hora = F.when(ts.isNotNull(), F.when(fecha_str.contains('T'),
+                      F.regexp_extract(fecha_str, r'T(\d{2})', 1).cast('int')).otherwise(0))
+
+        posts = df_posts.select(
+            F.col('usuario_did').alias('did'),
+            texto.alias('text'),
+            F.length(texto).alias('longitud'),
+            ts.alias('ts'),
+            hora.alias('hora'),
+            (F.coalesce(_columna(df_posts, 'likeCount'), F.lit(0)) +
+             F.coalesce(_columna(df_posts, 'replyCount'), F.lit(0))).alias('engagement'),
+        )
+
+        # Intervalo (minutos) respecto al post anterior del mismo usuario
+        ventana = Window.partitionBy('did').orderBy('ts')
+        posts = posts.withColumn(
+            'intervalo',
+            F.when(F.col('ts').isNotNull(),
+                   (F.unix_micros('ts') - F.unix_micros(F.lag('ts').over(ventana))) / _MICROS_POR_MINUTO),
+        )
+
+        n = F.count(F.lit(1))
+        agregados = posts.groupBy('did').agg(
+            F.avg('longitud').alias('avg_post_length'),
+            F.when(n > 1, F.stddev_pop('longitud')).otherwise(0.0).alias('std_post_length'),
+            F.coalesce(F.stddev_pop('intervalo'), F.lit(0.0)).alias('post_interval_std'),
+            (F.sum(F.when(F.col('hora') < 6, 1).otherwise(0)) / n).alias('night_posts_ratio'),
+            (F.sum(F.when(F.col('longitud') < 10, 1).otherwise(0)) / n).alias('repost_ratio'),
+            (F.sum(F.when(F.lower('text').contains('http'), 1).otherwise(0)) / n).alias('url_ratio'),
+            F.avg('engagement').alias('avg_engagement'),
+            F.collect_list('text').alias('textos'),
+        )
+
+        texto_pedidas = [f for f in FEATURES_TEXTO if f in self.feature_names]
+        if texto_pedidas:
+            agregados = agregados.withColumn('_texto', _texto_udf(texto_pedidas)(F.col('textos')))
+            for nombre in texto_pedidas:
+                agregados = agregados.withColumn(nombre, F.col(f'_texto.{nombre}'))
+        return agregados.drop('textos', '_texto')
+
+    def extraer(self, df_profiles, df_posts=None):
+        """
+        Calcula las features de todos los perfiles
+
+        Args:
+            df_profiles: DataFrame de profiles_to_scan.json
+            df_posts: DataFrame JSONL de posts (una fila por post con usuario_did)
+
+        Returns:
+            DataFrame con did, handle y las features pedidas (0 si no hay posts)
+        """
+        df = self.features_perfil(df_profiles)
+        comportamiento = [f for f in FEATURES_COMPORTAMIENTO if f in self.feature_names]
+        if comportamiento:
+            if df_posts is not None:
+                df = df.join(self.features_posts(df_posts), on='did', how='left')
+            for nombre in comportamiento:
+                valor = F.col(nombre) if nombre in df.columns else F.lit(None)
+                df = df.withColumn(nombre, F.coalesce(valor.cast('double'), F.lit(0.0)))
+        columnas = [f for f in self.feature_names if f in FEATURES_PERFIL + comportamiento]
+        return df.select('did', 'handle', *columnas)
+
+    def etiquetar(self, df_features, config_heuristicas):
+        """
+        Añade la columna `label` con HeuristicLabeler y descarta los inciertos
+
+        Args:
+            df_features: Resultado de `extraer`
+            config_heuristicas: Sección `heuristicas` de prediccion/config.yaml
+        """
+        esquema = StructType(df_features.schema.fields + [StructField('label', IntegerType())])
+
+        def etiquetar_lotes(lotes):
+            labeler = HeuristicLabeler(config_heuristicas)
+            for pdf in lotes:
+                pdf['label'] = labeler.label_batch(pdf).astype('int32')
+                yield pdf
+
+        return df_features.mapInPandas(etiquetar_lotes, esquema).filter(F.col('label') != -1)
@@ -0,0 +1,73 @@
+"""
+Módulo para barrer umbrales del etiquetado heurístico sin volver a etiquetar
+
+El score neto de cada perfil no depende de `min_score_bot`/`min_score_humano`,
+así que se calcula una vez, se ordena y cada par de umbrales se resuelve con
+dos búsquedas binarias (np.searchsorted) sobre todo el grid a la vez.
+"""
+import numpy as np
+
+
+def contar_por_umbrales(scores_ordenados, umbrales_bot, umbrales_humano):
+    """
+    Cuenta bots y humanos para cada combinación de umbrales
+
+    Aplica las mismas reglas que HeuristicLabeler: bot si score <= -min_score_bot;
+    si no, humano si score >= min_score_humano.
+
+    Args:
+        scores_ordenados: Scores netos ordenados de menor a mayor
+        umbrales_bot: Valores de min_score_bot (array 1D)
+        umbrales_humano: Valores de min_score_humano (array 1D)
+
+    Returns:
+        Tupla (bots, humanos), matrices (len(umbrales_bot), len(umbrales_humano))
+    """
+    scores_ordenados = np.asarray(scores_ordenados, dtype=np.float64)
+    limite_bot = -np.asarray(umbrales_bot, dtype=np.float64)[:, None]
+    umbral_humano = np.asarray(umbrales_humano, dtype=np.float64)[None, :]
+    n = scores_ordenados.size
+
+    bots = np.searchsorted(scores_ordenados, limite_bot, side='right')
+    desde_humano = np.searchsorted(scores_ordenados, umbral_humano, side='left')
+    humanos = n - desde_humano
+    # Perfiles que cumplen ambos cortes (solo si min_score_humano <= -min_score_bot): cuentan como bot
+    solapados = np.clip(bots - desde_humano, 0, None)
+    humanos = humanos - solapados
+
+    return np.broadcast_to(bots, humanos.shape).copy(), humanos
+
+
+def barrer_umbrales(scores, umbrales_bot, umbrales_humano, total=None):
+    """
+    Distribución de labels para todo el grid de umbrales
+
+    Args:
+        scores: Scores netos (sin ordenar) de los perfiles puntuados
+        umbrales_bot: Valores de min_score_bot a probar
+        umbrales_humano: Valores de min_score_humano a probar
+        total: Número real de perfiles de entrada (por defecto len(scores)); los
+            perfiles que no se pudieron puntuar cuentan como inciertos
+
+    Returns:
+        Dict con matrices 'bots', 'humanos', 'inciertos' (conteos) y
+        'pct_bots', 'pct_humanos', 'pct_inciertos' (sobre `total`)
+    """
+    scores = np.sort(np.asarray(scores, dtype=np.float64))
+    total = scores.size if total is None else total
+    bots, humanos = contar_por_umbrales(scores, umbrales_bot, umbrales_humano)
+    inciertos = total - bots - humanos
+    divisor = max(total, 1)
+    return {
+        'bots': bots,
+        'humanos': humanos,
+        'inciertos': inciertos,
+        'pct_bots': 100 * bots / divisor,
+        'pct_humanos': 100 * humanos / divisor,
+        'pct_inciertos': 100 * inciertos / divisor,
+    }
+
+
+def histograma_scores(scores):
+    """Valores distintos de score y su frecuencia (los pesos suelen ser múltiplos de 0.5)"""
+    return np.unique(np.asarray(scores, dtype=np.float64), return_counts=True)
@@ -3,6 +3,7 @@ Módulo para manejo seguro de archivos con validación de rutas.
 Previene ataques de path traversal, symlink attacks y acceso no autorizado.
 """
 import os
+from contextlib import contextmanager
 from pathlib import Path
 
 
@@ -139,6 +140,50 @@ class SecureFileHandler:
         else:
             return open(fd, modo, encoding=encoding)
     
+    @contextmanager
+    def abrir_escritura_atomica(self, ruta, modo='w', encoding='utf-8', permisos=0o600):
+        """
+        Escribe un archivo completo de forma atómica (context manager).
+        
+        Se escribe en un temporal del mismo directorio que sustituye al archivo
+        con os.replace() solo si el bloque termina sin errores. Quien tenga
+        abierto el archivo anterior (p. ej. el índice de web/local_store.py)
+        sigue leyendo esa versión entera, y nunca se ve uno a medio escribir.
+        
+        Args:
+            ruta: Ruta del archivo (relativa al base_dir o absoluta dentro de base_dir)
+            modo: Modo de apertura ('w' o 'wb')
+            encoding: Codificación del archivo (solo para modo texto)
+            permisos: Permisos del archivo (por defecto 0o600 = solo propietario)
+        
+        Yields:
+            File object del temporal
+        
+        Raises:
+            ValueError: Si la ruta no es segura o el modo no es de escritura completa
+        """
+        if modo not in ('w', 'wb'):
+            raise ValueError(f"Modo no soportado para escritura atómica: {modo}")
+        ruta_segura = self.validar_ruta(ruta)
+        ruta_segura.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        temporal = ruta_segura.with_name(f".{ruta_segura.name}.{os.getpid()}.tmp")
+        
+        # O_NOFOLLOW: no seguir un symlink plantado en el nombre del temporal
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_NOFOLLOW', 0)
+        fd = os.open(temporal, flags, permisos)
+        try:
+            with (open(fd, modo) if 'b' in modo else open(fd, modo, encoding=encoding)) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, ruta_segura)
+        except BaseException:
+            try:
+                temporal.unlink()
+            except FileNotFoundError:
+                pass
+            raise
+    
     def existe(self, ruta):
         """
         Verifica si un archivo existe de forma segura.
@@ -78,24 +78,83 @@ class SecureModelHandler:
         
         # Verificar integridad si está habilitado
         if verificar_integridad:
-            checksum_esperado = self._obtener_checksum(nombre_archivo)
-            if checksum_esperado:
-                checksum_actual = self.calcular_checksum(ruta)
-                if checksum_actual != checksum_esperado:
-                    raise ValueError(
-                        f"⚠️ ALERTA DE SEGURIDAD: El archivo '{nombre_archivo}' ha sido modificado. "
-                        f"Checksum esperado: {checksum_esperado[:16]}..., "
-                        f"Checksum actual: {checksum_actual[:16]}... "
-                        f"No se cargará el modelo por seguridad."
-                    )
-            else:
-                print(f"⚠️ Advertencia: No hay checksum registrado para {nombre_archivo}. "
-                      f"Cargando sin verificación de integridad.")
+            self._verificar_integridad(nombre_archivo, ruta)
         
         # Cargar el modelo
         with open(ruta, 'rb') as f:
             return pickle.load(f)
     
+    def guardar_arrays(self, arrays, nombre_archivo, permisos=0o600):
+        """
+        Guarda un diccionario de arrays de NumPy (.npz) y registra su checksum.
+        
+        A diferencia de guardar_modelo no usa pickle: solo admite arrays
+        numéricos, booleanos o de texto.
+        
+        Args:
+            arrays: Dict nombre -> array
+            nombre_archivo: Nombre del archivo (ej: 'bot_detector_compilado.npz')
+            permisos: Permisos del archivo (por defecto solo propietario)
+        
+        Returns:
+            Path: Ruta donde se guardaron los arrays
+        """
+        import os
+        import numpy as np
+        
+        ruta = self.modelos_dir / nombre_archivo
+        self.modelos_dir.mkdir(parents=True, exist_ok=True)
+        
+        arrays = {k: np.asarray(v) for k, v in arrays.items()}
+        objetos = [k for k, v in arrays.items() if v.dtype.hasobject]
+        if objetos:
+            raise ValueError(f"Arrays con objetos de Python no permitidos: {objetos}")
+        
+        fd = os.open(ruta, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, permisos)
+        with open(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        
+        self._guardar_checksum(nombre_archivo, self.calcular_checksum(ruta))
+        return ruta
+    
+    def cargar_arrays(self, nombre_archivo, verificar_integridad=True):
+        """
+        Carga arrays guardados con guardar_arrays (sin permitir pickle).
+        
+        Returns:
+            Dict nombre -> array
+        
+        Raises:
+            ValueError: Si el archivo ha sido modificado
+            FileNotFoundError: Si el archivo no existe
+        """
+        import numpy as np
+        
+        ruta = self.modelos_dir / nombre_archivo
+        if not ruta.exists():
+            raise FileNotFoundError(f"Modelo no encontrado: {ruta}")
+        if verificar_integridad:
+            self._verificar_integridad(nombre_archivo, ruta)
+        
+        with np.load(ruta, allow_pickle=False) as datos:
+            return {k: datos[k] for k in datos.files}
+    
+    def _verificar_integridad(self, nombre_archivo, ruta):
+        """Compara el checksum de un archivo con el registrado (ValueError si difiere)"""
+        checksum_esperado = self._obtener_checksum(nombre_archivo)
+        if checksum_esperado:
+            checksum_actual = self.calcular_checksum(ruta)
+            if checksum_actual != checksum_esperado:
+                raise ValueError(
+                    f"⚠️ ALERTA DE SEGURIDAD: El archivo '{nombre_archivo}' ha sido modificado. "
+                    f"Checksum esperado: {checksum_esperado[:16]}..., "
+                    f"Checksum actual: {checksum_actual[:16]}... "
+                    f"No se cargará el modelo por seguridad."
+                )
+        else:
+            print(f"⚠️ Advertencia: No hay checksum registrado para {nombre_archivo}. "
+                  f"Cargando sin verificación de integridad.")
+    
     def _guardar_checksum(self, nombre_archivo, checksum):
         """Guarda el checksum de un archivo"""
         checksums = self._cargar_checksums()
@@ -0,0 +1,171 @@
+"""
+Arranque y memoria de gunicorn con y sin precarga del modelo
+
+Para cada modo (PRELOAD_MODEL=1 y PRELOAD_MODEL=0) lanza
+`gunicorn -c web/gunicorn.conf.py web.app:app` con N workers sobre un modelo
+sintético y mide:
+  - segundos hasta que todos los workers están listos (/readyz da 200 con
+    un pid por worker)
+  - latencia de la primera predicción (`POST /api/predict` con features)
+  - memoria por worker desde /proc: rss (cuenta las páginas compartidas en cada
+    worker), pss (las reparte entre los procesos que las comparten) y privada
+
+Uso:
+    python tests/benchmarks/benchmark_arranque.py
+    python tests/benchmarks/benchmark_arranque.py --workers 4 --arboles 500 --json arranque.json
+
+Requiere gunicorn y Linux (/proc).
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Añadir directorio raíz al path
+RAIZ = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+from seguridad.secure_model_handler import SecureModelHandler
+
+FEATURES = ['followers_count', 'following_count', 'posts_count', 'posts_per_day', 'avg_post_length']
+MODOS = {'preload': '1', 'sin_preload': '0'}
+
+
+def crear_modelo(directorio, arboles):
+    """Entrena y guarda (con checksums) un modelo sintético con `arboles` árboles"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, len(FEATURES)))
+    scaler = StandardScaler().fit(X)
+    model = xgb.XGBClassifier(n_estimators=arboles, max_depth=6).fit(scaler.transform(X), X[:, 3] > 0)
+    handler = SecureModelHandler(directorio)
+    handler.guardar_modelo(model, 'bot_detector.pkl')
+    handler.guardar_modelo(scaler, 'feature_scaler.pkl')
+    handler.guardar_modelo(FEATURES, 'feature_columns.pkl')
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _get(url, timeout=5):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, OSError):
+        return None, None
+
+
+def memoria(pid):
+    """rss, pss y privada (bytes) de un proceso según /proc/<pid>/smaps_rollup"""
+    campos = {'Rss': 'rss', 'Pss': 'pss', 'Private_Clean': 'privada', 'Private_Dirty': 'privada'}
+    resultado = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for linea in f:
+            nombre, _, resto = linea.partition(':')
+            if nombre in campos:
+                resultado[campos[nombre]] = resultado.get(campos[nombre], 0) + int(resto.split()[0]) * 1024
+    return resultado
+
+
+def hijos(pid):
+    ruta = Path(f'/proc/{pid}/task/{pid}/children')
+    return [int(p) for p in ruta.read_text().split()] if ruta.exists() else []
+
+
+def medir_modo(preload, workers, modelos_dir, timeout):
+    puerto = _puerto_libre()
+    entorno = dict(os.environ, PRELOAD_MODEL=preload, WEB_WORKERS=str(workers),
+                   BIND=f'127.0.0.1:{puerto}', MODELOS_DIR=str(modelos_dir))
+    inicio = time.perf_counter()
+    maestro = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'web/gunicorn.conf.py', 'web.app:app'],
+        cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f'http://127.0.0.1:{puerto}'
+        listos = set()
+        while len(listos) < workers:
+            if time.perf_counter() - inicio > timeout:
+                raise TimeoutError(f'Solo {len(listos)}/{workers} workers listos en {timeout} s')
+            if maestro.poll() is not None:
+                raise RuntimeError('gunicorn terminó durante el arranque')
+            status, estado = _get(f'{base}/readyz')
+            if status == 200:
+                listos.add(estado['pid'])
+            else:
+                time.sleep(0.05)
+        segundos_listo = time.perf_counter() - inicio
+
+        cuerpo = json.dumps({'features': {c: 1.0 for c in FEATURES}}).encode()
+        peticion = urllib.request.Request(f'{base}/api/predict', data=cuerpo,
+                                          headers={'Content-Type': 'application/json'})
+        t = time.perf_counter()
+        with urllib.request.urlopen(peticion, timeout=30) as respuesta:
+            respuesta.read()
+        primera_ms = (time.perf_counter() - t) * 1000
+
+        mem_maestro = memoria(maestro.pid)
+        por_worker = [memoria(pid) for pid in hijos(maestro.pid)]
+        return {
+            'segundos_hasta_listo': segundos_listo,
+            'primera_prediccion_ms': primera_ms,
+            'maestro': mem_maestro,
+            'workers': por_worker,
+            'pss_total_mb': (mem_maestro['pss'] + sum(m['pss'] for m in por_worker)) / 2**20,
+        }
+    finally:
+        maestro.send_signal(signal.SIGTERM)
+        maestro.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arranque y memoria de gunicorn con y sin precarga")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--arboles', type=int, default=300, help="Árboles del modelo sintético")
+    parser.add_argument('--modos', nargs='+', choices=MODOS, default=list(MODOS))
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--json', help="Guardar resultados en este archivo")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"ARRANQUE DE GUNICORN: {args.workers} workers, modelo de {args.arboles} árboles")
+    print("=" * 80)
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as modelos_dir:
+        crear_modelo(modelos_dir, args.arboles)
+        for modo in args.modos:
+            print(f"⏱️  {modo}...", flush=True)
+            r = medir_modo(MODOS[modo], args.workers, modelos_dir, args.timeout)
+            resultados[modo] = r
+            rss = [m['rss'] / 2**20 for m in r['workers']]
+            privada = [m['privada'] / 2**20 for m in r['workers']]
+            print(f"   listo en {r['segundos_hasta_listo']:.2f}s | primera predicción "
+                  f"{r['primera_prediccion_ms']:.1f} ms | PSS total {r['pss_total_mb']:.0f} MB")
+            print(f"   por worker: rss {', '.join(f'{x:.0f}' for x in rss)} MB | "
+                  f"privada {', '.join(f'{x:.0f}' for x in privada)} MB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': vars(args), 'modos': resultados}, f, indent=2)
+        print(f"\n💾 Resultados guardados en: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
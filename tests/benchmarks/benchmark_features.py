@@ -0,0 +1,256 @@
+"""
+Benchmarks de rendimiento de la extracción de features y el etiquetado
+
+Mide throughput (usuarios/s y posts/s) y pico de memoria (tracemalloc) de:
+  - extract_profile_features
+  - _calculate_avg_similarity
+  - HeuristicLabeler.label_profile (perfil a perfil) y label_batch (reglas vectorizadas)
+  - etiquetado completo (1_etiquetar_datos.py sobre un almacén sintético)
+
+Uso:
+    python tests/benchmarks/benchmark_features.py --escala pequena
+    python tests/benchmarks/benchmark_features.py --usuarios 5000 --posts-max 300 --json base.json
+    python tests/benchmarks/benchmark_features.py --escala pequena --comparar base.json --tolerancia 0.2
+
+Con --comparar, el proceso termina con código 1 si algún caso pierde más de
+`tolerancia` de throughput o aumenta su pico de memoria en más de `tolerancia`.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Añadir directorio raíz al path
+RAIZ = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from prediccion.utils.datos_sinteticos import generar_usuarios, escribir_almacen
+from prediccion.utils.feature_extraction import FeatureExtractor
+from prediccion.utils.heuristics import HeuristicLabeler
+
+# Escalas predefinidas: (usuarios, posts_min, posts_max)
+ESCALAS = {
+    'pequena': (1_000, 25, 100),
+    'mediana': (100_000, 25, 250),
+    'grande': (1_000_000, 25, 1_000),
+}
+
+CASOS = [
+    'extract_profile_features', 'calculate_avg_similarity', 'label_profile', 'label_batch',
+    'etiquetado_completo',
+]
+
+
+def _cargar_etiquetado():
+    """Importa scripts/1_etiquetar_datos.py (el nombre empieza por dígito)"""
+    ruta = RAIZ / 'prediccion' / 'scripts' / '1_etiquetar_datos.py'
+    spec = importlib.util.spec_from_file_location('etiquetar_datos', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# ── CASOS ──
+# Cada caso recibe los parámetros de generación y devuelve (segundos medidos, usuarios, posts).
+# Solo se cronometra la llamada medida, no la generación de datos sintéticos.
+
+def caso_extract_profile_features(parametros):
+    extractor = FeatureExtractor()
+    medido = 0.0
+    usuarios = posts_total = 0
+    for perfil, posts in generar_usuarios(**parametros):
+        inicio = time.perf_counter()
+        extractor.extract_profile_features(perfil, posts)
+        medido += time.perf_counter() - inicio
+        usuarios += 1
+        posts_total += len(posts)
+    return medido, usuarios, posts_total
+
+
+def caso_calculate_avg_similarity(parametros):
+    extractor = FeatureExtractor()
+    medido = 0.0
+    usuarios = posts_total = 0
+    for _, posts in generar_usuarios(**parametros):
+        textos = [p['text'] for p in posts]
+        inicio = time.perf_counter()
+        extractor._calculate_avg_similarity(textos)
+        medido += time.perf_counter() - inicio
+        usuarios += 1
+        posts_total += len(posts)
+    return medido, usuarios, posts_total
+
+
+def caso_label_profile(parametros):
+    labeler = HeuristicLabeler(_cargar_etiquetado().cargar_config()['heuristicas'])
+    extractor = FeatureExtractor(labeler.features_requeridas)
+    medido = 0.0
+    usuarios = posts_total = 0
+    for perfil, posts in generar_usuarios(**parametros):
+        features = extractor.extract_profile_features(perfil, posts)
+        inicio = time.perf_counter()
+        labeler.label_profile(features)
+        medido += time.perf_counter() - inicio
+        usuarios += 1
+        posts_total += len(posts)
+    return medido, usuarios, posts_total
+
+
+def caso_label_batch(parametros, tamano_bloque=5000):
+    labeler = HeuristicLabeler(_cargar_etiquetado().cargar_config()['heuristicas'])
+    extractor = FeatureExtractor(labeler.features_requeridas)
+    medido = 0.0
+    usuarios = posts_total = 0
+    bloque = []
+    for perfil, posts in generar_usuarios(**parametros):
+        bloque.append(extractor.extract_profile_features(perfil, posts))
+        usuarios += 1
+        posts_total += len(posts)
+        if len(bloque) == tamano_bloque:
+            inicio = time.perf_counter()
+            labeler.label_batch(bloque)
+            medido += time.perf_counter() - inicio
+            bloque = []
+    if bloque:
+        inicio = time.perf_counter()
+        labeler.label_batch(bloque)
+        medido += time.perf_counter() - inicio
+    return medido, usuarios, posts_total
+
+
+def caso_etiquetado_completo(parametros):
+    etiquetar = _cargar_etiquetado()
+    config = etiquetar.cargar_config()
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_profiles, ruta_posts = escribir_almacen(tmp, parametros['num_usuarios'], **{
+            k: v for k, v in parametros.items() if k != 'num_usuarios'
+        })
+        config['rutas'] = dict(
+            config['rutas'],
+            profiles_input=str(ruta_profiles),
+            posts_input=str(ruta_posts),
+            dataset_etiquetado=str(Path(tmp) / 'dataset_etiquetado.parquet'),
+        )
+        config['duplicados'] = dict(config.get('duplicados') or {}, habilitado=False)
+
+        etiquetados = {'total': 0, 'bots': 0, 'humanos': 0, 'inciertos': 0, 'errores': 0}
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            profiles, posts_data = etiquetar.cargar_datos(config)
+            with posts_data:
+                filas = etiquetar.etiquetar_perfiles(profiles, posts_data, config, etiquetados)
+                etiquetar.guardar_dataset(filas, config)
+        medido = time.perf_counter() - inicio
+
+    usuarios = etiquetados['total']
+    posts_total = sum(len(posts) for _, posts in generar_usuarios(**parametros))
+    return medido, usuarios, posts_total
+
+
+def ejecutar_caso(nombre, parametros, medir_memoria=True):
+    """Ejecuta un caso y devuelve sus métricas"""
+    funcion = globals()[f'caso_{nombre}']
+    medido, usuarios, posts_total = funcion(parametros)
+    resultado = {
+        'segundos': medido,
+        'usuarios': usuarios,
+        'posts': posts_total,
+        'usuarios_por_segundo': usuarios / medido if medido else float('inf'),
+        'posts_por_segundo': posts_total / medido if medido else float('inf'),
+        'pico_memoria_mb': None,
+    }
+    if medir_memoria:
+        # Segunda pasada con tracemalloc (ralentiza, por eso no se usa para el tiempo).
+        # El pico incluye los datos sintéticos del usuario en curso.
+        tracemalloc.start()
+        try:
+            funcion(parametros)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        resultado['pico_memoria_mb'] = pico / 1024 / 1024
+    return resultado
+
+
+def comparar(resultados, base, tolerancia):
+    """Devuelve la lista de regresiones respecto a un JSON de resultados anterior"""
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anterior = base.get('casos', {}).get(nombre)
+        if anterior is None:
+            continue
+        if actual['usuarios_por_segundo'] < anterior['usuarios_por_segundo'] * (1 - tolerancia):
+            regresiones.append(
+                f"{nombre}: throughput {actual['usuarios_por_segundo']:.1f} < "
+                f"{anterior['usuarios_por_segundo']:.1f} usuarios/s"
+            )
+        if actual['pico_memoria_mb'] and anterior.get('pico_memoria_mb') and \
+                actual['pico_memoria_mb'] > anterior['pico_memoria_mb'] * (1 + tolerancia):
+            regresiones.append(
+                f"{nombre}: memoria {actual['pico_memoria_mb']:.1f} > {anterior['pico_memoria_mb']:.1f} MB"
+            )
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de extracción de features y etiquetado")
+    parser.add_argument('--escala', choices=ESCALAS, default='pequena', help="Escala predefinida")
+    parser.add_argument('--usuarios', type=int, help="Número de usuarios (sobrescribe la escala)")
+    parser.add_argument('--posts-min', type=int, help="Mínimo de posts por usuario")
+    parser.add_argument('--posts-max', type=int, help="Máximo de posts por usuario")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--casos', nargs='+', choices=CASOS, default=CASOS)
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir el pico de memoria")
+    parser.add_argument('--json', help="Guardar resultados en este archivo")
+    parser.add_argument('--comparar', help="JSON de resultados de referencia")
+    parser.add_argument('--tolerancia', type=float, default=0.2, help="Regresión máxima permitida (fracción)")
+    args = parser.parse_args()
+
+    usuarios, posts_min, posts_max = ESCALAS[args.escala]
+    parametros = {
+        'num_usuarios': args.usuarios or usuarios,
+        'posts_min': args.posts_min or posts_min,
+        'posts_max': args.posts_max or posts_max,
+        'semilla': args.semilla,
+    }
+
+    print("=" * 80)
+    print("BENCHMARK DE FEATURES Y ETIQUETADO")
+    print("=" * 80)
+    print(f"Usuarios: {parametros['num_usuarios']:,} | "
+          f"Posts por usuario: {parametros['posts_min']}-{parametros['posts_max']}\n")
+
+    resultados = {}
+    for nombre in args.casos:
+        print(f"⏱️  {nombre}...", flush=True)
+        r = ejecutar_caso(nombre, parametros, medir_memoria=not args.sin_memoria)
+        resultados[nombre] = r
+        memoria = f"{r['pico_memoria_mb']:.1f} MB" if r['pico_memoria_mb'] is not None else "-"
+        print(f"   {r['segundos']:.2f}s | {r['usuarios_por_segundo']:,.1f} usuarios/s | "
+              f"{r['posts_por_segundo']:,.0f} posts/s | pico {memoria}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': parametros, 'casos': resultados}, f, indent=2)
+        print(f"\n💾 Resultados guardados en: {args.json}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print("\n❌ Regresiones detectadas:")
+            for regresion in regresiones:
+                print(f"  • {regresion}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones respecto a la referencia")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Prueba de carga de la web: modo síncrono (WSGI) frente a modo asíncrono (ASGI)
+
+Levanta un único worker de cada modo en este proceso y le lanza peticiones
+concurrentes a `POST /api/predict` con handles distintos (todas fallan en la
+caché, así que todas descargan):
+  - sync: la app Flask en un servidor WSGI de un solo hilo, como un worker
+    sync de gunicorn (una petición a la vez)
+  - async: web/asgi.py en uvicorn, como un worker de `uvicorn web.asgi:app`
+
+Bluesky se simula con una latencia fija por cuenta (time.sleep en modo sync,
+asyncio.sleep en modo async) y perfiles/posts sintéticos; el modelo es un
+XGBoost pequeño entrenado al vuelo. No hace falta conexión ni credenciales.
+
+Uso:
+    python tests/benchmarks/benchmark_servidor.py
+    python tests/benchmarks/benchmark_servidor.py --peticiones 400 --concurrencia 100 --latencia-ms 300
+    python tests/benchmarks/benchmark_servidor.py --modos async --json async.json
+
+Requiere uvicorn para el modo async (pip install -r requirements.txt).
+"""
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+# Añadir directorio raíz al path
+RAIZ = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+import web.app as web_app
+from prediccion.utils.datos_sinteticos import generar_usuarios
+from web.asgi import AsyncServer
+from web.cache import CacheStore
+from web.cache_backends import MemoryBackend
+from web.model_cache import ModelBundle
+
+MODOS = ['sync', 'async']
+FEATURES = ['followers_count', 'following_count', 'posts_count', 'posts_per_day', 'avg_post_length']
+
+
+def preparar_app(latencia, num_perfiles=200):
+    """Modelo sintético, caché en memoria y descarga simulada en web.app"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, len(FEATURES))), columns=FEATURES)
+    scaler = StandardScaler().fit(X)
+    model = xgb.XGBClassifier(n_estimators=50, max_depth=4).fit(scaler.transform(X), X['posts_per_day'] > 0)
+    bundle = ModelBundle(model, scaler, FEATURES, None, None, (), time.time(), 'benchmark')
+
+    usuarios = list(generar_usuarios(num_perfiles, posts_min=25, posts_max=25))
+
+    def cuenta(actor):
+        perfil, posts = usuarios[hash(actor) % len(usuarios)]
+        return {**perfil, 'did': f'did:plc:{actor}', 'handle': actor}, posts, True
+
+    def fetch_user(actor):
+        time.sleep(latencia)
+        return cuenta(actor)
+
+    web_app.get_model_cache = lambda: SimpleNamespace(get=lambda: bundle)
+    web_app.fetch_user = fetch_user
+    web_app.PREDICTION_CACHE = CacheStore(
+        MemoryBackend(max_entries=100_000), ttls={'prediction': 600, 'feed': 600, 'handle': 600}, refresh_ahead=1.0
+    )
+    return cuenta
+
+
+class _ServidorSync(WSGIServer):
+    # Cola de conexiones amplia: las peticiones esperan como en el backlog de gunicorn
+    request_queue_size = 1024
+
+
+class _Silencioso(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def servidor_sync(puerto):
+    servidor = make_server('127.0.0.1', puerto, web_app.app, server_class=_ServidorSync, handler_class=_Silencioso)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    return servidor.shutdown
+
+
+def servidor_async(puerto, latencia, cuenta, hilos):
+    import uvicorn
+
+    class ServidorSimulado(AsyncServer):
+        async def fetch_user(self, identifier):
+            await asyncio.sleep(latencia)
+            return cuenta(identifier)
+
+    config = uvicorn.Config(ServidorSimulado(web_app.app, threads=hilos), host='127.0.0.1', port=puerto,
+                            log_level='warning', lifespan='on')
+    servidor = uvicorn.Server(config)
+    servidor.install_signal_handlers = lambda: None
+    hilo = threading.Thread(target=servidor.run, daemon=True)
+    hilo.start()
+    while not servidor.started:
+        time.sleep(0.01)
+
+    def parar():
+        servidor.should_exit = True
+        hilo.join()
+    return parar
+
+
+def lanzar_carga(puerto, modo, peticiones, concurrencia, timeout):
+    """Lanza las peticiones con `concurrencia` clientes; devuelve las métricas"""
+    url = f'http://127.0.0.1:{puerto}/api/predict'
+
+    def una(i):
+        cuerpo = json.dumps({'identifier': f'{modo}{i}.bsky.social'}).encode()
+        req = urllib.request.Request(url, data=cuerpo, headers={'Content-Type': 'application/json'})
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as respuesta:
+                ok = respuesta.status == 200 and json.loads(respuesta.read())['source'] == 'api'
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return time.perf_counter() - inicio, ok
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(concurrencia) as pool:
+        resultados = list(pool.map(una, range(peticiones)))
+    total = time.perf_counter() - inicio
+
+    latencias = np.array([t for t, ok in resultados if ok])
+    return {
+        'segundos': total,
+        'peticiones': peticiones,
+        'errores': sum(not ok for _, ok in resultados),
+        'peticiones_por_segundo': len(latencias) / total,
+        'latencia_p50_ms': float(np.percentile(latencias, 50) * 1000) if len(latencias) else None,
+        'latencia_p95_ms': float(np.percentile(latencias, 95) * 1000) if len(latencias) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga: worker síncrono frente a asíncrono")
+    parser.add_argument('--modos', nargs='+', choices=MODOS, default=MODOS)
+    parser.add_argument('--peticiones', type=int, default=100)
+    parser.add_argument('--concurrencia', type=int, default=50, help="Clientes simultáneos")
+    parser.add_argument('--latencia-ms', type=float, default=200, help="Latencia simulada de Bluesky por cuenta")
+    parser.add_argument('--hilos', type=int, default=16, help="Hilos de puntuación del modo async (ASYNC_THREADS)")
+    parser.add_argument('--timeout', type=float, default=300, help="Timeout de cada petición (segundos)")
+    parser.add_argument('--json', help="Guardar resultados en este archivo")
+    args = parser.parse_args()
+
+    latencia = args.latencia_ms / 1000
+    cuenta = preparar_app(latencia)
+
+    print("=" * 80)
+    print("PRUEBA DE CARGA: SYNC vs ASYNC (un worker)")
+    print("=" * 80)
+    print(f"Peticiones: {args.peticiones} | Concurrencia: {args.concurrencia} | "
+          f"Latencia de Bluesky: {args.latencia_ms:.0f} ms\n")
+
+    resultados = {}
+    for modo in args.modos:
+        puerto = _puerto_libre()
+        parar = servidor_sync(puerto) if modo == 'sync' else servidor_async(puerto, latencia, cuenta, args.hilos)
+        try:
+            print(f"⏱️  {modo}...", flush=True)
+            r = lanzar_carga(puerto, modo, args.peticiones, args.concurrencia, args.timeout)
+        finally:
+            parar()
+        resultados[modo] = r
+        p50 = f"{r['latencia_p50_ms']:.0f}" if r['latencia_p50_ms'] is not None else "-"
+        p95 = f"{r['latencia_p95_ms']:.0f}" if r['latencia_p95_ms'] is not None else "-"
+        print(f"   {r['segundos']:.2f}s | {r['peticiones_por_segundo']:,.1f} peticiones/s | "
+              f"p50 {p50} ms | p95 {p95} ms | errores {r['errores']}")
+
+    if 'sync' in resultados and 'async' in resultados and resultados['sync']['peticiones_por_segundo']:
+        mejora = resultados['async']['peticiones_por_segundo'] / resultados['sync']['peticiones_por_segundo']
+        print(f"\n🚀 Async: {mejora:.1f}× peticiones/s por worker")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': vars(args), 'modos': resultados}, f, indent=2)
+        print(f"\n💾 Resultados guardados en: {args.json}")
+
+    if web_app.BATCHER is not None:
+        web_app.BATCHER.close()
+
+
+if __name__ == "__main__":
+    main()
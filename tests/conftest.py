@@ -2,6 +2,78 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Añadir el directorio raíz del proyecto al path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
+
+COLUMNAS_SINTETICAS = ['followers_count', 'posts_count']
+
+
+@pytest.fixture
+def crear_bundle():
+    """
+    Fábrica de ModelBundle con un XGBoost sintético de 3 árboles (la etiqueta es
+    el signo de la primera columna). Uso: crear_bundle(cols=..., model_id=...)
+    """
+    import numpy as np
+    import pandas as pd
+    import xgboost as xgb
+    from sklearn.preprocessing import StandardScaler
+    from web.model_cache import ModelBundle
+
+    def crear(cols=COLUMNAS_SINTETICAS, model_id='modelo'):
+        cols = list(cols)
+        X = pd.DataFrame(np.random.default_rng(0).normal(size=(100, len(cols))), columns=cols)
+        scaler = StandardScaler().fit(X)
+        model = xgb.XGBClassifier(n_estimators=3).fit(scaler.transform(X), X[cols[0]] > 0)
+        return ModelBundle(model, scaler, cols, None, None, (), 0.0, model_id)
+
+    return crear
+
+
+@pytest.fixture
+def crear_modelos():
+    """
+    Fábrica de directorios de modelos: guarda con SecureModelHandler (con
+    checksums) bot_detector.pkl, feature_scaler.pkl y feature_columns.pkl de un
+    XGBoost sintético. Uso: crear_modelos(directorio, cols=...) -> directorio
+    """
+    import numpy as np
+    import xgboost as xgb
+    from sklearn.preprocessing import StandardScaler
+    from seguridad.secure_model_handler import SecureModelHandler
+
+    def crear(directorio, cols=COLUMNAS_SINTETICAS):
+        X = np.random.default_rng(0).normal(size=(200, len(cols)))
+        handler = SecureModelHandler(directorio)
+        handler.guardar_modelo(xgb.XGBClassifier(n_estimators=3).fit(X, X[:, 0] > 0), 'bot_detector.pkl')
+        handler.guardar_modelo(StandardScaler().fit(X), 'feature_scaler.pkl')
+        handler.guardar_modelo(list(cols), 'feature_columns.pkl')
+        return directorio
+
+    return crear
+
+
+@pytest.fixture
+def web_app_aislada(tmp_path, monkeypatch):
+    """
+    web.app con caché de predicciones en memoria, SingleFlight y micro-batcher
+    nuevos y el almacén local apuntando a una carpeta vacía (sin llamar a la API
+    ni leer almacen/ del repositorio). Cierra el micro-batcher al terminar.
+    """
+    import web.app as web_app
+    from web.cache import CacheStore
+    from web.cache_backends import MemoryBackend
+    from web.local_store import LocalStore
+    from web.singleflight import SingleFlight
+
+    monkeypatch.setattr(web_app, 'PREDICTION_CACHE', CacheStore(
+        MemoryBackend(), ttls={'prediction': 60, 'feed': 60, 'handle': 60}, refresh_ahead=1.0))
+    monkeypatch.setattr(web_app, 'SINGLE_FLIGHT', SingleFlight())
+    monkeypatch.setattr(web_app, 'LOCAL_STORE', LocalStore(tmp_path / 'almacen_vacio', max_age=3600))
+    monkeypatch.setattr(web_app, 'BATCHER', None)
+    yield web_app
+    if web_app.BATCHER is not None:
+        web_app.BATCHER.close()
@@ -0,0 +1,169 @@
+"""Tests minimalistas para la ruta rápida desde el almacén local."""
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from prediccion.utils.estadisticas_incrementales import actualizar_entrada
+from seguridad.secure_file_handler import SecureFileHandler
+from web.local_store import LocalStore
+
+POSTS = [
+    {'uri': 'at://1', 'text': 'hola mundo', 'createdAt': '2024-01-01T10:00:00Z', 'likeCount': 2, 'replyCount': 1},
+    {'uri': 'at://2', 'text': 'mira http://x.y', 'createdAt': '2024-01-01T12:00:00Z', 'likeCount': 0, 'replyCount': 0},
+]
+
+
+def escribir_almacen(directorio, horas=1.0):
+    """Dos cuentas: alice con posts descargados hace `horas` y bob sin entrada de posts."""
+    alice = {'did': 'did:plc:alice', 'handle': 'Alice.bsky.social', 'followers_count': 10, 'posts_count': 2}
+    bob = {'did': 'did:plc:bob', 'handle': 'bob.bsky.social'}
+    entrada = actualizar_entrada({'profile': alice, 'posts': []}, POSTS)
+    entrada['descargado_en'] = (datetime.now(timezone.utc) - timedelta(hours=horas)).isoformat()
+    (directorio / 'profiles_to_scan.json').write_text(json.dumps([alice, bob]), encoding='utf-8')
+    (directorio / 'posts_usuarios.json').write_text(json.dumps({alice['did']: entrada}), encoding='utf-8')
+
+
+class TestLocalStore:
+    """Tests de LocalStore."""
+
+    def test_entrada_fresca_por_handle_y_did(self, tmp_path):
+        """Test: Se resuelve el handle, se calcula la edad y se dan las features precalculadas."""
+        escribir_almacen(tmp_path, horas=1)
+        store = LocalStore(tmp_path, max_age=3600 * 2, background=False)
+
+        entrada = store.get('alice.bsky.social')
+        assert entrada['profile']['did'] == 'did:plc:alice'
+        assert len(entrada['posts']) == 2
+        assert entrada['age'] == pytest.approx(3600, abs=60)
+        assert entrada['features']['url_ratio'] == 0.5
+        assert store.get('did:plc:alice')['profile']['handle'] == 'Alice.bsky.social'
+
+        assert store.get('bob.bsky.social') is None
+        assert store.get('did:plc:nadie') is None
+        assert store.stats()['hit'] == 2 and store.stats()['missing'] == 2
+        assert store.stats()['handles'] == 1
+
+    def test_entrada_antigua_y_sin_marca(self, tmp_path):
+        """Test: Pasada la ventana no se sirve; sin marca es antigua aunque el archivo sea reciente."""
+        escribir_almacen(tmp_path, horas=5)
+        assert LocalStore(tmp_path, max_age=3600, background=False).get('did:plc:alice') is None
+
+        datos = json.loads((tmp_path / 'posts_usuarios.json').read_text(encoding='utf-8'))
+        del datos['did:plc:alice']['descargado_en']
+        (tmp_path / 'posts_usuarios.json').write_text(json.dumps(datos), encoding='utf-8')
+        store = LocalStore(tmp_path, max_age=3600, background=False)
+        assert store.get('did:plc:alice') is None
+        assert store.stats()['stale'] == 1
+
+    def test_archivo_reescrito_en_sitio(self, tmp_path):
+        """Test: Si el crawler reescribe el archivo tras indexarlo se va a la API hasta reindexar, sin excepciones."""
+        escribir_almacen(tmp_path, horas=1)
+        store = LocalStore(tmp_path, max_age=3600 * 2, check_interval=3600, background=False)
+        assert store.available()
+
+        ruta = tmp_path / 'posts_usuarios.json'
+        inodo = ruta.stat().st_ino
+        datos = json.loads(ruta.read_text(encoding='utf-8'))
+        nuevo = json.dumps({'did:plc:otro': {'profile': {'did': 'did:plc:otro'}, 'posts': POSTS * 50}, **datos})
+        with open(ruta, 'w', encoding='utf-8') as f:  # O_TRUNC: mismo inodo, offsets distintos
+            f.write(nuevo[:len(nuevo) // 2])
+        assert ruta.stat().st_ino == inodo
+        assert store.get('alice.bsky.social') is None
+        assert store.get('did:plc:alice') is None  # A medio escribir: no se puede reindexar todavía
+
+        ruta.write_text(nuevo, encoding='utf-8')
+        assert store.get('did:plc:alice')['profile']['did'] == 'did:plc:alice'
+        assert store.stats()['missing'] == 2 and store.stats()['hit'] == 1
+
+    def test_reindexa_al_cambiar(self, tmp_path):
+        """Test: Sin archivos no hay almacén; al aparecer o cambiar se vuelve a indexar."""
+        store = LocalStore(tmp_path, max_age=3600 * 2, check_interval=0, background=False)
+        assert not store.available()
+
+        escribir_almacen(tmp_path, horas=1)
+        assert store.available() and store.stats()['entries'] == 1
+        escribir_almacen(tmp_path, horas=3)
+        despues = datetime.now().timestamp() + 10
+        os.utime(tmp_path / 'posts_usuarios.json', (despues, despues))
+        assert store.get('did:plc:alice') is None
+        assert store.stats()['rebuilds'] == 2
+
+    def test_reemplazo_atomico_en_segundo_plano(self, tmp_path, monkeypatch):
+        """Test: Con reemplazo atómico se sigue leyendo la versión anterior mientras se indexa la nueva en segundo plano."""
+        import web.local_store as local_store
+
+        escribir_almacen(tmp_path, horas=1)
+        store = LocalStore(tmp_path, max_age=3600 * 2, check_interval=0)
+        store.available()  # Arranca la primera indexación en segundo plano
+        store.wait(5)
+        assert store.available()
+        assert store.get('alice.bsky.social')['posts'] == POSTS
+
+        puerta = threading.Event()
+        original = local_store._Index
+
+        def indexar_despacio(*args):
+            puerta.wait(5)
+            return original(*args)
+
+        monkeypatch.setattr(local_store, '_Index', indexar_despacio)
+        ruta = tmp_path / 'posts_usuarios.json'
+        datos = json.loads(ruta.read_text(encoding='utf-8'))
+        nuevo = {'uri': 'at://3', 'text': 'post nuevo', 'createdAt': '2024-01-02T10:00:00Z'}
+        datos = {'did:plc:otro': {'profile': {'did': 'did:plc:otro'}, 'posts': POSTS * 50},
+                 'did:plc:alice': actualizar_entrada(datos['did:plc:alice'], [nuevo])}
+        with SecureFileHandler(tmp_path).abrir_escritura_atomica('posts_usuarios.json') as f:
+            json.dump(datos, f)
+
+        assert store.get('did:plc:alice')['posts'] == POSTS  # Versión anterior, completa
+        assert store.stats()['building']
+        puerta.set()
+        store.wait(5)
+        assert len(store.get('did:plc:alice')['posts']) == 3
+        assert store.stats()['rebuilds'] == 2 and store.stats()['missing'] == 0
+
+
+class TestRutaLocal:
+    """Tests de la ruta almacén local -> API en web/app.py."""
+
+    @pytest.fixture
+    def web_app(self, tmp_path, monkeypatch, web_app_aislada, crear_bundle):
+        web_app = web_app_aislada
+        bundle = crear_bundle(cols=['followers_count', 'posts_count', 'url_ratio'])
+
+        llamadas = []
+
+        def fetch_user(actor):
+            llamadas.append(actor)
+            return {'did': 'did:plc:alice', 'handle': 'alice.bsky.social'}, POSTS, True
+
+        monkeypatch.setattr(web_app, 'fetch_user', fetch_user)
+        monkeypatch.setattr(web_app, 'get_model_cache', lambda: SimpleNamespace(get=lambda: bundle))
+        monkeypatch.setattr(web_app, 'LOCAL_STORE', LocalStore(tmp_path, max_age=3600 * 2, background=False))
+        monkeypatch.setattr(web_app, 'llamadas', llamadas, raising=False)
+        return web_app
+
+    def test_almacen_antes_que_api(self, web_app, tmp_path):
+        """Test: Una cuenta fresca en el almacén se puntúa sin llamar a la API."""
+        escribir_almacen(tmp_path, horas=1)
+        client = web_app.app.test_client()
+        respuesta = client.post('/api/predict', json={'identifier': '@Alice.bsky.social'})
+
+        assert respuesta.status_code == 200
+        assert respuesta.json['source'] == 'local'
+        assert respuesta.json['data_age'] == pytest.approx(3600, abs=60)
+        assert respuesta.json['features']['url_ratio'] == 0.5
+        assert respuesta.json['features']['followers_count'] == 10
+        assert web_app.llamadas == []
+        assert client.get('/api/cache/stats').json['local_store']['hit'] == 1
+        assert 'bluesky_web_local_store_lookups_total{outcome="hit"} 1' in client.get('/metrics').get_data(as_text=True)
+
+    def test_almacen_antiguo_va_a_la_api(self, web_app, tmp_path):
+        """Test: Con datos fuera de la ventana de frescura se consulta la API."""
+        escribir_almacen(tmp_path, horas=3)
+        respuesta = web_app.app.test_client().post('/api/predict', json={'identifier': 'alice.bsky.social'})
+
+        assert respuesta.json['source'] == 'api'
+        assert web_app.llamadas == ['alice.bsky.social']
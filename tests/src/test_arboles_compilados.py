@@ -0,0 +1,71 @@
+"""Tests minimalistas para el modelo compilado a arrays de NumPy."""
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+from seguridad.secure_model_handler import SecureModelHandler
+from prediccion.utils.arboles_compilados import (
+    PredictorCompilado, cargar_compilado, compilar_modelo, exportar, filas_frontera, plegar_umbrales
+)
+
+
+class TestArbolesCompilados:
+    """Tests de exportar y PredictorCompilado."""
+
+    @pytest.fixture
+    def modelo(self):
+        rng = np.random.default_rng(0)
+        cols = ['followers_ratio', 'posts_per_day', 'account_age_days', 'has_avatar']
+        X = rng.normal(size=(3000, 4)) * [1.0, 40.0, 300.0, 0.5] + [1.0, 20.0, 900.0, 0.5]
+        X[rng.random(X.shape) < 0.05] = np.nan
+        y = ((np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) / 40 + rng.normal(size=3000)) > 1.2).astype(int)
+        scaler = StandardScaler().fit(pd.DataFrame(X, columns=cols))
+        model = xgb.XGBClassifier(n_estimators=40, max_depth=4, subsample=0.8).fit(
+            scaler.transform(pd.DataFrame(X, columns=cols)), y
+        )
+        return model, scaler, cols, X
+
+    def test_plegar_umbrales(self):
+        """Test: x < T equivale a comparar el valor escalado en float32 con el umbral."""
+        umbrales = np.array([0.5, -1.25, 3.0], dtype=np.float32)
+        media, escala = np.array([10.0, 0.3, -7.0]), np.array([3.0, 0.1, 1e-3])
+        T = plegar_umbrales(umbrales, media, escala)
+        for x in (T, np.nextafter(T, -np.inf)):
+            escalado = ((x - media) / escala).astype(np.float32)
+            assert np.array_equal(x < T, escalado < umbrales)
+
+    def test_bit_a_bit(self, modelo):
+        """Test: Las probabilidades coinciden bit a bit con predict_proba (NaN y umbrales incluidos)."""
+        model, scaler, cols, X = modelo
+        arrays, verificacion = compilar_modelo(model, scaler, cols, X)
+        assert verificacion['filas'] > len(X)
+        assert verificacion['distintas'] == 0
+
+        predictor = PredictorCompilado(arrays)
+        X_prueba = np.vstack([X[:500], filas_frontera(predictor, X, max_filas=900)])
+        esperado = model.predict_proba(scaler.transform(pd.DataFrame(X_prueba, columns=cols)))
+        obtenido = predictor.predict_proba(X_prueba)
+        assert obtenido.dtype == np.float32
+        assert np.array_equal(obtenido.view(np.uint32), esperado.astype(np.float32).view(np.uint32))
+
+        fila = dict(zip(cols, X[0]))
+        assert np.array_equal(predictor.vector(fila), X[:1], equal_nan=True)
+        assert np.array_equal(predictor.escalar(X[:10]), scaler.transform(pd.DataFrame(X[:10], columns=cols)), equal_nan=True)
+
+    def test_guardar_y_cargar(self, modelo, tmp_path):
+        """Test: El artefacto se carga sin pickle y se ignora si el modelo cambió."""
+        model, scaler, cols, X = modelo
+        handler = SecureModelHandler(tmp_path)
+        handler.guardar_modelo(model, 'bot_detector.pkl')
+        arrays = exportar(model, scaler, cols)
+        arrays['checksum_modelo'] = np.array(handler.calcular_checksum(tmp_path / 'bot_detector.pkl'))
+        handler.guardar_arrays(arrays, 'bot_detector_compilado.npz')
+
+        predictor = cargar_compilado(handler)
+        assert predictor.feature_cols == cols
+        assert predictor.n_arboles == 40
+        assert np.array_equal(predictor.predict_proba(X[:50]), PredictorCompilado(arrays).predict_proba(X[:50]))
+
+        handler.guardar_modelo(xgb.XGBClassifier(n_estimators=2).fit(X[:50, :1], np.arange(50) % 2), 'bot_detector.pkl')
+        assert cargar_compilado(handler) is None
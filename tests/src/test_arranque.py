@@ -0,0 +1,78 @@
+"""Tests minimalistas para la precarga del modelo y /readyz."""
+import os
+import pytest
+from web.model_cache import ModelCache
+
+
+@pytest.fixture
+def web_app(tmp_path, monkeypatch, crear_modelos):
+    """web.app con un modelo sintético en tmp_path y el estado de arranque limpio."""
+    import web.app as web_app
+
+    crear_modelos(tmp_path)
+    monkeypatch.setattr(web_app, 'MODEL_CACHE', ModelCache(tmp_path))
+    monkeypatch.setattr(web_app, 'BATCHER', None)
+    monkeypatch.setattr(web_app, 'LOCAL_STORE', None)
+    monkeypatch.setattr(web_app, 'ALMACEN_DIR', tmp_path / 'almacen')
+    monkeypatch.setattr(web_app, 'STARTUP', dict(web_app.STARTUP, preloaded=False, load_seconds=None,
+                                                 warm_up_seconds=None, ready_at=None, error=None))
+    yield web_app
+    if web_app.BATCHER is not None:
+        web_app.BATCHER.close()
+
+
+class TestArranque:
+    """Tests de preload_model, warm_up y /readyz."""
+
+    def test_readyz_tras_calentar(self, web_app, tmp_path):
+        """Test: /readyz carga el modelo, hace una inferencia de prueba y no la repite."""
+        client = web_app.app.test_client()
+        respuesta = client.get('/readyz')
+        assert respuesta.status_code == 200
+        estado = respuesta.json
+        assert estado['ready'] and not estado['preloaded']
+        assert estado['load_seconds'] > 0 and estado['warm_up_seconds'] > 0
+        assert estado['memory']['rss'] > 0
+        assert web_app.BATCHER.stats()['rows'] == 1
+
+        assert client.get('/readyz').status_code == 200
+        assert web_app.BATCHER.stats()['rows'] == 1
+        texto = client.get('/metrics').get_data(as_text=True)
+        assert 'bluesky_web_startup_seconds{phase="warm_up"}' in texto
+        assert 'bluesky_web_process_memory_bytes{kind="rss"}' in texto
+
+    def test_cuenta_de_calentamiento(self, web_app):
+        """Test: El perfil de calentamiento usa las claves que lee el extractor (ninguna feature de perfil a 0)."""
+        from prediccion.utils.feature_extraction import FeatureExtractor
+
+        features = FeatureExtractor().extract_profile_features(web_app.WARM_UP_PROFILE, web_app.WARM_UP_POSTS)
+        for nombre in ('followers_count', 'following_count', 'posts_count', 'has_avatar',
+                       'bio_length', 'display_name_length', 'account_age_days'):
+            assert features[nombre] > 0, nombre
+
+    def test_no_listo_sin_modelo(self, web_app, tmp_path):
+        """Test: Sin artefactos /readyz responde 503 con el error."""
+        (tmp_path / 'bot_detector.pkl').unlink()
+        respuesta = web_app.app.test_client().get('/readyz')
+        assert respuesta.status_code == 503
+        assert not respuesta.json['ready'] and respuesta.json['error']
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="Requiere fork()")
+    def test_precarga_compartida_tras_fork(self, web_app):
+        """Test: El modelo precargado en el padre se usa en el hijo sin volver a cargarlo."""
+        web_app.preload_model()
+        bundle = web_app.MODEL_CACHE.get()
+        assert web_app.STARTUP['preloaded'] and web_app.MODEL_CACHE.reloads == 1
+
+        pid = os.fork()
+        if pid == 0:
+            codigo = 1
+            try:
+                web_app.worker_started(0.0)
+                web_app.warm_up()
+                ok = web_app.MODEL_CACHE.get() is bundle and web_app.MODEL_CACHE.reloads == 1
+                codigo = 0 if ok and web_app.STARTUP['load_seconds'] else 1
+            finally:
+                os._exit(codigo)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
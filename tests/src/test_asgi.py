@@ -0,0 +1,125 @@
+"""Tests minimalistas para el modo de servicio asíncrono (web/asgi.py)."""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from web.singleflight import AsyncSingleFlight
+
+
+async def peticion(app, method, path, body=b'', content_type='application/json'):
+    """Ejecuta una petición HTTP contra una app ASGI; devuelve (status, cuerpo)."""
+    enviado = []
+    mensajes = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+    async def receive():
+        return mensajes.pop(0) if mensajes else {'type': 'http.disconnect'}
+
+    async def send(mensaje):
+        enviado.append(mensaje)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'', 'http_version': '1.1',
+        'headers': [(b'content-type', content_type.encode()), (b'host', b'localhost')],
+    }
+    await app(scope, receive, send)
+    return enviado[0]['status'], enviado[1]['body']
+
+
+@pytest.fixture
+def servidor(monkeypatch, web_app_aislada, crear_bundle):
+    """AsyncServer con modelo sintético, caché en memoria y Bluesky simulado (0.2 s por cuenta)."""
+    from web.asgi import AsyncServer
+
+    web_app = web_app_aislada
+    bundle = crear_bundle()
+    monkeypatch.setattr(web_app, 'get_model_cache', lambda: SimpleNamespace(get=lambda: bundle))
+
+    servidor = AsyncServer(web_app.app, threads=2)
+    descargas = []
+
+    async def fetch_user(actor):
+        descargas.append(actor)
+        await asyncio.sleep(0.2)
+        return {'did': f'did:plc:{actor.split(".")[0]}', 'handle': actor, 'followers_count': 10}, [], True
+
+    servidor.fetch_user = fetch_user
+    servidor.descargas = descargas
+    yield servidor
+    servidor.pool.shutdown()
+
+
+class TestAsgi:
+    """Tests del servidor ASGI."""
+
+    def test_rutas_flask(self, servidor):
+        """Test: Las rutas sin descarga se sirven con la app Flask."""
+        status, cuerpo = asyncio.run(peticion(servidor, 'GET', '/healthz'))
+        assert (status, cuerpo) == (200, b'OK')
+        status, cuerpo = asyncio.run(peticion(servidor, 'POST', '/api/predict', b'{}'))
+        assert status == 400
+
+    def test_descargas_concurrentes(self, servidor):
+        """Test: Muchas descargas comparten un worker con solo 2 hilos."""
+        async def lanzar():
+            return await asyncio.gather(*[
+                peticion(servidor, 'POST', '/api/predict', json.dumps({'identifier': f'user{i}.bsky.social'}).encode())
+                for i in range(20)
+            ])
+
+        inicio = time.perf_counter()
+        respuestas = asyncio.run(lanzar())
+        # En serie serían 20 × 0.2 s; con 2 hilos bloqueados, 10 × 0.2 s
+        assert time.perf_counter() - inicio < 1.5
+        assert all(status == 200 for status, _ in respuestas)
+        resultados = [json.loads(cuerpo) for _, cuerpo in respuestas]
+        assert {r['handle'] for r in resultados} == {f'user{i}.bsky.social' for i in range(20)}
+        assert all(r['source'] == 'api' for r in resultados)
+
+        status, cuerpo = asyncio.run(peticion(
+            servidor, 'POST', '/api/predict', json.dumps({'identifier': '@User3.bsky.social'}).encode()))
+        assert json.loads(cuerpo)['source'] == 'cache'
+        assert len(servidor.descargas) == 20
+
+    def test_formulario_y_coalescencia(self, servidor):
+        """Test: El formulario usa la descarga asíncrona y una cuenta viral se descarga una vez."""
+        async def lanzar():
+            return await asyncio.gather(*[
+                peticion(servidor, 'POST', '/predict', b'identifier=viral.bsky.social',
+                         'application/x-www-form-urlencoded')
+                for _ in range(5)
+            ])
+
+        respuestas = asyncio.run(lanzar())
+        assert all(status == 200 and b'viral.bsky.social' in cuerpo for status, cuerpo in respuestas)
+        assert servidor.descargas == ['viral.bsky.social']
+        assert servidor.flight.stats()['followers'] == 4
+
+
+class TestAsyncSingleFlight:
+    """Tests de AsyncSingleFlight."""
+
+    def test_errores_y_timeout(self):
+        """Test: Los seguidores reciben el error del líder y pueden agotar su espera."""
+        vuelo = AsyncSingleFlight()
+
+        async def falla():
+            await asyncio.sleep(0.1)
+            raise ValueError('perfil no encontrado')
+
+        async def lenta():
+            await asyncio.sleep(0.3)
+            return 'ok'
+
+        async def escenario():
+            errores = await asyncio.gather(*[vuelo.do('x', falla) for _ in range(3)], return_exceptions=True)
+            lider = asyncio.ensure_future(vuelo.do('y', lenta))
+            await asyncio.sleep(0)
+            with pytest.raises(TimeoutError):
+                await vuelo.do('y', lenta, timeout=0.05)
+            return errores, await lider
+
+        errores, lider = asyncio.run(escenario())
+        assert all(isinstance(e, ValueError) for e in errores)
+        assert lider == ('ok', False)
+        assert vuelo.stats() == {'in_flight': 0, 'leaders': 2, 'followers': 3, 'timeouts': 1}
@@ -0,0 +1,42 @@
+"""Tests minimalistas para la búsqueda de hiperparámetros."""
+import json
+import numpy as np
+from prediccion.utils.busqueda import (
+    buscar_hiperparametros, guardar_mejores_parametros, parametros_xgboost, muestrear_candidatos
+)
+
+
+class TestBusquedaHiperparametros:
+    """Tests para successive halving con validación cruzada en paralelo."""
+
+    def test_muestrear_sin_repetir(self):
+        """Test: No se repiten combinaciones y no se piden más de las que existen."""
+        espacio = {'max_depth': [3, 4], 'learning_rate': [0.1, 0.2]}
+        candidatos = muestrear_candidatos(espacio, 10)
+        assert len(candidatos) == 4
+        assert len({tuple(sorted(c.items())) for c in candidatos}) == 4
+
+    def test_busqueda_y_uso_en_entrenamiento(self, tmp_path):
+        """Test: La búsqueda devuelve parámetros del espacio y el entrenamiento normal los aplica."""
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(600, 4)).astype(np.float32)
+        y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.5, size=600) > 0).astype(int)
+        cfg = {
+            'candidatos': 4, 'folds': 2, 'eta': 2, 'rondas_min': 10, 'rondas_max': 40,
+            'early_stopping_rounds': 5, 'procesos': 2,
+            'espacio': {'max_depth': [2, 3], 'learning_rate': [0.1, 0.3]},
+            'resultado': 'modelos/mejores_parametros.json',
+        }
+        resultado = buscar_hiperparametros(X, y, cfg, params_base={'random_state': 42, 'n_estimators': 100},
+                                           log=lambda *a: None)
+        assert resultado['params']['max_depth'] in (2, 3)
+        assert 1 <= resultado['params']['n_estimators'] <= 40
+        assert resultado['auc'] > 0.8
+        assert [len(r['resultados']) for r in resultado['historial']] == [4, 2, 1]
+
+        guardar_mejores_parametros(resultado, tmp_path / cfg['resultado'])
+        config = {'modelo': {'xgboost': {'max_depth': 6, 'random_state': 42}, 'busqueda': cfg}}
+        params = parametros_xgboost(config, tmp_path)
+        assert params['max_depth'] == resultado['params']['max_depth']
+        assert params['random_state'] == 42
+        assert json.loads((tmp_path / cfg['resultado']).read_text())['params'] == resultado['params']
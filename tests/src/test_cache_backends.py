@@ -0,0 +1,123 @@
+"""Tests minimalistas para el backend de caché compartido (protocolo Redis)."""
+import socketserver
+import threading
+import time
+import pytest
+from web.cache import CacheStore, decode_value, encode_value
+from web.cache_backends import MemoryBackend, RedisBackend, backend_from_url
+
+
+class ServidorRespFalso(socketserver.ThreadingTCPServer):
+    """Servidor mínimo que habla RESP (GET, SET PX, DEL, PING, AUTH, SELECT)."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, password=None):
+        super().__init__(('127.0.0.1', 0), ManejadorResp)
+        self.password = password
+        self.datos = {}
+        self.comandos = []
+
+
+class ManejadorResp(socketserver.StreamRequestHandler):
+    def leer_comando(self):
+        linea = self.rfile.readline()
+        if not linea:
+            return None
+        args = []
+        for _ in range(int(linea[1:-2])):
+            longitud = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(longitud + 2)[:-2])
+        return args
+
+    def handle(self):
+        servidor = self.server
+        autenticado = servidor.password is None
+        while (args := self.leer_comando()) is not None:
+            comando = args[0].upper().decode()
+            servidor.comandos.append(comando)
+            if comando == 'AUTH':
+                autenticado = args[-1].decode() == servidor.password
+                self.wfile.write(b'+OK\r\n' if autenticado else b'-WRONGPASS invalid password\r\n')
+            elif not autenticado:
+                self.wfile.write(b'-NOAUTH Authentication required.\r\n')
+            elif comando in ('PING', 'SELECT'):
+                self.wfile.write(b'+PONG\r\n' if comando == 'PING' else b'+OK\r\n')
+            elif comando == 'SET':
+                caduca = time.monotonic() + int(args[4]) / 1000 if len(args) > 4 else float('inf')
+                servidor.datos[args[1]] = (args[2], caduca)
+                self.wfile.write(b'+OK\r\n')
+            elif comando == 'GET':
+                valor, caduca = servidor.datos.get(args[1], (None, 0))
+                if valor is None or time.monotonic() >= caduca:
+                    self.wfile.write(b'$-1\r\n')
+                else:
+                    self.wfile.write(b'$%d\r\n%s\r\n' % (len(valor), valor))
+            elif comando == 'DEL':
+                self.wfile.write(b':%d\r\n' % int(servidor.datos.pop(args[1], None) is not None))
+            else:
+                self.wfile.write(b'-ERR unknown command\r\n')
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorRespFalso(password='secreto')
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+class TestCacheBackends:
+    """Tests de RedisBackend, MemoryBackend y la codificación de valores."""
+
+    def test_codificacion_comprimida(self):
+        """Test: Los valores grandes se comprimen y se recuperan con su fecha."""
+        grande = {'posts': ['texto repetido'] * 200}
+        datos = encode_value(grande, 123.0, compress_min_bytes=100)
+        assert datos[:1] == b'\x01' and len(datos) < 500
+        assert decode_value(datos) == (grande, 123.0)
+        assert decode_value(encode_value('did:plc:a', 5.0))[0] == 'did:plc:a'
+
+    def test_redis_compartido(self, servidor):
+        """Test: Dos réplicas comparten valores a través del servidor, con TTL y autenticación."""
+        url = f'redis://:secreto@127.0.0.1:{servidor.server_address[1]}/2'
+        replica_a = CacheStore(backend_from_url(url), ttls={'prediction': 60, 'feed': 0.2},
+                               compress_min_bytes=50)
+        replica_b = CacheStore(backend_from_url(url), ttls={'prediction': 60, 'feed': 0.2})
+        assert replica_a.backend.ping()
+
+        replica_a.set('prediction', 'did:plc:a', {'prob_bot': 0.8, 'features': list(range(50))})
+        replica_a.set('feed', 'did:plc:a', {'posts': []})
+        valor, edad = replica_b.get('prediction', 'did:plc:a')
+        assert valor['prob_bot'] == 0.8 and edad < 5
+        assert b'bsky:prediction:did:plc:a' in servidor.datos
+        assert {'AUTH', 'SELECT'} <= set(servidor.comandos)
+
+        time.sleep(0.25)
+        assert replica_b.get('feed', 'did:plc:a') is None
+        replica_b.delete('prediction', 'did:plc:a')
+        assert replica_a.get('prediction', 'did:plc:a') is None
+        assert replica_a.backend.stats()['errors'] == 0
+
+    def test_servidor_caido(self, servidor):
+        """Test: Sin servidor, las lecturas son fallos y no se reintenta durante retry_after."""
+        puerto = servidor.server_address[1]
+        servidor.shutdown()
+        servidor.server_close()
+        backend = RedisBackend(port=puerto, timeout=0.2, retry_after=60)
+        assert backend.get('x') is None
+        backend.set('x', b'1', 10)
+        assert backend.stats()['errors'] == 1 and not backend.stats()['available']
+
+    def test_backend_memoria(self):
+        """Test: El backend en memoria respeta el TTL de cada clave."""
+        backend = backend_from_url('memory://')
+        assert isinstance(backend, MemoryBackend)
+        backend.set('a', b'1', 0.05)
+        assert backend.get('a') == b'1'
+        time.sleep(0.06)
+        assert backend.get('a') is None
+        with pytest.raises(ValueError):
+            backend_from_url('memcached://localhost')
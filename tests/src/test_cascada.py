@@ -0,0 +1,59 @@
+"""Tests minimalistas para la inferencia en cascada."""
+import numpy as np
+import pytest
+import xgboost as xgb
+from seguridad.secure_model_handler import SecureModelHandler
+from prediccion.utils.cascada import ModeloCascada, calibrar_margen, cargar_cascada
+
+
+class TestCascada:
+    """Tests para ModeloCascada."""
+
+    @pytest.fixture
+    def datos(self):
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(3000, 4))
+        # Frontera no lineal + ruido: hay una banda donde el modelo lineal duda
+        y = ((X[:, 0] + 0.5 * X[:, 1] ** 2 + 0.3 * rng.normal(size=3000)) > 0.5).astype(int)
+        model = xgb.XGBClassifier(n_estimators=30, max_depth=3).fit(X[:2000], y[:2000])
+        return X, y, model
+
+    def test_calibrar_margen(self):
+        """Test: El margen deja en el camino rápido el prefijo más lejano que cumple el objetivo."""
+        distancias = np.array([5.0, 4.0, 3.0, 3.0, 1.0, 0.5])
+        acuerdos = np.array([True, True, True, False, True, False])
+        assert calibrar_margen(distancias, acuerdos, 1.0) == 3.0
+        assert calibrar_margen(distancias, acuerdos, 0.8) == 0.5
+        assert calibrar_margen(distancias, acuerdos, 0.0) == -1.0
+        assert calibrar_margen(distancias, ~acuerdos, 0.5) == float('inf')
+
+    def test_acuerdo_y_delegacion(self, datos):
+        """Test: El camino rápido cumple el acuerdo objetivo y la banda incierta usa XGBoost."""
+        X, y, model = datos
+        cascada = ModeloCascada(threshold=0.7, objetivo_acuerdo=0.99, margen_min=0.0)
+        cascada.ajustar(X[:2000], model.predict_proba(X[:2000])[:, 1])
+
+        metricas = cascada.evaluar(X[:2000], model, y[:2000])
+        assert metricas['acuerdo_rapida'] >= 0.99
+        assert 0 < metricas['fraccion_rapida'] < 1
+        assert cascada.contadores == {'rapida': 0, 'completa': 0}
+
+        prob, es_bot, rapida = cascada.resolver(X[2000:], model)
+        completo = model.predict_proba(X[2000:])[:, 1]
+        assert np.allclose(prob[~rapida], completo[~rapida])
+        assert np.array_equal(es_bot, prob > 0.7)
+        assert cascada.contadores['rapida'] == int(rapida.sum())
+        assert cascada.fraccion_rapida() == pytest.approx(rapida.mean())
+
+    def test_cascada_de_otro_modelo(self, datos, tmp_path):
+        """Test: Una cascada destilada de otro modelo no se carga."""
+        X, _, model = datos
+        handler = SecureModelHandler(tmp_path)
+        handler.guardar_modelo(model, 'bot_detector.pkl')
+        cascada = ModeloCascada().ajustar(X, model.predict_proba(X)[:, 1])
+        cascada.checksum_modelo = handler.calcular_checksum(tmp_path / 'bot_detector.pkl')
+        handler.guardar_modelo(cascada, 'cascada.pkl')
+        assert cargar_cascada(handler) is not None
+
+        handler.guardar_modelo(xgb.XGBClassifier(n_estimators=2).fit(X[:50], X[:50, 0] > 0), 'bot_detector.pkl')
+        assert cargar_cascada(handler) is None
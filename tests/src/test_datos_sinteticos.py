@@ -0,0 +1,33 @@
+"""Tests minimalistas para el generador de datos sintéticos de los benchmarks."""
+from prediccion.utils.datos_sinteticos import generar_usuarios, escribir_almacen
+from prediccion.utils.feature_extraction import FeatureExtractor, FEATURES_BASE
+from prediccion.utils.json_streaming import iterar_array, IndicePostsUsuarios
+
+
+class TestDatosSinteticos:
+    """Tests para generar_usuarios y escribir_almacen."""
+
+    def test_generacion_reproducible(self):
+        """Test: La misma semilla produce los mismos usuarios y respeta el rango de posts."""
+        a = list(generar_usuarios(20, posts_min=3, posts_max=8, semilla=7))
+        b = list(generar_usuarios(20, posts_min=3, posts_max=8, semilla=7))
+        assert a == b
+        assert all(3 <= len(posts) <= 8 for _, posts in a)
+
+    def test_formato_compatible_con_extractor(self):
+        """Test: Los perfiles y posts generados tienen el formato que espera FeatureExtractor."""
+        extractor = FeatureExtractor()
+        for perfil, posts in generar_usuarios(10, posts_min=5, posts_max=10):
+            features = extractor.extract_profile_features(perfil, posts)
+            assert list(features) == FEATURES_BASE
+            assert features['account_age_days'] > 0
+            assert features['avg_post_length'] > 0
+
+    def test_escribir_almacen(self, tmp_path):
+        """Test: El almacén escrito se lee con los lectores incrementales."""
+        ruta_profiles, ruta_posts = escribir_almacen(tmp_path, 15, posts_min=2, posts_max=4)
+        usuarios = list(generar_usuarios(15, posts_min=2, posts_max=4))
+        assert list(iterar_array(ruta_profiles)) == [perfil for perfil, _ in usuarios]
+        with IndicePostsUsuarios(ruta_posts) as indice:
+            perfil, posts = usuarios[9]
+            assert indice[perfil['did']]['posts'] == posts
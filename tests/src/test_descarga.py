@@ -0,0 +1,81 @@
+"""Tests minimalistas para la descarga concurrente de perfil y posts."""
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from gestor.descarga import descargar_usuario, PerfilNoDisponible
+
+
+def cliente_falso(espera_perfil=0.0, espera_posts=0.0, error_perfil=None, error_posts=None):
+    """Cliente de atproto con respuestas fijas y retardos configurables."""
+    client = MagicMock()
+
+    def get_profile(actor):
+        time.sleep(espera_perfil)
+        if error_perfil:
+            raise error_perfil
+        respuesta = MagicMock()
+        respuesta.model_dump.return_value = {'did': 'did:plc:abc', 'handle': actor}
+        return respuesta
+
+    def get_author_feed(actor, limit):
+        time.sleep(espera_posts)
+        if error_posts:
+            raise error_posts
+        post = SimpleNamespace(
+            record=SimpleNamespace(text='hola', created_at='2024-01-01T00:00:00Z'),
+            like_count=1, reply_count=0, repost_count=2,
+        )
+        return SimpleNamespace(feed=[SimpleNamespace(post=post)] * limit)
+
+    client.get_profile.side_effect = get_profile
+    client.get_author_feed.side_effect = get_author_feed
+    return client
+
+
+class TestDescarga:
+    """Tests de descargar_usuario."""
+
+    def test_llamadas_en_paralelo(self):
+        """Test: La latencia es la de la llamada más lenta, no la suma."""
+        client = cliente_falso(espera_perfil=0.3, espera_posts=0.3)
+        datos = descargar_usuario(client, 'alice.bsky.social', num_posts=3)
+
+        assert datos['posts_completos']
+        assert len(datos['posts']) == 3
+        assert datos['posts'][0]['repostCount'] == 2
+        assert datos['tiempos']['total'] < 0.55
+
+    def test_posts_lentos_prediccion_degradada(self):
+        """Test: Si los posts no llegan a tiempo se devuelve solo el perfil."""
+        client = cliente_falso(espera_posts=1.0)
+        datos = descargar_usuario(client, 'alice.bsky.social', timeout_posts=0.1)
+
+        assert datos['profile']['handle'] == 'alice.bsky.social'
+        assert datos['posts'] == []
+        assert not datos['posts_completos'] and datos['posts_agotado']
+        assert datos['tiempos']['posts'] is None
+        assert datos['tiempos']['total'] < 0.5
+
+    def test_error_posts_no_bloquea(self):
+        """Test: Un error en los posts también da una predicción degradada."""
+        client = cliente_falso(error_posts=RuntimeError('feed caído'))
+        datos = descargar_usuario(client, 'alice.bsky.social')
+
+        assert not datos['posts_completos']
+        assert datos['error_posts'] == 'feed caído'
+        assert not datos['posts_agotado']
+
+    def test_perfil_agotado(self):
+        """Test: Sin perfil a tiempo no hay predicción posible."""
+        client = cliente_falso(espera_perfil=1.0)
+        with pytest.raises(PerfilNoDisponible) as excinfo:
+            descargar_usuario(client, 'alice.bsky.social', timeout_perfil=0.1)
+        assert excinfo.value.agotado
+
+    def test_perfil_con_error(self):
+        """Test: Un error del perfil se propaga como PerfilNoDisponible."""
+        client = cliente_falso(error_perfil=RuntimeError('no existe'))
+        with pytest.raises(PerfilNoDisponible, match='no existe') as excinfo:
+            descargar_usuario(client, 'alice.bsky.social')
+        assert not excinfo.value.agotado
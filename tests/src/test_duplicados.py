@@ -0,0 +1,69 @@
+"""Tests minimalistas para el índice de duplicados entre cuentas."""
+import pytest
+from prediccion.utils.duplicados import IndiceDuplicados
+from prediccion.utils.feature_extraction import FeatureExtractor, FEATURES_DUPLICADOS
+
+
+class TestIndiceDuplicados:
+    """Tests para IndiceDuplicados (MinHash-LSH)."""
+
+    TEXTO_SPAM = "Compra ya los mejores seguidores baratos en nuestra web oficial hoy mismo"
+
+    @pytest.fixture
+    def indice(self):
+        indice = IndiceDuplicados()
+        for i in range(5):
+            indice.agregar_posts(f"did:plc:bot{i}", [
+                {"uri": f"at://bot{i}/1", "text": self.TEXTO_SPAM + "!" * i},
+                {"uri": f"at://bot{i}/2", "text": f"post propio número {i} sobre otra cosa distinta"},
+            ])
+        indice.agregar_posts("did:plc:humano", [
+            {"uri": "at://humano/1", "text": "Hoy he visto un atardecer precioso desde la playa"},
+        ])
+        return indice
+
+    def test_cluster_entre_cuentas(self, indice):
+        """Test: El mismo texto desde 5 cuentas forma un cluster de 5 cuentas."""
+        features = indice.features_usuario("did:plc:bot0")
+        assert features['cross_dup_ratio'] == 0.5
+        assert features['cross_dup_cluster_size'] == 5
+
+    def test_usuario_sin_duplicados(self, indice):
+        """Test: Un usuario con texto original no aparece en clusters."""
+        assert indice.features_usuario("did:plc:humano") == {'cross_dup_ratio': 0, 'cross_dup_cluster_size': 0}
+
+    def test_actualizacion_incremental(self, indice):
+        """Test: Añadir posts nuevos actualiza el cluster y los ya vistos se ignoran."""
+        assert indice.agregar_posts("did:plc:bot0", [{"uri": "at://bot0/1", "text": self.TEXTO_SPAM}]) == 0
+        indice.agregar_posts("did:plc:nuevo", [{"uri": "at://nuevo/1", "text": self.TEXTO_SPAM}])
+        assert indice.features_usuario("did:plc:bot3")['cross_dup_cluster_size'] == 6
+
+    def test_candidato_sin_modificar_el_indice(self, indice):
+        """Test: Una cuenta no indexada se compara con los clusters sin añadirse; una indexada usa lo guardado."""
+        tamano, cubetas = len(indice), len(indice.cubetas)
+        features = indice.features_candidato("did:plc:nuevo", [
+            {"uri": "at://nuevo/1", "text": self.TEXTO_SPAM},
+            {"uri": "at://nuevo/2", "text": "algo que nadie más ha escrito nunca aquí"},
+            {"uri": "at://nuevo/3", "text": "!!!"},
+        ])
+        assert features == {'cross_dup_ratio': 0.5, 'cross_dup_cluster_size': 6}
+        assert len(indice) == tamano and len(indice.cubetas) == cubetas
+        assert "did:plc:nuevo" not in indice.posts_por_did
+        assert indice.features_usuario("did:plc:bot0")['cross_dup_cluster_size'] == 5
+
+        assert indice.features_candidato("did:plc:bot0", []) == indice.features_usuario("did:plc:bot0")
+        assert indice.features_candidato("did:plc:vacio", []) == {'cross_dup_ratio': 0, 'cross_dup_cluster_size': 0}
+
+    def test_features_en_extractor(self, indice):
+        """Test: El extractor expone las features del índice solo si se piden."""
+        extractor = FeatureExtractor(FEATURES_DUPLICADOS, indice_duplicados=indice)
+        features = extractor.extract_profile_features({"did": "did:plc:bot1"}, [])
+        assert features == {'cross_dup_ratio': 0.5, 'cross_dup_cluster_size': 5}
+        assert not set(FEATURES_DUPLICADOS) & set(FeatureExtractor().feature_names)
+
+    def test_guardar_y_cargar(self, indice, tmp_path):
+        """Test: El índice persistido conserva los clusters."""
+        ruta = tmp_path / "indice.pkl"
+        indice.guardar(ruta)
+        cargado = IndiceDuplicados.cargar(ruta)
+        assert cargado.features_usuario("did:plc:bot2") == indice.features_usuario("did:plc:bot2")
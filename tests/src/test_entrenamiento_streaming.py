@@ -0,0 +1,56 @@
+"""Tests minimalistas para el entrenamiento por bloques."""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from prediccion.utils.entrenamiento_streaming import entrenar_streaming, mascara_test, leer_bloques
+
+
+class TestEntrenamientoStreaming:
+    """Tests para entrenar_streaming."""
+
+    @pytest.fixture
+    def dataset(self, tmp_path):
+        rng = np.random.default_rng(0)
+        n = 1500
+        df = pd.DataFrame({
+            'followers_ratio': rng.random(n) * 3,
+            'posts_per_day': rng.random(n) * 100,
+            'bio_length': rng.integers(0, 200, n),
+        })
+        df['did'] = [f"did:plc:{i}" for i in range(n)]
+        df['handle'] = [f"u{i}.bsky.social" for i in range(n)]
+        df['label'] = ((df['posts_per_day'] > 60) | (df['followers_ratio'] < 0.2)).astype(int)
+        ruta = tmp_path / "dataset.csv"
+        df.to_csv(ruta, index=False)
+        return ruta, df
+
+    def test_division_por_hash(self, dataset):
+        """Test: La división es determinista y cercana a test_size."""
+        _, df = dataset
+        a = mascara_test(df['did'], 0.2, semilla=1)
+        assert np.array_equal(a, mascara_test(df['did'], 0.2, semilla=1))
+        assert 0.15 < a.mean() < 0.25
+
+    def test_entrenar_por_bloques(self, dataset, tmp_path):
+        """Test: El modelo se entrena por bloques y el scaler coincide con el de memoria."""
+        ruta, df = dataset
+        params = {'n_estimators': 20, 'max_depth': 3, 'learning_rate': 0.3, 'random_state': 42}
+        resultado = entrenar_streaming(ruta, params, test_size=0.2, semilla=42, tamano_bloque=100)
+
+        cols = resultado['feature_cols']
+        assert cols == ['followers_ratio', 'posts_per_day', 'bio_length']
+        train = df[~mascara_test(df['did'], 0.2, semilla=42)]
+        esperado = StandardScaler().fit(train[cols])
+        assert np.allclose(resultado['scaler'].mean_, esperado.mean_)
+        assert np.allclose(resultado['scaler'].scale_, esperado.scale_)
+
+        # Clasificador sklearn utilizable por 3_predecir.py
+        proba = resultado['model'].predict_proba(resultado['scaler'].transform(df[cols]))[:, 1]
+        assert ((proba > 0.5) == df['label']).mean() > 0.95
+        assert len(resultado['y_test']) == len(resultado['y_pred_proba']) == len(df) - len(train)
+
+        # Parquet por bloques con las mismas filas
+        ruta_parquet = tmp_path / "dataset.parquet"
+        df.to_parquet(ruta_parquet, index=False)
+        assert sum(len(b) for b in leer_bloques(ruta_parquet, tamano_bloque=400)) == len(df)
@@ -0,0 +1,81 @@
+"""Tests minimalistas para las estadísticas incrementales por usuario."""
+import pytest
+from prediccion.utils.feature_extraction import FeatureExtractor
+from prediccion.utils.estadisticas_incrementales import (
+    EstadisticasUsuario, FEATURES_INCREMENTALES, MAX_RECIENTES, actualizar_entrada
+)
+
+
+class TestEstadisticasUsuario:
+    """Tests para EstadisticasUsuario y actualizar_entrada."""
+
+    @pytest.fixture
+    def posts(self):
+        textos = ["hola", "un post bastante más largo http://x.y", "corto", "otro texto normal de ejemplo"]
+        return [
+            {"uri": f"at://u/{i}", "text": textos[i % 4], "createdAt": f"2024-01-0{1 + i // 3}T0{i % 10}:1{i}:00.000Z",
+             "likeCount": i, "replyCount": 1}
+            for i in range(9)
+        ]
+
+    def test_paridad_con_extractor(self, posts):
+        """Test: El acumulador da las mismas features que recalcular desde cero."""
+        esperadas = FeatureExtractor(FEATURES_INCREMENTALES).extract_profile_features({}, posts)
+        obtenidas = EstadisticasUsuario.desde_posts(list(reversed(posts))).features()
+        for nombre in FEATURES_INCREMENTALES:
+            assert obtenidas[nombre] == pytest.approx(esperadas[nombre])
+
+    def test_actualizacion_incremental_persistible(self, posts):
+        """Test: Actualizar por lotes con ida y vuelta a JSON equivale al historial completo."""
+        entrada = {"profile": {}, "posts": []}
+        actualizar_entrada(entrada, posts[:5])
+        actualizar_entrada(entrada, posts[3:])  # Solapados: no se duplican
+        assert len(entrada["posts"]) == 9
+        completas = EstadisticasUsuario.desde_posts(posts).features()
+        assert EstadisticasUsuario.desde_dict(entrada["estadisticas"]).features() == pytest.approx(completas)
+
+    def test_precalculadas_en_extractor(self, posts):
+        """Test: El extractor usa las features precalculadas sin recalcularlas."""
+        extractor = FeatureExtractor(['avg_post_length', 'vocabulary_diversity'])
+        features = extractor.extract_profile_features({}, posts[:1], precalculadas={'avg_post_length': 123.0})
+        assert features['avg_post_length'] == 123.0
+        assert 'longitudes' not in extractor._plan_para({'avg_post_length'})
+
+    def test_no_recorre_el_historial(self, posts):
+        """Test: Los posts ya vistos se descartan con las claves recientes, sin leer el historial."""
+        class Historial(list):
+            def __iter__(self):
+                raise AssertionError("se ha recorrido el historial")
+
+        entrada = actualizar_entrada({"profile": {}, "posts": []}, posts[:5])
+        entrada["posts"] = Historial(entrada["posts"])
+        actualizar_entrada(entrada, posts[3:])
+        assert len(entrada["posts"]) == 9
+        assert entrada["estadisticas"]["recientes"][-1] == "at://u/8"
+
+        # Acumuladores guardados antes de `recientes`: se reconstruyen una vez
+        antigua = actualizar_entrada({"profile": {}, "posts": []}, posts[:5])
+        del antigua["estadisticas"]["recientes"]
+        actualizar_entrada(antigua, posts[3:])
+        assert len(antigua["posts"]) == 9
+
+    def test_ventana_de_posts(self, posts):
+        """Test: Con límite se guardan los últimos posts y las estadísticas son las de esa ventana."""
+        entrada = actualizar_entrada({"profile": {}, "posts": []}, posts[:5], limite=4)
+        assert [p["uri"] for p in entrada["posts"]] == [f"at://u/{i}" for i in range(1, 5)]
+        actualizar_entrada(entrada, posts[3:], limite=4)
+        assert [p["uri"] for p in entrada["posts"]] == [f"at://u/{i}" for i in range(5, 9)]
+
+        estadisticas = EstadisticasUsuario.desde_dict(entrada["estadisticas"])
+        assert estadisticas.features() == pytest.approx(EstadisticasUsuario.desde_posts(posts[5:]).features())
+        # Los que salieron de la ventana se siguen reconociendo como vistos
+        assert estadisticas.recientes == [f"at://u/{i}" for i in range(9)]
+        actualizar_entrada(entrada, posts[:2], limite=4)
+        assert [p["uri"] for p in entrada["posts"]] == [f"at://u/{i}" for i in range(5, 9)]
+
+        # Se recuerdan al menos tantas claves como posts trae cada descarga
+        muchos = [{"uri": f"at://m/{i}", "text": "x"} for i in range(MAX_RECIENTES + 50)]
+        entrada = actualizar_entrada({"profile": {}, "posts": []}, muchos, limite=MAX_RECIENTES + 50)
+        assert len(entrada["estadisticas"]["recientes"]) == MAX_RECIENTES + 50
+        with pytest.raises(ValueError):
+            actualizar_entrada({"posts": []}, posts, limite=0)
@@ -33,3 +33,18 @@ class TestFeatureExtractor:
         features = extractor.extract_profile_features(profile, [])
         assert features['avg_post_length'] == 0
 
+    def test_solo_calcula_features_pedidas(self):
+        """Test: El plan solo incluye las dependencias de las features pedidas."""
+        extractor = FeatureExtractor(['followers_ratio', 'avg_post_length'])
+        assert 'timestamps' not in extractor.plan
+        assert 'palabras' not in extractor.plan
+        features = extractor.extract_profile_features(
+            {"followers_count": 10, "follows_count": 5}, [{"text": "hola"}]
+        )
+        assert list(features) == ['followers_ratio', 'avg_post_length']
+        assert features['avg_post_length'] == 4
+
+    def test_feature_desconocida(self):
+        """Test: Pedir una feature no registrada falla al construir el extractor."""
+        with pytest.raises(ValueError, match="Feature desconocida"):
+            FeatureExtractor(['no_existe'])
@@ -56,3 +56,47 @@ class TestGestor:
             dids = [p["did"] for p in resultado]
             assert "did:plc:1" in dids
             assert "did:plc:2" in dids
+
+    def test_vuelve_a_descargar_usuarios_caducados(self, tmp_path):
+        """Test: Un DID ya procesado se vuelve a descargar pasado el plazo y solo se añaden sus posts nuevos."""
+        from datetime import datetime, timedelta, timezone
+        from types import SimpleNamespace
+        from gestor.post import BlueskyPostsFetcher
+        from prediccion.utils.estadisticas_incrementales import actualizar_entrada
+
+        def hace(horas):
+            return (datetime.now(timezone.utc) - timedelta(hours=horas)).isoformat()
+
+        visto = {"uri": "at://viejo/1", "text": "ya estaba", "createdAt": "2024-01-01T00:00:00Z"}
+        fetcher = BlueskyPostsFetcher("mock_user", "mock_pass", horas_entre_descargas=24)
+        fetcher.processed_data = {
+            "did:plc:viejo": {**actualizar_entrada({"posts": []}, [visto]), "descargado_en": hace(48)},
+            "did:plc:reciente": {"posts": [], "descargado_en": hace(1)},
+            "did:plc:sin_fecha": {"posts": []},
+        }
+        fetcher.processed_dids = set(fetcher.processed_data)
+        assert fetcher.pendiente("did:plc:nuevo") and fetcher.pendiente("did:plc:viejo")
+        assert fetcher.pendiente("did:plc:sin_fecha") and not fetcher.pendiente("did:plc:reciente")
+
+        def post(uri, texto, fecha):
+            record = SimpleNamespace(created_at=fecha, text=texto, embed=None)
+            return SimpleNamespace(post=SimpleNamespace(cid=uri, uri=uri, record=record,
+                                                        reply_count=0, repost_count=0, like_count=1))
+
+        fetcher.client = MagicMock()
+        fetcher.client.get_author_feed.return_value = SimpleNamespace(feed=[
+            post("at://viejo/2", "post nuevo", "2024-02-01T00:00:00Z"),
+            post("at://viejo/1", "ya estaba", "2024-01-01T00:00:00Z"),
+        ])
+        fetcher.profiles_to_scan = [{"did": "did:plc:viejo", "handle": "viejo"}, {"did": "did:plc:reciente"}]
+        with patch.object(fetcher, "save_progress"), patch("gestor.post.time.sleep"):
+            fetcher.process_profiles()
+
+        fetcher.client.get_author_feed.assert_called_once()
+        entrada = fetcher.processed_data["did:plc:viejo"]
+        assert [p["uri"] for p in entrada["posts"]] == ["at://viejo/1", "at://viejo/2"]
+        assert entrada["estadisticas"]["n"] == 2
+        assert not fetcher.pendiente("did:plc:viejo")
+
+        with pytest.raises(ValueError):
+            BlueskyPostsFetcher("mock_user", "mock_pass", posts_per_user_limit=0)
@@ -0,0 +1,66 @@
+"""Tests minimalistas para el entrenamiento incremental y el registro de versiones."""
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+from prediccion.utils.incremental import (
+    RegistroVersiones, entrenar_incremental, huellas_dids, verificar_compatibilidad
+)
+
+FEATURES = ['followers_ratio', 'posts_per_day']
+
+
+def generar(n, inicio=0, semilla=0):
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({'followers_ratio': rng.random(n) * 3, 'posts_per_day': rng.random(n) * 100})
+    df['did'] = [f"did:plc:{i}" for i in range(inicio, inicio + n)]
+    df['label'] = ((df['posts_per_day'] > 60) | (df['followers_ratio'] < 0.2)).astype(int)
+    return df
+
+
+class TestIncremental:
+    """Tests para entrenar_incremental y RegistroVersiones."""
+
+    @pytest.fixture
+    def modelo_base(self):
+        df = generar(500)
+        scaler = StandardScaler().fit(df[FEATURES])
+        model = xgb.XGBClassifier(n_estimators=10, max_depth=3)
+        model.fit(scaler.transform(df[FEATURES]), df['label'])
+        return model, scaler, df
+
+    def test_compatibilidad(self, modelo_base):
+        """Test: Se rechazan datasets con otras features o un scaler de otras columnas."""
+        _, scaler, _ = modelo_base
+        verificar_compatibilidad(scaler, FEATURES, list(reversed(FEATURES)))
+        with pytest.raises(ValueError):
+            verificar_compatibilidad(scaler, FEATURES, FEATURES + ['bio_length'])
+        with pytest.raises(ValueError):
+            verificar_compatibilidad(scaler, list(reversed(FEATURES)), FEATURES)
+
+    def test_anade_arboles(self, modelo_base):
+        """Test: El modelo nuevo conserva los árboles del base y añade los pedidos."""
+        model, scaler, _ = modelo_base
+        resultado = entrenar_incremental(model, scaler, FEATURES, generar(300, inicio=500, semilla=1),
+                                         {'max_depth': 3, 'n_estimators': 999}, arboles_nuevos=5)
+        assert resultado['model'].get_booster().num_boosted_rounds() == 15
+        assert model.get_booster().num_boosted_rounds() == 10
+        assert resultado['filas_train'] + resultado['filas_test'] == 300
+        assert resultado['auc_nuevo'] is not None
+
+    def test_registro_versiones(self, modelo_base, tmp_path):
+        """Test: Las versiones se guardan con sus DIDs y solo se conservan las últimas."""
+        model, scaler, df = modelo_base
+        registro = RegistroVersiones(tmp_path / "versiones", max_versiones=2)
+        for _ in range(3):
+            entrada = registro.registrar(model, scaler, FEATURES, huellas_dids(df['did']), tipo='completo')
+        assert entrada['version'] == 3 and entrada['arboles'] == 10
+        assert [v['version'] for v in registro.versiones()] == [2, 3]
+        assert not (tmp_path / "versiones" / "v0001").exists()
+
+        vistas = registro.huellas(3)
+        nuevas = huellas_dids(['did:plc:0', 'did:plc:9999'])
+        assert np.isin(nuevas, vistas).tolist() == [True, False]
+        _, _, columnas = registro.cargar(3)
+        assert columnas == FEATURES
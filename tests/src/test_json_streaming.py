@@ -0,0 +1,105 @@
+"""Tests minimalistas para la lectura incremental de JSON y escritura por bloques."""
+import json
+import numpy as np
+import pytest
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from prediccion.utils.json_streaming import iterar_array, iterar_objeto, IndicePostsUsuarios
+from prediccion.utils.datasets import EscritorPorBloques, columnas_dataset, leer_dataset
+
+
+class TestJsonStreaming:
+    """Tests para los lectores incrementales del almacén."""
+
+    @pytest.fixture
+    def profiles_path(self, tmp_path):
+        profiles = [{"did": f"did:plc:{i}", "handle": f"usuário{i}.bsky.social"} for i in range(50)]
+        ruta = tmp_path / "profiles.json"
+        ruta.write_text(json.dumps(profiles, indent=4, ensure_ascii=False), encoding='utf-8')
+        return ruta, profiles
+
+    @pytest.fixture
+    def posts_path(self, tmp_path):
+        posts = {
+            f"did:plc:{i}": {"profile": {"did": f"did:plc:{i}"},
+                             "posts": [{"text": f"ñandú número {i} 🦋", "likeCount": i}]}
+            for i in range(30)
+        }
+        ruta = tmp_path / "posts.json"
+        ruta.write_text(json.dumps(posts, indent=2, ensure_ascii=False), encoding='utf-8')
+        return ruta, posts
+
+    def test_iterar_array_bloques_pequenos(self, profiles_path):
+        """Test: El array se reconstruye igual aunque el bloque parta los elementos."""
+        ruta, profiles = profiles_path
+        assert list(iterar_array(ruta, tamano_bloque=7)) == profiles
+
+    def test_iterar_objeto(self, posts_path):
+        """Test: Las entradas del objeto se recorren en orden."""
+        ruta, posts = posts_path
+        assert dict(iterar_objeto(ruta, tamano_bloque=13)) == posts
+
+    def test_indice_posts_acceso_por_did(self, posts_path):
+        """Test: El índice por offsets devuelve la entrada correcta con texto no ASCII."""
+        ruta, posts = posts_path
+        with IndicePostsUsuarios(ruta, tamano_bloque=11) as indice:
+            assert len(indice) == 30
+            assert "did:plc:99" not in indice
+            assert indice.get("did:plc:99") is None
+            assert indice["did:plc:17"] == posts["did:plc:17"]
+            assert indice.get("did:plc:3") == posts["did:plc:3"]
+
+    def test_escritor_por_bloques(self, tmp_path):
+        """Test: El CSV final contiene todas las filas escritas por bloques."""
+        ruta = tmp_path / "datos" / "dataset.csv"
+        with EscritorPorBloques(ruta, tamano_bloque=4) as escritor:
+            for i in range(10):
+                escritor.agregar({"a": i, "label": i % 2})
+        df = pd.read_csv(ruta)
+        assert escritor.filas_escritas == 10
+        assert df['a'].tolist() == list(range(10))
+
+    def test_escritor_fallido_conserva_el_anterior(self, tmp_path):
+        """Test: Si el etiquetado falla a medias el dataset anterior queda intacto; con 0 filas solo la cabecera."""
+        ruta = tmp_path / "dataset.csv"
+        with EscritorPorBloques(ruta, tamano_bloque=4) as escritor:
+            for i in range(3):
+                escritor.agregar({"a": i, "label": 0})
+
+        with pytest.raises(RuntimeError):
+            with EscritorPorBloques(ruta, tamano_bloque=4) as escritor:
+                for i in range(10):
+                    escritor.agregar({"a": 100 + i, "label": 1})
+                raise RuntimeError("etiquetado interrumpido")
+        assert pd.read_csv(ruta)['a'].tolist() == [0, 1, 2]
+        assert list(tmp_path.iterdir()) == [ruta]
+
+        with EscritorPorBloques(ruta, columnas=["a", "label"]):
+            pass
+        df = pd.read_csv(ruta)
+        assert list(df.columns) == ["a", "label"] and len(df) == 0
+
+        ruta_parquet = tmp_path / "dataset.parquet"
+        with EscritorPorBloques(ruta_parquet, columnas=["a", "did", "label"]):
+            pass
+        assert columnas_dataset(ruta_parquet) == ["a", "did", "label"]
+        assert len(leer_dataset(ruta_parquet)) == 0
+
+    def test_escritor_parquet_tipado(self, tmp_path):
+        """Test: El Parquet usa tipos compactos y se puede leer solo un subconjunto de columnas."""
+        ruta = tmp_path / "datos" / "dataset.parquet"
+        with EscritorPorBloques(ruta, tamano_bloque=4) as escritor:
+            for i in range(10):
+                escritor.agregar({"a": i * 0.5, "did": f"did:plc:{i}", "handle": f"h{i % 3}", "label": i % 2})
+        esquema = pq.read_schema(ruta)
+        assert str(esquema.field("a").type) == "float"
+        assert str(esquema.field("label").type) == "int8"
+        assert pa.types.is_dictionary(esquema.field("handle").type)
+        assert pq.ParquetFile(ruta).metadata.num_row_groups == 3
+
+        df = leer_dataset(ruta, columnas=["a", "label"])
+        assert list(df.columns) == ["a", "label"]
+        assert df["a"].dtype == np.float32 and df["label"].dtype == np.int8
+        assert df["a"].tolist() == [i * 0.5 for i in range(10)]
+        assert columnas_dataset(ruta) == ["a", "did", "handle", "label"]
@@ -0,0 +1,109 @@
+"""Tests minimalistas para las métricas de latencia por etapa y /metrics."""
+import math
+import os
+from types import SimpleNamespace
+import pytest
+from web.metrics import Histogram, Metrics, end_request, server_timing, start_request
+
+
+class TestMetrics:
+    """Tests de Histogram y Metrics."""
+
+    def test_cuantiles_del_histograma(self):
+        """Test: p50/p95/p99 interpolados dentro de su bucket."""
+        h = Histogram()
+        assert math.isnan(h.quantile(0.5))
+        for i in range(1, 101):
+            h.observe(i / 1000)
+
+        assert h.count == 100 and h.sum == pytest.approx(5.05)
+        assert h.quantile(0.5) == pytest.approx(0.05)
+        assert h.quantile(0.95) == pytest.approx(0.095)
+        assert h.cumulative()[-1] == (math.inf, 100)
+        h.observe(60.0)
+        assert h.quantile(1.0) == 30.0
+
+    def test_spans_de_la_peticion_y_formato(self):
+        """Test: Los spans van al histograma y a la petición en curso; formato Prometheus."""
+        metrics = Metrics()
+        with metrics.span('features'):
+            pass
+        timings, token = start_request()
+        metrics.observe('profile', 0.2)
+        metrics.count_error('feed', 'timeout')
+        end_request(token)
+        metrics.observe('profile', 0.4)
+
+        assert timings == [('profile', 0.2)]
+        assert server_timing(timings) == 'profile;dur=200.0'
+        assert metrics.summary()['profile']['count'] == 2
+
+        texto = metrics.render(extra=[('cache_hit_ratio', 'gauge', 'Tasa.', [({'namespace': 'feed'}, 0.5)])])
+        assert '# TYPE bluesky_web_stage_duration_seconds histogram' in texto
+        assert 'bluesky_web_stage_duration_seconds_bucket{stage="profile",le="0.25"} 1' in texto
+        assert 'bluesky_web_stage_duration_seconds_bucket{stage="profile",le="+Inf"} 2' in texto
+        assert 'bluesky_web_stage_duration_quantile_seconds{stage="profile",quantile="0.95"}' in texto
+        assert 'bluesky_web_upstream_errors_total{call="feed",reason="timeout"} 1' in texto
+        assert 'bluesky_web_cache_hit_ratio{namespace="feed"} 0.5' in texto
+
+    def test_agrega_los_workers(self, tmp_path):
+        """Test: Con directorio compartido se suman histogramas y contadores de otro worker; sus gauges no tras salir."""
+        def familias(hits):
+            return [('cache_hits_total', 'counter', 'Aciertos.', [({'namespace': 'feed'}, hits)]),
+                    ('model_preloaded', 'gauge', 'Precargado.', [({}, True)])]
+
+        pid = os.fork()
+        if pid == 0:
+            otro = Metrics(directory=tmp_path, collect=lambda: familias(2))
+            otro.observe('profile', 0.2)
+            otro.count_error('feed', 'timeout')
+            otro.flush()
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        metrics = Metrics(directory=tmp_path, collect=lambda: familias(3), flush_interval=0.01)
+        metrics.observe('profile', 0.4)
+        texto = metrics.render()
+        assert 'bluesky_web_stage_duration_seconds_bucket{stage="profile",le="0.25"} 1' in texto
+        assert 'bluesky_web_stage_duration_seconds_count{stage="profile"} 2' in texto
+        assert 'bluesky_web_upstream_errors_total{call="feed",reason="timeout"} 1' in texto
+        assert 'bluesky_web_cache_hits_total{namespace="feed"} 5' in texto
+        assert f'bluesky_web_model_preloaded{{pid="{os.getpid()}"}} 1' in texto
+        assert f'pid="{pid}"' not in texto
+        assert metrics.summary()['profile']['count'] == 2
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted([f'{pid}.json', f'{os.getpid()}.json'])
+
+
+class TestMetricsEndpoint:
+    """Tests de /metrics y la cabecera Server-Timing."""
+
+    def test_etapas_de_predict(self, monkeypatch, web_app_aislada, crear_bundle):
+        """Test: Una predicción registra cada etapa y la devuelve en Server-Timing."""
+        web_app = web_app_aislada
+        bundle = crear_bundle()
+
+        def fetch_user(actor):
+            web_app.METRICS.observe('login', 0.05)
+            return web_app.record_download({
+                'profile': {'did': 'did:plc:abc', 'handle': actor}, 'posts': [],
+                'posts_completos': False, 'error_posts': 'lento', 'posts_agotado': True,
+                'tiempos': {'perfil': 0.1, 'posts': None, 'total': 0.1},
+            })
+
+        monkeypatch.setattr(web_app, 'METRICS', Metrics(collect=web_app.metric_families))
+        monkeypatch.setattr(web_app, 'SERVER_TIMING', True)
+        monkeypatch.setattr(web_app, 'fetch_user', fetch_user)
+        monkeypatch.setattr(web_app, 'get_model_cache', lambda: SimpleNamespace(get=lambda: bundle))
+
+        client = web_app.app.test_client()
+        respuesta = client.post('/api/predict', json={'identifier': 'alice.bsky.social'})
+        assert respuesta.status_code == 200 and respuesta.json['degraded']
+        etapas = [parte.split(';')[0] for parte in respuesta.headers['Server-Timing'].split(', ')]
+        assert etapas == ['model_load', 'cache_lookup', 'login', 'profile', 'features', 'scoring', 'total']
+
+        texto = client.get('/metrics').get_data(as_text=True)
+        for etapa in etapas:
+            assert f'bluesky_web_stage_duration_seconds_count{{stage="{etapa}"}} 1' in texto
+        assert 'bluesky_web_upstream_errors_total{call="feed",reason="timeout"} 1' in texto
+        assert 'bluesky_web_cache_misses_total{namespace="handle"} 1' in texto
+        assert client.get('/api/metrics').json['scoring']['count'] == 1
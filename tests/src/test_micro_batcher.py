@@ -0,0 +1,82 @@
+"""Tests minimalistas para el micro-batching de predicciones de la web."""
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+from seguridad.secure_model_handler import SecureModelHandler
+from web.batcher import MicroBatcher
+from web.model_cache import ModelCache
+
+
+class TestMicroBatcher:
+    """Tests de MicroBatcher y de los endpoints /api/predict."""
+
+    def test_agrupa_peticiones_concurrentes(self):
+        """Test: Las filas de peticiones simultáneas se puntúan en una sola llamada."""
+        llamadas = []
+
+        def puntuar(clave, filas):
+            llamadas.append(len(filas))
+            return {'doble': np.array([2 * f for f in filas])}
+
+        batcher = MicroBatcher(puntuar, max_batch_size=8, max_wait_ms=500)
+        resultados = {}
+
+        def cliente(i):
+            resultados[i] = batcher.score('modelo', [i, 10 + i], timeout=5)
+
+        hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(4)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        batcher.close()
+
+        assert llamadas == [8]
+        assert all(resultados[i]['doble'].tolist() == [2 * i, 20 + 2 * i] for i in range(4))
+        assert batcher.stats()['largest_batch'] == 8
+
+    def test_errores_y_claves_distintas(self):
+        """Test: Claves distintas no se mezclan y los errores llegan a cada petición."""
+        def puntuar(clave, filas):
+            if clave == 'roto':
+                raise RuntimeError('modelo roto')
+            return {'clave': np.array([clave] * len(filas))}
+
+        batcher = MicroBatcher(puntuar, max_batch_size=100, max_wait_ms=0)
+        assert batcher.score('a', [1, 2], timeout=5)['clave'].tolist() == ['a', 'a']
+        with pytest.raises(RuntimeError):
+            batcher.score('roto', [1], timeout=5)
+        assert batcher.score('b', [], timeout=5) == {}
+        batcher.close()
+
+    def test_endpoints(self, tmp_path, monkeypatch):
+        """Test: /api/predict y /api/predict/batch devuelven lo mismo que predict_proba."""
+        import web.app as web_app
+
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(300, 2))
+        df = pd.DataFrame(X, columns=['a', 'b'])
+        scaler = StandardScaler().fit(df)
+        model = xgb.XGBClassifier(n_estimators=5).fit(scaler.transform(df), X[:, 0] > 0)
+        handler = SecureModelHandler(tmp_path)
+        handler.guardar_modelo(model, 'bot_detector.pkl')
+        handler.guardar_modelo(scaler, 'feature_scaler.pkl')
+        handler.guardar_modelo(['a', 'b'], 'feature_columns.pkl')
+        monkeypatch.setattr(web_app, 'MODEL_CACHE', ModelCache(tmp_path))
+        monkeypatch.setattr(web_app, 'BATCHER', None)
+
+        client = web_app.app.test_client()
+        filas = [{'a': float(x[0]), 'b': float(x[1])} for x in X[:20]]
+        esperado = model.predict_proba(scaler.transform(df[:20]))[:, 1]
+
+        respuesta = client.post('/api/predict/batch', json={'features': filas})
+        assert respuesta.status_code == 200
+        assert np.allclose([p['prob_bot'] for p in respuesta.json['predictions']], esperado)
+
+        respuesta = client.post('/api/predict', json={'features': filas[0]})
+        assert respuesta.json['prob_bot'] == pytest.approx(esperado[0])
+        assert client.post('/api/predict', json={'features': {'a': 1.0}}).status_code == 400
+        web_app.BATCHER.close()
@@ -0,0 +1,57 @@
+"""Tests minimalistas para la caché de modelos de la web."""
+import pytest
+from seguridad.secure_model_handler import SecureModelHandler
+from prediccion.utils.duplicados import IndiceDuplicados
+from web.model_cache import ModelCache
+
+
+class TestModelCache:
+    """Tests de ModelCache."""
+
+    @pytest.fixture
+    def modelos_dir(self, tmp_path, crear_modelos):
+        return crear_modelos(tmp_path, cols=['a', 'b'])
+
+    def test_carga_una_vez_y_recarga_al_cambiar(self, modelos_dir):
+        """Test: Sin cambios no se recarga; un cambio estable se recarga y un fichero alterado no."""
+        cache = ModelCache(modelos_dir, check_interval=0.0)
+        bundle = cache.get()
+        assert cache.get() is bundle
+        assert bundle.feature_cols == ['a', 'b'] and bundle.compiled is None
+        assert cache.status()['reloads'] == 1
+
+        SecureModelHandler(modelos_dir).guardar_modelo(['a', 'b', 'c'], 'feature_columns.pkl')
+        assert cache.get() is bundle  # Primera vez que se ve el cambio: se espera a que se asiente
+        nuevo = cache.get()
+        assert nuevo is not bundle and nuevo.feature_cols == ['a', 'b', 'c']
+
+        with open(modelos_dir / 'feature_columns.pkl', 'ab') as f:
+            f.write(b'x')
+        assert cache.get() is nuevo and cache.get() is nuevo
+        assert cache.status()['last_error'] is not None
+        assert cache.status()['reloads'] == 2
+
+    def test_intervalo_entre_comprobaciones(self, modelos_dir):
+        """Test: Dentro del intervalo no se consulta el disco."""
+        reloj = [0.0]
+        cache = ModelCache(modelos_dir, check_interval=5.0, clock=lambda: reloj[0])
+        bundle = cache.get()
+        SecureModelHandler(modelos_dir).guardar_modelo(['x', 'y'], 'feature_columns.pkl')
+        assert cache.get() is bundle and cache.get() is bundle
+        reloj[0] = 6.0
+        assert cache.get() is bundle
+        reloj[0] = 12.0
+        assert cache.get().feature_cols == ['x', 'y']
+
+    def test_indice_de_duplicados(self, tmp_path, crear_modelos):
+        """Test: Un modelo con features de duplicados no se sirve sin su índice, y con él lo carga."""
+        modelos_dir = crear_modelos(tmp_path / 'modelos', cols=['a', 'cross_dup_ratio'])
+
+        with pytest.raises(FileNotFoundError, match='cross_dup_ratio'):
+            ModelCache(modelos_dir).get()
+
+        indice = IndiceDuplicados()
+        indice.agregar_posts('did:plc:a', [{'uri': 'at://a/1', 'text': 'el mismo texto repetido por varias cuentas'}])
+        indice.guardar(tmp_path / 'datos' / 'indice_duplicados.pkl')
+        bundle = ModelCache(modelos_dir).get()
+        assert len(bundle.duplicates) == 1
@@ -0,0 +1,86 @@
+"""Tests minimalistas para la caché de predicciones de la web."""
+import dataclasses
+from web.cache import CacheStore, LRUCache
+from web.cache_backends import MemoryBackend
+
+
+class TestLRUCache:
+    """Tests de LRUCache."""
+
+    def test_ttl_lru_y_memoria(self):
+        """Test: Las entradas caducan, se expulsa la menos usada y se respeta el tope de bytes."""
+        reloj = [0.0]
+        cache = LRUCache(ttl=10, max_entries=2, max_bytes=1000, clock=lambda: reloj[0])
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a').value == 1
+        cache.set('c', 3)  # Expulsa 'b' (la menos usada)
+        assert cache.get('b') is None and cache.get('c').value == 3
+
+        reloj[0] = 10.0
+        assert cache.get('a') is None
+        cache.set('grande', 'x' * 2000)
+        assert cache.get('grande') is None
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (2, 3, 1, 1)
+
+    def test_ttl_por_entrada(self):
+        """Test: Una entrada con ttl propio caduca antes que el ttl por defecto."""
+        reloj = [0.0]
+        cache = LRUCache(ttl=100, clock=lambda: reloj[0])
+        cache.set('corta', 1, ttl=5)
+        cache.set('larga', 2)
+        reloj[0] = 5.0
+        assert cache.get('corta') is None and cache.get('larga').value == 2
+
+
+class TestCacheStore:
+    """Tests de CacheStore sobre MemoryBackend."""
+
+    def test_espacios_ttl_y_refresco_anticipado(self):
+        """Test: Cada espacio tiene su TTL y pasado refresh_ahead × ttl se recalcula en segundo plano."""
+        reloj = [1000.0]
+        store = CacheStore(MemoryBackend(), ttls={'prediction': 10, 'handle': 100},
+                           refresh_ahead=0.5, clock=lambda: reloj[0])
+        store.set('prediction', 'did:plc:a', {'p': 0.9})
+        store.set('handle', 'a.bsky.social', 'did:plc:a')
+        assert store.get('prediction', 'did:plc:a') == ({'p': 0.9}, 0.0)
+
+        reloj[0] += 6
+        valor, edad = store.get('prediction', 'did:plc:a')
+        assert store.needs_refresh('prediction', edad) and not store.needs_refresh('handle', edad)
+        store.refresh('did:plc:a', lambda: store.set('prediction', 'did:plc:a', {'p': 0.1})).result(timeout=5)
+        assert store.get('prediction', 'did:plc:a') == ({'p': 0.1}, 0.0)
+
+        reloj[0] += 10
+        assert store.get('prediction', 'did:plc:a') is None
+        assert store.get('handle', 'a.bsky.social')[0] == 'did:plc:a'
+        assert store.stats()['namespaces']['prediction']['misses'] == 1
+        assert store.stats()['refreshes'] == 1
+
+
+class TestAnalyzeIdentifier:
+    """Tests de la caché en analyze_identifier (sin llamar a la API)."""
+
+    def test_repeticiones_desde_cache(self, monkeypatch, web_app_aislada, crear_bundle):
+        """Test: Handle y DID repetidos se sirven de la caché y un modelo nuevo re-puntúa sin descargar."""
+        web_app = web_app_aislada
+        bundle = crear_bundle(model_id='modelo-1')
+
+        descargas = []
+
+        def fetch_user(actor):
+            descargas.append(actor)
+            return {'did': 'did:plc:abc', 'handle': 'Alice.bsky.social', 'followers_count': 10}, [], True
+
+        monkeypatch.setattr(web_app, 'fetch_user', fetch_user)
+
+        primero = web_app.analyze_identifier('@Alice.bsky.social', bundle)
+        assert primero['source'] == 'api' and primero['did'] == 'did:plc:abc'
+        assert web_app.analyze_identifier('alice.bsky.social', bundle)['source'] == 'cache'
+        assert web_app.analyze_identifier('did:plc:abc', bundle)['prob_bot'] == primero['prob_bot']
+
+        otro = dataclasses.replace(bundle, model_id='modelo-2')
+        assert web_app.analyze_identifier('did:plc:abc', otro)['source'] == 'cache'
+        assert descargas == ['alice.bsky.social']
@@ -0,0 +1,72 @@
+"""Tests minimalistas para el motor de reglas vectorizado."""
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+from prediccion.utils.heuristics import HeuristicLabeler
+from prediccion.utils.reglas import MotorReglas, compilar_condicion
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / 'prediccion' / 'config.yaml'
+
+
+class TestMotorReglas:
+    """Tests para MotorReglas con las reglas de prediccion/config.yaml."""
+
+    @pytest.fixture
+    def config_heuristicas(self):
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)['heuristicas']
+
+    @pytest.fixture
+    def perfiles(self):
+        # Valores en los bordes de los umbrales de las reglas
+        rng = np.random.default_rng(0)
+        valores = {
+            'has_avatar': [0, 1], 'bio_length': [0, 9, 10, 19, 20, 50, 51, 100, 101],
+            'handle_has_many_numbers': [0, 1], 'posts_per_day': [0, 0.1, 0.5, 14, 15, 20, 21, 30, 50, 51, 100, 101],
+            'account_age_days': [0, 29, 30, 89, 90, 180, 181, 365, 366, 730, 731],
+            'posts_count': [0, 300, 301, 800, 801], 'followers_ratio': [0, 0.01, 0.04, 0.05, 0.1, 0.2, 0.3, 0.5, 0.6],
+            'following_count': [0, 100, 101, 200, 201, 500, 501], 'followers_count': [0, 50, 51, 100, 101, 500, 501, 1000, 1001],
+            'repost_ratio': [0, 0.6, 0.7, 0.8, 0.9], 'night_posts_ratio': [0, 0.4, 0.5],
+            'post_interval_std': [0, 4.9, 5, 6], 'vocabulary_diversity': [0, 0.4, 0.5, 0.6, 0.7],
+            'post_similarity_avg': [0, 0.2, 0.3, 0.4, 1], 'avg_engagement': [0, 2, 3, 5, 6, 10, 11],
+        }
+        filas = [{k: rng.choice(v).item() for k, v in valores.items()} for _ in range(3000)]
+        # Perfiles con features ausentes usan los mismos valores por defecto que las reglas históricas
+        return filas + [{}, {'has_avatar': 1}, {'post_interval_std': 3}]
+
+    def test_paridad_con_reglas_historicas(self, config_heuristicas, perfiles):
+        """Test: Las reglas de config.yaml dan exactamente el score y label de _calculate_weighted_score."""
+        historico = HeuristicLabeler({})
+        motor = MotorReglas.desde_config(config_heuristicas)
+        resultado = motor.evaluar(perfiles)
+
+        esperados = np.array([historico._calculate_weighted_score(f) for f in perfiles])
+        assert np.array_equal(resultado.scores, esperados)
+        assert resultado.labels.tolist() == [historico.label_profile(f) for f in perfiles]
+        assert resultado.contribuciones.shape == (len(perfiles), len(motor.reglas))
+
+        labeler = HeuristicLabeler(config_heuristicas)
+        assert [labeler.label_profile(f) for f in perfiles[:200]] == resultado.labels[:200].tolist()
+
+    def test_grupos_excluyentes(self):
+        """Test: Dentro de un grupo solo puntúa la primera regla que se cumple."""
+        motor = MotorReglas(
+            reglas_bot=[
+                {'nombre': 'muy_alta', 'grupo': 'g', 'condicion': 'x > 10', 'peso': 3},
+                {'nombre': 'alta', 'grupo': 'g', 'condicion': 'x > 5', 'peso': 1},
+            ],
+            reglas_humano=[{'nombre': 'y', 'condicion': '(y >= 1 OR x == 0) AND NOT x > 100', 'peso': 2}],
+        )
+        resultado = motor.evaluar({'x': [0, 7, 20, 200], 'y': [0, 1, 1, 1]})
+        assert resultado.scores.tolist() == [2.0, 1.0, -1.0, -3.0]
+        assert resultado.labels.tolist() == [0, 0, 1, 1]
+
+    def test_condicion_invalida(self):
+        """Test: Las condiciones mal formadas se rechazan sin evaluar código."""
+        with pytest.raises(ValueError):
+            compilar_condicion("x > 1 AND")
+        with pytest.raises(ValueError):
+            compilar_condicion("__import__('os')")
@@ -36,3 +36,48 @@ class TestSecureModelHandler:
         
         # Verificar contenido
         assert modelo_cargado == modelo
+    
+    def test_guardar_y_cargar_arrays(self, handler, temp_dir):
+        """Test: Los arrays se guardan sin pickle y se verifica su integridad."""
+        import numpy as np
+        arrays = {'valor': np.arange(5, dtype=np.float32), 'cols': np.array(['a', 'b'])}
+        handler.guardar_arrays(arrays, 'arrays.npz')
+        cargados = handler.cargar_arrays('arrays.npz')
+        assert np.array_equal(cargados['valor'], arrays['valor'])
+        assert cargados['cols'].tolist() == ['a', 'b']
+        
+        with pytest.raises(ValueError):
+            handler.guardar_arrays({'obj': np.array([{}], dtype=object)}, 'objetos.npz')
+        
+        with open(temp_dir / 'arrays.npz', 'ab') as f:
+            f.write(b'x')
+        with pytest.raises(ValueError):
+            handler.cargar_arrays('arrays.npz')
+
+
+class TestEscrituraAtomica:
+    """Tests para SecureFileHandler.abrir_escritura_atomica."""
+
+    def test_reemplaza_sin_tocar_el_inodo_anterior(self, tmp_path):
+        """Test: el archivo nuevo sustituye al anterior; quien lo tenía abierto sigue leyendo la versión vieja."""
+        from seguridad.secure_file_handler import SecureFileHandler
+        ruta = tmp_path / 'datos.json'
+        ruta.write_text('viejo', encoding='utf-8')
+        with open(ruta, encoding='utf-8') as abierto:
+            with SecureFileHandler(tmp_path).abrir_escritura_atomica('datos.json') as f:
+                f.write('nuevo')
+            assert abierto.read() == 'viejo'
+        assert ruta.read_text(encoding='utf-8') == 'nuevo'
+        assert os.listdir(tmp_path) == ['datos.json']
+
+    def test_error_conserva_el_anterior(self, tmp_path):
+        """Test: si la escritura falla no se reemplaza el archivo ni queda el temporal."""
+        from seguridad.secure_file_handler import SecureFileHandler
+        ruta = tmp_path / 'datos.json'
+        ruta.write_text('viejo', encoding='utf-8')
+        with pytest.raises(RuntimeError):
+            with SecureFileHandler(tmp_path).abrir_escritura_atomica('datos.json') as f:
+                f.write('a medias')
+                raise RuntimeError('fallo')
+        assert ruta.read_text(encoding='utf-8') == 'viejo'
+        assert os.listdir(tmp_path) == ['datos.json']
@@ -0,0 +1,83 @@
+"""Tests minimalistas para la coalescencia de consultas idénticas."""
+import threading
+import time
+import pytest
+from web.singleflight import SingleFlight
+
+
+def en_paralelo(n, funcion):
+    """Lanza `funcion(i)` en n hilos y devuelve sus resultados."""
+    resultados = [None] * n
+
+    def ejecutar(i):
+        try:
+            resultados[i] = funcion(i)
+        except Exception as e:
+            resultados[i] = e
+
+    hilos = [threading.Thread(target=ejecutar, args=(i,)) for i in range(n)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return resultados
+
+
+class TestSingleFlight:
+    """Tests de SingleFlight."""
+
+    def test_una_llamada_compartida(self):
+        """Test: Llamadas concurrentes con la misma clave ejecutan la función una vez."""
+        vuelo = SingleFlight()
+        llamadas = []
+
+        def lenta():
+            llamadas.append(1)
+            time.sleep(0.2)
+            return {'prob_bot': 0.9}
+
+        resultados = en_paralelo(5, lambda i: vuelo.do('did:plc:a', lenta, timeout=5))
+        assert len(llamadas) == 1
+        assert all(r[0] == {'prob_bot': 0.9} for r in resultados)
+        assert sorted(r[1] for r in resultados) == [False, True, True, True, True]
+        assert vuelo.stats() == {'in_flight': 0, 'leaders': 1, 'followers': 4, 'timeouts': 0}
+        assert vuelo.do('did:plc:a', lambda: 'otra vez') == ('otra vez', False)
+
+    def test_errores_y_timeout(self):
+        """Test: Los seguidores reciben el error del líder y pueden agotar su espera."""
+        vuelo = SingleFlight()
+
+        def falla():
+            time.sleep(0.2)
+            raise ValueError('perfil no encontrado')
+
+        resultados = en_paralelo(3, lambda i: vuelo.do('x', falla, timeout=5))
+        assert all(isinstance(r, ValueError) for r in resultados)
+
+        liberar = threading.Event()
+        lider = threading.Thread(target=vuelo.do, args=('y', lambda: liberar.wait(5)))
+        lider.start()
+        time.sleep(0.05)
+        with pytest.raises(TimeoutError):
+            vuelo.do('y', lambda: None, timeout=0.05)
+        liberar.set()
+        lider.join()
+        assert vuelo.stats()['timeouts'] == 1
+
+    def test_analyze_identifier_coalesce(self, monkeypatch, web_app_aislada, crear_bundle):
+        """Test: Peticiones simultáneas del mismo handle hacen una sola descarga."""
+        web_app = web_app_aislada
+        bundle = crear_bundle()
+        descargas = []
+
+        def fetch_user(actor):
+            descargas.append(actor)
+            time.sleep(0.2)
+            return {'did': 'did:plc:viral', 'handle': 'viral.bsky.social'}, [], True
+
+        monkeypatch.setattr(web_app, 'fetch_user', fetch_user)
+
+        resultados = en_paralelo(6, lambda i: web_app.analyze_identifier('@Viral.bsky.social', bundle))
+        assert descargas == ['viral.bsky.social']
+        assert len({r['prob_bot'] for r in resultados}) == 1
+        assert sum(r['shared'] for r in resultados) == 5
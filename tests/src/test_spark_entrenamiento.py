@@ -0,0 +1,72 @@
+"""Tests minimalistas para el entrenamiento y la puntuación con xgboost.spark."""
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyspark")
+pytest.importorskip("xgboost.spark")
+
+if not (os.environ.get("JAVA_HOME") or shutil.which("java")):
+    pytest.skip("Spark necesita Java", allow_module_level=True)
+
+from pyspark.sql import SparkSession
+from sklearn.preprocessing import StandardScaler
+from prediccion.utils.entrenamiento_streaming import mascara_test
+from prediccion.utils.spark_entrenamiento import (
+    ajustar_scaler_spark, columna_prueba, entrenar_spark, puntuar_spark
+)
+
+
+class TestSparkEntrenamiento:
+    """Tests de entrenar_spark y puntuar_spark."""
+
+    @pytest.fixture(scope="class")
+    def spark(self):
+        spark = SparkSession.builder.master("local[1]").appName("test_spark_entrenamiento") \
+            .config("spark.ui.enabled", "false").getOrCreate()
+        yield spark
+        spark.stop()
+
+    @pytest.fixture
+    def pdf(self):
+        rng = np.random.default_rng(0)
+        n = 600
+        df = pd.DataFrame({
+            'did': [f"did:plc:{i}" for i in range(n)],
+            'handle': [f"u{i}.bsky.social" for i in range(n)],
+            'followers_ratio': rng.random(n) * 3,
+            'posts_per_day': rng.random(n) * 100,
+            'has_avatar': np.ones(n),
+        })
+        df['label'] = ((df['posts_per_day'] > 60) | (df['followers_ratio'] < 0.2)).astype(int)
+        return df
+
+    def test_scaler_y_division(self, spark, pdf):
+        """Test: El scaler y la división por hash coinciden con los de pandas."""
+        df = spark.createDataFrame(pdf)
+        cols = ['followers_ratio', 'posts_per_day', 'has_avatar']
+        scaler = ajustar_scaler_spark(df, cols)
+        esperado = StandardScaler().fit(pdf[cols])
+        assert np.allclose(scaler.mean_, esperado.mean_)
+        assert np.allclose(scaler.scale_, esperado.scale_)
+        assert np.allclose(scaler.transform(pdf[cols]), esperado.transform(pdf[cols]))
+
+        prueba = df.select(columna_prueba('did', 0.2, 7).alias('p')).toPandas()['p'].to_numpy()
+        assert np.array_equal(prueba, mascara_test(pdf['did'], 0.2, semilla=7))
+
+    def test_entrenar_y_puntuar(self, spark, pdf):
+        """Test: El modelo de Spark funciona fuera de Spark y la puntuación por lotes coincide."""
+        params = {'n_estimators': 10, 'max_depth': 3, 'learning_rate': 0.3, 'random_state': 42, 'n_jobs': 4}
+        resultado = entrenar_spark(spark.createDataFrame(pdf.drop(columns='handle')), params, num_workers=1)
+        model, scaler, cols = resultado['model'], resultado['scaler'], resultado['feature_cols']
+        assert cols == ['followers_ratio', 'posts_per_day', 'has_avatar']
+        assert model.get_booster().num_boosted_rounds() == 10
+        assert sum(resultado['conteos']['test'].values()) == len(resultado['y_test'])
+
+        local = model.predict_proba(scaler.transform(pdf[cols]))[:, 1]
+        puntuado = puntuar_spark(spark.createDataFrame(pdf), model, scaler, cols, threshold=0.5).toPandas()
+        assert puntuado['did'].tolist() == pdf['did'].tolist()
+        assert np.allclose(puntuado['prob_bot'], local)
+        assert puntuado['es_bot'].tolist() == (local > 0.5).astype(int).tolist()
@@ -0,0 +1,75 @@
+"""Tests minimalistas para la extracción de features con Spark."""
+import os
+import shutil
+import pytest
+
+pytest.importorskip("pyspark")
+pytest.importorskip("pyarrow")
+
+if not (os.environ.get("JAVA_HOME") or shutil.which("java")):
+    pytest.skip("Spark necesita Java", allow_module_level=True)
+
+from pyspark.sql import SparkSession
+from prediccion.utils.feature_extraction import FeatureExtractor
+from prediccion.utils.spark_features import SparkFeatureExtractor
+
+
+class TestSparkFeatureExtractor:
+    """Tests de paridad entre SparkFeatureExtractor y FeatureExtractor."""
+
+    @pytest.fixture(scope="class")
+    def spark(self):
+        spark = SparkSession.builder.master("local[1]").appName("test_spark_features") \
+            .config("spark.ui.enabled", "false").getOrCreate()
+        yield spark
+        spark.stop()
+
+    @pytest.fixture
+    def datos(self):
+        profiles = [
+            {"did": "did:plc:a", "handle": "bot123456.bsky.social", "followers_count": 3,
+             "follows_count": 900, "posts_count": 500, "created_at": "2024-06-01T10:00:00.000Z",
+             "description": "", "display_name": "Bot"},
+            {"did": "did:plc:b", "handle": "ana.bsky.social", "followers_count": 120,
+             "follows_count": 0, "posts_count": 40, "created_at": "2019-03-02",
+             "avatar": "https://cdn/avatar.jpg", "description": "Hola", "display_name": "Ana"},
+            {"did": "did:plc:c", "handle": "sinposts.bsky.social", "followers_count": 1,
+             "follows_count": 1, "posts_count": 0, "created_at": "fecha rota"},
+        ]
+        posts = {
+            "did:plc:a": [
+                {"text": "Compra ya http://x.co", "createdAt": "2024-07-01T03:00:00.000Z", "likeCount": 0, "replyCount": 0},
+                {"text": "Compra ya http://x.co", "createdAt": "2024-07-01T03:05:00.000Z", "likeCount": 1, "replyCount": 0},
+                {"text": "ok", "createdAt": "2024-07-01T04:15:00.000Z", "likeCount": 0, "replyCount": 2},
+            ],
+            "did:plc:b": [
+                {"text": "Un paseo precioso por el parque hoy", "createdAt": "2024-05-01T18:30:00.000Z", "likeCount": 5, "replyCount": 1},
+                {"text": "Leyendo un libro nuevo", "createdAt": "2024-04-28T09:00:00.000Z", "likeCount": 2, "replyCount": 0},
+            ],
+        }
+        return profiles, posts
+
+    def test_paridad_con_python(self, spark, datos):
+        """Test: Spark calcula las mismas features que FeatureExtractor."""
+        profiles, posts = datos
+        filas_posts = [dict(p, usuario_did=did) for did, lista in posts.items() for p in lista]
+        df_profiles = spark.createDataFrame(
+            [{k: p.get(k) for k in ("did", "handle", "followers_count", "follows_count", "posts_count",
+                                    "created_at", "avatar", "description", "display_name")} for p in profiles],
+            "did string, handle string, followers_count long, follows_count long, posts_count long, "
+            "created_at string, avatar string, description string, display_name string",
+        )
+        df_posts = spark.createDataFrame(
+            filas_posts, "usuario_did string, text string, createdAt string, likeCount long, replyCount long"
+        )
+
+        resultado = {
+            fila["did"]: fila.asDict()
+            for fila in SparkFeatureExtractor(spark).extraer(df_profiles, df_posts).collect()
+        }
+        extractor = FeatureExtractor()
+        for profile in profiles:
+            esperado = extractor.extract_profile_features(profile, posts.get(profile["did"], []))
+            obtenido = resultado[profile["did"]]
+            for nombre, valor in esperado.items():
+                assert obtenido[nombre] == pytest.approx(valor, abs=1e-9), nombre
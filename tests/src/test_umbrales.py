@@ -0,0 +1,25 @@
+"""Tests minimalistas para el barrido de umbrales heurísticos."""
+import numpy as np
+from prediccion.utils.reglas import MotorReglas
+from prediccion.utils.umbrales import barrer_umbrales
+
+
+class TestBarridoUmbrales:
+    """Tests para barrer_umbrales."""
+
+    def test_coincide_con_etiquetado(self):
+        """Test: Cada par del grid da los mismos conteos que etiquetar con esos umbrales."""
+        rng = np.random.default_rng(1)
+        scores = rng.integers(-20, 21, size=2000) / 2  # múltiplos de 0.5, incluye los bordes
+        umbrales_bot = np.arange(0, 3.01, 0.5)
+        umbrales_humano = np.arange(-1, 3.01, 0.5)  # incluye pares solapados
+
+        grid = barrer_umbrales(scores, umbrales_bot, umbrales_humano, total=2100)
+        for i, b in enumerate(umbrales_bot):
+            for j, h in enumerate(umbrales_humano):
+                labels = MotorReglas([], [], min_score_bot=b, min_score_humano=h).etiquetar(scores)
+                assert grid['bots'][i, j] == (labels == 1).sum()
+                assert grid['humanos'][i, j] == (labels == 0).sum()
+                # Los perfiles sin score (total - len(scores)) cuentan como inciertos
+                assert grid['inciertos'][i, j] == (labels == -1).sum() + 100
+        assert np.allclose(grid['pct_bots'] + grid['pct_humanos'] + grid['pct_inciertos'], 100)
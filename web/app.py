@@ -12,9 +12,11 @@ Usage (development):
   python web/app.py
   # open http://127.0.0.1:5000
 """
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Ensure project root is on sys.path so internal imports like `prediccion` work
@@ -22,9 +24,61 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from web.metrics import Metrics, end_request, process_memory, server_timing, start_request
+
 app = Flask(__name__)
 app.secret_key = os.environ.get('FLASK_SECRET', 'dev-secret')
 
+# Predictions served by each stage of the cascade since this worker started
+CASCADE_STATS = {'fast': 0, 'full': 0}
+
+# Stage latencies and upstream errors, exposed on /metrics. With METRICS_DIR the
+# workers of the server share snapshots there and any of them answers for all
+METRICS = Metrics(directory=os.environ.get('METRICS_DIR') or None, collect=lambda: metric_families())
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '0') == '1'
+# WSGI environ keys: spans of the request and when it arrived (set earlier by web/asgi.py in async mode)
+REQUEST_TIMINGS = 'bluesky.timings'
+REQUEST_START = 'bluesky.request_start'
+TIMED_ENDPOINTS = {'predict', 'api_predict', 'api_predict_batch'}
+
+# Loaded model artifacts, shared by all requests of this worker (see get_model_cache)
+MODEL_CACHE = None
+MODELOS_DIR = Path(os.environ.get('MODELOS_DIR', PROJECT_ROOT / 'prediccion' / 'modelos'))
+
+# Startup of this worker (see preload_model, warm_up and /readyz). In preload mode
+# the gunicorn master fills `preloaded`/`load_seconds` before forking.
+STARTUP = {'started_at': time.time(), 'preloaded': False, 'load_seconds': None,
+           'warm_up_seconds': None, 'ready_at': None, 'error': None}
+_WARM_UP_LOCK = threading.Lock()
+
+# Micro-batching of scoring calls (see get_batcher); all knobs via environment
+BATCHER = None
+BATCH_TIMEOUT = float(os.environ.get('BATCH_TIMEOUT', '10'))
+BATCH_MAX_ROWS = int(os.environ.get('BATCH_MAX_ROWS', '1000'))
+DEFAULT_THRESHOLD = 0.7
+
+# Fetched accounts and their predictions, keyed by DID (see get_prediction_cache)
+PREDICTION_CACHE = None
+
+# In-flight upstream fetches shared by concurrent requests (see get_single_flight)
+SINGLE_FLIGHT = None
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', '15'))
+
+# Upstream fetch of an account: posts requested and per-call timeouts (see fetch_user)
+FETCH_POSTS = int(os.environ.get('FETCH_POSTS', '25'))
+FETCH_PROFILE_TIMEOUT = float(os.environ.get('FETCH_PROFILE_TIMEOUT', '10'))
+FETCH_FEED_TIMEOUT = float(os.environ.get('FETCH_FEED_TIMEOUT', '5'))
+
+# Scraped accounts in almacen/ served without calling the API while younger
+# than LOCAL_STORE_MAX_AGE seconds (0 disables it; see get_local_store)
+LOCAL_STORE = None
+ALMACEN_DIR = Path(os.environ.get('ALMACEN_DIR', PROJECT_ROOT / 'almacen'))
+LOCAL_STORE_MAX_AGE = float(os.environ.get('LOCAL_STORE_MAX_AGE', '86400'))
+
+# WSGI environ key with the (result, FetchError) computed by the async server (see analyze_request)
+PREFETCHED_ANALYSIS = 'bluesky.prefetched_analysis'
+SLOW_FETCH_MESSAGE = 'La consulta de este perfil está tardando demasiado; inténtalo de nuevo.'
+
 # Import internal utilities lazily (so app can import even if deps missing until used)
 def load_prediction_components():
     """Lazily import internal modules used for prediction.
@@ -47,6 +101,89 @@ def load_prediction_components():
     return FeatureExtractor, SecureModelHandler, ConexionBluesky
 
 
+def get_model_cache():
+    """Process-wide ModelCache, created on first use."""
+    global MODEL_CACHE
+    if MODEL_CACHE is None:
+        from web.model_cache import ModelCache
+        MODEL_CACHE = ModelCache(
+            MODELOS_DIR, check_interval=float(os.environ.get('MODEL_CHECK_INTERVAL', '1.0'))
+        )
+    return MODEL_CACHE
+
+
+def preload_model():
+    """Import the prediction stack and load the verified artifacts in this process.
+
+    Called by the gunicorn master before forking (web/gunicorn.conf.py), so the
+    workers share these pages copy-on-write instead of each loading a copy.
+    """
+    start = time.perf_counter()
+    load_prediction_components()
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    get_model_cache().get()
+    STARTUP.update(preloaded=True, load_seconds=time.perf_counter() - start)
+
+
+def worker_started(started_at):
+    """Reset the startup record in a freshly forked worker (`started_at`: fork time)."""
+    STARTUP.update(started_at=started_at, warm_up_seconds=None, ready_at=None, error=None)
+
+
+# Same keys as the profiles that fetch_user returns (model_dump(mode='json'))
+WARM_UP_PROFILE = {
+    'did': 'did:plc:warmup', 'handle': 'warmup.invalid', 'display_name': 'warm-up', 'description': 'warm-up',
+    'avatar': 'https://cdn.bsky.app/img/avatar/warmup.jpg', 'followers_count': 10, 'follows_count': 10,
+    'posts_count': 2, 'created_at': '2024-01-01T00:00:00.000Z',
+}
+WARM_UP_POSTS = [
+    {'text': 'warm-up post', 'createdAt': '2024-01-02T00:00:00.000Z', 'likeCount': 1, 'replyCount': 0,
+     'repostCount': 0},
+    {'text': 'another warm-up post', 'createdAt': '2024-01-03T00:00:00.000Z', 'likeCount': 0, 'replyCount': 1,
+     'repostCount': 0},
+]
+
+
+def warm_up():
+    """Load the model (unless preloaded) and score a synthetic account once.
+
+    Runs in each worker after the fork: it starts the micro-batcher thread and
+    the native thread pools of the model, which do not survive a fork. Idempotent;
+    raises if the model cannot be loaded.
+    """
+    with _WARM_UP_LOCK:
+        if STARTUP['ready_at'] is not None:
+            return
+        start = time.perf_counter()
+        try:
+            if not STARTUP['preloaded'] and STARTUP['load_seconds'] is None:
+                load_prediction_components()
+                get_model_cache().get()
+                STARTUP['load_seconds'] = time.perf_counter() - start
+            warm_start = time.perf_counter()
+            score_account(WARM_UP_PROFILE, WARM_UP_POSTS, get_model_cache().get())
+            # Start indexing almacen/ in the background before the first lookup
+            get_local_store().available()
+        except Exception as e:
+            STARTUP['error'] = str(e)
+            raise
+        STARTUP.update(warm_up_seconds=time.perf_counter() - warm_start, ready_at=time.time(), error=None)
+
+
+def startup_status():
+    """Startup timings and memory of this worker, for /readyz and /metrics."""
+    ready_at = STARTUP['ready_at']
+    return {
+        'pid': os.getpid(),
+        'preloaded': STARTUP['preloaded'],
+        'load_seconds': STARTUP['load_seconds'],
+        'warm_up_seconds': STARTUP['warm_up_seconds'],
+        'ready_seconds': ready_at - STARTUP['started_at'] if ready_at else None,
+        'memory': process_memory(),
+    }
+
+
 def generar_explicacion(features, prob_bot, es_bot):
     """Genera una explicación detallada con frase principal y 5 puntos específicos."""
     puntos = []
@@ -125,98 +262,573 @@ def healthz():
     return 'OK', 200
 
 
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Ready once this worker has the model loaded and has run a warm-up inference."""
+    try:
+        warm_up()
+    except Exception as e:
+        return jsonify({'ready': False, 'error': str(e), **startup_status()}), 503
+    return jsonify({'ready': True, **startup_status()})
+
+
+@app.before_request
+def start_timing():
+    environ = request.environ
+    environ.setdefault(REQUEST_START, time.perf_counter())
+    timings, environ['bluesky.timings_token'] = start_request(environ.get(REQUEST_TIMINGS))
+    environ[REQUEST_TIMINGS] = timings
+
+
+@app.after_request
+def finish_timing(response):
+    environ = request.environ
+    if request.endpoint in TIMED_ENDPOINTS:
+        METRICS.observe('total', time.perf_counter() - environ[REQUEST_START])
+    if SERVER_TIMING and environ.get(REQUEST_TIMINGS):
+        response.headers['Server-Timing'] = server_timing(environ[REQUEST_TIMINGS])
+    return response
+
+
+@app.teardown_request
+def stop_timing(_error):
+    token = request.environ.pop('bluesky.timings_token', None)
+    if token is not None:
+        end_request(token)
+
+
+def metric_families():
+    """Counters and gauges of this worker owned by other components, for METRICS.render."""
+    extra = [
+        ('cascade_predictions_total', 'counter', 'Predictions answered by each cascade stage.',
+         [({'stage': stage}, n) for stage, n in CASCADE_STATS.items()]),
+    ]
+    if PREDICTION_CACHE is not None:
+        stats = PREDICTION_CACHE.stats()
+        namespaces = stats['namespaces']
+        extra += [
+            ('cache_hits_total', 'counter', 'Prediction cache hits by namespace.',
+             [({'namespace': ns}, c['hits']) for ns, c in namespaces.items()]),
+            ('cache_misses_total', 'counter', 'Prediction cache misses by namespace.',
+             [({'namespace': ns}, c['misses']) for ns, c in namespaces.items()]),
+            ('cache_hit_ratio', 'gauge', 'Prediction cache hit rate by namespace.',
+             [({'namespace': ns}, c['hit_rate']) for ns, c in namespaces.items()]),
+            ('cache_refreshes_total', 'counter', 'Background refresh-ahead fetches by outcome.',
+             [({'outcome': 'ok'}, stats['refreshes']), ({'outcome': 'error'}, stats['refresh_errors'])]),
+        ]
+        if 'errors' in stats['backend']:
+            extra.append(('cache_backend_errors_total', 'counter', 'Errors talking to the shared cache backend.',
+                          [({'backend': stats['backend']['type']}, stats['backend']['errors'])]))
+    startup = startup_status()
+    extra += [
+        ('process_memory_bytes', 'gauge', 'Memory of this worker (pss and private exclude pages shared with the master).',
+         [({'kind': kind}, value) for kind, value in startup['memory'].items()]),
+        ('startup_seconds', 'gauge', 'Model load, warm-up inference and worker start to ready.',
+         [({'phase': phase}, startup[f'{phase}_seconds']) for phase in ('load', 'warm_up', 'ready')
+          if startup[f'{phase}_seconds'] is not None]),
+        ('model_preloaded', 'gauge', 'Whether the model was loaded by the master before forking.',
+         [({}, startup['preloaded'])]),
+    ]
+    if SINGLE_FLIGHT is not None:
+        flight = SINGLE_FLIGHT.stats()
+        extra.append(('single_flight_calls_total', 'counter', 'Coalesced upstream fetches by role.',
+                      [({'role': role}, flight[role]) for role in ('leaders', 'followers', 'timeouts')]))
+    if LOCAL_STORE is not None:
+        local = LOCAL_STORE.stats()
+        extra += [
+            ('local_store_lookups_total', 'counter', 'almacen/ lookups by outcome (stale and missing go to the API).',
+             [({'outcome': outcome}, local[outcome]) for outcome in ('hit', 'stale', 'missing')]),
+            ('local_store_entries', 'gauge', 'Accounts indexed from posts_usuarios.json.', [({}, local['entries'])]),
+        ]
+    return extra
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: stage latencies, upstream errors, caches (of every worker with METRICS_DIR)."""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_summary():
+    """Stage latencies of this worker (count, sum and p50/p95/p99 in seconds)."""
+    return jsonify(METRICS.summary())
+
+
+@app.route('/api/cascade/stats', methods=['GET'])
+def cascade_stats():
+    """Share of predictions answered by the cheap first-stage model in this worker."""
+    total = CASCADE_STATS['fast'] + CASCADE_STATS['full']
+    return jsonify({
+        'fast': CASCADE_STATS['fast'],
+        'full': CASCADE_STATS['full'],
+        'fast_fraction': CASCADE_STATS['fast'] / total if total else 0.0,
+    })
+
+
+@app.route('/api/model/status', methods=['GET'])
+def model_status():
+    """Which model version this worker serves and whether the last reload failed."""
+    if MODEL_CACHE is None:
+        return jsonify({'loaded': False})
+    return jsonify(MODEL_CACHE.status())
+
+
 @app.errorhandler(405)
 def method_not_allowed(_error):
     flash('Método no permitido. Te llevamos al inicio.', 'warning')
     return redirect(url_for('index'))
 
 
+class FetchError(Exception):
+    """Profile could not be fetched.
+
+    `category` is the flash category for the UI; `status` the HTTP status for the API.
+    """
+
+    def __init__(self, message, category='warning', status=502):
+        super().__init__(message)
+        self.category = category
+        self.status = status
+
+
+def score_rows(bundle, rows):
+    """Score a list of feature dicts with one vectorized call.
+
+    Runs in the micro-batcher thread with the rows of all coalesced requests.
+    """
+    import numpy as np
+
+    X = np.array([[row[c] for c in bundle.feature_cols] for row in rows], dtype=np.float64)
+    if bundle.compiled is not None:
+        # The compiled trees take raw features; the cascade still needs scaled ones
+        X_model = X
+        X_scaled = bundle.compiled.escalar(X)
+    else:
+        import pandas as pd
+        X_scaled = bundle.scaler.transform(pd.DataFrame(X, columns=bundle.feature_cols))
+        X_model = X_scaled
+    if bundle.cascade is not None:
+        # Confident cases are answered by the linear model; XGBoost only sees the uncertain band
+        probs, decisions, fast = bundle.cascade.resolver(X_scaled, bundle.model, X_modelo=X_model)
+        threshold = bundle.cascade.threshold
+    else:
+        probs = bundle.model.predict_proba(X_model)[:, 1]
+        threshold = DEFAULT_THRESHOLD
+        decisions = probs > threshold
+        fast = np.zeros(len(rows), dtype=bool)
+    CASCADE_STATS['fast'] += int(fast.sum())
+    CASCADE_STATS['full'] += int((~fast).sum())
+    return {
+        'prob_bot': probs,
+        'es_bot': decisions,
+        'fast': fast,
+        'threshold': np.full(len(rows), threshold),
+    }
+
+
+def get_batcher():
+    """Process-wide MicroBatcher, created on first use."""
+    global BATCHER
+    if BATCHER is None:
+        from web.batcher import MicroBatcher
+        BATCHER = MicroBatcher(
+            score_rows,
+            max_batch_size=int(os.environ.get('BATCH_MAX_SIZE', '64')),
+            max_wait_ms=float(os.environ.get('BATCH_MAX_WAIT_MS', '2')),
+        )
+    return BATCHER
+
+
+def predict_features(bundle, rows):
+    """Prediction dicts for feature rows, scored through the micro-batcher."""
+    with METRICS.span('scoring'):
+        results = get_batcher().score(bundle, rows, timeout=BATCH_TIMEOUT)
+    return [
+        {
+            'prob_humano': 1.0 - float(prob),
+            'prob_bot': float(prob),
+            'es_bot': bool(es_bot),
+            'threshold': float(threshold),
+            'via': 'fast' if fast else 'full',
+        }
+        for prob, es_bot, fast, threshold in zip(
+            results['prob_bot'], results['es_bot'], results['fast'], results['threshold']
+        )
+    ]
+
+
+def parse_feature_rows(items, feature_cols):
+    """Validate JSON feature objects; returns (rows, error message)."""
+    rows = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            return None, f'La fila {i} debe ser un objeto con las features.'
+        missing = [c for c in feature_cols if c not in item]
+        if missing:
+            return None, f'Faltan features en la fila {i}: {", ".join(missing)}'
+        try:
+            rows.append({c: float('nan') if item[c] is None else float(item[c]) for c in feature_cols})
+        except (TypeError, ValueError):
+            return None, f'Las features de la fila {i} deben ser numéricas.'
+    return rows, None
+
+
+def fetch_user(identifier):
+    """Profile and latest posts of a handle or DID from the Bluesky API.
+
+    Both calls run concurrently (see gestor/descarga.py), each with its own
+    timeout. Returns (profile, posts, complete); `complete` is False when the
+    feed failed or was too slow and only the profile is available.
+    """
+    _, _, ConexionBluesky = load_prediction_components()
+    from gestor.descarga import descargar_usuario, PerfilNoDisponible
+    conexion = ConexionBluesky()
+    try:
+        with METRICS.span('login'):
+            client = conexion.get_client()
+    except Exception as e:
+        METRICS.count_error('login', 'error')
+        raise FetchError(f'Error conectando a Bluesky: {e}', 'danger') from e
+
+    try:
+        datos = descargar_usuario(
+            client, identifier,
+            num_posts=FETCH_POSTS,
+            timeout_perfil=FETCH_PROFILE_TIMEOUT,
+            timeout_posts=FETCH_FEED_TIMEOUT,
+        )
+    except PerfilNoDisponible as e:
+        raise profile_fetch_error(e) from e
+    return record_download(datos)
+
+
+def profile_fetch_error(error):
+    """FetchError for a PerfilNoDisponible, counted as an upstream error."""
+    METRICS.count_error('profile', 'timeout' if error.agotado else 'error')
+    return FetchError(f'No se pudo obtener el perfil: {error}', status=504 if error.agotado else 502)
+
+
+def record_download(datos):
+    """Record the timings and feed errors of a download; returns (profile, posts, complete)."""
+    tiempos = datos['tiempos']
+    METRICS.observe('profile', tiempos['perfil'])
+    if tiempos['posts'] is not None:
+        METRICS.observe('feed', tiempos['posts'])
+    if not datos['posts_completos']:
+        METRICS.count_error('feed', 'timeout' if datos['posts_agotado'] else 'error')
+    return datos['profile'], datos['posts'], datos['posts_completos']
+
+
+def get_prediction_cache():
+    """Process-wide CacheStore of predictions, handle resolutions and fetched feeds.
+
+    CACHE_URL selects the backend: memory:// (per worker, default) or
+    redis://host:6379/0 (shared by every worker and replica).
+    """
+    global PREDICTION_CACHE
+    if PREDICTION_CACHE is None:
+        from web.cache import CacheStore
+        from web.cache_backends import backend_from_url
+        ttl = float(os.environ.get('PREDICTION_CACHE_TTL', '600'))
+        backend = backend_from_url(
+            os.environ.get('CACHE_URL', 'memory://'),
+            max_entries=int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', '1000')),
+            max_bytes=int(float(os.environ.get('PREDICTION_CACHE_MAX_MB', '64')) * 1024 * 1024),
+            timeout=float(os.environ.get('CACHE_TIMEOUT', '0.5')),
+        )
+        PREDICTION_CACHE = CacheStore(
+            backend,
+            ttls={
+                'prediction': ttl,
+                'feed': ttl,
+                'handle': float(os.environ.get('HANDLE_CACHE_TTL', '3600')),
+            },
+            refresh_ahead=float(os.environ.get('PREDICTION_CACHE_REFRESH_AHEAD', '0.8')),
+            compress_min_bytes=int(os.environ.get('CACHE_COMPRESS_MIN_BYTES', '1024')),
+        )
+    return PREDICTION_CACHE
+
+
+def get_single_flight():
+    """Process-wide SingleFlight for upstream fetches."""
+    global SINGLE_FLIGHT
+    if SINGLE_FLIGHT is None:
+        from web.singleflight import SingleFlight
+        SINGLE_FLIGHT = SingleFlight()
+    return SINGLE_FLIGHT
+
+
+def get_local_store():
+    """Process-wide LocalStore over ALMACEN_DIR."""
+    global LOCAL_STORE
+    if LOCAL_STORE is None:
+        from web.local_store import LocalStore
+        LOCAL_STORE = LocalStore(ALMACEN_DIR, LOCAL_STORE_MAX_AGE)
+    return LOCAL_STORE
+
+
+def normalize_identifier(identifier):
+    """Cache key for a handle or DID (handles are case-insensitive, '@' optional)."""
+    identifier = identifier.strip().lstrip('@')
+    return identifier if identifier.startswith('did:') else identifier.lower()
+
+
+def duplicate_features(bundle, profile, posts):
+    """Cross-account duplicate features of an account, {} if the model does not use them.
+
+    Read-only: accounts the crawler indexed get their stored features, and
+    any other account is compared against the index without being added to
+    it, so the result does not depend on earlier traffic or on the worker,
+    and the index shared after a fork stays untouched.
+    """
+    if bundle.duplicates is None:
+        return {}
+    return bundle.duplicates.features_candidato(profile.get('did'), posts)
+
+
+def score_account(profile, posts, bundle, precomputed=None):
+    """Extract features and score one account; returns the result dict.
+
+    `precomputed` features (e.g. the post statistics stored in almacen/) are
+    used as they are instead of being recalculated from the posts.
+    """
+    FeatureExtractor, _, _ = load_prediction_components()
+
+    # Extract features and predict
+    extractor = FeatureExtractor(bundle.feature_cols)
+    with METRICS.span('features'):
+        precomputed = {**(precomputed or {}), **duplicate_features(bundle, profile, posts)}
+        features = extractor.extract_profile_features(profile, posts, precalculadas=precomputed)
+    prediction = predict_features(bundle, [features])[0]
+
+    # Generar explicación
+    explicacion = generar_explicacion(features, prediction['prob_bot'], prediction['es_bot'])
+
+    return {
+        'handle': profile.get('handle'),
+        'did': profile.get('did'),
+        **prediction,
+        'explicacion': explicacion,
+        'features': {k: float(v) for k, v in features.items() if isinstance(v, (int, float))}
+    }
+
+
+def store_fetched(actor, profile, posts, complete, bundle):
+    """Score a fetched account and store its feed, prediction and handle aliases.
+
+    A degraded result (profile only, the feed did not arrive) is returned but
+    not cached, so the next request tries the feed again.
+    """
+    cache = get_prediction_cache()
+    result = {**score_account(profile, posts, bundle), 'degraded': not complete}
+    did = profile.get('did')
+    if did:
+        if complete:
+            stored_at = time.time()
+            cache.set('feed', did, {'profile': profile, 'posts': posts}, stored_at=stored_at)
+            cache.set('prediction', did, {'model_id': bundle.model_id, 'result': result}, stored_at=stored_at)
+        for alias in {normalize_identifier(actor), normalize_identifier(profile.get('handle') or '')} - {did, ''}:
+            cache.set('handle', alias, did)
+    return result
+
+
+def fetch_and_cache(actor, bundle):
+    """Fetch, score and store an account (see store_fetched)."""
+    profile, posts, complete = fetch_user(actor)
+    return store_fetched(actor, profile, posts, complete, bundle)
+
+
+def lookup_cached(identifier, bundle):
+    """Cached result for a handle or DID, without calling the API.
+
+    Handles resolve to a DID through the `handle` namespace. A cached
+    prediction from the current model is returned as is. One scored by another
+    model is re-scored from the cached feed. Hits past the refresh-ahead point
+    are refetched in the background.
+
+    Returns:
+        Tuple (result or None on a miss, normalized identifier, flight key);
+        the flight key is the DID when known, else the normalized identifier
+    """
+    cache = get_prediction_cache()
+    key = normalize_identifier(identifier)
+    did = key if key.startswith('did:') else None
+    with METRICS.span('cache_lookup'):
+        if did is None:
+            resolved = cache.get('handle', key)
+            did = resolved[0] if resolved else None
+
+        cached = cache.get('prediction', did) if did else None
+        if cached and cached[0]['model_id'] != bundle.model_id:
+            cached = None
+        feed = cache.get('feed', did) if did and not cached else None
+    if feed:
+        data, age = feed
+        result = {**score_account(data['profile'], data['posts'], bundle), 'degraded': False}
+        value = {'model_id': bundle.model_id, 'result': result}
+        cache.set('prediction', did, value, stored_at=time.time() - age)
+        cached = (value, age)
+    if not cached:
+        return None, key, did or key
+
+    value, age = cached
+    if cache.needs_refresh('prediction', age):
+        cache.refresh(did, lambda: get_single_flight().do(
+            did, lambda: fetch_and_cache(did, get_model_cache().get()), timeout=SINGLE_FLIGHT_TIMEOUT
+        ))
+    return {**value['result'], 'source': 'cache', 'cache_age': round(age, 3)}, key, did
+
+
+def lookup_local(key, bundle):
+    """Result for an account with fresh data in almacen/, else None (see web/local_store.py).
+
+    Args:
+        key: Normalized handle, or the DID when it is known
+    """
+    store = get_local_store()
+    if not store.available():
+        return None
+    with METRICS.span('local_lookup'):
+        entry = store.get(key)
+    if entry is None:
+        return None
+    result = score_account(entry['profile'], entry['posts'], bundle, precomputed=entry['features'])
+    return {**result, 'degraded': False, 'source': 'local', 'data_age': round(entry['age'], 3)}
+
+
+def analyze_identifier(identifier, bundle):
+    """Result dict for a handle or DID: cache, then almacen/, then the API.
+
+    The `source` field of the result says which one answered: 'cache',
+    'local' or 'api'.
+    """
+    result, key, flight_key = lookup_cached(identifier, bundle)
+    if result is not None:
+        return result
+    result = lookup_local(flight_key, bundle)
+    if result is not None:
+        return result
+    # Concurrent misses for the same account share one fetch and one scoring call
+    try:
+        result, shared = get_single_flight().do(
+            flight_key, lambda: fetch_and_cache(key, bundle), timeout=SINGLE_FLIGHT_TIMEOUT
+        )
+    except TimeoutError as e:
+        raise FetchError(SLOW_FETCH_MESSAGE, status=504) from e
+    return {**result, 'source': 'api', 'shared': shared, 'cache_age': 0.0}
+
+
+def analyze_request(identifier, bundle):
+    """analyze_identifier, unless the ASGI server already ran it for this request.
+
+    In async mode (web/asgi.py) the upstream fetch happens on the event loop
+    before the view runs; its outcome arrives in the WSGI environ.
+    """
+    prefetched = request.environ.get(PREFETCHED_ANALYSIS)
+    if prefetched is None:
+        return analyze_identifier(identifier, bundle)
+    result, error = prefetched
+    if error is not None:
+        raise error
+    return result
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
     identifier = request.form.get('identifier', '').strip()
-    id_type = request.form.get('id_type', 'handle')
 
     if not identifier:
         flash('Debes indicar un handle o DID para analizar.', 'danger')
         return redirect(url_for('index'))
 
     try:
-        FeatureExtractor, SecureModelHandler, ConexionBluesky = load_prediction_components()
+        load_prediction_components()
     except ImportError as e:
         flash(str(e), 'danger')
         return redirect(url_for('index'))
 
-    # Load model components
-    base_dir = Path(__file__).parent.parent / 'prediccion'
-    modelos_dir = base_dir / 'modelos'
-    handler = SecureModelHandler(modelos_dir)
-
+    # Model components are loaded once per worker and reloaded when the files change
     try:
-        model = handler.cargar_modelo('bot_detector.pkl', verificar_integridad=True)
-        scaler = handler.cargar_modelo('feature_scaler.pkl', verificar_integridad=True)
-        feature_cols = handler.cargar_modelo('feature_columns.pkl', verificar_integridad=True)
+        with METRICS.span('model_load'):
+            bundle = get_model_cache().get()
     except Exception as e:
         flash(f'Error cargando el modelo: {e}', 'danger')
         return redirect(url_for('index'))
 
-    # Obtain profile and posts
-    conexion = ConexionBluesky()
-    client = None
-    try:
-        client = conexion.get_client()
-    except Exception as e:
-        flash(f'Error conectando a Bluesky: {e}', 'danger')
-        return redirect(url_for('index'))
-
-    identifier_arg = identifier if id_type == 'handle' else identifier
     try:
-        profile_resp = client.get_profile(actor=identifier_arg)
-        profile = profile_resp.model_dump(mode='json')
-    except Exception as e:
-        flash(f'No se pudo obtener el perfil: {e}', 'warning')
+        result = analyze_request(identifier, bundle)
+    except FetchError as e:
+        flash(str(e), e.category)
         return redirect(url_for('index'))
 
-    # Get posts
-    try:
-        # default to 25 posts (same as config)
-        posts_response = client.get_author_feed(actor=identifier_arg, limit=25)
-        posts = []
-        for item in posts_response.feed:
-            post = item.post
-            posts.append({'text': post.record.text, 'createdAt': post.record.created_at,
-                          'likeCount': post.like_count, 'replyCount': post.reply_count,
-                          'repostCount': post.repost_count})
-    except Exception:
-        posts = []
-
-    # Extract features and predict
-    extractor = FeatureExtractor()
-    features = extractor.extract_profile_features(profile, posts)
-
-    import pandas as pd
-    X = pd.DataFrame([features])[feature_cols]
-    X_scaled = scaler.transform(X)
-    prob = model.predict_proba(X_scaled)[0]
-    prob_humano, prob_bot = prob[0], prob[1]
-    threshold = 0.7
-    es_bot = prob_bot > threshold
+    return render_template('result.html', result=result)
 
-    # Generar explicación
-    explicacion = generar_explicacion(features, prob_bot, es_bot)
 
-    result = {
-        'handle': profile.get('handle'),
-        'did': profile.get('did'),
-        'prob_humano': float(prob_humano),
-        'prob_bot': float(prob_bot),
-        'es_bot': bool(es_bot),
-        'threshold': threshold,
-        'explicacion': explicacion,
-        'features': {k: float(v) for k, v in features.items() if isinstance(v, (int, float))}
-    }
+@app.route('/api/predict', methods=['POST'])
+def api_predict():
+    """Score one account: {"features": {...}} or {"identifier": "handle or DID"}."""
+    payload = request.get_json(silent=True) or {}
+    try:
+        with METRICS.span('model_load'):
+            bundle = get_model_cache().get()
+    except Exception as e:
+        return jsonify({'error': f'Error cargando el modelo: {e}'}), 503
 
-    return render_template('result.html', result=result)
+    if 'features' in payload:
+        rows, error = parse_feature_rows([payload['features']], bundle.feature_cols)
+        if error:
+            return jsonify({'error': error}), 400
+        return jsonify(predict_features(bundle, rows)[0])
 
+    identifier = str(payload.get('identifier', '')).strip()
+    if not identifier:
+        return jsonify({'error': 'Debes indicar un handle o DID para analizar.'}), 400
+    try:
+        return jsonify(analyze_request(identifier, bundle))
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 500
+    except FetchError as e:
+        return jsonify({'error': str(e)}), e.status
+
+
+@app.route('/api/predict/batch', methods=['POST'])
+def api_predict_batch():
+    """Score many feature vectors: {"features": [{...}, ...]}."""
+    payload = request.get_json(silent=True) or {}
+    items = payload.get('features')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Debes enviar una lista de features.'}), 400
+    if len(items) > BATCH_MAX_ROWS:
+        return jsonify({'error': f'Como máximo {BATCH_MAX_ROWS} filas por petición.'}), 413
+    try:
+        with METRICS.span('model_load'):
+            bundle = get_model_cache().get()
+    except Exception as e:
+        return jsonify({'error': f'Error cargando el modelo: {e}'}), 503
+
+    rows, error = parse_feature_rows(items, bundle.feature_cols)
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify({'predictions': predict_features(bundle, rows)})
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss statistics of the prediction cache in this worker."""
+    return jsonify({
+        **get_prediction_cache().stats(),
+        'single_flight': get_single_flight().stats(),
+        'local_store': get_local_store().stats(),
+    })
+
+
+@app.route('/api/batcher/stats', methods=['GET'])
+def batcher_stats():
+    """How many rows each vectorized scoring call handled in this worker."""
+    if BATCHER is None:
+        return jsonify({'batches': 0, 'rows': 0})
+    return jsonify(BATCHER.stats())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,267 @@
+"""Async serving mode: ASGI entry point for I/O-bound prediction.
+
+    uvicorn web.asgi:app --host 0.0.0.0 --port 5000 --workers 2
+
+With sync gunicorn workers every analysis holds its worker for the whole
+Bluesky round trip. Here the upstream fetch of `POST /predict` and
+`POST /api/predict` with {"identifier": ...} runs on the event loop with
+atproto's AsyncClient, so many fetches share one worker. Everything else
+(cache lookups, scoring, template rendering and the other routes) is the
+unchanged Flask app, run in a pool of ASYNC_THREADS threads per worker.
+Threads rather than processes: NumPy and XGBoost release the GIL while
+scoring, and the model cache and micro-batcher stay shared by the worker.
+
+The outcome of the fetch reaches the Flask view through the WSGI environ
+(see web/app.py:analyze_request), so both modes give the same responses.
+Stage timings recorded before the view runs travel the same way, and the
+request context is copied into the pool threads (see web/metrics.py).
+"""
+import asyncio
+import contextvars
+import io
+import time
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import web.app as web_app
+from web.metrics import end_request, start_request
+
+ASYNC_THREADS = int(os.environ.get('ASYNC_THREADS', '16'))
+
+
+async def read_body(receive):
+    """Whole request body of an ASGI http scope."""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    return bytes(body)
+
+
+def wsgi_environ(scope, body):
+    """PEP 3333 environ for an ASGI http scope and its buffered body."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_TYPE': '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name, value = name.decode('latin-1').lower(), value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'content-length':
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def call_wsgi(wsgi_app, environ):
+    """Run a WSGI app to completion; returns (status, headers, body)."""
+    response = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and response:
+            raise exc_info[1].with_traceback(exc_info[2])
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(k.encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+        return chunks.append
+
+    iterable = wsgi_app(environ, start_response)
+    try:
+        for chunk in iterable:
+            chunks.append(chunk)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    return response['status'], response['headers'], b''.join(chunks)
+
+
+def analysis_target(method, path, content_type, body):
+    """Handle or DID whose upstream fetch this request needs, or None."""
+    if method != 'POST':
+        return None
+    if path == '/predict' and content_type.startswith('application/x-www-form-urlencoded'):
+        values = parse_qs(body.decode('utf-8', 'replace')).get('identifier', [''])
+        return values[0].strip() or None
+    if path == '/api/predict' and content_type.startswith('application/json'):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return None
+        if isinstance(payload, dict) and 'features' not in payload:
+            return str(payload.get('identifier', '')).strip() or None
+    return None
+
+
+def current_bundle():
+    """Model bundle the Flask views will use (raises like they do)."""
+    web_app.load_prediction_components()
+    return web_app.get_model_cache().get()
+
+
+class AsyncServer:
+    """ASGI app: async upstream fetches in front of the Flask WSGI app."""
+
+    def __init__(self, wsgi_app, threads=ASYNC_THREADS):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self._pool = None
+        self._flight = None
+        self._conexion = None
+        self.in_flight = 0
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.threads, thread_name_prefix='asgi-wsgi')
+        return self._pool
+
+    @property
+    def flight(self):
+        if self._flight is None:
+            from web.singleflight import AsyncSingleFlight
+            self._flight = AsyncSingleFlight()
+        return self._flight
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        self.in_flight += 1
+        arrived = time.perf_counter()
+        timings, token = start_request()
+        try:
+            body = await read_body(receive)
+            if scope['method'] == 'GET' and scope['path'] == '/api/async/stats':
+                status, headers = 200, [(b'content-type', b'application/json')]
+                payload = json.dumps(self.stats()).encode('utf-8')
+            else:
+                environ = wsgi_environ(scope, body)
+                environ[web_app.REQUEST_START] = arrived
+                environ[web_app.REQUEST_TIMINGS] = timings
+                identifier = analysis_target(scope['method'], scope['path'], environ['CONTENT_TYPE'], body)
+                if identifier:
+                    prefetched = await self.analyze(identifier)
+                    if prefetched is not None:
+                        environ[web_app.PREFETCHED_ANALYSIS] = prefetched
+                status, headers, payload = await self.in_pool(call_wsgi, self.wsgi_app, environ)
+        finally:
+            end_request(token)
+            self.in_flight -= 1
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # uvicorn spawns its workers, so each one loads and warms up its own model
+                try:
+                    await self.in_pool(web_app.warm_up)
+                except Exception:
+                    pass  # /readyz reports the error and retries
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def in_pool(self, fn, *args):
+        """Run `fn(*args)` in the thread pool with this request's context."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, contextvars.copy_context().run, fn, *args)
+
+    async def analyze(self, identifier):
+        """(result, error) for a handle or DID, like web_app.analyze_identifier.
+
+        Returns None when the model cannot be loaded; the view reports that.
+        """
+        try:
+            bundle = await self.in_pool(current_bundle)
+        except Exception:
+            return None
+
+        try:
+            result, key, flight_key = await self.in_pool(web_app.lookup_cached, identifier, bundle)
+            if result is not None:
+                return result, None
+            result = await self.in_pool(web_app.lookup_local, flight_key, bundle)
+            if result is not None:
+                return result, None
+            # Concurrent misses for the same account share one fetch and one scoring call
+            try:
+                result, shared = await self.flight.do(
+                    flight_key, lambda: self.fetch_and_cache(key, bundle), timeout=web_app.SINGLE_FLIGHT_TIMEOUT
+                )
+            except TimeoutError as e:
+                raise web_app.FetchError(web_app.SLOW_FETCH_MESSAGE, status=504) from e
+            return {**result, 'source': 'api', 'shared': shared, 'cache_age': 0.0}, None
+        except Exception as e:
+            return None, e
+
+    async def fetch_and_cache(self, actor, bundle):
+        """Fetch on the event loop, then score and store in the thread pool."""
+        profile, posts, complete = await self.fetch_user(actor)
+        return await self.in_pool(web_app.store_fetched, actor, profile, posts, complete, bundle)
+
+    async def fetch_user(self, identifier):
+        """Async web_app.fetch_user; one login per worker, shared by all requests."""
+        from gestor.conexion import ConexionBlueskyAsync
+        from gestor.descarga import descargar_usuario_async, PerfilNoDisponible
+        if self._conexion is None:
+            self._conexion = ConexionBlueskyAsync()
+        try:
+            with web_app.METRICS.span('login'):
+                client = await self._conexion.get_client()
+        except Exception as e:
+            web_app.METRICS.count_error('login', 'error')
+            raise web_app.FetchError(f'Error conectando a Bluesky: {e}', 'danger') from e
+
+        try:
+            datos = await descargar_usuario_async(
+                client, identifier,
+                num_posts=web_app.FETCH_POSTS,
+                timeout_perfil=web_app.FETCH_PROFILE_TIMEOUT,
+                timeout_posts=web_app.FETCH_FEED_TIMEOUT,
+            )
+        except PerfilNoDisponible as e:
+            raise web_app.profile_fetch_error(e) from e
+        return web_app.record_download(datos)
+
+    def stats(self):
+        return {
+            'in_flight_requests': self.in_flight,
+            'threads': self.threads,
+            'single_flight': self.flight.stats(),
+        }
+
+
+app = AsyncServer(web_app.app)
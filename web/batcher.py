@@ -0,0 +1,142 @@
+"""Micro-batching of prediction requests.
+
+Scoring one row at a time is dominated by per-call overhead (DataFrame
+construction, scaler, XGBoost's predict setup). The MicroBatcher collects the
+rows submitted by concurrent requests and scores them in one vectorized call.
+A batch closes when it holds `max_batch_size` rows or `max_wait_ms` after its
+first row arrived, whichever comes first. `max_wait_ms=0` scores whatever is
+already queued without waiting, so a lone request pays no extra latency.
+
+A single background thread per process does the scoring. It is started on
+first use, and again after a fork, so gunicorn workers each get their own.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class _Item:
+    __slots__ = ('key', 'rows', 'future')
+
+    def __init__(self, key, rows, future):
+        self.key = key
+        self.rows = rows
+        self.future = future
+
+
+class MicroBatcher:
+    """Coalesces concurrent submissions into batched calls to `score_fn`."""
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=5.0):
+        """
+        Args:
+            score_fn: Callable (key, rows) -> dict of arrays, one entry per row.
+                Rows are only batched together when they share the same key
+                (e.g. the model bundle they were validated against).
+            max_batch_size: Rows that close a batch immediately
+            max_wait_ms: Longest time the first row of a batch waits for others
+        """
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return self._queue
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+                # After a fork the parent's thread does not exist in this process
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='micro-batcher', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+            return self._queue
+
+    def submit(self, key, rows):
+        """Queue `rows` for scoring; returns a Future with the per-row results."""
+        future = Future()
+        if not rows:
+            future.set_result({})
+            return future
+        self._ensure_worker().put(_Item(key, list(rows), future))
+        return future
+
+    def score(self, key, rows, timeout=None):
+        """Submit and wait for the results (re-raises scoring errors)."""
+        return self.submit(key, rows).result(timeout)
+
+    def close(self):
+        """Stop the background thread once the queued batches are scored."""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                self._queue.put(_STOP)
+                self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        """Counters for the stats endpoint."""
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+        }
+
+    def _run(self, items_queue):
+        while True:
+            first = items_queue.get()
+            if first is _STOP:
+                return
+            batch, size = [first], len(first.rows)
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = items_queue.get(timeout=remaining) if remaining > 0 else items_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item.rows)
+            self._score(batch)
+            if stop:
+                return
+
+    def _score(self, batch):
+        # Group by key, keeping arrival order; almost always a single group
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item.key), []).append(item)
+        for items in groups.values():
+            rows = [row for item in items for row in item.rows]
+            try:
+                results = self.score_fn(items[0].key, rows)
+            except Exception as e:
+                for item in items:
+                    item.future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(rows)
+            self.largest_batch = max(self.largest_batch, len(rows))
+            start = 0
+            for item in items:
+                end = start + len(item.rows)
+                item.future.set_result({name: values[start:end] for name, values in results.items()})
+                start = end
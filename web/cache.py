@@ -0,0 +1,247 @@
+"""Caches of the web app: in-process LRU and the typed store used by predictions.
+
+`LRUCache` is a bounded in-process cache with per-entry TTL and LRU eviction.
+It is capped by entry count and by an approximate memory size, and the least
+recently used entries are evicted first.
+
+`CacheStore` is what the prediction path uses. It keeps values in named
+namespaces (predictions, handle→DID resolutions, fetched feeds), each with its
+own TTL, on top of a pluggable backend (see web/cache_backends.py). Values are
+stored as JSON, zlib-compressed above a size threshold, together with the
+wall-clock time they were produced. That way every replica sharing a backend
+computes the same age. When an entry is read after `refresh_ahead` × ttl,
+`refresh()` recomputes it on a small background pool while the current value
+keeps being served. Accounts that are looked up often therefore never expire,
+and nobody waits for the upstream API.
+"""
+import json
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+# First byte of an encoded value
+_PLAIN = b'\x00'
+_ZLIB = b'\x01'
+
+
+@dataclass
+class CacheEntry:
+    value: object
+    stored_at: float
+    size: int
+    expires_at: float
+    hits: int = 0
+
+
+def estimate_size(value):
+    """Approximate size in bytes (length of the JSON encoding)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return len(json.dumps(value, default=str, separators=(',', ':')))
+
+
+class LRUCache:
+    """Thread-safe TTL + LRU cache with hit/miss statistics."""
+
+    def __init__(self, ttl=600.0, max_entries=1000, max_bytes=64 * 1024 * 1024, clock=time.monotonic):
+        """
+        Args:
+            ttl: Default seconds an entry stays valid
+            max_entries: Entries kept at most
+            max_bytes: Approximate memory cap (see estimate_size)
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_bytes)
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Entry for `key` (None if missing or expired); marks it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() >= entry.expires_at:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+    def set(self, key, value, size=None, stored_at=None, ttl=None):
+        """Store `value`; `stored_at` keeps the age of a value that was only re-derived."""
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            stored_at = self._clock() if stored_at is None else stored_at
+            expires_at = stored_at + (self.ttl if ttl is None else float(ttl))
+            self._entries[key] = CacheEntry(value, stored_at, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def age(self, entry):
+        return self._clock() - entry.stored_at
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'ttl': self.ttl if math.isfinite(self.ttl) else None,
+        }
+
+
+def encode_value(value, stored_at, compress_min_bytes=1024):
+    """JSON envelope with the production time, zlib-compressed when large."""
+    data = json.dumps({'t': stored_at, 'v': value}, separators=(',', ':')).encode('utf-8')
+    if len(data) >= compress_min_bytes:
+        return _ZLIB + zlib.compress(data, 6)
+    return _PLAIN + data
+
+
+def decode_value(data):
+    """Inverse of encode_value: (value, stored_at)."""
+    if data[:1] == _ZLIB:
+        payload = zlib.decompress(data[1:])
+    elif data[:1] == _PLAIN:
+        payload = data[1:]
+    else:
+        raise ValueError('Unknown cache encoding')
+    envelope = json.loads(payload)
+    return envelope['v'], envelope['t']
+
+
+class CacheStore:
+    """Namespaced, TTL'd values over a bytes backend, with refresh-ahead."""
+
+    def __init__(self, backend, ttls, refresh_ahead=0.8, compress_min_bytes=1024,
+                 refresh_workers=2, clock=time.time):
+        """
+        Args:
+            backend: Object with get(key) -> bytes|None, set(key, bytes, ttl),
+                delete(key) and stats() (see web/cache_backends.py)
+            ttls: Seconds per namespace, e.g. {'prediction': 600, 'handle': 3600}
+            refresh_ahead: Fraction of the TTL after which a read schedules a
+                background refresh (>= 1 disables refresh-ahead)
+            compress_min_bytes: Encoded size from which values are compressed
+            refresh_workers: Threads used for background refreshes
+            clock: Wall clock shared by all replicas (injectable for tests)
+        """
+        self.backend = backend
+        self.ttls = dict(ttls)
+        self.refresh_ahead = float(refresh_ahead)
+        self.compress_min_bytes = compress_min_bytes
+        self.refresh_workers = max(1, int(refresh_workers))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = None
+        self.counters = {ns: {'hits': 0, 'misses': 0} for ns in self.ttls}
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    @staticmethod
+    def _key(namespace, key):
+        return f'{namespace}:{key}'
+
+    def get(self, namespace, key):
+        """(value, age in seconds) or None when missing, expired or unreadable."""
+        data = self.backend.get(self._key(namespace, key))
+        result = None
+        if data is not None:
+            try:
+                value, stored_at = decode_value(data)
+            except (ValueError, zlib.error):
+                value = None
+            else:
+                age = self._clock() - stored_at
+                if age < self.ttls[namespace]:
+                    result = (value, age)
+        self.counters[namespace]['hits' if result else 'misses'] += 1
+        return result
+
+    def set(self, namespace, key, value, stored_at=None):
+        """Store `value`; it expires ttl seconds after `stored_at` (default: now)."""
+        stored_at = self._clock() if stored_at is None else stored_at
+        ttl = self.ttls[namespace] - (self._clock() - stored_at)
+        if ttl <= 0:
+            return
+        self.backend.set(self._key(namespace, key), encode_value(value, stored_at, self.compress_min_bytes), ttl)
+
+    def delete(self, namespace, key):
+        self.backend.delete(self._key(namespace, key))
+
+    def needs_refresh(self, namespace, age):
+        """True once a value is past refresh_ahead × its namespace's ttl."""
+        return self.refresh_ahead < 1 and age >= self.refresh_ahead * self.ttls[namespace]
+
+    def refresh(self, key, compute):
+        """Run `compute()` in the background, at most once per key at a time in this process.
+
+        `compute` stores its own results (usually in several namespaces); errors
+        keep the current entries.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.refresh_workers, thread_name_prefix='cache-refresh')
+        return self._executor.submit(self._refresh, key, compute)
+
+    def _refresh(self, key, compute):
+        try:
+            compute()
+            self.refreshes += 1
+        except Exception:
+            self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self):
+        namespaces = {}
+        for ns, c in self.counters.items():
+            lookups = c['hits'] + c['misses']
+            namespaces[ns] = {**c, 'hit_rate': c['hits'] / lookups if lookups else 0.0, 'ttl': self.ttls[ns]}
+        return {
+            'backend': self.backend.stats(),
+            'namespaces': namespaces,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+        }
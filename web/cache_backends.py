@@ -0,0 +1,225 @@
+"""Byte-oriented backends for CacheStore (web/cache.py).
+
+- MemoryBackend: per-process LRUCache. It is the default, and each gunicorn
+  worker has its own.
+- RedisBackend: any server that speaks the Redis protocol (RESP), shared by
+  all workers and replicas. It is a minimal client on the standard library
+  (GET, SET with PX, DEL, PING, AUTH, SELECT) with a small connection pool.
+  When the server is unreachable every call degrades to a miss. The backend
+  then stops trying for `retry_after` seconds so requests do not pay the
+  connect timeout.
+
+`backend_from_url('memory://')` or `backend_from_url('redis://:pw@host:6379/0')`
+builds either one.
+"""
+import queue
+import socket
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+from web.cache import LRUCache
+
+
+class MemoryBackend:
+    """In-process backend on top of LRUCache."""
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024):
+        self.lru = LRUCache(ttl=float('inf'), max_entries=max_entries, max_bytes=max_bytes)
+
+    def get(self, key):
+        entry = self.lru.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key, data, ttl):
+        self.lru.set(key, data, size=len(data), ttl=ttl)
+
+    def delete(self, key):
+        self.lru.delete(key)
+
+    def stats(self):
+        stats = self.lru.stats()
+        stats.pop('ttl')
+        return {'type': 'memory', **stats}
+
+
+class RespError(Exception):
+    """Error reply from the server (-ERR ...)."""
+
+
+class _Connection:
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = sock.makefile('rb')
+
+    def close(self):
+        try:
+            self.reader.close()
+        finally:
+            self.sock.close()
+
+    def execute(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, (bytes, bytearray)):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self.sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Connection closed by the cache server')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode('utf-8')
+        if kind == b'-':
+            raise RespError(rest.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError('Connection closed by the cache server')
+            return data[:-2]
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f'Unexpected reply from the cache server: {line[:20]!r}')
+
+
+class RedisBackend:
+    """Shared backend over the Redis protocol."""
+
+    def __init__(self, host='localhost', port=6379, db=0, password=None, username=None,
+                 timeout=0.5, max_idle=8, retry_after=5.0, prefix='bsky:'):
+        """
+        Args:
+            host, port, db, username, password: Server location and credentials
+            timeout: Connect and read timeout in seconds
+            max_idle: Idle connections kept in the pool
+            retry_after: Seconds without trying after a connection error
+            prefix: Prepended to every key (several apps can share a server)
+        """
+        self.host = host
+        self.port = int(port)
+        self.db = int(db)
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.prefix = prefix
+        self._pool = queue.LifoQueue(maxsize=max_idle)
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.errors = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = _Connection(sock)
+        try:
+            if self.password:
+                args = ('AUTH', self.username, self.password) if self.username else ('AUTH', self.password)
+                conn.execute(*args)
+            if self.db:
+                conn.execute('SELECT', self.db)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def execute(self, *args):
+        """Run one command on a pooled connection (raises on any failure)."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            reply = conn.execute(*args)
+        except RespError:
+            self._release(conn)
+            raise
+        except Exception:
+            conn.close()
+            raise
+        self._release(conn)
+        return reply
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _call(self, *args):
+        """execute() that degrades to None while the server is down."""
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self.execute(*args)
+        except (OSError, ConnectionError, RespError, ValueError):
+            with self._lock:
+                self.errors += 1
+                self._down_until = time.monotonic() + self.retry_after
+            return None
+
+    def get(self, key):
+        data = self._call('GET', self.prefix + key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set(self, key, data, ttl):
+        self._call('SET', self.prefix + key, data, 'PX', max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self._call('DEL', self.prefix + key)
+
+    def ping(self):
+        return self._call('PING') == 'PONG'
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'type': 'redis',
+            'server': f'{self.host}:{self.port}/{self.db}',
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'errors': self.errors,
+            'available': time.monotonic() >= self._down_until,
+        }
+
+
+def backend_from_url(url, max_entries=1000, max_bytes=64 * 1024 * 1024, timeout=0.5):
+    """MemoryBackend for 'memory://', RedisBackend for 'redis://[user:pass@]host[:port][/db]'."""
+    parts = urlsplit(url)
+    if parts.scheme == 'memory':
+        return MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+    if parts.scheme == 'redis':
+        db = parts.path.strip('/')
+        return RedisBackend(
+            host=parts.hostname or 'localhost',
+            port=parts.port or 6379,
+            db=int(db) if db else 0,
+            username=unquote(parts.username) if parts.username else None,
+            password=unquote(parts.password) if parts.password else None,
+            timeout=timeout,
+        )
+    raise ValueError(f"Unsupported cache URL scheme: {parts.scheme!r} (use memory:// or redis://)")
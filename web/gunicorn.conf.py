@@ -0,0 +1,55 @@
+"""gunicorn settings for the sync serving mode.
+
+    gunicorn -c web/gunicorn.conf.py web.app:app
+
+With PRELOAD_MODEL=1 (default) the master imports the app, the prediction
+stack and the verified model artifacts before forking. The workers then share
+those pages copy-on-write instead of each importing pandas/xgboost and
+loading its own copy on the first request. gc.freeze() moves everything the
+master allocated out of the collector's reach, so collections in the workers
+do not write to (and unshare) those pages.
+
+Each worker still runs one warm-up inference after the fork (web/app.py:warm_up):
+the micro-batcher thread and the model's native thread pools do not survive
+a fork. /readyz answers 200 only after that. With PRELOAD_MODEL=0 each worker
+loads its own model at that point, before it accepts requests.
+"""
+import gc
+import os
+import time
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get('WEB_WORKERS', '2'))
+preload_app = os.environ.get('PRELOAD_MODEL', '1') == '1'
+
+
+def on_starting(server):
+    # Runs in the master after the app was preloaded, right before the first fork
+    if not preload_app:
+        return
+    from web.app import STARTUP, preload_model
+    try:
+        preload_model()
+    except Exception as e:
+        # Workers retry on their own; /readyz reports the error meanwhile
+        server.log.warning('Model preload failed: %s', e)
+    else:
+        server.log.info('Model preloaded in %.2f s', STARTUP['load_seconds'])
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.time()
+
+
+def post_worker_init(worker):
+    from web.app import startup_status, warm_up, worker_started
+    worker_started(worker.forked_at)
+    try:
+        warm_up()
+    except Exception as e:
+        worker.log.warning('Warm-up failed, /readyz will retry: %s', e)
+        return
+    status = startup_status()
+    worker.log.info('Worker ready in %.2f s (warm-up %.3f s, pss %.0f MB)', status['ready_seconds'],
+                    status['warm_up_seconds'], status['memory'].get('pss', status['memory']['rss']) / 2**20)
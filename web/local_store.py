@@ -0,0 +1,232 @@
+"""Read-only index of the scraped accounts in almacen/ for the prediction path.
+
+Many looked-up accounts are already in profiles_to_scan.json and
+posts_usuarios.json. The store indexes both files once: handle -> DID from the
+profiles, and the byte offset of each posts entry (IndicePostsUsuarios). A
+lookup then reads and parses only that account's entry. gestor/post.py
+replaces posts_usuarios.json atomically after every profile, and the index
+keeps the file it indexed open, so it goes on reading that version
+consistently until the new one is indexed. If the open file itself changes (a
+writer that rewrites it in place) or an entry does not decode, the account
+counts as missing and goes to the API. Entries written by
+gestor/post.py carry the accumulated post statistics
+(prediccion/utils/estadisticas_incrementales.py), which are handed to the
+feature extractor as precomputed features.
+
+An entry is served only while it is younger than `max_age` seconds. Its age
+comes from the `descargado_en` stamp that gestor/post.py writes. Entries saved
+before the stamp existed count as stale: the crawler rewrites the file after
+every profile, so its mtime says nothing about how old an entry is. Stale or
+missing entries are left to the API. When either file changes on disk
+(checked at most once per `check_interval`), the index is rebuilt in a
+background thread while the requests keep using the previous one; no request
+pays for the scan. Until the first index is ready lookups go to the API.
+"""
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from web.model_cache import file_signature
+
+PROFILES_FILE = 'profiles_to_scan.json'
+POSTS_FILE = 'posts_usuarios.json'
+
+
+def _stat_signature(st):
+    # Same fields as web.model_cache.file_signature
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class _Index:
+    """Offsets of one version of the files; never mutated after building.
+
+    Holds posts_usuarios.json open: after an atomic replace the old inode stays
+    readable through it. The file is closed when the index is garbage collected,
+    so a request still reading through a replaced index never sees a reused fd.
+    """
+
+    def __init__(self, directory, signature):
+        from prediccion.utils.json_streaming import IndicePostsUsuarios, iterar_array
+
+        self.built_at = time.time()
+        posts_path = Path(directory) / POSTS_FILE
+        self._file = open(posts_path, 'rb')
+        self.posts_signature = _stat_signature(os.fstat(self._file.fileno()))
+        self.signature = (signature[0], self.posts_signature)
+        self.posts = IndicePostsUsuarios(posts_path)
+        # The offsets must come from the open version
+        if _stat_signature(os.stat(posts_path)) != self.posts_signature:
+            self._file.close()
+            raise RuntimeError(f'{POSTS_FILE} changed while it was being indexed')
+        # Only handles with a posts entry: the rest would be a miss anyway
+        self.handles = {}
+        if signature[0] is not None:
+            for profile in iterar_array(Path(directory) / PROFILES_FILE):
+                did, handle = profile.get('did'), profile.get('handle')
+                if handle and did in self.posts:
+                    self.handles[handle.lower()] = did
+
+    def read(self, did):
+        """Entry of `did`, or None if the open file was modified or the entry does not decode."""
+        start, length = self.posts.offsets[did]
+        fd = self._file.fileno()
+        try:
+            if _stat_signature(os.fstat(fd)) != self.posts_signature:
+                return None
+            # pread: no shared file position, so no lock between threads
+            raw = os.pread(fd, length, start)
+            # Rewritten in place while reading
+            if _stat_signature(os.fstat(fd)) != self.posts_signature:
+                return None
+            entry = json.loads(raw.decode('utf-8'))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or (entry.get('profile') or {}).get('did', did) != did:
+            return None
+        return entry
+
+
+def downloaded_at(entry):
+    """Epoch seconds of the `descargado_en` stamp of an entry, None without a valid one."""
+    stamp = entry.get('descargado_en')
+    if not stamp:
+        return None
+    try:
+        when = datetime.fromisoformat(stamp.replace('Z', '+00:00'))
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+class LocalStore:
+    """Fresh almacen/ entries by handle or DID."""
+
+    def __init__(self, directory, max_age, check_interval=5.0, clock=time.time, background=True):
+        """
+        Args:
+            directory: Folder with profiles_to_scan.json and posts_usuarios.json
+            max_age: Seconds an entry is served after it was downloaded
+            check_interval: Minimum seconds between stat() checks of the files
+            clock: Wall clock (injectable for tests)
+            background: Build the index in a background thread (False: in the
+                lookup that notices the change, for tests and scripts)
+        """
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.background = background
+        self._clock = clock
+        self._index = None
+        self._checked_at = -math.inf
+        self._lock = threading.Lock()
+        self._builder = None
+        self._stats_lock = threading.Lock()
+        self.rebuilds = 0
+        self.last_error = None
+        self.outcomes = {'hit': 0, 'stale': 0, 'missing': 0}
+
+    def _current(self):
+        """Index of the files on disk, rebuilt when they changed; None without posts file."""
+        index = self._index
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return index
+        self._checked_at = now
+        signature = file_signature(self.directory, (PROFILES_FILE, POSTS_FILE))
+        if signature[1] is None:
+            return None
+        if index is None or index.signature != signature:
+            self._rebuild(signature)
+            index = self._index
+        return index
+
+    def _rebuild(self, signature):
+        # One build per worker at a time; meanwhile lookups use the previous index
+        with self._lock:
+            if self._builder is not None and self._builder.is_alive():
+                return
+            if not self.background:
+                self._build(signature)
+                return
+            self._builder = threading.Thread(target=self._build, args=(signature,),
+                                             name='local-store-index', daemon=True)
+            self._builder.start()
+
+    def _build(self, signature):
+        try:
+            new_index = _Index(self.directory, signature)
+        except Exception as e:
+            # Half-written or replaced while indexing: keep the previous version,
+            # the next check retries
+            self.last_error = str(e)
+            return
+        self._index = new_index
+        self.rebuilds += 1
+        self.last_error = None
+
+    def wait(self, timeout=None):
+        """Block until a running background build finishes (tests, warm-up)."""
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+    def available(self):
+        """Whether posts_usuarios.json exists and has been indexed."""
+        return self.max_age > 0 and self._current() is not None
+
+    def _count(self, outcome):
+        with self._stats_lock:
+            self.outcomes[outcome] += 1
+
+    def get(self, identifier):
+        """Entry for a normalized handle or DID if it is fresh enough.
+
+        Returns:
+            Dict with profile, posts, features (precomputed, possibly empty)
+            and age in seconds, or None when the account is missing or stale
+        """
+        index = self._current()
+        if index is None:
+            return None
+        did = identifier if identifier.startswith('did:') else index.handles.get(identifier)
+        entry = None
+        if did in index.posts:
+            entry = index.read(did)
+            if entry is None:
+                # The file changed under the index: stat it again on the next lookup
+                self._checked_at = -math.inf
+        if not entry or not entry.get('profile'):
+            self._count('missing')
+            return None
+        when = downloaded_at(entry)
+        age = None if when is None else self._clock() - when
+        if age is None or age > self.max_age:
+            self._count('stale')
+            return None
+        self._count('hit')
+        features = {}
+        if 'estadisticas' in entry:
+            from prediccion.utils.estadisticas_incrementales import EstadisticasUsuario
+            features = EstadisticasUsuario.desde_dict(entry['estadisticas']).features()
+        return {'profile': entry['profile'], 'posts': entry.get('posts') or [],
+                'features': features, 'age': max(age, 0.0)}
+
+    def stats(self):
+        index = self._index
+        return {
+            'directory': str(self.directory),
+            'max_age': self.max_age,
+            'entries': len(index.posts) if index else 0,
+            'handles': len(index.handles) if index else 0,
+            'built_at': index.built_at if index else None,
+            'building': self._builder is not None and self._builder.is_alive(),
+            'rebuilds': self.rebuilds,
+            'last_error': self.last_error,
+            **self.outcomes,
+        }
@@ -0,0 +1,348 @@
+"""Per-stage latency histograms and the Prometheus text format for /metrics.
+
+Each stage of a prediction (login, profile and feed fetch, feature
+extraction, model load, scoring...) is timed with `Metrics.span` or reported
+with `Metrics.observe`. Durations go into a fixed-bucket histogram per stage,
+from which p50/p95/p99 are estimated like Prometheus' histogram_quantile.
+
+The spans of the request being served are also collected in a context
+variable, so the app can echo them in a `Server-Timing` header. Context
+variables follow asyncio tasks and can be carried into worker threads with
+contextvars.copy_context().
+
+With several workers behind one port (gunicorn or uvicorn --workers), a
+scrape lands on any of them. Given a `directory` (METRICS_DIR), every worker
+writes a snapshot of its histograms, counters and the families returned by
+`collect` to <directory>/<pid>.json, at most once per `flush_interval` while
+it keeps observing. The worker that answers /metrics merges all snapshots:
+buckets and counters are summed, so the series stay monotonic across scrapes
+(also after a worker is replaced, as in prometheus_client's multiprocess
+mode), and gauges keep one sample per live worker with a `pid` label. The
+directory must be emptied before the server starts.
+"""
+import bisect
+import contextvars
+import json
+import math
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Upper bounds in seconds, from a cache hit to a slow upstream call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations (not thread-safe on its own)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)], ending with +Inf."""
+        total, result = 0, []
+        for bound, n in zip(self.buckets + (math.inf,), self.counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolating linearly inside its bucket."""
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        lower, below = 0.0, 0
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if math.isinf(bound):
+                    return self.buckets[-1]
+                inside = total - below
+                return lower + (bound - lower) * ((rank - below) / inside if inside else 1.0)
+            lower, below = bound, total
+        return self.buckets[-1]
+
+
+def process_memory():
+    """Memory of this process in bytes: rss, and on Linux pss and private.
+
+    rss counts pages shared with the gunicorn master in full in every worker;
+    pss divides them among the processes that share them, and private is what
+    this worker alone holds. Falls back to peak rss where /proc is missing.
+    """
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    memory = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in fields:
+                    key = fields[name]
+                    memory[key] = memory.get(key, 0) + int(rest.split()[0]) * 1024
+    except (OSError, ValueError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kB on Linux, bytes on macOS
+        memory = {'rss': maxrss if sys.platform == 'darwin' else maxrss * 1024}
+    return memory
+
+
+def start_request(timings=None):
+    """Collect the spans of the current request in `timings` (new list by default)."""
+    timings = [] if timings is None else timings
+    return timings, _request_timings.set(timings)
+
+
+def end_request(token):
+    _request_timings.reset(token)
+
+
+def server_timing(timings):
+    """`Server-Timing` header value for a list of (stage, seconds)."""
+    return ', '.join(f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in timings)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists but belongs to someone else
+    return True
+
+
+class Metrics:
+    """Stage histograms and upstream error counters of this process, merged with its siblings'."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, directory=None, collect=None, flush_interval=1.0):
+        """
+        Args:
+            buckets: Histogram upper bounds in seconds
+            directory: Folder shared by the workers of a server (None: this process only)
+            collect: Callable returning this process' extra families (see render),
+                written to the snapshot together with the histograms
+            flush_interval: Seconds between snapshot writes while there are new observations
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.directory = Path(directory) if directory else None
+        self.collect = collect
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.errors = {}
+        self.last_error = None
+        self._dirty = False
+        self._flusher = None
+        self._pid = None
+
+    def _ensure_flusher(self):
+        if self._pid == os.getpid() and self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or self._flusher is None or not self._flusher.is_alive():
+                # After a fork the parent's thread does not exist in this process
+                self._pid = os.getpid()
+                self._flusher = threading.Thread(target=self._run, name='metrics-flusher', daemon=True)
+                self._flusher.start()
+
+    def _run(self):
+        pid = os.getpid()
+        while os.getpid() == pid:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                self.flush()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            self._dirty = True
+        if self.directory is not None:
+            self._ensure_flusher()
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+
+    @contextmanager
+    def span(self, stage):
+        """Time the body of a `with` block as `stage` (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count_error(self, call, reason):
+        """Count a failed upstream call, e.g. ('feed', 'timeout')."""
+        with self._lock:
+            self.errors[(call, reason)] = self.errors.get((call, reason), 0) + 1
+            self._dirty = True
+
+    def snapshot(self, extra=None):
+        """JSON-ready state of this process; `extra` defaults to `collect()`."""
+        if extra is None:
+            extra = self.collect() if self.collect is not None else ()
+        with self._lock:
+            self._dirty = False
+            return {
+                'pid': os.getpid(),
+                'buckets': list(self.buckets),
+                'stages': {stage: [list(h.counts), h.sum] for stage, h in self.stages.items()},
+                'errors': [[call, reason, n] for (call, reason), n in self.errors.items()],
+                'extra': [[name, kind, help_text, [[labels, value] for labels, value in samples]]
+                          for name, kind, help_text, samples in extra],
+            }
+
+    def flush(self, extra=None):
+        """Write this process' snapshot to the shared directory (atomically)."""
+        if self.directory is not None:
+            self._write(self.snapshot(extra))
+
+    def _write(self, data):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{data['pid']}.json"
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(tmp, path)
+        except Exception as e:
+            # A failed write only delays the numbers; the next flush retries
+            self.last_error = str(e)
+            self._dirty = True
+
+    def _snapshots(self, extra=None):
+        """Own snapshot (fresh) followed by the other workers' snapshots on disk."""
+        own = self.snapshot(extra)
+        if self.directory is None:
+            return [own]
+        self._write(own)
+        snapshots = [own]
+        for path in sorted(self.directory.glob('*.json')):
+            if path.stem == str(own['pid']):
+                continue
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue  # replaced or half-written: seen on the next scrape
+            if tuple(data.get('buckets', ())) == self.buckets:
+                snapshots.append(data)
+        return snapshots
+
+    def merged(self, extra=None):
+        """(stages, errors, families) of every worker sharing the directory.
+
+        Histograms and counters are summed, also those of workers that already
+        exited; gauges only keep live workers, each with a `pid` label.
+        """
+        snapshots = self._snapshots(extra)
+        shared = self.directory is not None
+        stages, errors, families = {}, {}, {}
+        for data in snapshots:
+            live = data is snapshots[0] or _alive(data['pid'])
+            for stage, (counts, total) in data['stages'].items():
+                h = stages.get(stage)
+                if h is None:
+                    h = stages[stage] = Histogram(self.buckets)
+                h.counts = [a + b for a, b in zip(h.counts, counts)]
+                h.sum += total
+                h.count += sum(counts)
+            for call, reason, n in data['errors']:
+                errors[(call, reason)] = errors.get((call, reason), 0) + n
+            for name, kind, help_text, samples in data['extra']:
+                _, _, merged_samples = families.setdefault(name, (kind, help_text, {}))
+                for labels, value in samples:
+                    if kind == 'counter':
+                        key = tuple(sorted(labels.items()))
+                        merged_samples[key] = (labels, merged_samples.get(key, (None, 0))[1] + value)
+                    elif live:
+                        labels = dict(labels, pid=data['pid']) if shared else labels
+                        merged_samples[(data['pid'],) + tuple(sorted(labels.items()))] = (labels, value)
+        families = [(name, kind, help_text, list(samples.values()))
+                    for name, (kind, help_text, samples) in families.items()]
+        return stages, errors, families
+
+    def summary(self):
+        """{stage: {count, sum, p50, p95, p99}} in seconds, for JSON endpoints."""
+        stages, _, _ = self.merged()
+        return {
+            stage: {
+                'count': h.count,
+                'sum': h.sum,
+                **{f'p{round(q * 100)}': h.quantile(q) for q in QUANTILES},
+            }
+            for stage, h in sorted(stages.items())
+        }
+
+    def render(self, prefix='bluesky_web', extra=None):
+        """Prometheus text exposition (version 0.0.4).
+
+        Args:
+            prefix: Metric name prefix
+            extra: Iterable of (name, type, help, [(labels dict, value)]) families
+                of this process to append, e.g. cache counters owned by other
+                components; defaults to `collect()`
+        """
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{prefix}_{name}{suffix}{_labels(labels)} {_number(value)}')
+
+        stages, errors, families = self.merged(extra)
+        histogram_samples, quantile_samples = [], []
+        for stage, h in sorted(stages.items()):
+            for bound, total in h.cumulative():
+                histogram_samples.append(('_bucket', {'stage': stage, 'le': bound}, total))
+            histogram_samples.append(('_sum', {'stage': stage}, h.sum))
+            histogram_samples.append(('_count', {'stage': stage}, h.count))
+            for q in QUANTILES:
+                quantile_samples.append(('', {'stage': stage, 'quantile': q}, h.quantile(q)))
+
+        family('stage_duration_seconds', 'histogram', 'Duration of each prediction stage.', histogram_samples)
+        family('stage_duration_quantile_seconds', 'gauge',
+               'p50/p95/p99 of each stage estimated from the histogram buckets.', quantile_samples)
+        family('upstream_errors_total', 'counter', 'Failed Bluesky calls by call and reason.',
+               [('', {'call': call, 'reason': reason}, n) for (call, reason), n in sorted(errors.items())])
+        for name, kind, help_text, samples in families:
+            family(name, kind, help_text, [('', labels, value) for labels, value in samples])
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        text = _number(value) if isinstance(value, float) else str(value)
+        text = text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{text}"')
+    return '{' + ','.join(parts) + '}'
@@ -0,0 +1,187 @@
+"""Process-wide cache of the prediction artifacts with hot reload.
+
+Each worker loads the model artifacts once and keeps them in memory instead of
+unpickling and re-hashing them on every request. Each access does a cheap
+`stat()` of the watched files (mtime, size, inode), at most once per
+`check_interval` seconds. When the stats differ from those of the loaded
+bundle and have stayed the same for two consecutive checks, the artifacts are
+reloaded through `SecureModelHandler`, which does the full SHA-256
+verification, and swapped in with a single assignment. Waiting for two equal
+checks keeps a reload from pairing a new model with the old scaler while
+training is still writing the files. Requests already running keep the
+bundle they hold, so retraining never needs a restart.
+
+If a reload fails (for example the training script has written the model
+but not yet `checksums.json`), the previous bundle keeps serving. The next
+change to the files triggers another attempt.
+"""
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+# Cross-account duplicates index (prediccion/datos/ next to prediccion/modelos/).
+# Loaded only for models trained on its features; the crawler keeps it updated.
+DUPLICATES_INDEX = os.path.join('..', 'datos', 'indice_duplicados.pkl')
+
+# Files whose change triggers a reload (checksums.json is rewritten last by training)
+WATCHED_FILES = (
+    'bot_detector.pkl',
+    'feature_scaler.pkl',
+    'feature_columns.pkl',
+    'bot_detector_compilado.npz',
+    'cascada.pkl',
+    'checksums.json',
+    DUPLICATES_INDEX,
+)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Artifacts of one model version; never mutated after loading."""
+    model: object
+    scaler: object
+    feature_cols: list
+    compiled: object
+    cascade: object
+    signature: tuple
+    loaded_at: float
+    # SHA-256 of bot_detector.pkl: identifies the model across processes and replicas
+    model_id: str = None
+    # IndiceDuplicados when feature_cols include the cross-account features; the
+    # only mutable part: scored accounts are added to it in memory (web/app.py)
+    duplicates: object = None
+
+
+def file_signature(directory, names=WATCHED_FILES):
+    """(mtime_ns, size, inode) of each watched file, None for missing ones."""
+    signature = []
+    for name in names:
+        try:
+            st = os.stat(Path(directory) / name)
+        except FileNotFoundError:
+            signature.append(None)
+            continue
+        signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(signature)
+
+
+def load_bundle(modelos_dir, signature):
+    """Load and verify all artifacts from `modelos_dir`.
+
+    The compiled NumPy trees are preferred when present and built from the
+    current `bot_detector.pkl`; otherwise the pickled model and scaler are used.
+
+    Raises:
+        FileNotFoundError: If the model uses the cross-account duplicate
+            features and the index is missing (serving zeros would not match
+            what the model was trained on)
+    """
+    from seguridad.secure_model_handler import SecureModelHandler
+    from prediccion.utils.arboles_compilados import cargar_compilado
+    from prediccion.utils.cascada import cargar_cascada
+    from prediccion.utils.feature_extraction import FEATURES_DUPLICADOS
+
+    handler = SecureModelHandler(modelos_dir)
+    compiled = cargar_compilado(handler)
+    if compiled is not None:
+        model, scaler, feature_cols = compiled, None, compiled.feature_cols
+    else:
+        model = handler.cargar_modelo('bot_detector.pkl', verificar_integridad=True)
+        scaler = handler.cargar_modelo('feature_scaler.pkl', verificar_integridad=True)
+        feature_cols = handler.cargar_modelo('feature_columns.pkl', verificar_integridad=True)
+    # Optional first stage; None when missing or trained for another model
+    cascade = cargar_cascada(handler)
+    model_id = handler.calcular_checksum(handler.modelos_dir / 'bot_detector.pkl')
+
+    duplicates = None
+    if set(FEATURES_DUPLICADOS) & set(feature_cols):
+        from prediccion.utils.duplicados import IndiceDuplicados
+        index_path = Path(modelos_dir) / DUPLICATES_INDEX
+        if not index_path.exists():
+            raise FileNotFoundError(
+                f'The model uses {", ".join(FEATURES_DUPLICADOS)} but {index_path.resolve()} does not exist'
+            )
+        duplicates = IndiceDuplicados.cargar(index_path)
+    return ModelBundle(model, scaler, feature_cols, compiled, cascade, signature, time.time(), model_id, duplicates)
+
+
+class ModelCache:
+    """Holds the current ModelBundle and swaps it when the files change."""
+
+    def __init__(self, modelos_dir, check_interval=1.0, loader=load_bundle, clock=time.monotonic):
+        """
+        Args:
+            modelos_dir: Directory with the trained artifacts
+            check_interval: Minimum seconds between stat() checks
+            loader: Callable (modelos_dir, signature) -> ModelBundle
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.modelos_dir = Path(modelos_dir)
+        self.check_interval = check_interval
+        self._loader = loader
+        self._clock = clock
+        self._bundle = None
+        self._lock = threading.Lock()
+        self._checked_at = -math.inf
+        self._failed_signature = None
+        self._pending_signature = None
+        self.reloads = 0
+        self.last_error = None
+
+    def get(self):
+        """Current bundle, reloading first if the artifacts changed on disk.
+
+        Raises:
+            Exception: Whatever the loader raised, only when no bundle has
+                been loaded yet
+        """
+        bundle = self._bundle
+        now = self._clock()
+        if bundle is not None and now - self._checked_at < self.check_interval:
+            return bundle
+        signature = file_signature(self.modelos_dir)
+        self._checked_at = now
+        if bundle is not None:
+            if signature in (bundle.signature, self._failed_signature):
+                return bundle
+            if signature != self._pending_signature:
+                # Files still changing: serve the loaded version until they settle
+                self._pending_signature = signature
+                return bundle
+        return self._reload(signature)
+
+    def _reload(self, signature):
+        # One loader per worker at a time; the others wait and reuse its result
+        with self._lock:
+            bundle = self._bundle
+            if bundle is not None and signature in (bundle.signature, self._failed_signature):
+                return bundle
+            try:
+                new_bundle = self._loader(self.modelos_dir, signature)
+            except Exception as e:
+                self.last_error = str(e)
+                self._failed_signature = signature
+                if bundle is None:
+                    raise
+                return bundle
+            self._bundle = new_bundle
+            self._failed_signature = None
+            self.last_error = None
+            self.reloads += 1
+            return new_bundle
+
+    def status(self):
+        """Summary for the status endpoint."""
+        bundle = self._bundle
+        return {
+            'loaded': bundle is not None,
+            'loaded_at': bundle.loaded_at if bundle else None,
+            'model_id': bundle.model_id if bundle else None,
+            'compiled': bool(bundle and bundle.compiled is not None),
+            'cascade': bool(bundle and bundle.cascade is not None),
+            'reloads': self.reloads,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,138 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+When several requests ask for the same key at once, only the first one (the
+leader) runs the call. The others (followers) wait for its result, up to a
+timeout, and receive the same value or the same exception. Once the call
+finishes the key is forgotten, so a later request runs it again (by then the
+prediction cache usually answers first).
+
+Coalescing is per process. Across workers and replicas the shared cache
+backend already limits repeated upstream fetches. AsyncSingleFlight is the
+same for coroutines of one event loop (async serving mode, web/asgi.py).
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, timeout=None):
+        """Run `fn()` for `key`, or wait for the call already in flight.
+
+        Args:
+            key: Identity of the call (e.g. normalized handle or DID)
+            fn: Zero-argument callable
+            timeout: Seconds a follower waits for the leader (None = forever)
+
+        Returns:
+            Tuple (result, shared); `shared` is True for followers
+
+        Raises:
+            TimeoutError: A follower waited longer than `timeout`
+            Exception: Whatever `fn` raised (for the leader and its followers)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            try:
+                return future.result(timeout), True
+            except FutureTimeoutError:
+                with self._lock:
+                    self.timeouts += 1
+                raise TimeoutError(f'Timed out after {timeout}s waiting for the in-flight call') from None
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        return {
+            'in_flight': self.in_flight(),
+            'leaders': self.leaders,
+            'followers': self.followers,
+            'timeouts': self.timeouts,
+        }
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop."""
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+
+    async def do(self, key, fn, timeout=None):
+        """Await `fn()` for `key`, or wait for the call already in flight.
+
+        Same contract as SingleFlight.do, with `fn` returning an awaitable.
+        A follower that times out or is cancelled does not cancel the leader.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.followers += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout), True
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise TimeoutError(f'Timed out after {timeout}s waiting for the in-flight call') from None
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved: without followers nobody else reads it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._calls.pop(key, None)
+
+    def in_flight(self):
+        return len(self._calls)
+
+    def stats(self):
+        return {
+            'in_flight': self.in_flight(),
+            'leaders': self.leaders,
+            'followers': self.followers,
+            'timeouts': self.timeouts,
+        }